@@ -3162,4 +3162,9 @@ CREATE TABLE IF NOT EXISTS feedback_attachments (
     FOREIGN KEY (feedback_id) REFERENCES feedback_reports(id) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+CREATE TABLE IF NOT EXISTS secuencias_certificados (
+    clave VARCHAR(40) PRIMARY KEY,
+    siguiente BIGINT NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 SET FOREIGN_KEY_CHECKS = 1;
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""Índice de consulta por instrumento y fecha sobre ``normalize_audit_trail.csv``.
+
+Responder "qué cambió en el instrumento X entre las fechas A y B" ya no requiere
+volver a ejecutar ``expand_changes`` sobre todo el audit trail. El índice se
+construye una sola vez a partir del CSV normalizado que genera
+``convert_audit_trail_csv.py`` y se guarda junto a él (``*.idx.json``):
+
+- ``fechas``/``offsets``/``longitudes``: un registro por evento, ordenados por
+  ``fecha_evento`` y con la posición en bytes del registro dentro del CSV.
+- ``codigos``: para cada ``instrumento_codigo``, las posiciones (ya ordenadas
+  por fecha) de sus eventos dentro de los arreglos anteriores.
+
+Las consultas ubican el intervalo con búsqueda binaria y leen mediante ``mmap``
+únicamente los bytes de los registros referenciados. Si el CSV cambió desde que
+se construyó el índice (tamaño o fecha de modificación), el índice se
+reconstruye automáticamente.
+
+Ejemplos::
+
+    python audit_trail_index.py --codigo SBL-LM-08-001
+    python audit_trail_index.py --codigo SBL-LM-08-001 --desde 2024-04-01 --hasta 2024-04-30
+    python audit_trail_index.py --desde "2024-04-19 12:00" --hasta "2024-04-19 13:00" --formato json
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import csv
+import datetime as dt
+import io
+import json
+import mmap
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+BASE_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BASE_DIR.parents[4] / "tools" / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.append(str(SCRIPTS_DIR))
+
+from sbl_utils import detect_compression, iter_csv_record_spans  # noqa: E402
+
+# Misma ruta que ``convert_audit_trail_csv.DEFAULT_NORMALIZED_CSV``; se define
+# aquí para no cargar el conversor completo al consultar el índice.
+DEFAULT_NORMALIZED_CSV = BASE_DIR.parent / "Archivos_Normalize" / "normalize_audit_trail.csv"
+
+INDEX_VERSION = 1
+INDEX_SUFFIX = ".idx.json"
+CODE_FIELD = "instrumento_codigo"
+DATE_FIELD = "fecha_evento"
+# ``fecha_evento`` se escribe como ``%Y-%m-%d %H:%M:%S``; al compararse como
+# texto conserva el orden cronológico, por lo que el índice no necesita
+# convertirlas a ``datetime``.
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class AuditTrailIndexError(RuntimeError):
+    """Error al construir o consultar el índice del audit trail."""
+
+
+def default_index_path(csv_path: Path) -> Path:
+    return csv_path.with_name(csv_path.name + INDEX_SUFFIX)
+
+
+def _parse_record(raw: bytes) -> List[str]:
+    return next(csv.reader(io.StringIO(raw.decode("utf-8"), newline="")), [])
+
+
+def _source_signature(csv_path: Path) -> Dict[str, int]:
+    stat = csv_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _check_plain(csv_path: Path) -> None:
+    if detect_compression(csv_path) is not None:
+        raise AuditTrailIndexError(
+            f"El índice requiere el CSV normalizado sin comprimir: {csv_path}"
+        )
+
+
+def build_index(csv_path: Path, index_path: Optional[Path] = None) -> Path:
+    """Recorre el CSV normalizado una vez y escribe el índice en disco."""
+    _check_plain(csv_path)
+    index_path = index_path or default_index_path(csv_path)
+    events: List[Tuple[str, int, int, str]] = []
+    if csv_path.stat().st_size == 0:
+        raise AuditTrailIndexError(f"El CSV normalizado está vacío: {csv_path}")
+
+    with csv_path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        records = iter_csv_record_spans(buffer)
+        header_span = next(records)
+        header = [name.lstrip("\ufeff") for name in _parse_record(buffer[header_span[0]:sum(header_span)])]
+        try:
+            code_index = header.index(CODE_FIELD)
+            date_index = header.index(DATE_FIELD)
+        except ValueError as exc:
+            raise AuditTrailIndexError(
+                f"El CSV no contiene las columnas {CODE_FIELD}/{DATE_FIELD}: {csv_path}"
+            ) from exc
+
+        for offset, length in records:
+            values = _parse_record(buffer[offset:offset + length])
+            if len(values) <= max(code_index, date_index):
+                continue
+            events.append((values[date_index], offset, length, values[code_index]))
+
+    events.sort()
+    codes: Dict[str, List[int]] = {}
+    for position, (_, _, _, code) in enumerate(events):
+        if code:
+            codes.setdefault(code, []).append(position)
+
+    payload = {
+        "version": INDEX_VERSION,
+        "source": csv_path.name,
+        **_source_signature(csv_path),
+        "header": header,
+        "fechas": [event[0] for event in events],
+        "offsets": [event[1] for event in events],
+        "longitudes": [event[2] for event in events],
+        "codigos": codes,
+    }
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    with index_path.open("w", encoding="utf-8") as handle:
+        json.dump(payload, handle, ensure_ascii=False, separators=(",", ":"))
+    return index_path
+
+
+def _parse_bound(value: Optional[str], *, end: bool) -> Optional[str]:
+    """Convierte una fecha de consulta al formato textual de ``fecha_evento``."""
+    if value is None:
+        return None
+    text = value.strip()
+    try:
+        parsed = dt.datetime.fromisoformat(text)
+    except ValueError as exc:
+        raise AuditTrailIndexError(f"Fecha de consulta inválida: {value!r}") from exc
+    if end and len(text) <= 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59)
+    return parsed.strftime(DATE_FORMAT)
+
+
+@dataclass
+class AuditTrailIndex:
+    """Índice cargado en memoria junto con el CSV normalizado mapeado."""
+
+    csv_path: Path
+    header: List[str]
+    fechas: List[str]
+    offsets: List[int]
+    longitudes: List[int]
+    codigos: Dict[str, List[int]]
+
+    @classmethod
+    def open(
+        cls,
+        csv_path: Path = DEFAULT_NORMALIZED_CSV,
+        index_path: Optional[Path] = None,
+        *,
+        rebuild: bool = False,
+    ) -> "AuditTrailIndex":
+        """Carga el índice y lo reconstruye si falta o quedó desactualizado."""
+        _check_plain(csv_path)
+        if not csv_path.exists():
+            raise AuditTrailIndexError(f"No se encontró el CSV normalizado en: {csv_path}")
+        index_path = index_path or default_index_path(csv_path)
+        payload = None
+        if not rebuild and index_path.exists():
+            with index_path.open(encoding="utf-8") as handle:
+                payload = json.load(handle)
+            signature = _source_signature(csv_path)
+            if (
+                payload.get("version") != INDEX_VERSION
+                or payload.get("size") != signature["size"]
+                or payload.get("mtime_ns") != signature["mtime_ns"]
+            ):
+                payload = None
+        if payload is None:
+            build_index(csv_path, index_path)
+            with index_path.open(encoding="utf-8") as handle:
+                payload = json.load(handle)
+        return cls(
+            csv_path=csv_path,
+            header=payload["header"],
+            fechas=payload["fechas"],
+            offsets=payload["offsets"],
+            longitudes=payload["longitudes"],
+            codigos=payload["codigos"],
+        )
+
+    def _window(self, desde: Optional[str], hasta: Optional[str]) -> Tuple[int, int]:
+        low = 0 if desde is None else bisect.bisect_left(self.fechas, desde)
+        high = len(self.fechas) if hasta is None else bisect.bisect_right(self.fechas, hasta)
+        if desde is not None or hasta is not None:
+            # Los eventos sin fecha quedan al inicio y no pertenecen a ningún rango.
+            low = max(low, bisect.bisect_right(self.fechas, ""))
+        return low, high
+
+    def _positions(
+        self,
+        codigo: Optional[str],
+        desde: Optional[str],
+        hasta: Optional[str],
+    ) -> List[int]:
+        low, high = self._window(desde, hasta)
+        if codigo is None:
+            return list(range(low, high))
+        positions = self.codigos.get(codigo, [])
+        start = bisect.bisect_left(positions, low)
+        stop = bisect.bisect_left(positions, high)
+        return positions[start:stop]
+
+    def _read(self, positions: Sequence[int]) -> List[Dict[str, str]]:
+        if not positions:
+            return []
+        rows: List[Dict[str, str]] = []
+        with self.csv_path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for position in positions:
+                offset = self.offsets[position]
+                values = _parse_record(buffer[offset:offset + self.longitudes[position]])
+                rows.append(dict(zip(self.header, values)))
+        return rows
+
+    def history(
+        self,
+        codigo: str,
+        desde: Optional[str] = None,
+        hasta: Optional[str] = None,
+    ) -> List[Dict[str, str]]:
+        """Cambios de un instrumento, en orden cronológico, dentro del rango dado."""
+        return self._read(
+            self._positions(codigo, _parse_bound(desde, end=False), _parse_bound(hasta, end=True))
+        )
+
+    def between(self, desde: Optional[str], hasta: Optional[str]) -> List[Dict[str, str]]:
+        """Todos los cambios registrados entre ``desde`` y ``hasta`` (inclusive)."""
+        return self._read(
+            self._positions(None, _parse_bound(desde, end=False), _parse_bound(hasta, end=True))
+        )
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Consulta el historial del audit trail normalizado por instrumento y rango de fechas."
+    )
+    parser.add_argument(
+        "--normalized",
+        type=Path,
+        default=DEFAULT_NORMALIZED_CSV,
+        help="CSV normalizado generado por convert_audit_trail_csv.py.",
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=None,
+        help="Ruta del índice (por defecto <csv>.idx.json).",
+    )
+    parser.add_argument("--rebuild", action="store_true", help="Reconstruye el índice antes de consultar.")
+    parser.add_argument("--codigo", default=None, help="Código del instrumento a consultar.")
+    parser.add_argument("--desde", default=None, help="Fecha inicial (YYYY-MM-DD o YYYY-MM-DD HH:MM).")
+    parser.add_argument("--hasta", default=None, help="Fecha final inclusiva (YYYY-MM-DD o YYYY-MM-DD HH:MM).")
+    parser.add_argument(
+        "--formato",
+        choices=("csv", "json"),
+        default="csv",
+        help="Formato de salida de los registros encontrados.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        index = AuditTrailIndex.open(args.normalized, args.index, rebuild=args.rebuild)
+        started = time.perf_counter()
+        if args.codigo:
+            rows = index.history(args.codigo, args.desde, args.hasta)
+        elif args.desde or args.hasta:
+            rows = index.between(args.desde, args.hasta)
+        else:
+            print(
+                f"Índice listo: {len(index.fechas)} eventos, {len(index.codigos)} instrumentos.",
+                file=sys.stderr,
+            )
+            return 0
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    except AuditTrailIndexError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 1
+
+    if args.formato == "json":
+        json.dump(rows, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        writer = csv.DictWriter(sys.stdout, fieldnames=index.header, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"{len(rows)} registros en {elapsed_ms:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    from stage_profiler import run_main
+
+    raise SystemExit(run_main(main))
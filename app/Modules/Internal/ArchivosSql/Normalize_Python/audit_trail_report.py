@@ -9,16 +9,22 @@ operativos. Los resultados se escriben en:
 - ``audit_trail_report_totals.json``
 
 Ambos archivos se ubican en el mismo directorio de este script.
+
+Con ``--measure-memory`` el script no genera reportes; en su lugar mide con
+``tracemalloc`` la memoria que ocupan los acumuladores de un número dado de
+filas sintéticas (100 000 por defecto).
 """
 from __future__ import annotations
 
+import argparse
 import csv
 import json
 import sys
+import tracemalloc
 import unicodedata
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, MutableMapping, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 ROOT = Path(__file__).resolve().parent
 PROJECT_ROOT = ROOT.parents[4]
@@ -27,11 +33,12 @@ if str(PROJECT_ROOT) not in sys.path:
 
 from app.Modules.Internal.ArchivosSql.Normalize_Python.convert_audit_trail_csv import (  # noqa: E402
     CSV_PATH,
+    normalize_cell_reference,
     normalize_section_name,
     normalize_text,
     parse_datetime,
-    resolve_cell_reference,
-    resolve_section,
+    scan_audit_trail,
+    section_label,
 )
 SUMMARY_PATH = ROOT / "audit_trail_report_summary.csv"
 TOTALS_PATH = ROOT / "audit_trail_report_totals.json"
@@ -46,6 +53,20 @@ LOCATION_COLUMN = "G"
 FECHA_ALTA_COLUMN = "H"
 FECHA_BAJA_COLUMN = "I"
 
+# Cada columna se identifica con un código entero (A=0 … I=8) y un bit, de modo
+# que los valores actuales de una fila viven en una lista de tamaño fijo y la
+# verificación de alta se reduce a comparar máscaras.
+COLUMN_CODES = {column: index for index, column in enumerate(ALLOWED_COLUMNS)}
+COLUMN_COUNT = len(ALLOWED_COLUMNS)
+CODE_COLUMN_CODE = COLUMN_CODES[CODE_COLUMN]
+DEPARTMENT_COLUMN_CODE = COLUMN_CODES[DEPARTMENT_COLUMN]
+LOCATION_COLUMN_CODE = COLUMN_CODES[LOCATION_COLUMN]
+FECHA_ALTA_COLUMN_CODE = COLUMN_CODES[FECHA_ALTA_COLUMN]
+FECHA_BAJA_COLUMN_CODE = COLUMN_CODES[FECHA_BAJA_COLUMN]
+CODE_COLUMN_BIT = 1 << CODE_COLUMN_CODE
+FIRST_COLUMN_BIT = 1 << COLUMN_CODES["A"]
+REQUIRED_FOR_ALTA_MASK = sum(1 << COLUMN_CODES[column] for column in REQUIRED_FOR_ALTA)
+
 KEYWORD_PATTERNS = {
     "rechazado": ("rechazad",),
     "baja": ("baja",),
@@ -95,47 +116,78 @@ class CellChange:
     timestamp_str: str
     previous_value: Optional[str]
     new_value: Optional[str]
+    column_code: int = field(init=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.column_code = COLUMN_CODES[self.column]
 
 
-@dataclass
 class RowMetrics:
-    """Acumula los movimientos relevantes de una fila."""
+    """Acumula los movimientos relevantes de una fila.
 
-    row_number: int
-    asignaciones_codigo: int = 0
-    cambios_codigo: int = 0
-    movimientos_departamento: int = 0
-    movimientos_ubicacion: int = 0
-    regresos_almacen: int = 0
-    cambios_fecha_alta: int = 0
-    cambios_fecha_baja: int = 0
-    alta_confirmada: bool = False
-    fecha_alta_completa: Optional[str] = None
-    _current_values: MutableMapping[str, Tuple[Optional[str], Optional[str]]] = field(
-        default_factory=lambda: {col: (None, None) for col in ALLOWED_COLUMNS}
-    )
-    _columns_with_data: MutableMapping[str, bool] = field(
-        default_factory=lambda: {col: False for col in ALLOWED_COLUMNS}
+    Usa ``__slots__`` y una lista de tamaño fijo indexada por código de columna
+    en lugar de diccionarios por instancia. ``_present_mask`` marca las columnas
+    cuyo valor actual no es nulo y ``_history_mask`` las que alguna vez tuvieron
+    dato, así la alta se confirma con una sola comparación de bits.
+    """
+
+    __slots__ = (
+        "row_number",
+        "asignaciones_codigo",
+        "cambios_codigo",
+        "movimientos_departamento",
+        "movimientos_ubicacion",
+        "regresos_almacen",
+        "cambios_fecha_alta",
+        "cambios_fecha_baja",
+        "alta_confirmada",
+        "fecha_alta_completa",
+        "_values",
+        "_present_mask",
+        "_history_mask",
     )
 
-    def _set_value(self, column: str, value: Optional[str]) -> None:
-        self._current_values[column] = (value, canonicalize(value))
-        if value is not None:
-            self._columns_with_data[column] = True
+    def __init__(self, row_number: int) -> None:
+        self.row_number = row_number
+        self.asignaciones_codigo = 0
+        self.cambios_codigo = 0
+        self.movimientos_departamento = 0
+        self.movimientos_ubicacion = 0
+        self.regresos_almacen = 0
+        self.cambios_fecha_alta = 0
+        self.cambios_fecha_baja = 0
+        self.alta_confirmada = False
+        self.fecha_alta_completa: Optional[str] = None
+        self._values: List[Optional[str]] = [None] * COLUMN_COUNT
+        self._present_mask = 0
+        self._history_mask = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"RowMetrics(row_number={self.row_number}, "
+            f"alta_confirmada={self.alta_confirmada})"
+        )
+
+    def _set_value(self, code: int, value: Optional[str]) -> None:
+        self._values[code] = value
+        bit = 1 << code
+        if value is None:
+            self._present_mask &= ~bit
+        else:
+            self._present_mask |= bit
+            self._history_mask |= bit
 
-    def _get_value(self, column: str) -> Tuple[Optional[str], Optional[str]]:
-        return self._current_values[column]
+    def get_value(self, column: str) -> Optional[str]:
+        return self._values[COLUMN_CODES[column]]
 
     def process_change(self, change: CellChange) -> None:
         new_value = change.new_value
-        new_canonical = canonicalize(new_value)
         previous_value = change.previous_value
-        previous_canonical = canonicalize(previous_value)
-        old_value, old_canonical = self._get_value(change.column)
+        code = change.column_code
 
-        if change.column == CODE_COLUMN:
+        if code == CODE_COLUMN_CODE:
             if new_value is not None:
-                had_history = self._columns_with_data.get(CODE_COLUMN, False)
+                had_history = bool(self._history_mask & CODE_COLUMN_BIT)
                 if previous_value is None:
                     self.asignaciones_codigo += 1
                     if had_history:
@@ -144,27 +196,30 @@ class RowMetrics:
                     self.cambios_codigo += 1
             # Si se elimina el código no se contabiliza como movimiento.
 
-        elif change.column == DEPARTMENT_COLUMN:
+        elif code == DEPARTMENT_COLUMN_CODE:
             if values_differ(previous_value, new_value):
                 self.movimientos_departamento += 1
-        elif change.column == LOCATION_COLUMN:
+        elif code == LOCATION_COLUMN_CODE:
             if values_differ(previous_value, new_value):
                 self.movimientos_ubicacion += 1
                 if is_almacen(new_value):
                     self.regresos_almacen += 1
 
-        elif change.column == FECHA_ALTA_COLUMN:
+        elif code == FECHA_ALTA_COLUMN_CODE:
             if values_differ(previous_value, new_value):
                 self.cambios_fecha_alta += 1
 
-        elif change.column == FECHA_BAJA_COLUMN:
+        elif code == FECHA_BAJA_COLUMN_CODE:
             if values_differ(previous_value, new_value):
                 self.cambios_fecha_baja += 1
 
-        self._set_value(change.column, new_value)
+        self._set_value(code, new_value)
 
         if not self.alta_confirmada:
-            if all(self._current_values[col][1] is not None for col in REQUIRED_FOR_ALTA) and self._columns_with_data.get("A", False):
+            if (
+                self._present_mask & REQUIRED_FOR_ALTA_MASK == REQUIRED_FOR_ALTA_MASK
+                and self._history_mask & FIRST_COLUMN_BIT
+            ):
                 self.alta_confirmada = True
                 if change.timestamp_str:
                     self.fecha_alta_completa = change.timestamp_str
@@ -193,36 +248,36 @@ def parse_cell(cell: Optional[str]) -> Optional[Tuple[str, int]]:
 
 def load_changes() -> Dict[int, List[CellChange]]:
     grouped: Dict[int, List[CellChange]] = {}
-    with CSV_PATH.open(newline="", encoding="utf-8") as csv_file:
-        reader = csv.DictReader(csv_file)
-        for index, row in enumerate(reader):
-            if resolve_section(row) != TARGET_SECTION:
-                continue
-
-            parsed_cell = parse_cell(resolve_cell_reference(row))
-            if parsed_cell is None:
-                continue
-            column, row_number = parsed_cell
-
-            timestamp_dt = parse_datetime(row.get("Fecha"))
-            timestamp_key: Optional[int]
-            timestamp_str = ""
-            if timestamp_dt is not None:
-                timestamp_key = int(timestamp_dt.timestamp())
-                timestamp_str = timestamp_dt.strftime("%Y-%m-%d %H:%M")
-            else:
-                timestamp_key = None
-
-            change = CellChange(
-                sort_index=(timestamp_key or 0, index),
-                column=column,
-                row_number=row_number,
-                timestamp=timestamp_key,
-                timestamp_str=timestamp_str,
-                previous_value=normalize_text(row.get("Valor anterior")),
-                new_value=normalize_text(row.get("Nuevo valor")),
-            )
-            grouped.setdefault(row_number, []).append(change)
+    for index, (fecha, seccion, hoja, id_value, rango, anterior, nuevo, _) in enumerate(
+        scan_audit_trail(CSV_PATH)
+    ):
+        if section_label(seccion or hoja) != TARGET_SECTION:
+            continue
+
+        parsed_cell = parse_cell(normalize_cell_reference(id_value or rango))
+        if parsed_cell is None:
+            continue
+        column, row_number = parsed_cell
+
+        timestamp_dt = parse_datetime(fecha)
+        timestamp_key: Optional[int]
+        timestamp_str = ""
+        if timestamp_dt is not None:
+            timestamp_key = int(timestamp_dt.timestamp())
+            timestamp_str = timestamp_dt.strftime("%Y-%m-%d %H:%M")
+        else:
+            timestamp_key = None
+
+        change = CellChange(
+            sort_index=(timestamp_key or 0, index),
+            column=column,
+            row_number=row_number,
+            timestamp=timestamp_key,
+            timestamp_str=timestamp_str,
+            previous_value=normalize_text(anterior),
+            new_value=normalize_text(nuevo),
+        )
+        grouped.setdefault(row_number, []).append(change)
 
     for changes in grouped.values():
         changes.sort(key=lambda item: item.sort_index)
@@ -231,20 +286,18 @@ def load_changes() -> Dict[int, List[CellChange]]:
 
 def count_keyword_matches() -> int:
     matches = 0
-    with CSV_PATH.open(newline="", encoding="utf-8") as csv_file:
-        reader = csv.DictReader(csv_file)
-        for row in reader:
-            if normalize_section_name(row.get("Sección")) != KEYWORD_SECTION and resolve_section(row) != KEYWORD_SECTION:
-                continue
-            valor_anterior = normalize_for_keywords(normalize_text(row.get("Valor anterior")))
-            valor_nuevo = normalize_for_keywords(normalize_text(row.get("Nuevo valor")))
-            for patterns in KEYWORD_PATTERNS.values():
-                if any(pattern in valor_anterior for pattern in patterns if pattern):
-                    matches += 1
-                    break
-                if any(pattern in valor_nuevo for pattern in patterns if pattern):
-                    matches += 1
-                    break
+    for _, seccion, hoja, _, _, anterior, nuevo, _ in scan_audit_trail(CSV_PATH):
+        if normalize_section_name(seccion or hoja) != KEYWORD_SECTION and section_label(seccion or hoja) != KEYWORD_SECTION:
+            continue
+        valor_anterior = normalize_for_keywords(normalize_text(anterior))
+        valor_nuevo = normalize_for_keywords(normalize_text(nuevo))
+        for patterns in KEYWORD_PATTERNS.values():
+            if any(pattern in valor_anterior for pattern in patterns if pattern):
+                matches += 1
+                break
+            if any(pattern in valor_nuevo for pattern in patterns if pattern):
+                matches += 1
+                break
     return matches
 
 
@@ -313,7 +366,65 @@ def write_totals(rows: Iterable[RowMetrics], keyword_matches: int) -> None:
         json.dump(totals, totals_file, ensure_ascii=False, indent=2)
 
 
-def main() -> None:
+def synthetic_changes(total_rows: int) -> Dict[int, List[CellChange]]:
+    """Genera una secuencia de altas completas (columnas A–I) por fila."""
+    grouped: Dict[int, List[CellChange]] = {}
+    for row_number in range(1, total_rows + 1):
+        changes = []
+        for index, column in enumerate(ALLOWED_COLUMNS):
+            changes.append(
+                CellChange(
+                    sort_index=(0, index),
+                    column=column,
+                    row_number=row_number,
+                    timestamp=None,
+                    timestamp_str="",
+                    previous_value=None,
+                    new_value=f"{column}{row_number}",
+                )
+            )
+        grouped[row_number] = changes
+    return grouped
+
+
+def measure_metrics_memory(total_rows: int) -> Tuple[int, int]:
+    """Devuelve ``(bytes_actuales, pico)`` asignados por ``build_metrics``."""
+    changes = synthetic_changes(total_rows)
+    tracemalloc.start()
+    try:
+        metrics = build_metrics(changes)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    if len(metrics) != total_rows:
+        raise RuntimeError("El número de acumuladores no coincide con las filas generadas")
+    return current, peak
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--measure-memory",
+        nargs="?",
+        type=int,
+        const=100_000,
+        default=None,
+        metavar="FILAS",
+        help="Mide la memoria de los acumuladores para FILAS filas sintéticas (100000 por defecto)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    if args.measure_memory is not None:
+        current, peak = measure_metrics_memory(args.measure_memory)
+        print(
+            f"RowMetrics x {args.measure_memory}: {current / 1024:.1f} KiB retenidos, "
+            f"pico {peak / 1024:.1f} KiB ({current / max(args.measure_memory, 1):.0f} B/fila)"
+        )
+        return
+
     changes = load_changes()
     metrics = build_metrics(changes)
     write_summary(metrics)
@@ -322,4 +433,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    from stage_profiler import run_main
+
+    run_main(main)
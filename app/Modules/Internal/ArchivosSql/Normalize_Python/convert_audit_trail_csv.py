@@ -6,6 +6,10 @@ celdas copiadas masivamente, deriva el código del instrumento a partir de las
 hojas originales y agrega la firma interna de cada usuario. Además genera un
 CSV intermedio (`normalize_audit_trail.csv`) y registra un resumen de las
 transformaciones programáticas aplicadas.
+
+Con `--historiales` las mismas filas leídas alimentan además a
+`convert_historiales_csv.build_historiales`: el audit trail se parsea y sus
+fechas se resuelven una sola vez para ambas salidas.
 """
 from __future__ import annotations
 
@@ -13,12 +17,30 @@ import argparse
 import csv
 import datetime as dt
 import re
+import sys
 import unicodedata
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, List, Mapping, Optional, Sequence
+from typing import Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 
 BASE_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BASE_DIR.parents[4] / "tools" / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.append(str(SCRIPTS_DIR))
+
+from db_loader import LoadBatch, SQLDialect, add_load_arguments, run_load  # noqa: E402
+from pipeline_metrics import setup_metrics  # noqa: E402
+from sbl_utils import (  # noqa: E402
+    SQLStreamWriter,
+    add_compression_argument,
+    detect_compression,
+    open_text,
+    read_csv_parallel,
+    scan_csv_columns,
+    with_compression_suffix,
+)
+
 ARCHIVOS_SQL_DIR = BASE_DIR.parent
 CSV_ORIGINAL_DIR = ARCHIVOS_SQL_DIR / "Archivos_CSV_originales"
 NORMALIZE_DIR = ARCHIVOS_SQL_DIR / "Archivos_Normalize"
@@ -33,6 +55,7 @@ CSV_PATH = DEFAULT_INPUT_CSV
 DEFAULT_OUTPUT_SQL = ARCHIVOS_SQL_DIR / "Archivos_BD_SBL" / "SBL_inserts" / "insert_audit_trail.sql"
 DEFAULT_NORMALIZED_CSV = NORMALIZE_DIR / "normalize_audit_trail.csv"
 DEFAULT_CODE_LOG = REPORT_DIR / "audit_trail_code_log.md"
+DEFAULT_HISTORIALES_DIR = ARCHIVOS_SQL_DIR / "Archivos_BD_SQL"
 
 EMPRESA_ID = 1
 MONTH_MAP = {
@@ -54,6 +77,9 @@ MONTH_MAP = {
 NA_VALUES = {"", "NA", "ND", "N/A", "NULL", "null"}
 SECTION_FIELD_CANDIDATES = ("Sección", "Hoja")
 ID_FIELD_CANDIDATES = ("ID", "Rango")
+# Columnas del audit trail crudo que usan los lectores; `scan_audit_trail`
+# entrega cada fila como una tupla en este orden.
+AUDIT_SCAN_COLUMNS = ("Fecha", "Sección", "Hoja", "ID", "Rango", "Valor anterior", "Nuevo valor", "Usuario")
 CELL_PATTERN = re.compile(r"^([A-Za-z]+)(\d+)$")
 DATE_PATTERN = re.compile(r"(\d{1,2})-([A-Za-z\.]+)-(\d{2,4})")
 
@@ -161,6 +187,10 @@ class RawAuditRow:
     valor_anterior: Optional[str]
     valor_nuevo: Optional[str]
     usuario: str
+    # Clave canónica de la hoja (`sanitize_sheet_key`) y celda única
+    # (`normalize_cell_reference`), resueltas una vez al leer la fila.
+    hoja_canonica: Optional[str]
+    celda: Optional[str]
     row_position: int
 
 
@@ -193,6 +223,16 @@ class NormalizationStats:
 
 _snapshot_cache: dict[str, SheetSnapshot] = {}
 _column_labels_cache: dict[str, Mapping[str, str]] = {}
+# Directorio de las hojas LM/PR/CERT que resuelven códigos y etiquetas de columna.
+SHEETS_DIR = CSV_ORIGINAL_DIR
+
+
+def use_sheets_dir(path: Path) -> None:
+    """Toma las hojas de otro directorio (p. ej. un conjunto sintético) y limpia las cachés."""
+    global SHEETS_DIR
+    SHEETS_DIR = path
+    _snapshot_cache.clear()
+    _column_labels_cache.clear()
 
 
 def column_to_index(column: str) -> int:
@@ -270,8 +310,8 @@ def resolve_sheet_config(canonical: str) -> SheetSnapshot:
         candidates = SHEET_SOURCES[canonical]
         header_rows = HEADER_ROWS.get(canonical, 1)
         path = next(
-            (CSV_ORIGINAL_DIR / name for name in candidates if (CSV_ORIGINAL_DIR / name).exists()),
-            CSV_ORIGINAL_DIR / candidates[0],
+            (SHEETS_DIR / name for name in candidates if (SHEETS_DIR / name).exists()),
+            SHEETS_DIR / candidates[0],
         )
         _snapshot_cache[canonical] = SheetSnapshot.from_csv(path, header_rows)
     return _snapshot_cache[canonical]
@@ -416,8 +456,17 @@ def resolve_cell_reference(row: Mapping[str, str | None]) -> Optional[str]:
     return normalize_cell_reference(raw_value)
 
 
+def normalize_section_name(value: Optional[str]) -> Optional[str]:
+    """Normaliza el nombre de hoja tal como aparece en el audit trail."""
+    return normalize_text(value)
+
+
 def resolve_section(row: Mapping[str, str | None]) -> Optional[str]:
-    raw_value = _first_available(row, SECTION_FIELD_CANDIDATES)
+    return section_label(_first_available(row, SECTION_FIELD_CANDIDATES))
+
+
+def section_label(raw_value: Optional[str]) -> Optional[str]:
+    """Segmento ("Instrumentos", "Plan de riesgos"...) de un nombre de hoja crudo."""
     normalized = normalize_text(raw_value)
     key = sanitize_sheet_key(normalized)
     return resolve_sheet_label(key)
@@ -457,42 +506,69 @@ def _parse_placeholder(value: str) -> dt.datetime:
         ) from exc
 
 
-def load_raw_rows(csv_path: Path) -> List[RawAuditRow]:
-    rows: List[RawAuditRow] = []
-    with csv_path.open(newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        for idx, record in enumerate(reader, start=2):
-            fecha_evento = parse_datetime(record.get("Fecha"))
-            hoja = record.get("Hoja") or record.get("Sección") or ""
-            rango = record.get("Rango") or record.get("ID") or ""
-            valor_anterior = normalize_cell_value(record.get("Valor anterior"))
-            valor_nuevo = normalize_cell_value(record.get("Nuevo valor"))
-            usuario = (record.get("Usuario") or "").strip()
-            rows.append(
-                RawAuditRow(
-                    fecha_evento=fecha_evento,
-                    hoja=hoja,
-                    rango=rango,
-                    valor_anterior=valor_anterior,
-                    valor_nuevo=valor_nuevo,
-                    usuario=usuario,
-                    row_position=idx,
-                )
+def scan_audit_trail(csv_path: Path) -> Iterator[Tuple[Optional[str], ...]]:
+    """Filas del audit trail crudo como tuplas en el orden de `AUDIT_SCAN_COLUMNS`.
+
+    El archivo se recorre con mmap y solo se decodifican esas columnas; las
+    que no existan en el encabezado valen None.
+    """
+    return scan_csv_columns(csv_path, AUDIT_SCAN_COLUMNS)
+
+
+def raw_audit_values(records: Iterable[Tuple[Optional[str], ...]]) -> List[tuple]:
+    """Valores de `RawAuditRow` (sin `row_position`) para tuplas de `AUDIT_SCAN_COLUMNS`."""
+    values: List[tuple] = []
+    for fecha, seccion, hoja, id_value, rango, anterior, nuevo, usuario in records:
+        hoja = hoja or seccion or ""
+        rango = rango or id_value or ""
+        values.append(
+            (
+                parse_datetime(fecha),
+                hoja,
+                rango,
+                normalize_cell_value(anterior),
+                normalize_cell_value(nuevo),
+                (usuario or "").strip(),
+                sanitize_sheet_key(hoja),
+                normalize_cell_reference(rango),
             )
-    return rows
+        )
+    return values
+
+
+def load_raw_rows(csv_path: Path, workers: int = 1) -> List[RawAuditRow]:
+    """Lee el audit trail crudo; con `workers > 1` lo reparte por rangos de bytes.
+
+    En modo paralelo cada proceso también convierte fechas y celdas de su
+    rango; `row_position` conserva la numeración de la lectura secuencial.
+    """
+    if workers > 1 and detect_compression(csv_path) is None:
+        numbered = (
+            item
+            for chunk in read_csv_parallel(
+                csv_path,
+                columns=AUDIT_SCAN_COLUMNS,
+                transform=raw_audit_values,
+                workers=workers,
+            )
+            for item in chunk.numbered()
+        )
+    else:
+        numbered = enumerate(raw_audit_values(scan_audit_trail(csv_path)), start=2)
+    return [RawAuditRow(*values, row_position=idx) for idx, values in numbered]
 
 
 def expand_changes(rows: List[RawAuditRow], placeholder: Optional[dt.datetime]) -> tuple[List[NormalizedChange], NormalizationStats]:
     stats = NormalizationStats(total_rows=len(rows))
     changes: List[NormalizedChange] = []
     for raw in rows:
-        canonical = sanitize_sheet_key(raw.hoja)
+        canonical = raw.hoja_canonica
         segmento = resolve_sheet_label(canonical)
         if canonical is None:
             stats.unknown_sheets += 1
         cells = expand_range(raw.rango)
         if not cells:
-            reference = normalize_cell_reference(raw.rango)
+            reference = raw.celda
             if reference:
                 match = CELL_PATTERN.match(reference)
                 if match:
@@ -538,8 +614,9 @@ def expand_changes(rows: List[RawAuditRow], placeholder: Optional[dt.datetime])
     return changes, stats
 
 
-def write_normalized_csv(changes: List[NormalizedChange], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
+def write_normalized_csv(
+    changes: List[NormalizedChange], path: Path, empresa_id: int = EMPRESA_ID
+) -> None:
     headers = [
         "row_position",
         "empresa_id",
@@ -557,14 +634,14 @@ def write_normalized_csv(changes: List[NormalizedChange], path: Path) -> None:
         "usuario_nombre",
         "usuario_firma_interna",
     ]
-    with path.open("w", encoding="utf-8", newline="") as handle:
+    with open_text(path, "w") as handle:
         writer = csv.writer(handle)
         writer.writerow(headers)
         for change in changes:
             writer.writerow(
                 [
                     change.row_position,
-                    EMPRESA_ID,
+                    empresa_id,
                     change.segmento_actor,
                     change.hoja,
                     change.seccion,
@@ -582,31 +659,12 @@ def write_normalized_csv(changes: List[NormalizedChange], path: Path) -> None:
             )
 
 
-def write_sql(changes: List[NormalizedChange], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    columns = (
-        "empresa_id",
-        "segmento_actor",
-        "instrumento_codigo",
-        "columna_excel",
-        "fila_excel",
-        "fecha_evento",
-        "seccion",
-        "valor_anterior",
-        "valor_nuevo",
-        "usuario_correo",
-        "usuario_nombre",
-        "usuario_firma_interna",
-    )
-    lines: List[str] = [
-        "-- Archivo generado automaticamente por convert_audit_trail_csv.py",
-        f"-- Empresa destino: {EMPRESA_ID}",
-        "",
-        "START TRANSACTION;",
-    ]
-    rows = [
-        [
-            EMPRESA_ID,
+def _audit_trail_records(
+    changes: Iterable[NormalizedChange], empresa_id: int = EMPRESA_ID
+) -> Iterator[Sequence[object]]:
+    for change in changes:
+        yield (
+            empresa_id,
             change.segmento_actor,
             change.instrumento_codigo,
             change.columna_excel or None,
@@ -618,24 +676,76 @@ def write_sql(changes: List[NormalizedChange], path: Path) -> None:
             change.usuario_correo,
             change.usuario_nombre,
             change.usuario_firma_interna,
-        ]
-        for change in changes
+        )
+
+
+AUDIT_TRAIL_COLUMNS = (
+    "empresa_id",
+    "segmento_actor",
+    "instrumento_codigo",
+    "columna_excel",
+    "fila_excel",
+    "fecha_evento",
+    "seccion",
+    "valor_anterior",
+    "valor_nuevo",
+    "usuario_correo",
+    "usuario_nombre",
+    "usuario_firma_interna",
+)
+
+
+def build_load_batches(
+    changes: Iterable[NormalizedChange], dialect: SQLDialect, empresa_id: int = EMPRESA_ID
+) -> List[LoadBatch]:
+    """Equivalente parametrizado de `write_sql` para `--load`."""
+    rows = (
+        tuple(
+            value.strftime("%Y-%m-%d %H:%M:%S") if isinstance(value, dt.datetime) else value
+            for value in record
+        )
+        for record in _audit_trail_records(changes, empresa_id)
+    )
+    return [
+        LoadBatch(
+            table="audit_trail",
+            sql=dialect.insert_values("audit_trail", AUDIT_TRAIL_COLUMNS),
+            rows=rows,
+        )
     ]
-    for chunk in chunked(rows, 200):
-        if not chunk:
-            continue
-        lines.append("")
-        lines.append("INSERT INTO audit_trail (" + ", ".join(columns) + ")")
-        lines.append("VALUES")
-        value_lines: List[str] = []
-        for record in chunk:
-            formatted = ", ".join(sql_value(value) for value in record)
-            value_lines.append(f"    ({formatted})")
-        lines.append(",\n".join(value_lines) + ";")
-    lines.append("")
-    lines.append("COMMIT;")
-    lines.append("")
-    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def write_sql(
+    changes: Iterable[NormalizedChange],
+    path: Path,
+    *,
+    batch_size: int = 200,
+    flush_size: int = SQLStreamWriter.DEFAULT_FLUSH_SIZE,
+    empresa_id: int = EMPRESA_ID,
+) -> None:
+    """Escribe el SQL por lotes de `batch_size` filas sin armar el script en memoria."""
+    insert_header = "INSERT INTO audit_trail (" + ", ".join(AUDIT_TRAIL_COLUMNS) + ")"
+    records = _audit_trail_records(changes, empresa_id)
+    with SQLStreamWriter(path, flush_size=flush_size) as sink:
+        sink.write_line("-- Archivo generado automaticamente por convert_audit_trail_csv.py")
+        sink.write_line(f"-- Empresa destino: {empresa_id}")
+        sink.write_line()
+        sink.write_line("START TRANSACTION;")
+        while True:
+            chunk = list(islice(records, batch_size))
+            if not chunk:
+                break
+            sink.write_line()
+            sink.write_line(insert_header)
+            sink.write_values(
+                (
+                    "(" + ", ".join(sql_value(value) for value in record) + ")"
+                    for record in chunk
+                ),
+                terminator=";",
+            )
+        sink.write_line()
+        sink.write_line("COMMIT;")
 
 
 def write_code_log(stats: NormalizationStats, total_changes: int, csv_path: Path, log_path: Path) -> None:
@@ -666,6 +776,15 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         default=CSV_PATH,
         help="Ruta del archivo AT_instrumentos_original_v2.csv (o su versión previa).",
     )
+    parser.add_argument(
+        "--hojas-dir",
+        type=Path,
+        default=CSV_ORIGINAL_DIR,
+        help=(
+            "Directorio con las hojas LM/PR/CERT que resuelven el código de cada fila "
+            "(p. ej. el de un conjunto generado con tools/scripts/synthetic_dataset.py)."
+        ),
+    )
     parser.add_argument(
         "--output",
         type=Path,
@@ -693,7 +812,49 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
             "Si se omite, permanecerán en NULL."
         ),
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--build-index",
+        action="store_true",
+        help=(
+            "Construye el índice de consulta por instrumento/fecha (<csv>.idx.json) "
+            "sobre el CSV normalizado; ver audit_trail_index.py."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Procesos para leer el audit trail por rangos de bytes (default: 1). "
+            "Solo aplica al CSV sin comprimir."
+        ),
+    )
+    parser.add_argument(
+        "--historiales",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_HISTORIALES_DIR,
+        default=None,
+        help=(
+            "Genera también los SQL de historiales (convert_historiales_csv.py) con "
+            "las mismas filas leídas, en el directorio indicado "
+            "(por defecto Archivos_BD_SQL, el mismo que usa ese script)."
+        ),
+    )
+    parser.add_argument(
+        "--empresa-id",
+        type=int,
+        default=EMPRESA_ID,
+        help=f"Empresa destino de audit_trail e historiales (default: {EMPRESA_ID}).",
+    )
+    add_compression_argument(parser)
+    add_load_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.build_index and args.compress:
+        parser.error("--build-index requiere el CSV normalizado sin comprimir.")
+    if args.workers < 1:
+        parser.error("--workers debe ser al menos 1")
+    return args
 
 
 def main(argv: Optional[Sequence[str]] = None) -> None:
@@ -701,11 +862,50 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
     if not args.csv.exists():
         raise FileNotFoundError(f"No se encontró el archivo de auditoría en: {args.csv}")
     placeholder = _parse_placeholder(args.fecha_lote) if args.fecha_lote else None
-    raw_rows = load_raw_rows(args.csv)
-    changes, stats = expand_changes(raw_rows, placeholder)
-    write_normalized_csv(changes, args.normalized_output)
-    write_sql(changes, args.output)
+    use_sheets_dir(args.hojas_dir)
+    metrics = setup_metrics("convert_audit_trail_csv")
+    with metrics.stage("lectura_csv") as etapa:
+        raw_rows = load_raw_rows(args.csv, workers=args.workers)
+        etapa.rows = len(raw_rows)
+        etapa.gauge("procesos", args.workers)
+    with metrics.stage("expansion_cambios") as etapa:
+        changes, stats = expand_changes(raw_rows, placeholder)
+        etapa.rows = len(changes)
+    with metrics.stage("escritura_csv_normalizado") as etapa:
+        write_normalized_csv(
+            changes, with_compression_suffix(args.normalized_output, args.compress), args.empresa_id
+        )
+        etapa.rows = len(changes)
+    if args.build_index:
+        from audit_trail_index import build_index  # type: ignore[import-not-found]
+
+        build_index(args.normalized_output)
+    if args.load:
+        with metrics.stage("carga_base") as etapa:
+            results = run_load(
+                args.load,
+                lambda dialect: build_load_batches(changes, dialect, args.empresa_id),
+                batch_size=args.load_batch_size,
+            )
+            etapa.rows = sum(result.rows for result in results)
+    else:
+        with metrics.stage("escritura_sql") as etapa:
+            write_sql(
+                changes,
+                with_compression_suffix(args.output, args.compress),
+                empresa_id=args.empresa_id,
+            )
+            etapa.rows = len(changes)
+    if args.historiales is not None:
+        from convert_historiales_csv import entries_from_raw_rows, write_historiales  # type: ignore[import-not-found]
+
+        with metrics.stage("historiales") as etapa:
+            entries = entries_from_raw_rows(raw_rows)
+            write_historiales(entries, args.historiales, args.empresa_id)
+            etapa.rows = len(entries)
     write_code_log(stats, len(changes), args.csv, args.code_log)
 
 if __name__ == "__main__":
-    main()
+    from stage_profiler import run_main
+
+    run_main(main)
@@ -5,11 +5,14 @@ El objetivo de este conversor es permitir que phpMyAdmin importe los
 movimientos históricos sin depender de ``LOAD DATA LOCAL INFILE``. El script
 lee el mismo CSV utilizado por ``convert_audit_trail_csv.py`` y replica la
 lógica del bloque ``tmp_historial_instrumentos`` contenido en el SQL legado.
+
+Las entradas se construyen a partir de las ``RawAuditRow`` de
+``convert_audit_trail_csv.load_raw_rows``; ``convert_audit_trail_csv.py
+--historiales`` reutiliza la misma lectura para generar ambas salidas.
 """
 
 from __future__ import annotations
 
-import csv
 import datetime as dt
 import pathlib
 import re
@@ -20,18 +23,19 @@ from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 from convert_audit_trail_csv import (  # type: ignore[import-not-found]
     CSV_PATH,
+    DEFAULT_HISTORIALES_DIR,
     EMPRESA_ID,
     MONTH_MAP,
+    RawAuditRow,
+    load_raw_rows,
     normalize_cell_reference,
     normalize_text,
-    parse_datetime,
-    resolve_cell_reference,
-    resolve_section,
+    resolve_sheet_label,
     sql_quote,
 )
 
 ROOT = pathlib.Path(__file__).resolve().parent
-OUTPUT_DIR = ROOT.parent / "Archivos_BD_SQL"
+OUTPUT_DIR = DEFAULT_HISTORIALES_DIR
 
 DEPARTAMENTOS_SQL = OUTPUT_DIR / "insert_historial_departamentos.sql"
 UBICACIONES_SQL = OUTPUT_DIR / "insert_historial_ubicaciones.sql"
@@ -150,36 +154,38 @@ def parse_historial_date(value: Optional[str]) -> Optional[dt.date]:
         return None
 
 
-def load_entries() -> List[CsvEntry]:
+def load_entries(csv_path: pathlib.Path = CSV_PATH) -> List[CsvEntry]:
+    if not csv_path.exists():
+        return []
+    return entries_from_raw_rows(load_raw_rows(csv_path))
+
+
+def entries_from_raw_rows(rows: Iterable[RawAuditRow]) -> List[CsvEntry]:
+    """Entradas de la hoja de instrumentos a partir de filas ya parseadas.
+
+    Se reutilizan la fecha, la hoja canónica y la celda que resolvió
+    ``convert_audit_trail_csv``; ``normalize_text`` sobre los valores
+    multilínea de ``RawAuditRow`` equivale a aplicarlo al texto crudo.
+    """
     entries: List[CsvEntry] = []
-    if not CSV_PATH.exists():
-        return entries
-
-    with CSV_PATH.open(newline="", encoding="utf-8") as csv_file:
-        reader = csv.DictReader(csv_file)
-        for index, row in enumerate(reader, start=1):
-            if resolve_section(row) != TARGET_SECTION:
-                continue
-
-            reference = parse_cell_reference(resolve_cell_reference(row))
-            if reference is None:
-                continue
-
-            prefix, row_number = reference
-            fecha_evento = parse_datetime(row.get("Fecha"))
-            valor_anterior = normalize_text(row.get("Valor anterior"))
-            valor_nuevo = normalize_text(row.get("Nuevo valor"))
-
-            entries.append(
-                CsvEntry(
-                    row_position=index,
-                    row_number=row_number,
-                    prefix=prefix,
-                    timestamp=fecha_evento,
-                    valor_anterior=valor_anterior,
-                    valor_nuevo=valor_nuevo,
-                )
+    for raw in rows:
+        if resolve_sheet_label(raw.hoja_canonica) != TARGET_SECTION or raw.celda is None:
+            continue
+
+        match = CELL_PATTERN.match(raw.celda)
+        if match is None:
+            continue
+
+        entries.append(
+            CsvEntry(
+                row_position=raw.row_position,
+                row_number=int(match.group(2)),
+                prefix=match.group(1).upper(),
+                timestamp=raw.fecha_evento,
+                valor_anterior=normalize_text(raw.valor_anterior),
+                valor_nuevo=normalize_text(raw.valor_nuevo),
             )
+        )
 
     return entries
 
@@ -362,7 +368,9 @@ def build_union_select(
     return lines
 
 
-def build_departamentos_sql(registros: Sequence[HistorialTexto]) -> List[str]:
+def build_departamentos_sql(
+    registros: Sequence[HistorialTexto], empresa_id: int = EMPRESA_ID
+) -> List[str]:
     header = [
         "-- Archivo generado automáticamente por convert_historiales_csv.py",
         "",
@@ -378,7 +386,7 @@ def build_departamentos_sql(registros: Sequence[HistorialTexto]) -> List[str]:
 
     payload = [
         (
-            str(EMPRESA_ID),
+            str(empresa_id),
             sql_quote(item.instrumento_codigo),
             sql_quote(item.valor),
             format_datetime(item.fecha_evento),
@@ -437,7 +445,9 @@ def build_departamentos_sql(registros: Sequence[HistorialTexto]) -> List[str]:
     return lines
 
 
-def build_ubicaciones_sql(registros: Sequence[HistorialTexto]) -> List[str]:
+def build_ubicaciones_sql(
+    registros: Sequence[HistorialTexto], empresa_id: int = EMPRESA_ID
+) -> List[str]:
     header = [
         "-- Archivo generado automáticamente por convert_historiales_csv.py",
         "",
@@ -453,7 +463,7 @@ def build_ubicaciones_sql(registros: Sequence[HistorialTexto]) -> List[str]:
 
     payload = [
         (
-            str(EMPRESA_ID),
+            str(empresa_id),
             sql_quote(item.instrumento_codigo),
             sql_quote(item.valor),
             format_datetime(item.fecha_evento),
@@ -514,6 +524,7 @@ def build_ubicaciones_sql(registros: Sequence[HistorialTexto]) -> List[str]:
 def build_fecha_sql(
     registros: Sequence[HistorialFecha],
     table_name: str,
+    empresa_id: int = EMPRESA_ID,
 ) -> List[str]:
     header = [
         "-- Archivo generado automáticamente por convert_historiales_csv.py",
@@ -530,7 +541,7 @@ def build_fecha_sql(
 
     payload = [
         (
-            str(EMPRESA_ID),
+            str(empresa_id),
             sql_quote(item.instrumento_codigo),
             format_date(item.fecha_valor),
             format_datetime(item.fecha_evento),
@@ -588,6 +599,7 @@ def build_fecha_sql(
 def build_tipos_sql(
     registros: Sequence[HistorialTexto],
     estado_prefijo: str,
+    empresa_id: int = EMPRESA_ID,
 ) -> List[str]:
     header = [
         "-- Archivo generado automáticamente por convert_historiales_csv.py",
@@ -605,7 +617,7 @@ def build_tipos_sql(
 
     payload = [
         (
-            str(EMPRESA_ID),
+            str(empresa_id),
             sql_quote(item.instrumento_codigo),
             sql_quote(item.valor),
             format_datetime(item.fecha_evento),
@@ -667,10 +679,13 @@ def write_sql_file(path: pathlib.Path, lines: Iterable[str]) -> None:
     path.write_text("\n".join(lines), encoding="utf-8")
 
 
-def main() -> None:
-    ensure_output_dir()
-    entries = load_entries()
-
+def write_historiales(
+    entries: Sequence[CsvEntry],
+    output_dir: pathlib.Path = OUTPUT_DIR,
+    empresa_id: int = EMPRESA_ID,
+) -> None:
+    """Escribe los cinco SQL de historiales en ``output_dir``."""
+    output_dir.mkdir(parents=True, exist_ok=True)
     (
         departamentos,
         ubicaciones,
@@ -680,13 +695,31 @@ def main() -> None:
         estado_prefijo,
     ) = build_historiales(entries)
 
-    write_sql_file(DEPARTAMENTOS_SQL, build_departamentos_sql(departamentos))
-    write_sql_file(UBICACIONES_SQL, build_ubicaciones_sql(ubicaciones))
-    write_sql_file(FECHA_ALTA_SQL, build_fecha_sql(fechas_alta, "historial_fecha_alta"))
-    write_sql_file(FECHA_BAJA_SQL, build_fecha_sql(fechas_baja, "historial_fecha_baja"))
-    write_sql_file(TIPOS_SQL, build_tipos_sql(tipos, estado_prefijo))
+    write_sql_file(
+        output_dir / DEPARTAMENTOS_SQL.name, build_departamentos_sql(departamentos, empresa_id)
+    )
+    write_sql_file(
+        output_dir / UBICACIONES_SQL.name, build_ubicaciones_sql(ubicaciones, empresa_id)
+    )
+    write_sql_file(
+        output_dir / FECHA_ALTA_SQL.name,
+        build_fecha_sql(fechas_alta, "historial_fecha_alta", empresa_id),
+    )
+    write_sql_file(
+        output_dir / FECHA_BAJA_SQL.name,
+        build_fecha_sql(fechas_baja, "historial_fecha_baja", empresa_id),
+    )
+    write_sql_file(
+        output_dir / TIPOS_SQL.name, build_tipos_sql(tipos, estado_prefijo, empresa_id)
+    )
+
+
+def main() -> None:
+    write_historiales(load_entries())
 
 
 if __name__ == "__main__":
-    main()
+    from stage_profiler import run_main
+
+    run_main(main)
 
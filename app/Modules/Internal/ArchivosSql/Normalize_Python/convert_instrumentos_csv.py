@@ -25,6 +25,7 @@ from __future__ import annotations
 import argparse
 import csv
 import re
+import sys
 import unicodedata
 from dataclasses import dataclass
 from datetime import date, datetime
@@ -32,6 +33,12 @@ from pathlib import Path
 from typing import Optional, Sequence
 
 BASE_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BASE_DIR.parents[4] / "tools" / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.append(str(SCRIPTS_DIR))
+
+from columnar_cache import write_sidecar  # noqa: E402
+
 ARCHIVOS_SQL_DIR = BASE_DIR.parent
 CSV_ORIGINAL_DIR = ARCHIVOS_SQL_DIR / "Archivos_CSV_originales"
 NORMALIZE_DIR = ARCHIVOS_SQL_DIR / "Archivos_Normalize"
@@ -642,6 +649,11 @@ def main(argv: Optional[Sequence[str]] = None) -> None:
                     )
             writer.writerow(row)
 
+    # Caché tipada para los lectores posteriores (historiales, validador, auditoría).
+    write_sidecar(output_path, fieldnames, ([row[name] for name in fieldnames] for row in rows))
+
 
 if __name__ == "__main__":
-    main()
+    from stage_profiler import run_main
+
+    run_main(main)
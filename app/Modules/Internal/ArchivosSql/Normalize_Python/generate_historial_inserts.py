@@ -20,20 +20,37 @@ Puedes sobreescribir el archivo de entrada, el directorio de salida y el
 python app/Modules/Internal/ArchivosSql/Normalize_Python/generate_historial_inserts.py     --input app/Modules/Internal/ArchivosSql/Archivos_Normalize/normalize_instrumentos.csv     --output-dir app/Modules/Internal/ArchivosSql/Archivos_BD_SBL/SBL_historiales     --empresa-id 1
 ```
 
+Con ``--load DSN`` las mismas inserciones se envían directamente a la base de
+datos como sentencias parametrizadas (ver ``tools/scripts/db_loader.py``) en
+lugar de escribir los archivos ``.sql``.
+
 Si en el futuro se dispone de un CSV con los datos normalizados del audit trail,
 este script puede ampliarse para incluir movimientos hist?ricos adicionales
 leyendo ``audit_trail_normalizado.csv``.
 """
 from __future__ import annotations
 
-import csv
 import datetime as dt
 import pathlib
 import argparse
+import sys
 from dataclasses import dataclass
-from typing import Iterable, Mapping, Sequence, Optional
+from typing import Iterable, Iterator, Mapping, Sequence, Optional
 
 ROOT = pathlib.Path(__file__).resolve().parent
+SCRIPTS_DIR = ROOT.parents[4] / "tools" / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.append(str(SCRIPTS_DIR))
+
+from db_loader import (  # noqa: E402
+    LoadBatch,
+    SQLDialect,
+    add_load_arguments,
+    run_load,
+)
+from columnar_cache import iter_rows  # noqa: E402
+from sbl_utils import add_compression_argument, open_text, with_compression_suffix  # noqa: E402
+
 DEFAULT_EMPRESA_ID = 1
 DEFAULT_INPUT = ROOT.parent / "Archivos_Normalize" / "normalize_instrumentos.csv"
 DEFAULT_OUTPUT_DIR = ROOT.parent / "Archivos_BD_SBL" / "SBL_historiales"
@@ -98,39 +115,36 @@ def read_instruments(path: pathlib.Path) -> Iterable[InstrumentRecord]:
             f"No se encontró el archivo requerido: {path.as_posix()}"
         )
 
-    with path.open(newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            codigo = (row.get("codigo") or "").strip()
-            if not codigo:
-                continue
-
-            departamento_raw = (row.get("departamento_id") or "").strip()
-            departamento_id = int(departamento_raw) if departamento_raw else None
+    for row in iter_rows(path):
+        codigo = (row.get("codigo") or "").strip()
+        if not codigo:
+            continue
 
-            ubicacion_raw = normalize_text(row.get("ubicacion"))
-            if ubicacion_raw and ubicacion_raw.upper() not in NA_VALUES_UPPER:
-                ubicacion = ubicacion_raw
-            else:
-                ubicacion = None
+        departamento_id = parse_optional_int(row.get("departamento_id"))
 
-            fecha_alta = parse_date(row.get("fecha_alta"))
-            fecha_baja = parse_date(row.get("fecha_baja"))
+        ubicacion_raw = normalize_text(row.get("ubicacion"))
+        if ubicacion_raw and ubicacion_raw.upper() not in NA_VALUES_UPPER:
+            ubicacion = ubicacion_raw
+        else:
+            ubicacion = None
 
-            estado_raw = normalize_text(row.get("estado"))
-            if estado_raw and estado_raw.upper() not in NA_VALUES_UPPER:
-                estado = estado_raw
-            else:
-                estado = None
+        fecha_alta = parse_date(row.get("fecha_alta"))
+        fecha_baja = parse_date(row.get("fecha_baja"))
 
-            yield InstrumentRecord(
-                codigo=codigo,
-                departamento_id=departamento_id,
-                ubicacion=ubicacion,
-                fecha_alta=fecha_alta,
-                fecha_baja=fecha_baja,
-                estado=estado,
-            )
+        estado_raw = normalize_text(row.get("estado"))
+        if estado_raw and estado_raw.upper() not in NA_VALUES_UPPER:
+            estado = estado_raw
+        else:
+            estado = None
+
+        yield InstrumentRecord(
+            codigo=codigo,
+            departamento_id=departamento_id,
+            ubicacion=ubicacion,
+            fecha_alta=fecha_alta,
+            fecha_baja=fecha_baja,
+            estado=estado,
+        )
 
 
 def normalize_text(value: str | None) -> str | None:
@@ -156,9 +170,11 @@ def sanitize_text(value: str | None, *, preserve_newlines: bool = False) -> Opti
     return cleaned
 
 
-def parse_empresa_id(raw: str | None) -> int:
+def parse_empresa_id(raw: str | int | None) -> int:
     if raw is None:
         return DEFAULT_EMPRESA_ID
+    if isinstance(raw, int):
+        return raw
     cleaned = raw.strip()
     if not cleaned:
         return DEFAULT_EMPRESA_ID
@@ -168,9 +184,16 @@ def parse_empresa_id(raw: str | None) -> int:
         return DEFAULT_EMPRESA_ID
 
 
-def parse_date(value: str | None) -> dt.date | None:
-    if value is None:
-        return None
+def parse_optional_int(raw: str | int | None) -> int | None:
+    if raw is None or isinstance(raw, int):
+        return raw
+    cleaned = raw.strip()
+    return int(cleaned) if cleaned else None
+
+
+def parse_date(value: str | dt.date | None) -> dt.date | None:
+    if value is None or isinstance(value, dt.date):
+        return value
     cleaned = value.strip()
     if not cleaned or cleaned.upper() in NA_VALUES:
         return None
@@ -307,14 +330,25 @@ WHERE i.codigo = {sql_quote(record.codigo)}
     return [InsertStatement(table="historial_fecha_baja", sql=sql)]
 
 
-def build_estado_inserts(record: InstrumentRecord) -> list[InsertStatement]:
+def estado_tipo_values(record: InstrumentRecord) -> Optional[tuple[str, dt.date | None]]:
+    """Estado y fecha base para ``historial_tipos_instrumento`` (o ``None``)."""
+
     if record.estado is None:
-        return []
+        return None
 
     if record.estado.upper() in {"NA", "ND", "N/A", "NULL", "SIN DATO"}:
-        return []
+        return None
 
     fecha_base = record.fecha_baja if record.estado.lower().startswith("ina") else record.fecha_alta
+    return record.estado, fecha_base
+
+
+def build_estado_inserts(record: InstrumentRecord) -> list[InsertStatement]:
+    values = estado_tipo_values(record)
+    if values is None:
+        return []
+
+    _, fecha_base = values
     fecha_expr = date_expr(fecha_base)
     timestamp_expr = coalesce_timestamp(fecha_expr)
 
@@ -340,26 +374,24 @@ def load_plan_riesgos(path: pathlib.Path | None) -> dict[str, list[PlanRiskEntry
     if path is None or not path.exists():
         return {}
     plan_records: dict[str, list[PlanRiskEntry]] = {}
-    with path.open(newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            codigo_raw = sanitize_text(row.get("instrumento_codigo"))
-            if not codigo_raw:
-                continue
-            codigo = codigo_raw.upper()
-            empresa_id = parse_empresa_id(row.get("empresa_id"))
-            fecha_actualizacion = parse_date(row.get("fecha_actualizacion"))
-            plan_records.setdefault(codigo, []).append(
-                PlanRiskEntry(
-                    codigo=codigo,
-                    empresa_id=empresa_id,
-                    fecha_actualizacion=fecha_actualizacion,
-                    requerimiento=sanitize_text(row.get("requerimiento")),
-                    observaciones=sanitize_text(row.get("observaciones"), preserve_newlines=True),
-                    tipo_calibracion=sanitize_text(row.get("tipo_calibracion")),
-                    especificaciones=sanitize_text(row.get("especificaciones"), preserve_newlines=True),
-                )
+    for row in iter_rows(path):
+        codigo_raw = sanitize_text(row.get("instrumento_codigo"))
+        if not codigo_raw:
+            continue
+        codigo = codigo_raw.upper()
+        empresa_id = parse_empresa_id(row.get("empresa_id"))
+        fecha_actualizacion = parse_date(row.get("fecha_actualizacion"))
+        plan_records.setdefault(codigo, []).append(
+            PlanRiskEntry(
+                codigo=codigo,
+                empresa_id=empresa_id,
+                fecha_actualizacion=fecha_actualizacion,
+                requerimiento=sanitize_text(row.get("requerimiento")),
+                observaciones=sanitize_text(row.get("observaciones"), preserve_newlines=True),
+                tipo_calibracion=sanitize_text(row.get("tipo_calibracion")),
+                especificaciones=sanitize_text(row.get("especificaciones"), preserve_newlines=True),
             )
+        )
     return plan_records
 
 
@@ -381,57 +413,56 @@ def load_calibration_events(path: pathlib.Path | None) -> list[CalibrationEvent]
     if path is None or not path.exists():
         return []
     events: list[CalibrationEvent] = []
-    with path.open(newline="", encoding="utf-8") as handle:
-        reader = csv.DictReader(handle)
-        for row in reader:
-            codigo_raw = sanitize_text(row.get("instrumento_codigo"))
-            if not codigo_raw:
-                continue
-            codigo = codigo_raw.upper()
-            fecha_evento = parse_date(row.get("fecha_calibracion"))
-            if fecha_evento is None:
-                continue
-            empresa_id = parse_empresa_id(row.get("empresa_id"))
-            tipo_evento = sanitize_text(row.get("tipo")) or "Calibraci?n"
-            descripcion = sanitize_text(row.get("observaciones"), preserve_newlines=True)
-            if not descripcion:
-                descripcion = sanitize_text(row.get("requerimiento"))
-            if not descripcion:
-                periodo_label = sanitize_text(row.get("periodo_label"))
-                periodo_year = sanitize_text(row.get("periodo_year"))
-                periodo = sanitize_text(row.get("periodo"))
-                detalles: list[str] = []
-                if periodo_label and periodo_year:
-                    detalles.append(f"{periodo_label} {periodo_year}")
-                elif periodo_label:
-                    detalles.append(periodo_label)
-                if periodo and periodo not in detalles:
-                    detalles.append(periodo)
-                if detalles:
-                    descripcion = ". ".join(detalles)
-            if not descripcion:
-                descripcion = f"Calibraci?n registrada en {path.name}"
-            certificado_codigo = sanitize_text(row.get("certificado_codigo"))
-            events.append(
-                CalibrationEvent(
-                    codigo=codigo,
-                    empresa_id=empresa_id,
-                    fecha_evento=fecha_evento,
-                    tipo_evento=tipo_evento,
-                    descripcion=descripcion,
-                    certificado_codigo=certificado_codigo,
-                )
+    for row in iter_rows(path):
+        codigo_raw = sanitize_text(row.get("instrumento_codigo"))
+        if not codigo_raw:
+            continue
+        codigo = codigo_raw.upper()
+        fecha_evento = parse_date(row.get("fecha_calibracion"))
+        if fecha_evento is None:
+            continue
+        empresa_id = parse_empresa_id(row.get("empresa_id"))
+        tipo_evento = sanitize_text(row.get("tipo")) or "Calibraci?n"
+        descripcion = sanitize_text(row.get("observaciones"), preserve_newlines=True)
+        if not descripcion:
+            descripcion = sanitize_text(row.get("requerimiento"))
+        if not descripcion:
+            periodo_label = sanitize_text(row.get("periodo_label"))
+            periodo_year = sanitize_text(row.get("periodo_year"))
+            periodo = sanitize_text(row.get("periodo"))
+            detalles: list[str] = []
+            if periodo_label and periodo_year:
+                detalles.append(f"{periodo_label} {periodo_year}")
+            elif periodo_label:
+                detalles.append(periodo_label)
+            if periodo and periodo not in detalles:
+                detalles.append(periodo)
+            if detalles:
+                descripcion = ". ".join(detalles)
+        if not descripcion:
+            descripcion = f"Calibraci?n registrada en {path.name}"
+        certificado_codigo = sanitize_text(row.get("certificado_codigo"))
+        events.append(
+            CalibrationEvent(
+                codigo=codigo,
+                empresa_id=empresa_id,
+                fecha_evento=fecha_evento,
+                tipo_evento=tipo_evento,
+                descripcion=descripcion,
+                certificado_codigo=certificado_codigo,
             )
+        )
     events.sort(key=lambda event: (event.codigo, event.fecha_evento, event.tipo_evento))
     return events
 
 
-def build_calibration_inserts(
+def unique_calibration_events(
     events: Sequence[CalibrationEvent],
     empresa_id: int,
     known_codes: set[str],
-) -> list[InsertStatement]:
-    statements: list[InsertStatement] = []
+) -> Iterator[CalibrationEvent]:
+    """Eventos de la empresa con instrumento conocido, sin duplicados."""
+
     seen: set[tuple[str, dt.date, str]] = set()
     for event in events:
         if event.empresa_id != empresa_id:
@@ -442,6 +473,16 @@ def build_calibration_inserts(
         if key in seen:
             continue
         seen.add(key)
+        yield event
+
+
+def build_calibration_inserts(
+    events: Sequence[CalibrationEvent],
+    empresa_id: int,
+    known_codes: set[str],
+) -> list[InsertStatement]:
+    statements: list[InsertStatement] = []
+    for event in unique_calibration_events(events, empresa_id, known_codes):
         fecha_expr = date_expr(event.fecha_evento)
         tipo_expr = sql_quote(event.tipo_evento)
         descripcion_expr = sql_quote(event.descripcion)
@@ -465,13 +506,14 @@ WHERE i.codigo = {sql_quote(event.codigo)}
     return statements
 
 
-def build_specification_inserts(
+def unique_specifications(
     plan_records: Mapping[str, Sequence[PlanRiskEntry]],
     empresa_id: int,
     known_codes: set[str],
-) -> list[InsertStatement]:
-    statements: list[InsertStatement] = []
-    seen: set[tuple[str, dt.date, str]] = set()
+) -> Iterator[tuple[str, PlanRiskEntry, str]]:
+    """Especificaciones vigentes por instrumento como ``(codigo, entrada, version)``."""
+
+    seen: set[tuple[str, dt.date, str, str]] = set()
     for codigo in sorted(plan_records.keys()):
         if codigo not in known_codes:
             continue
@@ -487,10 +529,20 @@ def build_specification_inserts(
             if key in seen:
                 continue
             seen.add(key)
-            fecha_expr = date_expr(entry.fecha_actualizacion)
-            version_expr = sql_quote(version)
-            descripcion_expr = sql_quote(entry.especificaciones)
-            sql = f"""
+            yield codigo, entry, version
+
+
+def build_specification_inserts(
+    plan_records: Mapping[str, Sequence[PlanRiskEntry]],
+    empresa_id: int,
+    known_codes: set[str],
+) -> list[InsertStatement]:
+    statements: list[InsertStatement] = []
+    for codigo, entry, version in unique_specifications(plan_records, empresa_id, known_codes):
+        fecha_expr = date_expr(entry.fecha_actualizacion)
+        version_expr = sql_quote(version)
+        descripcion_expr = sql_quote(entry.especificaciones)
+        sql = f"""
 INSERT INTO historial_especificaciones (instrumento_id, empresa_id, fecha_vigencia, version, descripcion, usuario_id)
 SELECT i.id, @empresa_id, {fecha_expr}, {version_expr}, {descripcion_expr}, NULL
 FROM instrumentos i
@@ -505,27 +557,27 @@ WHERE i.codigo = {sql_quote(codigo)}
         AND he.version = {version_expr}
   );
 """.strip()
-            statements.append(InsertStatement(table="historial_especificaciones", sql=sql))
+        statements.append(InsertStatement(table="historial_especificaciones", sql=sql))
     return statements
 
 
-def build_estado_historial_inserts(
+def estado_historial_values(
     record: InstrumentRecord,
     plan_entry: Optional[PlanRiskEntry],
-) -> list[InsertStatement]:
+) -> Optional[tuple[str, dt.date | None, str]]:
+    """Estado, fecha base y motivo para ``historial_estado_instrumento`` (o ``None``)."""
+
     if record.estado is None:
-        return []
+        return None
     estado = record.estado.strip()
     if not estado or estado.upper() in NA_VALUES_UPPER:
-        return []
+        return None
     if estado.lower().startswith("ina"):
         fecha_base = record.fecha_baja
     else:
         fecha_base = record.fecha_alta
     if fecha_base is None and plan_entry and plan_entry.fecha_actualizacion:
         fecha_base = plan_entry.fecha_actualizacion
-    fecha_expr = date_expr(fecha_base)
-    fecha_evento_expr = coalesce_date(fecha_expr)
     motivo_candidates: list[str] = []
     if plan_entry:
         if plan_entry.observaciones:
@@ -536,6 +588,19 @@ def build_estado_historial_inserts(
             motivo_candidates.append(f"Tipo de calibraci?n: {plan_entry.tipo_calibracion}")
     motivo = motivo_candidates[0] if motivo_candidates else "Estado importado desde normalize_instrumentos.csv"
     motivo_sanitizado = sanitize_text(motivo, preserve_newlines=True) or "Estado importado desde normalize_instrumentos.csv"
+    return estado, fecha_base, motivo_sanitizado
+
+
+def build_estado_historial_inserts(
+    record: InstrumentRecord,
+    plan_entry: Optional[PlanRiskEntry],
+) -> list[InsertStatement]:
+    values = estado_historial_values(record, plan_entry)
+    if values is None:
+        return []
+    estado, fecha_base, motivo_sanitizado = values
+    fecha_expr = date_expr(fecha_base)
+    fecha_evento_expr = coalesce_date(fecha_expr)
     estado_expr = sql_quote(estado)
     motivo_expr = sql_quote(motivo_sanitizado)
     codigo_expr = sql_quote(record.codigo)
@@ -592,9 +657,10 @@ def write_statements(
     statements: list[InsertStatement],
     output_dir: pathlib.Path,
     empresa_id: int,
+    compression: str | None = None,
 ) -> None:
-    output_path = output_dir / f"{table}.sql"
-    with output_path.open("w", encoding="utf-8") as handle:
+    output_path = with_compression_suffix(output_dir / f"{table}.sql", compression)
+    with open_text(output_path, "w", newline=None) as handle:
         handle.write(render_file_header(table, empresa_id))
         handle.write("\n\n")
         if not statements:
@@ -610,20 +676,49 @@ def write_statements(
         handle.write(render_file_footer())
 
 
+@dataclass(frozen=True)
+class HistorialSources:
+    """Insumos ya leídos que comparten la generación de SQL y la carga directa."""
+
+    records: list[InstrumentRecord]
+    known_codes: set[str]
+    plan_records: dict[str, list[PlanRiskEntry]]
+    calibration_events: list[CalibrationEvent]
+
+
+def load_sources(
+    input_path: pathlib.Path,
+    plan_path: pathlib.Path | None = DEFAULT_PLAN_PATH,
+    certificates_path: pathlib.Path | None = DEFAULT_CERTIFICATES_PATH,
+) -> HistorialSources:
+    records = sorted(read_instruments(input_path), key=lambda r: r.codigo)
+    return HistorialSources(
+        records=records,
+        known_codes={record.codigo.upper() for record in records},
+        plan_records=load_plan_riesgos(plan_path),
+        calibration_events=load_calibration_events(certificates_path),
+    )
+
+
 def generate_historial_files(
     input_path: pathlib.Path,
     output_dir: pathlib.Path,
     empresa_id: int = DEFAULT_EMPRESA_ID,
     plan_path: pathlib.Path | None = DEFAULT_PLAN_PATH,
     certificates_path: pathlib.Path | None = DEFAULT_CERTIFICATES_PATH,
+    compression: str | None = None,
 ) -> Mapping[str, int]:
-    """Genera los archivos SQL y devuelve el total de inserciones por tabla."""
+    """Genera los archivos SQL y devuelve el total de inserciones por tabla.
 
-    records = sorted(read_instruments(input_path), key=lambda r: r.codigo)
-    known_codes = {record.codigo.upper() for record in records}
+    Con ``compression`` ('gzip' o 'zstd') cada archivo se escribe comprimido
+    (``<tabla>.sql.gz`` / ``<tabla>.sql.zst``).
+    """
 
-    plan_records = load_plan_riesgos(plan_path)
-    calibration_events = load_calibration_events(certificates_path)
+    sources = load_sources(input_path, plan_path, certificates_path)
+    records = sources.records
+    known_codes = sources.known_codes
+    plan_records = sources.plan_records
+    calibration_events = sources.calibration_events
 
     grouped: dict[str, list[InsertStatement]] = {
         "historial_departamentos": [],
@@ -658,12 +753,186 @@ def generate_historial_files(
 
     summary: dict[str, int] = {}
     for table_name, statements in grouped.items():
-        write_statements(table_name, statements, output_dir, empresa_id)
+        write_statements(table_name, statements, output_dir, empresa_id, compression)
         summary[table_name] = len(statements)
 
     return summary
 
 
+def _iso(value: dt.date | None) -> str | None:
+    return value.strftime(SQL_DATE_FORMAT) if value is not None else None
+
+
+def _historial_load_sql(
+    table: str,
+    alias: str,
+    columns: str,
+    select: str,
+    match: str,
+) -> str:
+    return (
+        f"INSERT INTO {table} ({columns}) "
+        f"SELECT i.id, {select} FROM instrumentos i "
+        "WHERE i.codigo = ? AND i.empresa_id = ? "
+        f"AND NOT EXISTS (SELECT 1 FROM {table} {alias} "
+        f"WHERE {alias}.instrumento_id = i.id AND {alias}.empresa_id = i.empresa_id AND {match})"
+    )
+
+
+def build_load_batches(
+    sources: HistorialSources,
+    empresa_id: int,
+    dialect: SQLDialect,
+) -> list[LoadBatch]:
+    """Equivalente parametrizado de los archivos de historial para ``--load``.
+
+    Las sentencias usan ``CURRENT_TIMESTAMP``/``CURRENT_DATE`` en lugar de
+    ``NOW()``/``CURDATE()`` para funcionar igual en MySQL y en SQLite.
+    """
+
+    records = sources.records
+    now = "COALESCE(?, CURRENT_TIMESTAMP)"
+    batches = [
+        LoadBatch(
+            "historial_departamentos",
+            _historial_load_sql(
+                "historial_departamentos", "hd",
+                "instrumento_id, departamento_id, empresa_id, fecha, `timestamp`",
+                f"?, i.empresa_id, {now}, {now}",
+                "hd.departamento_id = ?",
+            ),
+            [
+                (r.departamento_id, _iso(r.fecha_alta), _iso(r.fecha_alta),
+                 r.codigo, empresa_id, r.departamento_id)
+                for r in records
+                if r.departamento_id is not None
+            ],
+        ),
+        LoadBatch(
+            "historial_ubicaciones",
+            _historial_load_sql(
+                "historial_ubicaciones", "hu",
+                "instrumento_id, ubicacion, empresa_id, fecha, `timestamp`",
+                f"?, i.empresa_id, {now}, {now}",
+                "hu.ubicacion = ?",
+            ),
+            [
+                (r.ubicacion, _iso(r.fecha_alta), _iso(r.fecha_alta),
+                 r.codigo, empresa_id, r.ubicacion)
+                for r in records
+                if r.ubicacion is not None
+            ],
+        ),
+    ]
+    for table, alias, attr in (
+        ("historial_fecha_alta", "hfa", "fecha_alta"),
+        ("historial_fecha_baja", "hfb", "fecha_baja"),
+    ):
+        batches.append(
+            LoadBatch(
+                table,
+                _historial_load_sql(
+                    table, alias,
+                    "instrumento_id, fecha, empresa_id, `timestamp`",
+                    f"?, i.empresa_id, {now}",
+                    f"{alias}.fecha = ?",
+                ),
+                [
+                    (_iso(getattr(r, attr)), _iso(getattr(r, attr)),
+                     r.codigo, empresa_id, _iso(getattr(r, attr)))
+                    for r in records
+                    if getattr(r, attr) is not None
+                ],
+            )
+        )
+
+    tipos_rows = []
+    for record in records:
+        values = estado_tipo_values(record)
+        if values is None:
+            continue
+        estado, fecha_base = values
+        tipos_rows.append(
+            (estado, _iso(fecha_base), _iso(fecha_base), record.codigo, empresa_id, estado)
+        )
+    batches.append(
+        LoadBatch(
+            "historial_tipos_instrumento",
+            _historial_load_sql(
+                "historial_tipos_instrumento", "hti",
+                "instrumento_id, estado, empresa_id, fecha, `timestamp`",
+                f"?, i.empresa_id, {now}, {now}",
+                "hti.estado = ?",
+            ),
+            tipos_rows,
+        )
+    )
+
+    batches.append(
+        LoadBatch(
+            "historial_calibraciones",
+            _historial_load_sql(
+                "historial_calibraciones", "hc",
+                "instrumento_id, empresa_id, fecha_evento, tipo_evento, descripcion, "
+                "certificado_codigo, usuario_id",
+                "i.empresa_id, ?, ?, ?, ?, NULL",
+                "hc.fecha_evento = ? AND hc.tipo_evento = ?",
+            ),
+            [
+                (_iso(event.fecha_evento), event.tipo_evento, event.descripcion,
+                 event.certificado_codigo, event.codigo, empresa_id,
+                 _iso(event.fecha_evento), event.tipo_evento)
+                for event in unique_calibration_events(
+                    sources.calibration_events, empresa_id, sources.known_codes
+                )
+            ],
+        )
+    )
+
+    batches.append(
+        LoadBatch(
+            "historial_especificaciones",
+            _historial_load_sql(
+                "historial_especificaciones", "he",
+                "instrumento_id, empresa_id, fecha_vigencia, version, descripcion, usuario_id",
+                "i.empresa_id, ?, ?, ?, NULL",
+                "he.fecha_vigencia = ? AND he.version = ?",
+            ),
+            [
+                (_iso(entry.fecha_actualizacion), version, entry.especificaciones,
+                 codigo, empresa_id, _iso(entry.fecha_actualizacion), version)
+                for codigo, entry, version in unique_specifications(
+                    sources.plan_records, empresa_id, sources.known_codes
+                )
+            ],
+        )
+    )
+
+    estado_rows = []
+    for record in records:
+        plan_entry = select_plan_entry(sources.plan_records.get(record.codigo.upper()), empresa_id)
+        values = estado_historial_values(record, plan_entry)
+        if values is None:
+            continue
+        estado, fecha_base, motivo = values
+        estado_rows.append(
+            (_iso(fecha_base), estado, motivo, record.codigo, empresa_id, estado, _iso(fecha_base))
+        )
+    batches.append(
+        LoadBatch(
+            "historial_estado_instrumento",
+            _historial_load_sql(
+                "historial_estado_instrumento", "hei",
+                "instrumento_id, empresa_id, fecha_evento, estado, motivo, usuario_id",
+                "i.empresa_id, COALESCE(?, CURRENT_DATE), ?, ?, NULL",
+                "hei.estado = ? AND hei.fecha_evento = COALESCE(?, CURRENT_DATE)",
+            ),
+            estado_rows,
+        )
+    )
+    return batches
+
+
 def build_argument_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description=(
@@ -719,18 +988,30 @@ def build_argument_parser() -> argparse.ArgumentParser:
         default=DEFAULT_EMPRESA_ID,
         help="Identificador de empresa que se documentará en los comentarios.",
     )
+    add_compression_argument(parser)
+    add_load_arguments(parser)
     return parser
 
 
 def main(argv: list[str] | None = None) -> None:
     args = build_argument_parser().parse_args(argv)
 
+    if args.load:
+        sources = load_sources(args.input_path, args.plan_path, args.certificates_path)
+        run_load(
+            args.load,
+            lambda dialect: build_load_batches(sources, args.empresa_id, dialect),
+            batch_size=args.load_batch_size,
+        )
+        return
+
     summary = generate_historial_files(
         input_path=args.input_path,
         output_dir=args.output_dir,
         empresa_id=args.empresa_id,
         plan_path=args.plan_path,
         certificates_path=args.certificates_path,
+        compression=args.compress,
     )
 
     for table_name, total in summary.items():
@@ -738,4 +1019,6 @@ def main(argv: list[str] | None = None) -> None:
 
 
 if __name__ == "__main__":
-    main()
+    from stage_profiler import run_main
+
+    run_main(main)
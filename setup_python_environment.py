@@ -18,6 +18,7 @@ python setup_python_environment.py
 
 from __future__ import annotations
 
+import importlib.util
 import os
 import subprocess
 import sys
@@ -102,12 +103,17 @@ class PythonEnvironmentSetup:
             ("chardet", "chardet"),
         ]
         
+        # find_spec localiza el paquete sin ejecutarlo: validar no debe
+        # costar lo mismo que importar pandas completo.
         all_good = True
         for module, alias in test_imports:
             try:
-                __import__(module)
+                found = importlib.util.find_spec(module) is not None
+            except (ImportError, ValueError):
+                found = False
+            if found:
                 print(f"✅ {module}")
-            except ImportError:
+            else:
                 print(f"❌ {module} no encontrado")
                 all_good = False
         
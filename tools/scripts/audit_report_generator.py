@@ -15,6 +15,18 @@ Uso:
 ```bash
 python tools/scripts/audit_report_generator.py --empresa-id 1 --output storage/audit_reports/
 ```
+
+El Excel se escribe fila por fila con `xlsx_writer.XLSXStreamWriter` (sin pandas),
+por lo que la memoria no crece con el número de instrumentos. Con
+`--excel-por-cliente` se genera además un libro por cliente, en paralelo con
+`--workers N`.
+
+Con `--snapshot` el análisis es incremental: se guarda una instantánea
+(`compliance_snapshot.py`) con las fechas de cada instrumento y los agregados por
+cliente, y en la siguiente corrida solo se recalculan los instrumentos cuyas
+filas de origen cambiaron o que cruzaron los umbrales de 30/0 días. Las métricas
+por cliente (incluidos percentiles e histograma de días a vencimiento para el
+tablero, `client_audit_dashboard_*.json`) se acumulan durante el mismo análisis.
 """
 
 from __future__ import annotations
@@ -22,23 +34,34 @@ from __future__ import annotations
 import argparse
 import csv
 import datetime as dt
-from dataclasses import dataclass
+import re
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, List, Optional, Tuple, Any
 import json
 
-try:
-    import pandas as pd
-    HAS_PANDAS = True
-except ImportError:
-    HAS_PANDAS = False
-    pd = None
-
+from compliance_snapshot import (
+    ESTADO_SIN_DATOS, ClientAggregate, ComplianceSnapshot, InstrumentSnapshot,
+    SnapshotError, DEFAULT_SNAPSHOT_NAME, classify_due, rows_fingerprint
+)
+from instrument_classifier import RULES_SIGNATURE, classify_instrument
+from pipeline_metrics import setup_metrics
 from sbl_utils import (
     setup_logging, get_repo_root, get_csv_originales_dir, 
     get_normalize_dir, CSVHandler, DateParser, TextNormalizer
 )
 
+SUMMARY_SHEET_COLUMNS = [
+    'Cliente', 'Total Instrumentos', 'Al Día', 'Vencidos', 'Próximos a Vencer',
+    'Cumplimiento (%)', 'Servicios Pendientes', 'Instrumentos Críticos'
+]
+INSTRUMENT_SHEET_COLUMNS = [
+    'Cliente', 'Código', 'Descripción', 'Ubicación', 'Tipo Servicio', 'Criticidad',
+    'Última Calibración', 'Próxima Calibración', 'Estado', 'Días hasta Vencimiento',
+    'Frecuencia (meses)'
+]
+PENDING_STATES = ('VENCIDO', 'PROXIMO_VENCER')
+
 @dataclass
 class ClientInstrumentStatus:
     """Estado de un instrumento de cliente en el sistema."""
@@ -66,14 +89,24 @@ class ClientAuditMetrics:
     promedio_dias_vencimiento: float
     instrumentos_criticos: int
     servicios_pendientes: int
+    percentiles_dias: Dict[int, int] = field(default_factory=dict)
+    histograma_dias: Dict[str, int] = field(default_factory=dict)
 
 class ClientAuditReportGenerator:
     """Generador de reportes de auditoría para clientes."""
     
-    def __init__(self, empresa_id: int = 1):
+    def __init__(
+        self,
+        empresa_id: int = 1,
+        snapshot_path: Optional[Path] = None,
+        fecha_corte: Optional[dt.date] = None,
+    ):
         self.empresa_id = empresa_id
+        self.snapshot_path = snapshot_path
+        self.fecha_corte = fecha_corte
         self.repo_root = get_repo_root(__file__)
         self.logger = setup_logging("client_audit_report_generator")
+        self.metrics = setup_metrics("client_audit_report_generator")
         
         # Directorios
         self.csv_dir = get_csv_originales_dir(self.repo_root)
@@ -86,6 +119,7 @@ class ClientAuditReportGenerator:
         self.calibraciones: List[Dict[str, Any]] = []
         self.clientes: List[Dict[str, Any]] = []
         self.client_instrument_status: List[ClientInstrumentStatus] = []
+        self.snapshot: Optional[ComplianceSnapshot] = None
     
     def load_data(self) -> None:
         """Carga los datos necesarios desde los archivos CSV."""
@@ -94,7 +128,15 @@ class ClientAuditReportGenerator:
         # Cargar instrumentos normalizados
         instrumentos_file = self.normalize_dir / "normalize_instrumentos.csv"
         if instrumentos_file.exists():
-            self.instrumentos = CSVHandler.read_csv(instrumentos_file)
+            # Con la caché columnar vigente se omite la detección de encoding y
+            # delimitador; las filas se entregan como texto, igual que el CSV.
+            from columnar_cache import load_sidecar  # importación diferida: solo al cargar datos
+
+            table = load_sidecar(instrumentos_file)
+            if table is not None:
+                self.instrumentos = list(table.iter_dicts(as_text=True))
+            else:
+                self.instrumentos = CSVHandler.read_csv(instrumentos_file)
             self.logger.info(f"Cargados {len(self.instrumentos)} instrumentos")
         else:
             self.logger.warning(f"No se encontró {instrumentos_file}")
@@ -160,150 +202,218 @@ class ClientAuditReportGenerator:
         
         return client_mapping.get(prefix, f'Cliente_{prefix}')
     
+    def _group_calibraciones(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Agrupa las calibraciones por código de instrumento en una sola pasada."""
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for cal in self.calibraciones:
+            grouped.setdefault(cal.get('codigo', '').upper(), []).append(cal)
+        return grouped
+    
+    def _analyze_instrument(
+        self,
+        instrumento: Dict[str, Any],
+        calibraciones_instrumento: List[Dict[str, Any]],
+        huella: str = '',
+    ) -> InstrumentSnapshot:
+        """Calcula fechas, criticidad y tipo de servicio de un instrumento."""
+        codigo = instrumento.get('codigo', '')
+        cliente = self.get_client_name(codigo)
+        
+        # Encontrar última calibración
+        ultima_calibracion = None
+        proxima_calibracion = None
+        frecuencia_meses = None
+        
+        if calibraciones_instrumento:
+            fechas_calibracion = []
+            for cal in calibraciones_instrumento:
+                fecha_str = cal.get('fecha_calibracion') or cal.get('fecha')
+                if fecha_str:
+                    fecha = DateParser.parse_spanish_date(fecha_str)
+                    if fecha:
+                        fechas_calibracion.append(fecha)
+            
+            if fechas_calibracion:
+                ultima_calibracion = max(fechas_calibracion)
+                
+                # Intentar determinar frecuencia
+                freq_str = instrumento.get('frecuencia_calibracion') or '12'
+                try:
+                    frecuencia_meses = int(freq_str) if freq_str.isdigit() else 12
+                except (ValueError, AttributeError):
+                    frecuencia_meses = 12
+                
+                # Calcular próxima calibración
+                if frecuencia_meses:
+                    proxima_calibracion = DateParser.add_months(
+                        ultima_calibracion, frecuencia_meses
+                    )
+        
+        # Determinar criticidad y tipo de servicio (tablas de reglas compiladas)
+        criticidad, servicio_tipo = classify_instrument(instrumento)
+        
+        return InstrumentSnapshot(
+            huella=huella,
+            cliente=cliente,
+            ultima_calibracion=ultima_calibracion,
+            proxima_calibracion=proxima_calibracion,
+            frecuencia_meses=frecuencia_meses,
+            criticidad=criticidad,
+            servicio_tipo=servicio_tipo,
+            estado=ESTADO_SIN_DATOS,
+        )
+    
+    def _open_snapshot(self, today: dt.date) -> ComplianceSnapshot:
+        """Carga la instantánea previa y la lleva a la fecha de corte actual.
+        
+        Sin ``snapshot_path`` se devuelve una instantánea vacía en memoria que solo
+        sirve como acumulador de las métricas de esta corrida.
+        """
+        if self.snapshot_path is None:
+            return ComplianceSnapshot(fecha_corte=today)
+        contexto = rows_fingerprint([*self.clientes, {'reglas': RULES_SIGNATURE}])
+        try:
+            snapshot = ComplianceSnapshot.load(self.snapshot_path)
+        except SnapshotError as e:
+            self.logger.info(f"Sin instantánea utilizable, se recalcula todo: {e}")
+            return ComplianceSnapshot(fecha_corte=today, contexto=contexto)
+        if snapshot.contexto != contexto:
+            # El catálogo de clientes y las reglas de clasificación definen el
+            # cliente, la criticidad y el tipo de servicio de cada instrumento.
+            self.logger.info("El catálogo de clientes o las reglas cambiaron, se recalcula todo")
+            return ComplianceSnapshot(fecha_corte=today, contexto=contexto)
+        snapshot.advance_to(today)
+        return snapshot
+    
     def analyze_client_instrument_status(self) -> None:
-        """Analiza el estado de cumplimiento de cada instrumento por cliente."""
+        """Analiza el estado de cumplimiento de cada instrumento por cliente.
+        
+        Los agregados por cliente se acumulan en la misma pasada. Con
+        ``snapshot_path`` solo se recalculan los instrumentos cuyas filas de
+        origen cambiaron; el resto reutiliza sus fechas de la instantánea y
+        únicamente se reclasifica contra la fecha de corte.
+        """
         self.logger.info("Analizando estado de instrumentos por cliente...")
         
-        today = dt.date.today()
+        today = self.fecha_corte or dt.date.today()
+        calibraciones_por_codigo = self._group_calibraciones()
+        incremental = self.snapshot_path is not None
+        snapshot = self._open_snapshot(today)
+        vistos: Dict[str, None] = {}
+        orden_clientes: Dict[str, None] = {}
+        recalculados = cruces = 0
         
         for instrumento in self.instrumentos:
             codigo = instrumento.get('codigo', '')
             if not codigo:
                 continue
             
-            cliente = self.get_client_name(codigo)
-            
             # Buscar calibraciones para este instrumento
-            calibraciones_instrumento = [
-                cal for cal in self.calibraciones 
-                if cal.get('codigo', '').upper() == codigo.upper()
-            ]
-            
-            # Encontrar última calibración
-            ultima_calibracion = None
-            proxima_calibracion = None
-            frecuencia_meses = None
-            
-            if calibraciones_instrumento:
-                fechas_calibracion = []
-                for cal in calibraciones_instrumento:
-                    fecha_str = cal.get('fecha_calibracion') or cal.get('fecha')
-                    if fecha_str:
-                        fecha = DateParser.parse_spanish_date(fecha_str)
-                        if fecha:
-                            fechas_calibracion.append(fecha)
-                
-                if fechas_calibracion:
-                    ultima_calibracion = max(fechas_calibracion)
-                    
-                    # Intentar determinar frecuencia
-                    freq_str = instrumento.get('frecuencia_calibracion') or '12'
-                    try:
-                        frecuencia_meses = int(freq_str) if freq_str.isdigit() else 12
-                    except (ValueError, AttributeError):
-                        frecuencia_meses = 12
-                    
-                    # Calcular próxima calibración
-                    if frecuencia_meses:
-                        proxima_calibracion = DateParser.add_months(
-                            ultima_calibracion, frecuencia_meses
-                        )
-            
-            # Determinar estado de cumplimiento
-            estado_cumplimiento = "SIN_DATOS"
-            dias_vencimiento = None
-            
-            if proxima_calibracion:
-                dias_vencimiento = (proxima_calibracion - today).days
-                
-                if dias_vencimiento > 30:
-                    estado_cumplimiento = "AL_DIA"
-                elif dias_vencimiento > 0:
-                    estado_cumplimiento = "PROXIMO_VENCER"
-                else:
-                    estado_cumplimiento = "VENCIDO"
-            
-            # Determinar criticidad y tipo de servicio
-            descripcion = instrumento.get('descripcion', '').lower()
-            ubicacion = instrumento.get('ubicacion', '').lower()
-            
-            criticidad = "NORMAL"
-            if any(term in descripcion for term in ['critico', 'vital', 'principal']):
-                criticidad = "CRITICA"
-            elif any(term in ubicacion for term in ['produccion', 'proceso', 'linea']):
-                criticidad = "ALTA"
-            
-            # Determinar tipo de servicio
-            servicio_tipo = "CALIBRACION"
-            if any(term in descripcion for term in ['mantenimiento', 'reparacion']):
-                servicio_tipo = "MANTENIMIENTO"
-            elif any(term in descripcion for term in ['validacion', 'verificacion']):
-                servicio_tipo = "VALIDACION"
-            
+            calibraciones_instrumento = calibraciones_por_codigo.get(codigo.upper(), [])
+            
+            entry = None
+            huella = ''
+            if incremental:
+                clave = codigo
+                repeticion = 2
+                while clave in vistos:
+                    clave = f"{codigo}#{repeticion}"
+                    repeticion += 1
+                vistos[clave] = None
+                huella = rows_fingerprint([instrumento, *calibraciones_instrumento])
+                entry = snapshot.instrumentos.get(clave)
+                if entry is not None and entry.huella != huella:
+                    snapshot.count(entry, sign=-1)
+                    entry = None
+            
+            if entry is None:
+                entry = self._analyze_instrument(instrumento, calibraciones_instrumento, huella)
+                entry.estado = classify_due(entry.dias(today))
+                if incremental:
+                    snapshot.instrumentos[clave] = entry
+                snapshot.count(entry)
+                recalculados += 1
+            else:
+                estado = classify_due(entry.dias(today))
+                if estado != entry.estado:
+                    snapshot.aggregate(entry.cliente).move(entry.estado, estado)
+                    entry.estado = estado
+                    cruces += 1
+            
+            orden_clientes[entry.cliente] = None
             status = ClientInstrumentStatus(
                 codigo=codigo,
-                cliente=cliente,
+                cliente=entry.cliente,
                 descripcion=instrumento.get('descripcion', ''),
                 ubicacion=instrumento.get('ubicacion', ''),
-                ultima_calibracion=ultima_calibracion,
-                proxima_calibracion=proxima_calibracion,
-                estado_cumplimiento=estado_cumplimiento,
-                dias_vencimiento=dias_vencimiento,
-                frecuencia_meses=frecuencia_meses,
-                criticidad=criticidad,
-                servicio_tipo=servicio_tipo
+                ultima_calibracion=entry.ultima_calibracion,
+                proxima_calibracion=entry.proxima_calibracion,
+                estado_cumplimiento=entry.estado,
+                dias_vencimiento=entry.dias(today),
+                frecuencia_meses=entry.frecuencia_meses,
+                criticidad=entry.criticidad,
+                servicio_tipo=entry.servicio_tipo
             )
             
             self.client_instrument_status.append(status)
         
+        if incremental:
+            for clave in [clave for clave in snapshot.instrumentos if clave not in vistos]:
+                snapshot.count(snapshot.instrumentos.pop(clave), sign=-1)
+        snapshot.drop_empty_clients()
+        # Mismo orden de clientes que la primera aparición en los instrumentos.
+        snapshot.clientes = {
+            cliente: snapshot.clientes[cliente]
+            for cliente in orden_clientes
+            if cliente in snapshot.clientes
+        }
+        self.snapshot = snapshot
+        if incremental:
+            snapshot.save(self.snapshot_path)
+            self.logger.info(
+                f"Instantánea {self.snapshot_path.name}: {recalculados} instrumentos recalculados, "
+                f"{cruces} cambios de estado por fecha"
+            )
+        
         self.logger.info(f"Analizados {len(self.client_instrument_status)} instrumentos de clientes")
     
     def calculate_client_metrics(self) -> Dict[str, ClientAuditMetrics]:
-        """Calcula métricas de auditoría por cliente."""
-        client_metrics = {}
+        """Calcula métricas de auditoría por cliente a partir de los acumuladores.
         
-        # Agrupar por cliente
-        clients = {}
-        for status in self.client_instrument_status:
-            cliente = status.cliente
-            if cliente not in clients:
-                clients[cliente] = []
-            clients[cliente].append(status)
-        
-        # Calcular métricas para cada cliente
-        for cliente, instruments in clients.items():
-            total = len(instruments)
-            
-            if total == 0:
-                continue
-            
-            al_dia = len([s for s in instruments if s.estado_cumplimiento == "AL_DIA"])
-            vencidos = len([s for s in instruments if s.estado_cumplimiento == "VENCIDO"])
-            proximos = len([s for s in instruments if s.estado_cumplimiento == "PROXIMO_VENCER"])
-            criticos = len([s for s in instruments if s.criticidad == "CRITICA"])
-            
-            # Servicios pendientes (vencidos + próximos a vencer)
-            servicios_pendientes = vencidos + proximos
-            
-            porcentaje_cumplimiento = (al_dia / total) * 100
-            
-            # Calcular promedio de días de vencimiento
-            dias_vencimiento = [s.dias_vencimiento for s in instruments if s.dias_vencimiento is not None]
-            promedio_dias = sum(dias_vencimiento) / len(dias_vencimiento) if dias_vencimiento else 0.0
-            
-            client_metrics[cliente] = ClientAuditMetrics(
-                cliente=cliente,
-                total_instrumentos=total,
-                instrumentos_al_dia=al_dia,
-                instrumentos_vencidos=vencidos,
-                instrumentos_proximos_vencer=proximos,
-                porcentaje_cumplimiento=porcentaje_cumplimiento,
-                promedio_dias_vencimiento=promedio_dias,
-                instrumentos_criticos=criticos,
-                servicios_pendientes=servicios_pendientes
-            )
+        Si los estados se asignaron sin pasar por
+        ``analyze_client_instrument_status``, los acumuladores se alimentan con
+        una sola pasada sobre ``client_instrument_status``.
+        """
+        if self.snapshot is None:
+            snapshot = ComplianceSnapshot(fecha_corte=self.fecha_corte or dt.date.today())
+            for status in self.client_instrument_status:
+                snapshot.aggregate(status.cliente).add(
+                    status.estado_cumplimiento,
+                    status.criticidad,
+                    status.proxima_calibracion,
+                    status.dias_vencimiento,
+                )
+            self.snapshot = snapshot
         
-        return client_metrics
+        fecha_corte = self.snapshot.fecha_corte
+        return {
+            cliente: _metrics_from_aggregate(cliente, aggregate, fecha_corte)
+            for cliente, aggregate in self.snapshot.clientes.items()
+            if aggregate.total > 0
+        }
+    
+    def generate_client_dashboard_json(self, client_metrics: Dict[str, ClientAuditMetrics], output_file: Path) -> None:
+        """Genera el JSON del tablero con métricas, percentiles e histograma por cliente."""
+        self.logger.info(f"Generando datos del tablero por cliente en {output_file}")
+        
+        payload = {
+            'fecha_corte': self.snapshot.fecha_corte.isoformat() if self.snapshot else None,
+            'empresa_id': self.empresa_id,
+            'clientes': [asdict(metrics) for metrics in client_metrics.values()],
+        }
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+            f.write('\n')
     
     def generate_client_summary_report(self, client_metrics: Dict[str, ClientAuditMetrics], output_file: Path) -> None:
         """Genera reporte resumen por cliente."""
@@ -397,58 +507,46 @@ class ClientAuditReportGenerator:
     
     def generate_client_excel_report(self, client_metrics: Dict[str, ClientAuditMetrics], output_file: Path) -> None:
         """Genera reporte en formato Excel por cliente."""
-        if not HAS_PANDAS:
-            self.logger.warning("pandas no disponible, omitiendo reporte Excel")
-            return
-        
         self.logger.info(f"Generando reporte Excel por cliente en {output_file}")
+        write_client_workbook(output_file, client_metrics, self.client_instrument_status)
+    
+    def generate_client_workbooks(
+        self,
+        client_metrics: Dict[str, ClientAuditMetrics],
+        output_dir: Path,
+        timestamp: str,
+        workers: int = 1,
+    ) -> List[Path]:
+        """Genera un libro Excel independiente por cliente, opcionalmente en paralelo."""
+        statuses_by_client: Dict[str, List[ClientInstrumentStatus]] = {}
+        for status in self.client_instrument_status:
+            statuses_by_client.setdefault(status.cliente, []).append(status)
         
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            # Hoja de resumen por cliente
-            client_summary_data = []
-            for cliente, metrics in client_metrics.items():
-                client_summary_data.append({
-                    'Cliente': cliente,
-                    'Total Instrumentos': metrics.total_instrumentos,
-                    'Al Día': metrics.instrumentos_al_dia,
-                    'Vencidos': metrics.instrumentos_vencidos,
-                    'Próximos a Vencer': metrics.instrumentos_proximos_vencer,
-                    'Cumplimiento (%)': round(metrics.porcentaje_cumplimiento, 1),
-                    'Servicios Pendientes': metrics.servicios_pendientes,
-                    'Instrumentos Críticos': metrics.instrumentos_criticos
-                })
-            
-            df_summary = pd.DataFrame(client_summary_data)
-            df_summary = df_summary.sort_values('Cumplimiento (%)')
-            df_summary.to_excel(writer, sheet_name='Resumen por Cliente', index=False)
-            
-            # Hoja con todos los instrumentos
-            instruments_data = []
-            for status in self.client_instrument_status:
-                instruments_data.append({
-                    'Cliente': status.cliente,
-                    'Código': status.codigo,
-                    'Descripción': status.descripcion,
-                    'Ubicación': status.ubicacion,
-                    'Tipo Servicio': status.servicio_tipo,
-                    'Criticidad': status.criticidad,
-                    'Última Calibración': status.ultima_calibracion,
-                    'Próxima Calibración': status.proxima_calibracion,
-                    'Estado': status.estado_cumplimiento,
-                    'Días hasta Vencimiento': status.dias_vencimiento,
-                    'Frecuencia (meses)': status.frecuencia_meses
-                })
-            
-            df_instruments = pd.DataFrame(instruments_data)
-            df_instruments.to_excel(writer, sheet_name='Todos los Instrumentos', index=False)
-            
-            # Hoja de servicios pendientes
-            pending_df = df_instruments[df_instruments['Estado'].isin(['VENCIDO', 'PROXIMO_VENCER'])]
-            if not pending_df.empty:
-                pending_df = pending_df.sort_values(['Cliente', 'Estado'])
-                pending_df.to_excel(writer, sheet_name='Servicios Pendientes', index=False)
+        slugs = _unique_file_slugs(client_metrics)
+        jobs = [
+            (
+                output_dir / f"client_audit_report_{slugs[cliente]}_{timestamp}.xlsx",
+                {cliente: metrics},
+                statuses_by_client.get(cliente, []),
+            )
+            for cliente, metrics in client_metrics.items()
+        ]
+        self.logger.info(f"Generando {len(jobs)} libros Excel por cliente con {workers} proceso(s)")
+        
+        if workers > 1 and len(jobs) > 1:
+            # Importación diferida: el pool solo se usa con --excel-por-cliente --workers N.
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(_write_client_workbook_job, jobs))
+        return [_write_client_workbook_job(job) for job in jobs]
     
-    def generate_reports(self, output_dir: Optional[Path] = None) -> None:
+    def generate_reports(
+        self,
+        output_dir: Optional[Path] = None,
+        per_client_excel: bool = False,
+        workers: int = 1,
+    ) -> None:
         """Genera todos los reportes de auditoría por cliente."""
         if output_dir is None:
             output_dir = self.output_dir
@@ -471,15 +569,20 @@ class ClientAuditReportGenerator:
             output_dir / f"client_audit_detailed_{timestamp}.csv"
         )
         
-        # Excel solo si pandas está disponible
-        if HAS_PANDAS:
-            try:
-                self.generate_client_excel_report(
-                    client_metrics,
-                    output_dir / f"client_audit_report_{timestamp}.xlsx"
-                )
-            except Exception as e:
-                self.logger.warning(f"Error generando Excel: {e}")
+        self.generate_client_dashboard_json(
+            client_metrics,
+            output_dir / f"client_audit_dashboard_{timestamp}.json"
+        )
+        
+        try:
+            self.generate_client_excel_report(
+                client_metrics,
+                output_dir / f"client_audit_report_{timestamp}.xlsx"
+            )
+            if per_client_excel:
+                self.generate_client_workbooks(client_metrics, output_dir, timestamp, workers)
+        except Exception as e:
+            self.logger.warning(f"Error generando Excel: {e}")
         
         self.logger.info(f"Reportes de clientes generados en {output_dir}")
         self.logger.info(f"Total clientes analizados: {len(client_metrics)}")
@@ -492,17 +595,144 @@ class ClientAuditReportGenerator:
         if priority_clients:
             self.logger.info(f"Clientes con instrumentos vencidos: {len(priority_clients)}")
     
-    def run(self, output_dir: Optional[Path] = None) -> None:
+    def run(
+        self,
+        output_dir: Optional[Path] = None,
+        per_client_excel: bool = False,
+        workers: int = 1,
+    ) -> None:
         """Ejecuta el proceso completo de generación de reportes por cliente."""
         self.logger.info("Iniciando generación de reportes de auditoría por cliente")
         
-        self.load_data()
-        self.analyze_client_instrument_status()
-        self.generate_reports(output_dir)
+        with self.metrics.stage("carga_datos") as etapa:
+            self.load_data()
+            etapa.rows = len(self.instrumentos) + len(self.clientes) + len(self.calibraciones)
+            etapa.count("instrumentos", len(self.instrumentos))
+            etapa.count("clientes", len(self.clientes))
+            etapa.count("calibraciones", len(self.calibraciones))
+        with self.metrics.stage("analisis_estado") as etapa:
+            self.analyze_client_instrument_status()
+            etapa.rows = len(self.client_instrument_status)
+        with self.metrics.stage("generacion_reportes") as etapa:
+            self.generate_reports(output_dir, per_client_excel=per_client_excel, workers=workers)
+            etapa.rows = len(self.client_instrument_status)
+            etapa.gauge("procesos", workers)
         
         self.logger.info("Proceso de auditoría por cliente completado")
 
 
+def _file_slug(text: str) -> str:
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', TextNormalizer.normalize_text(text) or '').strip('_')
+    return slug or 'cliente'
+
+
+def _unique_file_slugs(clientes: Iterable[str]) -> Dict[str, str]:
+    """Slug de archivo por cliente; los nombres que colisionan reciben ``_2``, ``_3``...
+
+    Los clientes se recorren ordenados para que el sufijo no dependa del orden
+    de carga.
+    """
+    slugs: Dict[str, str] = {}
+    usados: set[str] = set()
+    for cliente in sorted(clientes):
+        base = slug = _file_slug(cliente)
+        sufijo = 1
+        while slug.lower() in usados:
+            sufijo += 1
+            slug = f"{base}_{sufijo}"
+        usados.add(slug.lower())
+        slugs[cliente] = slug
+    return slugs
+
+
+def _metrics_from_aggregate(
+    cliente: str,
+    aggregate: ClientAggregate,
+    fecha_corte: dt.date,
+) -> ClientAuditMetrics:
+    return ClientAuditMetrics(
+        cliente=cliente,
+        total_instrumentos=aggregate.total,
+        instrumentos_al_dia=aggregate.al_dia,
+        instrumentos_vencidos=aggregate.vencidos,
+        instrumentos_proximos_vencer=aggregate.proximos,
+        porcentaje_cumplimiento=(aggregate.al_dia / aggregate.total) * 100,
+        promedio_dias_vencimiento=(
+            aggregate.dias_suma / aggregate.dias_conteo if aggregate.dias_conteo else 0.0
+        ),
+        instrumentos_criticos=aggregate.criticos,
+        servicios_pendientes=aggregate.vencidos + aggregate.proximos,
+        percentiles_dias=aggregate.percentiles(fecha_corte),
+        histograma_dias=aggregate.histogram(fecha_corte),
+    )
+
+
+def _summary_row(cliente: str, metrics: ClientAuditMetrics) -> List[Any]:
+    return [
+        cliente,
+        metrics.total_instrumentos,
+        metrics.instrumentos_al_dia,
+        metrics.instrumentos_vencidos,
+        metrics.instrumentos_proximos_vencer,
+        round(metrics.porcentaje_cumplimiento, 1),
+        metrics.servicios_pendientes,
+        metrics.instrumentos_criticos,
+    ]
+
+
+def _instrument_row(status: ClientInstrumentStatus) -> List[Any]:
+    return [
+        status.cliente,
+        status.codigo,
+        status.descripcion,
+        status.ubicacion,
+        status.servicio_tipo,
+        status.criticidad,
+        status.ultima_calibracion,
+        status.proxima_calibracion,
+        status.estado_cumplimiento,
+        status.dias_vencimiento,
+        status.frecuencia_meses,
+    ]
+
+
+def write_client_workbook(
+    output_file: Path,
+    client_metrics: Dict[str, ClientAuditMetrics],
+    statuses: Iterable[ClientInstrumentStatus],
+) -> Path:
+    """Escribe el libro de auditoría (resumen, instrumentos y pendientes) en streaming.
+    
+    ``statuses`` se recorre una sola vez: la hoja de pendientes solo conserva
+    referencias a los instrumentos vencidos o próximos a vencer.
+    """
+    from xlsx_writer import XLSXStreamWriter  # importación diferida: solo al escribir Excel
+
+    with XLSXStreamWriter(output_file) as workbook:
+        with workbook.sheet('Resumen por Cliente', SUMMARY_SHEET_COLUMNS) as sheet:
+            ordered = sorted(client_metrics.items(), key=lambda item: item[1].porcentaje_cumplimiento)
+            sheet.write_rows(_summary_row(cliente, metrics) for cliente, metrics in ordered)
+        
+        pending: List[ClientInstrumentStatus] = []
+        with workbook.sheet('Todos los Instrumentos', INSTRUMENT_SHEET_COLUMNS) as sheet:
+            for status in statuses:
+                sheet.write_row(_instrument_row(status))
+                if status.estado_cumplimiento in PENDING_STATES:
+                    pending.append(status)
+        
+        if pending:
+            pending.sort(key=lambda status: (status.cliente, status.estado_cumplimiento))
+            with workbook.sheet('Servicios Pendientes', INSTRUMENT_SHEET_COLUMNS) as sheet:
+                sheet.write_rows(_instrument_row(status) for status in pending)
+    return output_file
+
+
+def _write_client_workbook_job(
+    job: Tuple[Path, Dict[str, ClientAuditMetrics], List[ClientInstrumentStatus]]
+) -> Path:
+    return write_client_workbook(*job)
+
+
 def main():
     """Función principal."""
     parser = argparse.ArgumentParser(
@@ -519,12 +749,53 @@ def main():
         type=Path,
         help="Directorio de salida para los reportes"
     )
+    parser.add_argument(
+        "--excel-por-cliente",
+        action="store_true",
+        help="Genera además un libro Excel independiente por cliente"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Procesos para generar los libros por cliente en paralelo"
+    )
+    
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        nargs="?",
+        const=get_repo_root(__file__) / "storage" / "client_audit_reports" / DEFAULT_SNAPSHOT_NAME,
+        default=None,
+        help=(
+            "Análisis incremental con la instantánea indicada "
+            f"(por defecto storage/client_audit_reports/{DEFAULT_SNAPSHOT_NAME})"
+        )
+    )
+    parser.add_argument(
+        "--fecha-corte",
+        type=dt.date.fromisoformat,
+        default=None,
+        help="Fecha de corte YYYY-MM-DD para calcular vencimientos (por defecto hoy)"
+    )
     
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers debe ser al menos 1")
     
-    generator = ClientAuditReportGenerator(empresa_id=args.empresa_id)
-    generator.run(output_dir=args.output)
+    generator = ClientAuditReportGenerator(
+        empresa_id=args.empresa_id,
+        snapshot_path=args.snapshot,
+        fecha_corte=args.fecha_corte,
+    )
+    generator.run(
+        output_dir=args.output,
+        per_client_excel=args.excel_por_cliente,
+        workers=args.workers,
+    )
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    from stage_profiler import run_main
+
+    run_main(main)
\ No newline at end of file
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Mide el tiempo de importación de los scripts con ``python -X importtime``.
+
+Cada módulo se importa en un intérprete nuevo (como lo hace el orquestador al
+lanzar cada etapa como subproceso), varias veces, y se reporta la mediana del
+tiempo acumulado junto con las dependencias directas más costosas. Si algún
+módulo supera su presupuesto, o arrastra alguna de las dependencias pesadas de
+``HEAVY_IMPORTS`` (que deben importarse solo en la ruta que las usa), el script
+termina con código 1, de modo que puede usarse como verificación en CI.
+
+Los presupuestos de ``DEFAULT_BUDGETS`` dejan cerca del doble de margen sobre
+las medianas medidas con Python 3.12 (5 repeticiones):
+
+=============================  ========  ============
+Módulo                         Mediana   Presupuesto
+=============================  ========  ============
+sbl_utils                        71 ms       150 ms
+db_loader                        72 ms       150 ms
+generate_insert_instrumentos     75 ms       150 ms
+generate_plan_riesgos            70 ms       150 ms
+generate_cert_calibrations      109 ms       220 ms
+audit_report_generator           94 ms       200 ms
+data_validator                   82 ms       170 ms
+run_all_processes                92 ms       190 ms
+=============================  ========  ============
+
+El tiempo depende de la máquina; la lista de dependencias pesadas no, así que
+es la verificación que detecta primero una importación eager nueva.
+
+Uso:
+```bash
+python tools/scripts/bench_import_time.py
+python tools/scripts/bench_import_time.py --budget-ms 120 --budget audit_report_generator=80
+python tools/scripts/bench_import_time.py generate_plan_riesgos --repeat 10 --json storage/importtime.json
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+DEFAULT_MODULES = (
+    "sbl_utils",
+    "db_loader",
+    "generate_insert_instrumentos",
+    "generate_plan_riesgos",
+    "generate_cert_calibrations",
+    "audit_report_generator",
+    "data_validator",
+    "run_all_processes",
+)
+DEFAULT_BUDGET_MS = 150.0
+DEFAULT_BUDGETS = {
+    "generate_cert_calibrations": 220.0,
+    "audit_report_generator": 200.0,
+    "data_validator": 170.0,
+    "run_all_processes": 190.0,
+}
+# Solo se usan con opciones concretas (--workers, Excel, carga directa...).
+HEAVY_IMPORTS = (
+    "concurrent.futures.process",
+    "multiprocessing",
+    "xml.sax",
+    "pandas",
+    "openpyxl",
+    "pyarrow",
+    "pymysql",
+    "chardet",
+    "zstandard",
+)
+DEFAULT_REPEAT = 5
+TOP_IMPORTS = 5
+
+
+@dataclass
+class ImportTiming:
+    """Resultado de importar un módulo en un intérprete limpio."""
+
+    module: str
+    median_ms: float
+    samples_ms: List[float]
+    budget_ms: float
+    heaviest: List[Tuple[str, float]] = field(default_factory=list)
+    heavy_imports: List[str] = field(default_factory=list)
+
+    @property
+    def within_budget(self) -> bool:
+        return self.median_ms <= self.budget_ms and not self.heavy_imports
+
+
+def parse_importtime(stderr: str) -> List[Tuple[int, str, int, int]]:
+    """Convierte la salida de ``-X importtime`` en ``(nivel, módulo, self_us, acumulado_us)``."""
+    entries: List[Tuple[int, str, int, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        level = (len(name) - len(stripped) - 1) // 2
+        entries.append((level, stripped, int(parts[0]), int(parts[1])))
+    return entries
+
+
+def measure_once(module: str, python: str = sys.executable) -> List[Tuple[int, str, int, int]]:
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SCRIPTS_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {module}:\n{result.stderr.strip()}")
+    return parse_importtime(result.stderr)
+
+
+def measure_module(module: str, repeat: int, budget_ms: float) -> ImportTiming:
+    samples: List[float] = []
+    runs: List[List[Tuple[int, str, int, int]]] = []
+    for _ in range(repeat):
+        entries = measure_once(module)
+        total = next(
+            (cumulative for level, name, _, cumulative in reversed(entries) if level == 0 and name == module),
+            None,
+        )
+        if total is None:
+            raise RuntimeError(f"-X importtime no reportó el módulo {module}")
+        samples.append(total / 1000)
+        runs.append(entries)
+
+    median = statistics.median(samples)
+    # Dependencias directas de la corrida más cercana a la mediana.
+    closest = runs[min(range(len(samples)), key=lambda index: abs(samples[index] - median))]
+    children = [(name, cumulative / 1000) for level, name, _, cumulative in closest if level == 1]
+    children.sort(key=lambda item: item[1], reverse=True)
+    imported = {name for level, name, _, _ in closest}
+    return ImportTiming(
+        module=module,
+        median_ms=round(median, 2),
+        samples_ms=[round(sample, 2) for sample in samples],
+        budget_ms=budget_ms,
+        heaviest=[(name, round(ms, 2)) for name, ms in children[:TOP_IMPORTS]],
+        heavy_imports=[name for name in HEAVY_IMPORTS if name in imported],
+    )
+
+
+def parse_budgets(values: Sequence[str]) -> Dict[str, float]:
+    budgets: Dict[str, float] = {}
+    for value in values:
+        module, separator, amount = value.partition("=")
+        if not separator:
+            raise argparse.ArgumentTypeError(f"Presupuesto inválido (MODULO=MS): {value}")
+        budgets[module.strip()] = float(amount)
+    return budgets
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Mide el tiempo de importación de los scripts con python -X importtime."
+    )
+    parser.add_argument(
+        "modules",
+        nargs="*",
+        default=list(DEFAULT_MODULES),
+        help="Módulos de tools/scripts a medir (por defecto todos los CLI).",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Importaciones por módulo.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=(
+            f"Presupuesto en milisegundos de los módulos sin uno propio en DEFAULT_BUDGETS "
+            f"(por defecto {DEFAULT_BUDGET_MS:g})."
+        ),
+    )
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="MODULO=MS",
+        help="Presupuesto específico para un módulo; puede repetirse.",
+    )
+    parser.add_argument("--json", type=Path, default=None, help="Guarda los resultados en JSON.")
+    args = parser.parse_args(argv)
+    if args.repeat <= 0:
+        parser.error("--repeat debe ser mayor que cero")
+    try:
+        args.budgets = parse_budgets(args.budget)
+    except argparse.ArgumentTypeError as exc:
+        parser.error(str(exc))
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    results: List[ImportTiming] = []
+    for module in args.modules:
+        budget = args.budgets.get(module, DEFAULT_BUDGETS.get(module, args.budget_ms))
+        timing = measure_module(module, args.repeat, budget)
+        results.append(timing)
+        status = "✅" if timing.within_budget else "❌"
+        heaviest = ", ".join(f"{name} {ms:.1f}" for name, ms in timing.heaviest)
+        print(
+            f"{status} {module:<32} {timing.median_ms:8.1f} ms "
+            f"(presupuesto {timing.budget_ms:g} ms) | {heaviest}"
+        )
+        if timing.heavy_imports:
+            print(f"   importa al arrancar: {', '.join(timing.heavy_imports)}")
+
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "python": sys.version.split()[0],
+            "repeat": args.repeat,
+            "results": [asdict(result) for result in results],
+        }
+        args.json.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+    over_budget = [result.module for result in results if not result.within_budget]
+    if over_budget:
+        print(f"Módulos fuera de presupuesto: {', '.join(over_budget)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    from stage_profiler import run_main
+
+    raise SystemExit(run_main(main))
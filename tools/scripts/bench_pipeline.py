@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""Benchmark de extremo a extremo de las etapas del pipeline con umbrales de regresión.
+
+Para cada escala se genera un conjunto sintético (ver ``synthetic_dataset.py``)
+y se ejecutan, en orden, las etapas del pipeline:
+
+- ``csv_load``: lectura de LM, PR, CERT y AT con ``CSVHandler``.
+- ``normalization``: ``convert_instrumentos_csv`` (normalize_instrumentos.csv).
+- ``insert_sql``: ``generate_insert_instrumentos`` sobre el CSV normalizado.
+- ``historial_sql``: ``generate_historial_inserts`` sobre el CSV normalizado.
+- ``audit_expansion``: ``convert_audit_trail_csv`` (expansión de rangos + SQL).
+- ``validation``: ``ClientDataValidator.validate_file`` del CSV normalizado.
+- ``audit_report``: ``ClientAuditReportGenerator`` (métricas y reportes).
+
+Cada corrida de una etapa ocurre en un proceso nuevo, de modo que los módulos y
+sus cachés empiezan en frío y el pico de memoria (``ru_maxrss``) pertenece solo a
+esa etapa; la importación de los módulos queda fuera del tiempo medido. Se
+reporta la mediana de ``--repeat`` corridas.
+
+Los resultados se agregan al historial JSON y se comparan contra la línea base:
+una etapa regresa si su tiempo o su memoria superan la base por más de la
+tolerancia (y por más del mínimo absoluto). En ese caso el script termina con
+código 1, de modo que puede usarse como verificación en CI.
+
+Uso:
+```bash
+python tools/scripts/bench_pipeline.py --update-baseline
+python tools/scripts/bench_pipeline.py --scales 1 10 100 --repeat 3
+python tools/scripts/bench_pipeline.py --stages audit_expansion --tolerance 0.1 --stage-tolerance audit_expansion=0.2
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime as dt
+import importlib
+import io
+import json
+import multiprocessing
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import ModuleType
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows: sin ru_maxrss
+    resource = None  # type: ignore[assignment]
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parents[1]
+NORMALIZE_PYTHON_DIR = REPO_ROOT / "app" / "Modules" / "Internal" / "ArchivosSql" / "Normalize_Python"
+BENCHMARK_DIR = REPO_ROOT / "storage" / "benchmarks"
+DEFAULT_BASELINE = BENCHMARK_DIR / "pipeline_baseline.json"
+DEFAULT_HISTORY = BENCHMARK_DIR / "pipeline_history.json"
+DEFAULT_SCALES = (1.0, 10.0)
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_SECONDS = 0.05
+DEFAULT_MIN_MB = 8.0
+NORMALIZED = "normalize_instrumentos.csv"
+READS_NORMALIZED = {"insert_sql", "historial_sql", "validation", "audit_report"}
+
+
+def _run_csv_load(module: ModuleType, dataset: Path, work: Path) -> int:
+    from synthetic_dataset import AUDIT_FILE, SHEET_FILES
+
+    files = [filename for filename, _ in SHEET_FILES.values()] + [AUDIT_FILE]
+    return sum(len(module.CSVHandler.read_csv(dataset / filename)) for filename in files)
+
+
+def _run_normalization(module: ModuleType, dataset: Path, work: Path) -> None:
+    module.main([
+        "--master", str(dataset / "LM_instrumentos_original_v2.csv"),
+        "--plan", str(dataset / "PR_instrumentos_original_v2.csv"),
+        "--output", str(work / NORMALIZED),
+    ])
+
+
+def _run_insert_sql(module: ModuleType, dataset: Path, work: Path) -> None:
+    module.main([
+        "--input", str(work / NORMALIZED),
+        "--estado-programado", str(work / NORMALIZED),
+        "--output", str(work / "insert_instrumentos.sql"),
+    ])
+
+
+def _run_historial_sql(module: ModuleType, dataset: Path, work: Path) -> None:
+    # Sin plan ni certificados normalizados: generate_plan_riesgos escribe dentro del repositorio.
+    module.main([
+        "--input", str(work / NORMALIZED),
+        "--output-dir", str(work / "historiales"),
+        "--plan-path", str(work / "normalize_plan_riesgos.csv"),
+        "--certificates-path", str(work / "normalize_certificates.csv"),
+    ])
+
+
+def _run_audit_expansion(module: ModuleType, dataset: Path, work: Path) -> None:
+    module.main([
+        "--csv", str(dataset / "AT_instrumentos_original_v2.csv"),
+        "--hojas-dir", str(dataset),
+        "--output", str(work / "insert_audit_trail.sql"),
+        "--normalized-output", str(work / "normalize_audit_trail.csv"),
+        "--code-log", str(work / "audit_trail_code_log.md"),
+    ])
+
+
+def _run_validation(module: ModuleType, dataset: Path, work: Path) -> int:
+    validator = module.ClientDataValidator()
+    validator.csv_dir, validator.normalize_dir = dataset, work
+    config = validator.get_validation_configs()["instrumentos_clientes"]
+    return len(validator.validate_file(work / NORMALIZED, config).issues)
+
+
+def _run_audit_report(module: ModuleType, dataset: Path, work: Path) -> None:
+    generator = module.ClientAuditReportGenerator()
+    generator.csv_dir, generator.normalize_dir = dataset, work
+    generator.run(output_dir=work / "client_audit_reports")
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    module: str
+    run: Callable[[ModuleType, Path, Path], object]
+
+
+STAGES: Dict[str, Stage] = {
+    stage.name: stage
+    for stage in (
+        Stage("csv_load", "sbl_utils", _run_csv_load),
+        Stage("normalization", "convert_instrumentos_csv", _run_normalization),
+        Stage("insert_sql", "generate_insert_instrumentos", _run_insert_sql),
+        Stage("historial_sql", "generate_historial_inserts", _run_historial_sql),
+        Stage("audit_expansion", "convert_audit_trail_csv", _run_audit_expansion),
+        Stage("validation", "data_validator", _run_validation),
+        Stage("audit_report", "audit_report_generator", _run_audit_report),
+    )
+}
+
+
+@dataclass
+class StageResult:
+    """Mediana de tiempo y pico de memoria de una etapa a una escala."""
+
+    stage: str
+    scale: float
+    seconds: float
+    samples: List[float]
+    peak_mb: Optional[float]
+
+    @property
+    def key(self) -> str:
+        return f"{self.stage}@x{self.scale:g}"
+
+
+@dataclass
+class Regression:
+    key: str
+    metric: str
+    baseline: float
+    current: float
+    tolerance: float
+
+    def describe(self) -> str:
+        change = (self.current / self.baseline - 1) * 100 if self.baseline else float("inf")
+        return (
+            f"{self.key} {self.metric}: {self.baseline:g} -> {self.current:g} "
+            f"(+{change:.0f}%, tolerancia {self.tolerance * 100:.0f}%)"
+        )
+
+
+def _peak_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KiB; macOS, bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _measure_stage(job: Tuple[str, str, str]) -> Tuple[float, Optional[float]]:
+    """Ejecuta una etapa en el proceso actual (nuevo) y mide tiempo y pico de memoria."""
+    name, dataset, work = job
+    for path in (str(SCRIPTS_DIR), str(NORMALIZE_PYTHON_DIR)):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    stage = STAGES[name]
+    module = importlib.import_module(stage.module)
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        started = time.perf_counter()
+        stage.run(module, Path(dataset), Path(work))
+        elapsed = time.perf_counter() - started
+    return elapsed, _peak_mb()
+
+
+def run_stage(name: str, dataset: Path, work: Path, repeat: int) -> Tuple[List[float], Optional[float]]:
+    context = multiprocessing.get_context("spawn")
+    samples: List[float] = []
+    peaks: List[float] = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            elapsed, peak = executor.submit(_measure_stage, (name, str(dataset), str(work))).result()
+        samples.append(elapsed)
+        if peak is not None:
+            peaks.append(peak)
+    return samples, (max(peaks) if peaks else None)
+
+
+def run_benchmark(
+    scales: Sequence[float],
+    stages: Sequence[str],
+    repeat: int,
+    seed: int = 0,
+    report: Callable[[StageResult], None] = lambda result: None,
+) -> List[StageResult]:
+    from synthetic_dataset import DatasetProfile, SyntheticDataset
+    from sbl_utils import get_csv_originales_dir
+
+    profile = DatasetProfile.learn(get_csv_originales_dir(REPO_ROOT))
+    results: List[StageResult] = []
+    for scale in scales:
+        with tempfile.TemporaryDirectory(prefix=f"bench_x{scale:g}_") as tmp_dir:
+            dataset, work = Path(tmp_dir) / "dataset", Path(tmp_dir) / "work"
+            work.mkdir(parents=True)
+            SyntheticDataset(profile, scale, seed).write(dataset)
+            pending = [name for name in STAGES if name in stages]
+            if "normalization" not in stages and READS_NORMALIZED.intersection(stages):
+                # Las etapas posteriores leen el CSV normalizado aunque no se mida.
+                pending.insert(0, "normalization")
+            for name in pending:
+                samples, peak = run_stage(name, dataset, work, repeat if name in stages else 1)
+                if name not in stages:
+                    continue
+                result = StageResult(
+                    stage=name,
+                    scale=scale,
+                    seconds=round(statistics.median(samples), 4),
+                    samples=[round(sample, 4) for sample in samples],
+                    peak_mb=None if peak is None else round(peak, 1),
+                )
+                results.append(result)
+                report(result)
+    return results
+
+
+def find_regressions(
+    results: Sequence[StageResult],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+    stage_tolerances: Dict[str, float],
+    min_seconds: float = DEFAULT_MIN_SECONDS,
+    min_mb: float = DEFAULT_MIN_MB,
+) -> List[Regression]:
+    """Etapas cuyo tiempo o memoria exceden la línea base más la tolerancia."""
+    regressions: List[Regression] = []
+    for result in results:
+        base = baseline.get(result.key)
+        if not base:
+            continue
+        allowed = stage_tolerances.get(result.stage, tolerance)
+        for metric, current, floor in (
+            ("seconds", result.seconds, min_seconds),
+            ("peak_mb", result.peak_mb, min_mb),
+        ):
+            reference = base.get(metric)
+            if current is None or reference is None:
+                continue
+            if current > reference * (1 + allowed) and current - reference > floor:
+                regressions.append(Regression(result.key, metric, reference, current, allowed))
+    return regressions
+
+
+def load_json(path: Path, default):
+    if not path.exists():
+        return default
+    with path.open(encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def write_json(path: Path, payload) -> None:
+    from sbl_utils import write_json_atomic
+
+    write_json_atomic(path, payload, indent=2)
+
+
+def parse_stage_tolerances(values: Sequence[str]) -> Dict[str, float]:
+    tolerances: Dict[str, float] = {}
+    for value in values:
+        stage, separator, amount = value.partition("=")
+        if not separator or stage.strip() not in STAGES:
+            raise argparse.ArgumentTypeError(f"Tolerancia inválida (ETAPA=FRACCION): {value}")
+        tolerances[stage.strip()] = float(amount)
+    return tolerances
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Mide tiempo y memoria de cada etapa del pipeline a varias escalas."
+    )
+    parser.add_argument(
+        "--scales",
+        type=float,
+        nargs="+",
+        default=list(DEFAULT_SCALES),
+        help="Factores de escala del conjunto sintético (por defecto 1 10).",
+    )
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=list(STAGES),
+        default=list(STAGES),
+        help="Etapas a medir (por defecto todas).",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Corridas por etapa y escala.")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del conjunto sintético.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Aumento máximo permitido sobre la base, como fracción (por defecto {DEFAULT_TOLERANCE:g}).",
+    )
+    parser.add_argument(
+        "--stage-tolerance",
+        action="append",
+        default=[],
+        metavar="ETAPA=FRACCION",
+        help="Tolerancia específica para una etapa; puede repetirse.",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=DEFAULT_MIN_SECONDS,
+        help="Diferencia absoluta mínima en segundos para contar como regresión.",
+    )
+    parser.add_argument(
+        "--min-mb",
+        type=float,
+        default=DEFAULT_MIN_MB,
+        help="Diferencia absoluta mínima en MB para contar como regresión.",
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Archivo JSON de la línea base.")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY, help="Historial JSON de corridas.")
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Guarda los resultados de esta corrida como nueva línea base.",
+    )
+    args = parser.parse_args(argv)
+    if args.repeat <= 0:
+        parser.error("--repeat debe ser mayor que cero")
+    if any(scale <= 0 for scale in args.scales):
+        parser.error("--scales debe contener valores mayores que cero")
+    if args.tolerance < 0:
+        parser.error("--tolerance no puede ser negativa")
+    try:
+        args.stage_tolerances = parse_stage_tolerances(args.stage_tolerance)
+    except argparse.ArgumentTypeError as exc:
+        parser.error(str(exc))
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+
+    def report(result: StageResult) -> None:
+        memory = "n/d" if result.peak_mb is None else f"{result.peak_mb:.1f} MB"
+        print(f"{result.key:<28} {result.seconds:9.3f} s  pico {memory}")
+
+    results = run_benchmark(args.scales, args.stages, args.repeat, args.seed, report)
+
+    history = load_json(args.history, {"runs": []})
+    history["runs"].append({
+        "fecha": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": [asdict(result) for result in results],
+    })
+    write_json(args.history, history)
+
+    baseline = load_json(args.baseline, {"results": {}})
+    if args.update_baseline:
+        baseline["python"] = sys.version.split()[0]
+        baseline["fecha"] = dt.datetime.now().isoformat(timespec="seconds")
+        baseline["results"].update(
+            {result.key: {"seconds": result.seconds, "peak_mb": result.peak_mb} for result in results}
+        )
+        write_json(args.baseline, baseline)
+        print(f"Línea base actualizada en {args.baseline}")
+        return 0
+
+    if not baseline["results"]:
+        print(f"Sin línea base en {args.baseline}; ejecuta con --update-baseline para crearla.")
+        return 0
+
+    regressions = find_regressions(
+        results, baseline["results"], args.tolerance, args.stage_tolerances, args.min_seconds, args.min_mb
+    )
+    if regressions:
+        print("Etapas con regresión:", file=sys.stderr)
+        for regression in regressions:
+            print(f"  ❌ {regression.describe()}", file=sys.stderr)
+        return 1
+    print("✅ Sin regresiones contra la línea base")
+    return 0
+
+
+if __name__ == "__main__":
+    from stage_profiler import run_main
+
+    raise SystemExit(run_main(main))
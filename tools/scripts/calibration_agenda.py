@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Agenda persistente de próximas calibraciones indexada por fecha de vencimiento.
+
+`generate_cert_calibrations.py` actualiza la agenda con cada programa de
+calibración que genera; los recordatorios y notificaciones la consultan sin
+volver a recorrer todos los instrumentos.
+
+Estructura: un calendario de cubetas por fecha (ordinal) más la lista ordenada
+de las fechas ocupadas, uno global y uno por cliente. Con ``d`` fechas
+distintas:
+
+- ``next_due(k)`` y ``due_within(horizonte)`` cuestan O(log d + resultados).
+- ``upsert``/``remove`` mueven el instrumento de cubeta en O(log d); solo se
+  inserta o elimina en la lista ordenada cuando una fecha se ocupa o se vacía.
+
+Ejemplos::
+
+    python tools/scripts/calibration_agenda.py --horizonte 30
+    python tools/scripts/calibration_agenda.py --cliente 5 --proximos 10 --formato json
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import csv
+import datetime as dt
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sbl_utils import write_json_atomic
+
+AGENDA_VERSION = 1
+DEFAULT_AGENDA_PATH = (
+    Path(__file__).resolve().parents[2] / "storage" / "calibration_schedules" / "agenda_calibraciones.json"
+)
+DEFAULT_HORIZON_DAYS = 30
+
+
+class AgendaError(RuntimeError):
+    """La agenda no se pudo leer o está dañada."""
+
+
+@dataclass
+class AgendaEntry:
+    """Instrumento programado; ``datos`` conserva el resto del programa (prioridad, frecuencia...)."""
+
+    instrumento_id: str
+    cliente_id: int
+    proxima_calibracion: dt.date
+    datos: Dict[str, Any] = field(default_factory=dict)
+
+    def as_row(self) -> Dict[str, Any]:
+        return {
+            "instrumento_id": self.instrumento_id,
+            "cliente_id": self.cliente_id,
+            "proxima_calibracion": self.proxima_calibracion.isoformat(),
+            **self.datos,
+        }
+
+
+class _Calendar:
+    """Cubetas de instrumentos por fecha y lista ordenada de fechas ocupadas."""
+
+    __slots__ = ("fechas", "cubetas")
+
+    def __init__(self) -> None:
+        self.fechas: List[int] = []
+        self.cubetas: Dict[int, Dict[str, None]] = {}
+
+    def add(self, ordinal: int, key: str) -> None:
+        cubeta = self.cubetas.get(ordinal)
+        if cubeta is None:
+            cubeta = self.cubetas[ordinal] = {}
+            bisect.insort(self.fechas, ordinal)
+        cubeta[key] = None
+
+    def discard(self, ordinal: int, key: str) -> None:
+        cubeta = self.cubetas.get(ordinal)
+        if cubeta is None or key not in cubeta:
+            return
+        del cubeta[key]
+        if not cubeta:
+            del self.cubetas[ordinal]
+            del self.fechas[bisect.bisect_left(self.fechas, ordinal)]
+
+    def iter_range(self, desde: Optional[int] = None, hasta: Optional[int] = None) -> Iterator[str]:
+        """Claves con fecha en ``[desde, hasta]`` en orden de vencimiento (y de clave)."""
+        start = 0 if desde is None else bisect.bisect_left(self.fechas, desde)
+        stop = len(self.fechas) if hasta is None else bisect.bisect_right(self.fechas, hasta)
+        for ordinal in self.fechas[start:stop]:
+            yield from sorted(self.cubetas[ordinal])
+
+    def __bool__(self) -> bool:
+        return bool(self.fechas)
+
+
+class CalibrationAgenda:
+    """Agenda de vencimientos con consultas por horizonte y próximos K por cliente."""
+
+    def __init__(self) -> None:
+        self.entries: Dict[str, AgendaEntry] = {}
+        self._todos = _Calendar()
+        self._por_cliente: Dict[int, _Calendar] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, instrumento_id: object) -> bool:
+        return instrumento_id in self.entries
+
+    def _calendar(self, cliente_id: Optional[int]) -> Optional[_Calendar]:
+        return self._todos if cliente_id is None else self._por_cliente.get(cliente_id)
+
+    def upsert(
+        self,
+        instrumento_id: str,
+        cliente_id: int,
+        proxima_calibracion: dt.date,
+        **datos: Any,
+    ) -> bool:
+        """Agrega o actualiza un instrumento; devuelve ``False`` si no cambió nada."""
+        previous = self.entries.get(instrumento_id)
+        if previous is not None:
+            if (
+                previous.cliente_id == cliente_id
+                and previous.proxima_calibracion == proxima_calibracion
+                and previous.datos == datos
+            ):
+                return False
+            self.remove(instrumento_id)
+        entry = AgendaEntry(instrumento_id, cliente_id, proxima_calibracion, dict(datos))
+        self.entries[instrumento_id] = entry
+        ordinal = proxima_calibracion.toordinal()
+        self._todos.add(ordinal, instrumento_id)
+        calendario = self._por_cliente.get(cliente_id)
+        if calendario is None:
+            calendario = self._por_cliente[cliente_id] = _Calendar()
+        calendario.add(ordinal, instrumento_id)
+        return True
+
+    def remove(self, instrumento_id: str) -> Optional[AgendaEntry]:
+        entry = self.entries.pop(instrumento_id, None)
+        if entry is None:
+            return None
+        ordinal = entry.proxima_calibracion.toordinal()
+        self._todos.discard(ordinal, instrumento_id)
+        calendario = self._por_cliente[entry.cliente_id]
+        calendario.discard(ordinal, instrumento_id)
+        if not calendario:
+            del self._por_cliente[entry.cliente_id]
+        return entry
+
+    def prune(self, vigentes: Iterable[str], cliente_id: Optional[int] = None) -> List[AgendaEntry]:
+        """Elimina los instrumentos que no están en ``vigentes``.
+
+        Con ``cliente_id`` solo se consideran los instrumentos de ese cliente; el
+        resto de la agenda queda intacto.
+        """
+        vigentes = set(vigentes)
+        if cliente_id is None:
+            candidatos = list(self.entries)
+        else:
+            calendario = self._por_cliente.get(cliente_id)
+            candidatos = list(calendario.iter_range()) if calendario is not None else []
+        return [self.remove(key) for key in candidatos if key not in vigentes]
+
+    def next_due(
+        self,
+        limit: int,
+        cliente_id: Optional[int] = None,
+        desde: Optional[dt.date] = None,
+    ) -> List[AgendaEntry]:
+        """Los ``limit`` instrumentos que vencen primero (a partir de ``desde`` si se indica)."""
+        calendario = self._calendar(cliente_id)
+        if calendario is None or limit <= 0:
+            return []
+        result: List[AgendaEntry] = []
+        for key in calendario.iter_range(desde.toordinal() if desde else None):
+            result.append(self.entries[key])
+            if len(result) >= limit:
+                break
+        return result
+
+    def due_within(
+        self,
+        horizonte_dias: int,
+        fecha_corte: Optional[dt.date] = None,
+        cliente_id: Optional[int] = None,
+        incluir_vencidos: bool = True,
+    ) -> List[AgendaEntry]:
+        """Instrumentos que vencen en los próximos ``horizonte_dias`` (y los ya vencidos)."""
+        calendario = self._calendar(cliente_id)
+        if calendario is None:
+            return []
+        corte = (fecha_corte or dt.date.today()).toordinal()
+        desde = None if incluir_vencidos else corte
+        return [self.entries[key] for key in calendario.iter_range(desde, corte + horizonte_dias)]
+
+    def clients(self) -> List[int]:
+        return sorted(self._por_cliente)
+
+    @classmethod
+    def load(cls, path: Path) -> "CalibrationAgenda":
+        """Carga la agenda; si el archivo no existe devuelve una agenda vacía."""
+        agenda = cls()
+        if not path.exists():
+            return agenda
+        try:
+            with path.open(encoding="utf-8") as handle:
+                payload = json.load(handle)
+            if payload.get("version") != AGENDA_VERSION:
+                raise AgendaError(f"Versión de agenda no soportada en {path}")
+            for instrumento_id, (cliente_id, proxima, datos) in payload["instrumentos"].items():
+                agenda.upsert(instrumento_id, cliente_id, dt.date.fromisoformat(proxima), **datos)
+        except (OSError, KeyError, TypeError, ValueError) as exc:
+            raise AgendaError(f"Agenda dañada en {path}: {exc}") from exc
+        return agenda
+
+    def save(self, path: Path) -> Path:
+        """Escribe la agenda de forma atómica (archivo temporal + ``os.replace``)."""
+        payload = {
+            "version": AGENDA_VERSION,
+            "instrumentos": {
+                key: [entry.cliente_id, entry.proxima_calibracion.isoformat(), entry.datos]
+                for key, entry in self.entries.items()
+            },
+        }
+        return write_json_atomic(path, payload, separators=(",", ":"))
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Consulta la agenda de próximas calibraciones por horizonte o próximos K."
+    )
+    parser.add_argument("--agenda", type=Path, default=DEFAULT_AGENDA_PATH, help="Archivo JSON de la agenda.")
+    parser.add_argument("--cliente", type=int, default=None, help="Limita la consulta a un cliente.")
+    parser.add_argument(
+        "--horizonte",
+        type=int,
+        default=None,
+        metavar="DIAS",
+        help=f"Instrumentos que vencen en los próximos DIAS (por defecto {DEFAULT_HORIZON_DAYS}).",
+    )
+    parser.add_argument("--proximos", type=int, default=None, metavar="K", help="Los K próximos vencimientos.")
+    parser.add_argument(
+        "--sin-vencidos",
+        action="store_true",
+        help="Con --horizonte, omite los instrumentos ya vencidos.",
+    )
+    parser.add_argument(
+        "--fecha-corte",
+        type=dt.date.fromisoformat,
+        default=None,
+        help="Fecha de referencia YYYY-MM-DD (por defecto hoy).",
+    )
+    parser.add_argument("--formato", choices=("csv", "json"), default="csv", help="Formato de salida.")
+    args = parser.parse_args(argv)
+    if args.horizonte is not None and args.proximos is not None:
+        parser.error("Usa --horizonte o --proximos, no ambos")
+    if args.horizonte is None and args.proximos is None:
+        args.horizonte = DEFAULT_HORIZON_DAYS
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        agenda = CalibrationAgenda.load(args.agenda)
+    except AgendaError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 1
+
+    if args.proximos is not None:
+        entries = agenda.next_due(args.proximos, args.cliente, args.fecha_corte)
+    else:
+        entries = agenda.due_within(
+            args.horizonte, args.fecha_corte, args.cliente, incluir_vencidos=not args.sin_vencidos
+        )
+
+    rows = [entry.as_row() for entry in entries]
+    if args.formato == "json":
+        json.dump(rows, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    elif rows:
+        fieldnames: Dict[str, None] = {}
+        for row in rows:
+            fieldnames.update(dict.fromkeys(row))
+        writer = csv.DictWriter(sys.stdout, fieldnames=list(fieldnames), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"{len(rows)} instrumentos de {len(agenda)} en la agenda", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    from stage_profiler import run_main
+
+    raise SystemExit(run_main(main))
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""Folios de certificado únicos y deterministas reservados por bloques.
+
+Cada certificado recibe ``CERT-AAAA-Eee-Cccc-NNNNNN``, donde ``NNNNNN`` es un
+consecutivo por año, empresa y cliente. El consecutivo no depende de la hora de
+generación, así que corridas masivas no repiten folios ni necesitan esperar.
+
+El contador vive en un almacén compartido:
+
+- `FileSequenceStore`: archivo JSON protegido con un bloqueo del sistema
+  operativo (``fcntl.flock`` o ``msvcrt.locking``) sobre un archivo ``.lock``
+  y reescrito de forma atómica con ``os.replace``. El sistema libera el
+  bloqueo si el proceso muere, así que no quedan bloqueos huérfanos.
+- `DatabaseSequenceStore`: tabla ``secuencias_certificados`` vía los pools de
+  `db_loader` (``sqlite:///`` como sustituto local o ``mysql://``); el
+  incremento ocurre en una sola transacción.
+
+`CertificateNumberAllocator` pide al almacén bloques de ``block_size`` folios y
+los entrega desde memoria, de modo que varios procesos trabajando en paralelo
+solo tocan el contador una vez por bloque y nunca reciben folios repetidos. Los
+folios que queden sin usar al terminar un proceso se pierden (huecos), nunca se
+reutilizan.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Protocol, Tuple
+
+from sbl_utils import write_json_atomic
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+DEFAULT_BLOCK_SIZE = 1000
+LOCK_TIMEOUT_SECONDS = 30.0
+SEQUENCE_TABLE = "secuencias_certificados"
+
+
+class CertificateSequenceError(RuntimeError):
+    """No se pudo reservar un bloque de folios."""
+
+
+class SequenceStore(Protocol):
+    def reserve(self, clave: str, cantidad: int) -> int:
+        """Reserva ``cantidad`` folios consecutivos de ``clave`` y devuelve el primero."""
+        ...
+
+
+def _try_lock(fd: int) -> bool:
+    """Toma el bloqueo exclusivo de ``fd`` sin esperar; ``False`` si está ocupado."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _unlock(fd: int) -> None:
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class FileSequenceStore:
+    """Contadores en un archivo JSON con incrementos atómicos entre procesos."""
+
+    def __init__(self, path: Path, lock_timeout: float = LOCK_TIMEOUT_SECONDS):
+        self.path = path
+        self.lock_path = path.with_name(path.name + ".lock")
+        self.lock_timeout = lock_timeout
+
+    def _acquire(self) -> int:
+        fd = os.open(self.lock_path, os.O_CREAT | os.O_RDWR)
+        deadline = time.monotonic() + self.lock_timeout
+        while not _try_lock(fd):
+            if time.monotonic() > deadline:
+                os.close(fd)
+                raise CertificateSequenceError(f"Tiempo agotado esperando el bloqueo {self.lock_path}")
+            time.sleep(0.005)
+        return fd
+
+    def _read(self) -> Dict[str, int]:
+        try:
+            with self.path.open(encoding="utf-8") as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {}
+        except ValueError as exc:
+            raise CertificateSequenceError(f"Contador de folios dañado en {self.path}: {exc}") from exc
+
+    def reserve(self, clave: str, cantidad: int) -> int:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = self._acquire()
+        try:
+            counters = self._read()
+            start = counters.get(clave, 1)
+            counters[clave] = start + cantidad
+            write_json_atomic(self.path, counters, fsync=True, indent=2, sort_keys=True)
+            return start
+        finally:
+            # El archivo .lock se conserva: borrarlo permitiría que dos procesos
+            # bloquearan archivos distintos con la misma ruta.
+            _unlock(fd)
+            os.close(fd)
+
+
+class DatabaseSequenceStore:
+    """Contadores en la tabla ``secuencias_certificados`` (SQLite o MySQL)."""
+
+    def __init__(self, dsn: str):
+        from db_loader import get_pool  # importación diferida: solo con --secuencia-certificados DSN
+
+        self.pool = get_pool(dsn)
+        if self.pool.dialect.name == "mysql":
+            upsert = "ON DUPLICATE KEY UPDATE siguiente = siguiente + ?"
+        else:
+            upsert = "ON CONFLICT (clave) DO UPDATE SET siguiente = siguiente + ?"
+        self._increment_sql = self.pool.dialect.prepare(
+            f"INSERT INTO {SEQUENCE_TABLE} (clave, siguiente) VALUES (?, ?) {upsert}"
+        )
+        self._select_sql = self.pool.dialect.prepare(
+            f"SELECT siguiente FROM {SEQUENCE_TABLE} WHERE clave = ?"
+        )
+
+    def reserve(self, clave: str, cantidad: int) -> int:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                # El upsert bloquea la fila hasta el commit; la lectura ve el valor ya incrementado.
+                cursor.execute(self._increment_sql, (clave, 1 + cantidad, cantidad))
+                cursor.execute(self._select_sql, (clave,))
+                siguiente = cursor.fetchone()[0]
+                conn.commit()
+            except Exception as exc:
+                conn.rollback()
+                raise CertificateSequenceError(f"No se pudo reservar folios para {clave}: {exc}") from exc
+            finally:
+                cursor.close()
+        return siguiente - cantidad
+
+
+def open_sequence_store(target: str) -> SequenceStore:
+    """Crea el almacén a partir de un DSN (``sqlite:///``, ``mysql://``) o una ruta JSON."""
+    if "://" in target:
+        return DatabaseSequenceStore(target)
+    return FileSequenceStore(Path(target))
+
+
+class CertificateNumberAllocator:
+    """Entrega folios desde bloques reservados en el almacén compartido."""
+
+    def __init__(self, store: SequenceStore, block_size: int = DEFAULT_BLOCK_SIZE):
+        if block_size <= 0:
+            raise ValueError(f"block_size debe ser positivo: {block_size}")
+        self.store = store
+        self.block_size = block_size
+        self._blocks: Dict[str, Tuple[int, int]] = {}
+
+    @staticmethod
+    def sequence_key(year: int, empresa_id: int, cliente_id: int) -> str:
+        return f"{year}-E{empresa_id:02d}-C{cliente_id:03d}"
+
+    def next_sequence(self, clave: str) -> int:
+        siguiente, fin = self._blocks.get(clave, (0, 0))
+        if siguiente >= fin:
+            siguiente = self.store.reserve(clave, self.block_size)
+            fin = siguiente + self.block_size
+        self._blocks[clave] = (siguiente + 1, fin)
+        return siguiente
+
+    def next_number(self, year: int, empresa_id: int, cliente_id: int) -> str:
+        clave = self.sequence_key(year, empresa_id, cliente_id)
+        return f"CERT-{clave}-{self.next_sequence(clave):06d}"
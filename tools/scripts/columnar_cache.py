@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""Caché columnar tipada junto a los CSV normalizados.
+
+Las etapas que escriben ``normalize_instrumentos.csv`` o
+``normalize_plan_riesgos.csv`` dejan al lado un ``<archivo>.csv.columnar``.
+Ese archivo guarda las mismas columnas con los enteros y las fechas ya
+convertidos. Los lectores (historiales, plan de riesgos, validador y reporte
+de auditoría) abren el archivo con ``mmap``, materializan solo las columnas
+que usan y evitan volver a convertir cada celda.
+
+Formato:
+
+- Con ``pyarrow`` instalado se escribe un archivo Arrow IPC (Feather v2, sin
+  compresión) que se lee con ``memory_map=True``.
+- Sin ``pyarrow`` se usa un formato propio: la cabecera ``SBLCOL1``, los
+  metadatos en JSON y un bloque alineado por columna. Los enteros son int64
+  con ``-2**63`` como nulo. Las fechas son ordinales int32 con 0 como nulo.
+  El texto se guarda en UTF-8 con desplazamientos en caracteres.
+
+El lector reconoce el formato por la cabecera. La caché se descarta si el CSV
+cambió (tamaño o ``mtime_ns`` distintos a los registrados), si el esquema no
+coincide o si el archivo está dañado. En esos casos los lectores vuelven al
+CSV. Solo se escribe si la conversión es exacta: cada entero y cada fecha
+debe volver a producir el texto original; si no, no se genera la caché.
+
+Uso:
+```bash
+python tools/scripts/columnar_cache.py app/Modules/Internal/ArchivosSql/Archivos_Normalize/normalize_certificates.csv
+python tools/scripts/columnar_cache.py --formato struct normalize_instrumentos.csv
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime as dt
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+from sbl_utils import lazy_import, module_available, open_text
+
+pyarrow = lazy_import('pyarrow', 'pip install pyarrow')
+
+SIDECAR_SUFFIX = ".columnar"
+MAGIC = b"SBLCOL1\0"
+ARROW_MAGIC = b"ARROW1"
+FORMAT_VERSION = 1
+NULL_INT = -(2 ** 63)
+_HEADER = struct.Struct("<8sI")
+_ALIGN = 8
+
+INT = "int"
+DATE = "date"
+TEXT = "str"
+
+# Columnas tipadas de cada CSV normalizado (el resto se guarda como texto).
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    "normalize_instrumentos.csv": {
+        "catalogo_id": INT, "marca_id": INT, "modelo_id": INT, "empresa_id": INT,
+        "departamento_id": INT, "programado": INT,
+        "fecha_alta": DATE, "fecha_baja": DATE, "proxima_calibracion": DATE,
+    },
+    "normalize_plan_riesgos.csv": {"empresa_id": INT, "fecha_actualizacion": DATE},
+    "normalize_certificates.csv": {"empresa_id": INT, "fecha_calibracion": DATE, "fecha_proxima": DATE},
+}
+
+
+class ColumnarCacheError(ValueError):
+    """Un valor no puede representarse sin pérdida en la columna tipada."""
+
+
+def sidecar_path(csv_path: Path) -> Path:
+    return csv_path.with_name(csv_path.name + SIDECAR_SUFFIX)
+
+
+def schema_for(csv_path: Path) -> Dict[str, str]:
+    name = csv_path.name
+    for suffix in (".gz", ".zst"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+    return SCHEMAS.get(name, {})
+
+
+def _source_stamp(csv_path: Path) -> Dict[str, Any]:
+    stat = csv_path.stat()
+    return {"name": csv_path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _convert(kind: str, column: str, values: Sequence[str]) -> List[Any]:
+    converted: List[Any] = []
+    for line, text in enumerate(values, start=2):
+        if text == "":
+            converted.append(None)
+            continue
+        try:
+            if kind == INT:
+                value: Any = int(text)
+                exact = str(value) == text and NULL_INT < value < 2 ** 63
+            else:
+                value = dt.date.fromisoformat(text)
+                exact = value.isoformat() == text
+        except ValueError:
+            exact = False
+        if not exact:
+            raise ColumnarCacheError(f"'{text}' (columna {column}, línea {line}) no es {kind} exacto")
+        converted.append(value)
+    return converted
+
+
+def _typed_columns(
+    header: Sequence[str], rows: Iterable[Sequence[str]], schema: Mapping[str, str]
+) -> Dict[str, List[Any]]:
+    columns: Dict[str, List[Any]] = {name: [] for name in header}
+    appenders = [columns[name].append for name in header]
+    width = len(header)
+    for row in rows:
+        if len(row) != width:
+            raise ColumnarCacheError(f"Fila con {len(row)} campos; se esperaban {width}")
+        for append, value in zip(appenders, row):
+            if not isinstance(value, str):
+                # Igual que csv.writer: None se escribe como celda vacía. Otro
+                # tipo no corresponde al texto del CSV, así que no hay caché.
+                if value is not None:
+                    raise ColumnarCacheError(f"Valor no textual {value!r} en la fila")
+                value = ""
+            append(value)
+    for name in header:
+        kind = schema.get(name, TEXT)
+        if kind != TEXT:
+            columns[name] = _convert(kind, name, columns[name])
+    return columns
+
+
+def _pad(handle, position: int) -> int:
+    padding = -position % _ALIGN
+    handle.write(b"\0" * padding)
+    return position + padding
+
+
+def _write_struct(path: Path, columns: Dict[str, List[Any]], kinds: Dict[str, str], meta: Dict[str, Any]) -> None:
+    import array
+
+    blocks: List[bytes] = []
+    layout: List[Dict[str, Any]] = []
+    for name, values in columns.items():
+        kind = kinds[name]
+        if kind == INT:
+            data = array.array("q", [NULL_INT if value is None else value for value in values]).tobytes()
+            parts = [data]
+        elif kind == DATE:
+            data = array.array("i", [0 if value is None else value.toordinal() for value in values]).tobytes()
+            parts = [data]
+        else:
+            offsets = array.array("q", [0])
+            total = 0
+            for value in values:
+                total += len(value)
+                offsets.append(total)
+            parts = [offsets.tobytes(), "".join(values).encode("utf-8")]
+        layout.append({"name": name, "type": kind, "sizes": [len(part) for part in parts]})
+        blocks.extend(parts)
+
+    meta = {**meta, "byteorder": sys.byteorder, "columns": layout}
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as handle:
+        handle.write(_HEADER.pack(MAGIC, len(meta_bytes)))
+        handle.write(meta_bytes)
+        position = _pad(handle, _HEADER.size + len(meta_bytes))
+        for block in blocks:
+            handle.write(block)
+            position = _pad(handle, position + len(block))
+    os.replace(tmp_path, path)
+
+
+def _write_arrow(path: Path, columns: Dict[str, List[Any]], kinds: Dict[str, str], meta: Dict[str, Any]) -> None:
+    import pyarrow.feather  # noqa: F401 - registra el submódulo en el proxy
+
+    types = {INT: pyarrow.int64(), DATE: pyarrow.date32(), TEXT: pyarrow.string()}
+    schema = pyarrow.schema(
+        [pyarrow.field(name, types[kinds[name]]) for name in columns],
+        metadata={b"sbl_columnar": json.dumps(meta).encode("utf-8")},
+    )
+    table = pyarrow.table({name: pyarrow.array(values, types[kinds[name]]) for name, values in columns.items()}, schema=schema)
+    tmp_path = path.with_name(path.name + ".tmp")
+    pyarrow.feather.write_feather(table, str(tmp_path), compression="uncompressed")
+    os.replace(tmp_path, path)
+
+
+def write_sidecar(
+    csv_path: Path,
+    header: Sequence[str],
+    rows: Iterable[Sequence[str]],
+    *,
+    schema: Optional[Mapping[str, str]] = None,
+    formato: str = "auto",
+) -> Optional[Path]:
+    """Escribe la caché de ``csv_path`` con las filas (texto) que se acaban de escribir.
+
+    Debe llamarse después de cerrar el CSV, porque registra su tamaño y su
+    ``mtime``. Devuelve ``None`` (y borra cualquier caché anterior) si algún
+    valor tipado no es exacto.
+    """
+    target = sidecar_path(csv_path)
+    schema = schema_for(csv_path) if schema is None else schema
+    try:
+        columns = _typed_columns(list(header), rows, schema)
+    except ColumnarCacheError:
+        target.unlink(missing_ok=True)
+        return None
+    kinds = {name: schema.get(name, TEXT) for name in columns}
+    meta = {
+        "version": FORMAT_VERSION,
+        "source": _source_stamp(csv_path),
+        "rows": len(next(iter(columns.values()), [])),
+        "schema": kinds,
+    }
+    if formato == "auto":
+        formato = "arrow" if module_available("pyarrow") else "struct"
+    if formato == "arrow":
+        _write_arrow(target, columns, kinds, meta)
+    else:
+        _write_struct(target, columns, kinds, meta)
+    return target
+
+
+def build_sidecar(csv_path: Path, *, formato: str = "auto") -> Optional[Path]:
+    """Genera la caché de un CSV normalizado ya existente."""
+    with open_text(csv_path) as handle:
+        reader = csv.reader(handle)
+        header = next(reader, [])
+        rows = list(reader)
+    return write_sidecar(csv_path, header, rows, formato=formato)
+
+
+class ColumnarTable:
+    """Columnas tipadas de una caché vigente; se materializan al pedirlas."""
+
+    def __init__(self, names: Sequence[str], rows: int, loader):
+        self.names = list(names)
+        self.rows = rows
+        self._loader = loader
+        self._columns: Dict[str, List[Any]] = {}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str) -> List[Any]:
+        if name not in self._columns:
+            if name not in self.names:
+                raise KeyError(name)
+            self._columns[name] = self._loader(name)
+        return self._columns[name]
+
+    def iter_dicts(self, as_text: bool = False) -> Iterator[Dict[str, Any]]:
+        """Filas como diccionarios, igual que ``csv.DictReader``.
+
+        Con ``as_text`` los valores tipados se devuelven como el texto original.
+        """
+        columns = [self.column(name) for name in self.names]
+        if as_text:
+            columns = [
+                [("" if value is None else value.isoformat() if isinstance(value, dt.date) else str(value)) for value in values]
+                if any(not isinstance(value, str) for value in values) else values
+                for values in columns
+            ]
+        names = self.names
+        for values in zip(*columns):
+            yield dict(zip(names, values))
+
+
+def _struct_loader(path: Path, meta: Dict[str, Any], data_offset: int):
+    rows = meta["rows"]
+    spans: Dict[str, tuple] = {}
+    position = data_offset
+    for column in meta["columns"]:
+        parts = []
+        for size in column["sizes"]:
+            parts.append((position, size))
+            position += size + (-size % _ALIGN)
+        spans[column["name"]] = (column["type"], parts)
+
+    def load(name: str) -> List[Any]:
+        kind, parts = spans[name]
+        with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                start, size = parts[0]
+                if kind == INT:
+                    ints = view[start:start + size].cast("q")
+                    values = [None if value == NULL_INT else value for value in ints.tolist()]
+                    ints.release()
+                elif kind == DATE:
+                    ordinals = view[start:start + size].cast("i")
+                    from_ordinal = dt.date.fromordinal
+                    values = [from_ordinal(value) if value else None for value in ordinals.tolist()]
+                    ordinals.release()
+                else:
+                    offsets_view = view[start:start + size].cast("q")
+                    offsets = offsets_view.tolist()
+                    offsets_view.release()
+                    text_start, text_size = parts[1]
+                    text = str(view[text_start:text_start + text_size], "utf-8")
+                    values = [text[offsets[index]:offsets[index + 1]] for index in range(rows)]
+            finally:
+                view.release()
+        return values
+
+    return load
+
+
+def _open_struct(path: Path) -> Optional[tuple]:
+    with path.open("rb") as handle:
+        head = handle.read(_HEADER.size)
+        if len(head) < _HEADER.size:
+            return None
+        magic, meta_size = _HEADER.unpack(head)
+        if magic != MAGIC:
+            return None
+        meta = json.loads(handle.read(meta_size).decode("utf-8"))
+    if meta.get("byteorder") != sys.byteorder:
+        return None
+    data_offset = _HEADER.size + meta_size
+    data_offset += -data_offset % _ALIGN
+    names = [column["name"] for column in meta["columns"]]
+    return meta, ColumnarTable(names, meta["rows"], _struct_loader(path, meta, data_offset))
+
+
+def _open_arrow(path: Path) -> Optional[tuple]:
+    if not module_available("pyarrow"):
+        return None
+    import pyarrow.feather  # noqa: F401 - registra el submódulo en el proxy
+
+    table = pyarrow.feather.read_table(str(path), memory_map=True)
+    raw_meta = (table.schema.metadata or {}).get(b"sbl_columnar")
+    if raw_meta is None:
+        return None
+    meta = json.loads(raw_meta.decode("utf-8"))
+    return meta, ColumnarTable(table.column_names, table.num_rows, lambda name: table.column(name).to_pylist())
+
+
+def load_sidecar(csv_path: Path, schema: Optional[Mapping[str, str]] = None) -> Optional[ColumnarTable]:
+    """Tabla de la caché de ``csv_path`` o ``None`` si falta, está vencida o dañada."""
+    path = sidecar_path(csv_path)
+    try:
+        with path.open("rb") as handle:
+            magic = handle.read(len(MAGIC))
+        opened = _open_arrow(path) if magic.startswith(ARROW_MAGIC) else _open_struct(path)
+        if opened is None:
+            return None
+        meta, table = opened
+        if meta.get("version") != FORMAT_VERSION or meta.get("source") != _source_stamp(csv_path):
+            return None
+        expected = schema_for(csv_path) if schema is None else schema
+        if any(meta["schema"].get(name, TEXT) != kind for name, kind in expected.items() if name in meta["schema"]):
+            return None
+        return table
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def iter_rows(csv_path: Path) -> Iterator[Dict[str, Any]]:
+    """Filas de ``csv_path``: tipadas desde la caché vigente o texto desde el CSV.
+
+    En las columnas tipadas la caché entrega ``int``/``datetime.date`` y
+    ``None`` para las celdas vacías; los consumidores aceptan ambas formas.
+    """
+    table = load_sidecar(csv_path)
+    if table is not None:
+        yield from table.iter_dicts()
+        return
+    with open_text(csv_path) as handle:
+        yield from csv.DictReader(handle)
+
+
+def read_column(csv_path: Path, name: str) -> List[Any]:
+    """Una sola columna de ``csv_path``; desde la caché solo se materializa esa."""
+    table = load_sidecar(csv_path)
+    if table is not None and name in table.names:
+        return table.column(name)
+    with open_text(csv_path) as handle:
+        return [row.get(name) for row in csv.DictReader(handle)]
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Genera la caché columnar de CSV normalizados.")
+    parser.add_argument("csv", nargs="+", type=Path, help="CSV normalizados.")
+    parser.add_argument(
+        "--formato",
+        choices=("auto", "arrow", "struct"),
+        default="auto",
+        help="Formato de la caché (auto: Arrow si pyarrow está instalado).",
+    )
+    args = parser.parse_args(argv)
+    if args.formato == "arrow" and not module_available("pyarrow"):
+        parser.error("--formato arrow requiere pyarrow")
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    status = 0
+    for csv_path in args.csv:
+        target = build_sidecar(csv_path, formato=args.formato)
+        if target is None:
+            print(f"⚠️ {csv_path}: valores no exactos en columnas tipadas; sin caché")
+            status = 1
+        else:
+            print(f"✅ {target} ({target.stat().st_size:,} bytes)")
+    return status
+
+
+if __name__ == "__main__":
+    from stage_profiler import run_main
+
+    raise SystemExit(run_main(main))
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""Instantáneas persistentes de cumplimiento por cliente.
+
+`audit_report_generator.py` guarda, al terminar cada corrida, lo que ya calculó
+para cada instrumento (huella de sus filas de origen, cliente, última y próxima
+calibración, frecuencia, criticidad, tipo de servicio y estado) junto con los
+agregados por cliente (conteos por estado, suma de días a vencimiento y
+distribución de fechas de vencimiento).
+
+En la corrida siguiente:
+
+- Si la huella del instrumento no cambió, se reutilizan sus fechas y solo se
+  reclasifica su estado contra la nueva fecha de corte. Los agregados se ajustan
+  únicamente cuando el instrumento cruzó el umbral de 30 o de 0 días.
+- La suma de días a vencimiento de los instrumentos sin cambios se desplaza en
+  bloque por los días transcurridos, sin recorrerlos.
+- Los instrumentos nuevos, modificados o eliminados restan su aporte anterior y
+  suman el nuevo.
+
+Las métricas resultantes son idénticas a las de un recálculo completo.
+"""
+
+from __future__ import annotations
+
+import bisect
+import datetime as dt
+import hashlib
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from sbl_utils import write_json_atomic
+
+SNAPSHOT_VERSION = 2
+DEFAULT_SNAPSHOT_NAME = "compliance_snapshot.json"
+PROXIMO_VENCER_DAYS = 30
+DEFAULT_PERCENTILES = (10, 50, 90)
+# Límites superiores (inclusivos) de los rangos del histograma de días a vencimiento.
+DUE_HISTOGRAM_EDGES = (0, PROXIMO_VENCER_DAYS, 90, 180, 365)
+
+ESTADO_AL_DIA = "AL_DIA"
+ESTADO_PROXIMO = "PROXIMO_VENCER"
+ESTADO_VENCIDO = "VENCIDO"
+ESTADO_SIN_DATOS = "SIN_DATOS"
+
+
+class SnapshotError(RuntimeError):
+    """La instantánea no existe, está dañada o pertenece a otra versión."""
+
+
+def _histogram_labels(edges: Sequence[int]) -> List[str]:
+    labels = [f"<={edges[0]}"]
+    labels.extend(f"{low + 1}-{high}" for low, high in zip(edges, edges[1:]))
+    labels.append(f">{edges[-1]}")
+    return labels
+
+
+DUE_HISTOGRAM_LABELS = _histogram_labels(DUE_HISTOGRAM_EDGES)
+
+
+def classify_due(dias: Optional[int]) -> str:
+    """Estado de cumplimiento según los días que faltan para la próxima calibración."""
+    if dias is None:
+        return ESTADO_SIN_DATOS
+    if dias > PROXIMO_VENCER_DAYS:
+        return ESTADO_AL_DIA
+    if dias > 0:
+        return ESTADO_PROXIMO
+    return ESTADO_VENCIDO
+
+
+def rows_fingerprint(rows: Iterable[Mapping[str, Any]]) -> str:
+    """Huella estable de un conjunto de filas CSV (el orden de las filas importa)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        digest.update(repr(sorted(row.items())).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def _date_or_none(value: Optional[str]) -> Optional[dt.date]:
+    return dt.date.fromisoformat(value) if value else None
+
+
+def _iso_or_none(value: Optional[dt.date]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+@dataclass
+class InstrumentSnapshot:
+    """Lo que se conserva de un instrumento entre corridas."""
+
+    huella: str
+    cliente: str
+    ultima_calibracion: Optional[dt.date]
+    proxima_calibracion: Optional[dt.date]
+    frecuencia_meses: Optional[int]
+    criticidad: str
+    servicio_tipo: str
+    estado: str
+
+    def dias(self, fecha_corte: dt.date) -> Optional[int]:
+        if self.proxima_calibracion is None:
+            return None
+        return (self.proxima_calibracion - fecha_corte).days
+
+    def to_row(self) -> List[Any]:
+        return [
+            self.huella,
+            self.cliente,
+            _iso_or_none(self.ultima_calibracion),
+            _iso_or_none(self.proxima_calibracion),
+            self.frecuencia_meses,
+            self.criticidad,
+            self.servicio_tipo,
+            self.estado,
+        ]
+
+    @classmethod
+    def from_row(cls, row: List[Any]) -> "InstrumentSnapshot":
+        huella, cliente, ultima, proxima, frecuencia, criticidad, servicio, estado = row
+        return cls(
+            huella=huella,
+            cliente=cliente,
+            ultima_calibracion=_date_or_none(ultima),
+            proxima_calibracion=_date_or_none(proxima),
+            frecuencia_meses=frecuencia,
+            criticidad=criticidad,
+            servicio_tipo=servicio,
+            estado=estado,
+        )
+
+
+@dataclass
+class ClientAggregate:
+    """Acumulador de una sola pasada que alimenta `ClientAuditMetrics`.
+
+    Además de los conteos por estado guarda cuántos instrumentos vencen en cada
+    fecha (``proximas``, por ordinal). Como la fecha de vencimiento no depende de
+    la fecha de corte, la distribución no necesita desplazarse entre corridas y
+    de ella salen los percentiles y el histograma de días a vencimiento.
+    """
+
+    total: int = 0
+    al_dia: int = 0
+    vencidos: int = 0
+    proximos: int = 0
+    criticos: int = 0
+    dias_suma: int = 0
+    dias_conteo: int = 0
+    proximas: Dict[int, int] = field(default_factory=dict)
+
+    def _count_estado(self, estado: str, delta: int) -> None:
+        if estado == ESTADO_AL_DIA:
+            self.al_dia += delta
+        elif estado == ESTADO_VENCIDO:
+            self.vencidos += delta
+        elif estado == ESTADO_PROXIMO:
+            self.proximos += delta
+
+    def add(
+        self,
+        estado: str,
+        criticidad: str,
+        proxima: Optional[dt.date],
+        dias: Optional[int],
+        sign: int = 1,
+    ) -> None:
+        self.total += sign
+        self._count_estado(estado, sign)
+        if criticidad == "CRITICA":
+            self.criticos += sign
+        if dias is not None:
+            self.dias_suma += sign * dias
+            self.dias_conteo += sign
+        if proxima is not None:
+            ordinal = proxima.toordinal()
+            count = self.proximas.get(ordinal, 0) + sign
+            if count:
+                self.proximas[ordinal] = count
+            else:
+                del self.proximas[ordinal]
+
+    def move(self, anterior: str, nuevo: str) -> None:
+        self._count_estado(anterior, -1)
+        self._count_estado(nuevo, 1)
+
+    def shift(self, dias_transcurridos: int) -> None:
+        """Todos los instrumentos con fecha quedan ``dias_transcurridos`` más cerca del vencimiento."""
+        self.dias_suma -= dias_transcurridos * self.dias_conteo
+
+    def percentiles(
+        self,
+        fecha_corte: dt.date,
+        quantiles: Sequence[int] = DEFAULT_PERCENTILES,
+    ) -> Dict[int, int]:
+        """Percentiles (rango más cercano) de días a vencimiento."""
+        total = sum(self.proximas.values())
+        if not total:
+            return {}
+        corte = fecha_corte.toordinal()
+        ranks = sorted((max(1, math.ceil(q / 100 * total)), q) for q in quantiles)
+        ordinals = sorted(self.proximas)
+        result: Dict[int, int] = {}
+        index = 0
+        acumulado = self.proximas[ordinals[0]]
+        for rank, quantile in ranks:
+            while acumulado < rank:
+                index += 1
+                acumulado += self.proximas[ordinals[index]]
+            result[quantile] = ordinals[index] - corte
+        return dict(sorted(result.items()))
+
+    def histogram(self, fecha_corte: dt.date) -> Dict[str, int]:
+        """Instrumentos por rango de días a vencimiento (`DUE_HISTOGRAM_EDGES`)."""
+        corte = fecha_corte.toordinal()
+        counts = [0] * (len(DUE_HISTOGRAM_EDGES) + 1)
+        for ordinal, count in self.proximas.items():
+            counts[bisect.bisect_left(DUE_HISTOGRAM_EDGES, ordinal - corte)] += count
+        return dict(zip(DUE_HISTOGRAM_LABELS, counts))
+
+    def to_dict(self) -> Dict[str, Any]:
+        values = dict(vars(self))
+        values["proximas"] = {str(ordinal): count for ordinal, count in self.proximas.items()}
+        return values
+
+    @classmethod
+    def from_dict(cls, values: Mapping[str, Any]) -> "ClientAggregate":
+        values = dict(values)
+        values["proximas"] = {int(ordinal): count for ordinal, count in values.get("proximas", {}).items()}
+        return cls(**values)
+
+
+@dataclass
+class ComplianceSnapshot:
+    """Estado persistido de la última corrida del reporte de auditoría."""
+
+    fecha_corte: Optional[dt.date] = None
+    contexto: str = ""
+    instrumentos: Dict[str, InstrumentSnapshot] = field(default_factory=dict)
+    clientes: Dict[str, ClientAggregate] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "ComplianceSnapshot":
+        try:
+            with path.open(encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except FileNotFoundError as exc:
+            raise SnapshotError(f"No existe la instantánea {path}") from exc
+        except (OSError, ValueError) as exc:
+            raise SnapshotError(f"No se pudo leer la instantánea {path}: {exc}") from exc
+        if payload.get("version") != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Versión de instantánea no soportada en {path}")
+        try:
+            return cls(
+                fecha_corte=dt.date.fromisoformat(payload["fecha_corte"]),
+                contexto=payload["contexto"],
+                instrumentos={
+                    codigo: InstrumentSnapshot.from_row(row)
+                    for codigo, row in payload["instrumentos"].items()
+                },
+                clientes={
+                    cliente: ClientAggregate.from_dict(values)
+                    for cliente, values in payload["clientes"].items()
+                },
+            )
+        except (KeyError, TypeError, ValueError) as exc:
+            raise SnapshotError(f"Instantánea dañada en {path}: {exc}") from exc
+
+    def save(self, path: Path) -> Path:
+        """Escribe la instantánea de forma atómica (archivo temporal + ``os.replace``)."""
+        payload = {
+            "version": SNAPSHOT_VERSION,
+            "fecha_corte": _iso_or_none(self.fecha_corte),
+            "contexto": self.contexto,
+            "instrumentos": {codigo: entry.to_row() for codigo, entry in self.instrumentos.items()},
+            "clientes": {cliente: aggregate.to_dict() for cliente, aggregate in self.clientes.items()},
+        }
+        return write_json_atomic(path, payload, separators=(",", ":"))
+
+    def aggregate(self, cliente: str) -> ClientAggregate:
+        aggregate = self.clientes.get(cliente)
+        if aggregate is None:
+            aggregate = self.clientes[cliente] = ClientAggregate()
+        return aggregate
+
+    def count(self, entry: InstrumentSnapshot, sign: int = 1) -> None:
+        """Suma (o resta con ``sign=-1``) el aporte del instrumento a su cliente."""
+        self.aggregate(entry.cliente).add(
+            entry.estado,
+            entry.criticidad,
+            entry.proxima_calibracion,
+            entry.dias(self.fecha_corte),
+            sign,
+        )
+
+    def advance_to(self, fecha_corte: dt.date) -> None:
+        """Desplaza la suma de días de cada cliente hasta la nueva fecha de corte."""
+        if self.fecha_corte is not None:
+            transcurridos = (fecha_corte - self.fecha_corte).days
+            if transcurridos:
+                for aggregate in self.clientes.values():
+                    aggregate.shift(transcurridos)
+        self.fecha_corte = fecha_corte
+
+    def drop_empty_clients(self) -> None:
+        for cliente in [name for name, aggregate in self.clientes.items() if aggregate.total <= 0]:
+            del self.clientes[cliente]
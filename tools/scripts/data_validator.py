@@ -32,8 +32,10 @@ import re
 from sbl_utils import (
     setup_logging, get_repo_root, get_csv_originales_dir, 
     get_normalize_dir, CSVHandler, DateParser, TextNormalizer,
-    DataValidator, ValidationError
+    DataValidator, ValidationError, LOG_REPEAT_LIMIT
 )
+from columnar_cache import load_sidecar
+from pipeline_metrics import setup_metrics
 
 @dataclass
 class ValidationIssue:
@@ -71,9 +73,12 @@ class ValidationReport:
 class ClientDataValidator:
     """Validador de datos específico para el portal de clientes."""
     
-    def __init__(self):
+    def __init__(self, workers: int = 1):
         self.repo_root = get_repo_root(__file__)
-        self.logger = setup_logging("client_data_validator")
+        # Procesos para analizar cada CSV por rangos de bytes (CSVHandler.read_csv)
+        self.workers = workers
+        self.logger = setup_logging("client_data_validator", queued=True, repeat_limit=LOG_REPEAT_LIMIT)
+        self.metrics = setup_metrics("client_data_validator")
         
         # Directorios
         self.csv_dir = get_csv_originales_dir(self.repo_root)
@@ -105,9 +110,14 @@ class ClientDataValidator:
         for file_path in instrumentos_files:
             if file_path.exists():
                 try:
-                    data = CSVHandler.read_csv(file_path)
-                    for row in data:
-                        codigo = row.get('codigo', '').strip().upper()
+                    # La caché columnar evita releer el inventario completo como texto.
+                    table = load_sidecar(file_path)
+                    if table is not None and 'codigo' in table.names:
+                        codes = table.column('codigo')
+                    else:
+                        codes = [row.get('codigo', '') for row in CSVHandler.read_csv(file_path)]
+                    for raw_code in codes:
+                        codigo = raw_code.strip().upper()
                         if codigo and self.codigo_pattern.match(codigo):
                             self.valid_codes.add(codigo)
                             # Intentar extraer cliente del código
@@ -333,7 +343,7 @@ class ClientDataValidator:
         self.logger.info(f"Validando archivo de cliente: {file_path}")
         
         try:
-            data = CSVHandler.read_csv(file_path)
+            data = CSVHandler.read_csv(file_path, workers=self.workers)
         except Exception as e:
             report = ValidationReport(file_path=file_path, total_rows=0)
             report.issues.append(ValidationIssue(
@@ -588,7 +598,9 @@ class ClientDataValidator:
         self.logger.info("Iniciando validación de archivos del portal de clientes")
         
         # Cargar datos de referencia
-        self.load_reference_data()
+        with self.metrics.stage("carga_referencias") as etapa:
+            self.load_reference_data()
+            etapa.rows = len(self.valid_codes) + len(self.valid_clients)
         
         # Configuraciones de validación
         configs = self.get_validation_configs()
@@ -608,7 +620,11 @@ class ClientDataValidator:
         for file_path, config_type in files_to_validate:
             if file_path.exists():
                 config = configs.get(config_type, {})
-                report = self.validate_file(file_path, config)
+                with self.metrics.stage(f"validacion_{config_type}") as etapa:
+                    report = self.validate_file(file_path, config)
+                    etapa.rows = report.total_rows
+                    etapa.count("errores", report.errors_count)
+                    etapa.count("advertencias", report.warnings_count)
                 self.reports.append(report)
             else:
                 self.logger.info(f"Archivo no encontrado: {file_path}")
@@ -770,10 +786,18 @@ def main():
         type=Path,
         help="Directorio de salida para reportes"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Procesos para leer cada CSV por rangos de bytes (default: 1)"
+    )
     
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers debe ser al menos 1")
     
-    validator = ClientDataValidator()
+    validator = ClientDataValidator(workers=args.workers)
     success = validator.run_validation(output_dir=args.output)
     
     if not success:
@@ -781,4 +805,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    from stage_profiler import run_main
+
+    run_main(main)
\ No newline at end of file
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Catálogo de frecuencias de calibración por tipo de instrumento.
+
+Las frecuencias (en meses) se leen de ``calibration_frequencies.json`` o de otro
+catálogo con la misma forma::
+
+    {"default": 12, "tipos": {"balanza": 12, "balanza analitica": 6, ...}}
+
+Cada tipo del catálogo se divide en palabras (sin acentos, en minúsculas, con
+espacios, guiones o guiones bajos como separadores) y se inserta en un trie. La
+búsqueda recorre las palabras del tipo de instrumento y elige la coincidencia
+más larga, de modo que "Balanza analítica" obtiene la frecuencia de
+``balanza analitica`` sin importar el orden del catálogo. Se aceptan plurales
+simples ("Termómetros"). El resultado por tipo distinto se memoriza.
+
+Benchmark contra la búsqueda previa por subcadenas:
+```bash
+python tools/scripts/frequency_catalog.py --benchmark 1000000
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import time
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parent / "calibration_frequencies.json"
+CACHE_SIZE = 65536
+_TOKEN_SPLIT = re.compile(r"[^a-z0-9]+")
+# Clave de terminal dentro de los nodos del trie (las palabras nunca son vacías).
+_MONTHS = ""
+
+
+class FrequencyCatalogError(ValueError):
+    """El catálogo de frecuencias no existe o tiene un formato inválido."""
+
+
+def tokenize(text: Optional[str]) -> Tuple[str, ...]:
+    """Palabras sin acentos y en minúsculas de un tipo de instrumento."""
+    if not text:
+        return ()
+    text = unicodedata.normalize("NFD", str(text))
+    text = "".join(c for c in text if unicodedata.category(c) != "Mn").lower()
+    return tuple(token for token in _TOKEN_SPLIT.split(text) if token)
+
+
+def _word_forms(token: str) -> Tuple[str, ...]:
+    """La palabra y sus posibles singulares ("balanzas", "refrigeradores")."""
+    forms = [token]
+    if len(token) > 3 and token.endswith("s"):
+        forms.append(token[:-1])
+        if token.endswith("es"):
+            forms.append(token[:-2])
+    return tuple(forms)
+
+
+class FrequencyCatalog:
+    """Búsqueda de la coincidencia más larga sobre un trie de palabras."""
+
+    def __init__(self, frequencies: Mapping[str, int], default: int = 12, cache_size: int = CACHE_SIZE):
+        self.default = default
+        self._trie: Dict[str, dict] = {}
+        for tipo, months in frequencies.items():
+            tokens = tokenize(tipo)
+            if not tokens:
+                raise FrequencyCatalogError(f"Tipo de instrumento vacío en el catálogo: {tipo!r}")
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[_MONTHS] = int(months)
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_CATALOG_PATH) -> "FrequencyCatalog":
+        try:
+            with path.open(encoding="utf-8") as handle:
+                payload = json.load(handle)
+            return cls(payload["tipos"], int(payload.get("default", 12)))
+        except FileNotFoundError as exc:
+            raise FrequencyCatalogError(f"No existe el catálogo de frecuencias {path}") from exc
+        except (KeyError, TypeError, ValueError) as exc:
+            raise FrequencyCatalogError(f"Catálogo de frecuencias inválido en {path}: {exc}") from exc
+
+    def match(self, tokens: Sequence[str]) -> Optional[int]:
+        """Meses de la coincidencia más larga (la primera en caso de empate) o ``None``."""
+        best_length = 0
+        best_months = None
+        for start in range(len(tokens)):
+            node = self._trie
+            for position in range(start, len(tokens)):
+                node = next(
+                    (node[form] for form in _word_forms(tokens[position]) if form in node),
+                    None,
+                )
+                if node is None:
+                    break
+                length = position - start + 1
+                if _MONTHS in node and length > best_length:
+                    best_length, best_months = length, node[_MONTHS]
+        return best_months
+
+    def _lookup(self, tipo_instrumento: Optional[str]) -> int:
+        months = self.match(tokenize(tipo_instrumento))
+        return self.default if months is None else months
+
+
+@lru_cache(maxsize=None)
+def default_catalog() -> FrequencyCatalog:
+    return FrequencyCatalog.load(DEFAULT_CATALOG_PATH)
+
+
+def _legacy_frequency(instrument_type: str) -> int:
+    """Búsqueda previa por subcadenas en orden del diccionario; solo para el benchmark."""
+    calibration_frequencies = {
+        'balanza': 12, 'balanza_analitica': 6, 'pipeta': 12, 'micropipeta': 6,
+        'termometro': 12, 'termometro_digital': 6, 'ph_metro': 6, 'medidor_ph': 6,
+        'conductimetro': 12, 'espectrofotometro': 6, 'autoclave': 6, 'incubadora': 12,
+        'refrigerador': 6, 'congelador': 6, 'centrifuga': 12, 'agitador': 12,
+        'cronometro': 24, 'default': 12,
+    }
+    normalized_type = unicodedata.normalize("NFD", instrument_type.strip())
+    normalized_type = "".join(c for c in normalized_type if unicodedata.category(c) != "Mn").lower()
+    frequency_months = calibration_frequencies.get('default')
+    for instrument_pattern, months in calibration_frequencies.items():
+        if instrument_pattern in normalized_type:
+            frequency_months = months
+            break
+    return frequency_months
+
+
+def synthetic_types(count: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    base = [
+        "Balanza", "Balanza analítica", "Micropipeta", "Pipeta", "Termómetro digital",
+        "Termómetro", "pH-metro", "Medidor pH", "Espectrofotómetro UV", "Autoclave",
+        "Incubadora", "Refrigerador", "Congeladores", "Centrífuga", "Agitador magnético",
+        "Cronómetro", "Manómetro", "Higrómetro",
+    ]
+    variants = [f"{tipo} {suffix}".strip() for tipo in base for suffix in ("", "de laboratorio", "portátil", "modelo X")]
+    return [rng.choice(variants) for _ in range(count)]
+
+
+def run_benchmark(count: int) -> Dict[str, float]:
+    tipos = synthetic_types(count)
+    catalog = default_catalog()
+
+    started = time.perf_counter()
+    legacy = [_legacy_frequency(tipo) for tipo in tipos]
+    legacy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    trie = [catalog.lookup(tipo) for tipo in tipos]
+    trie_s = time.perf_counter() - started
+
+    changed = sorted({tipo for tipo, old, new in zip(tipos, legacy, trie) if old != new})
+    return {
+        "instrumentos": count,
+        "subcadenas_s": round(legacy_s, 3),
+        "trie_s": round(trie_s, 3),
+        "aceleracion": round(legacy_s / trie_s, 2) if trie_s else 0.0,
+        "tipos_corregidos": changed,
+    }
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compara la búsqueda de frecuencias por trie contra la búsqueda por subcadenas."
+    )
+    parser.add_argument(
+        "--benchmark",
+        type=int,
+        default=1_000_000,
+        metavar="INSTRUMENTOS",
+        help="Número de tipos sintéticos a resolver (por defecto 1,000,000).",
+    )
+    args = parser.parse_args(argv)
+    if args.benchmark <= 0:
+        parser.error("--benchmark debe ser mayor que cero")
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    result = run_benchmark(args.benchmark)
+    print(
+        f"{result['instrumentos']:,} instrumentos: subcadenas {result['subcadenas_s']:.3f} s, "
+        f"trie {result['trie_s']:.3f} s ({result['aceleracion']:.2f}x)"
+    )
+    if result["tipos_corregidos"]:
+        print("Tipos con frecuencia distinta (coincidencia más larga):")
+        for tipo in result["tipos_corregidos"]:
+            print(f"  - {tipo}")
+    return 0
+
+
+if __name__ == "__main__":
+    from stage_profiler import run_main
+
+    raise SystemExit(run_main(main))
@@ -20,9 +20,14 @@ Características específicas para el portal de clientes:
 Uso típico:
 ```bash
 python generate_cert_calibrations.py --empresa-id 1 --cliente-id 5
-python generate_cert_calibrations.py --all-clients --backup
+python generate_cert_calibrations.py --backup
+python generate_cert_calibrations.py --workers 4
 ```
 
+Con ``--workers N`` los instrumentos se reparten por ``cliente_id`` entre N
+procesos; cada proceso escribe su fragmento de CSV/SQL en streaming y al final se
+unen en los archivos de salida (los folios vienen del contador compartido).
+
 También mantiene compatibilidad con el proceso histórico:
 ```bash
 python tools/scripts/generate_cert_calibrations.py \
@@ -38,26 +43,37 @@ import argparse
 import calendar
 import csv
 import datetime as dt
+import heapq
 import json
 import re
-import subprocess
+import shutil
 import sys
-import uuid
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence, Dict, Any, Set
+from typing import Iterable, Iterator, List, Optional, Sequence, Dict, Any, Set, Tuple
+
+from calibration_agenda import AgendaError, CalibrationAgenda, DEFAULT_HORIZON_DAYS
+from certificate_sequence import (
+    DEFAULT_BLOCK_SIZE, CertificateNumberAllocator, open_sequence_store
+)
+from frequency_catalog import DEFAULT_CATALOG_PATH, FrequencyCatalog
+from pipeline_metrics import setup_metrics
 
 # Importar utilidades
 try:
     from sbl_utils import (
         setup_logging, get_repo_root, TextNormalizer, 
-        DateParser, CSVHandler, SQLGenerator, DataValidator
+        DateParser, CSVHandler, SQLGenerator, DataValidator, SQLStreamWriter,
+        add_compression_argument, open_text, with_compression_suffix,
+        flush_logging, LOG_REPEAT_LIMIT
     )
+    from db_loader import LoadBatch, SQLDialect, add_load_arguments, run_load
     UTILS_AVAILABLE = True
 except ImportError:
     # Fallback para compatibilidad con el script original
     UTILS_AVAILABLE = False
-    def setup_logging(name):
+    LOG_REPEAT_LIMIT = None
+    def setup_logging(name, **options):
         import logging
         logging.basicConfig(level=logging.INFO)
         return logging.getLogger(name)
@@ -118,6 +134,12 @@ def _resolve_cert_path() -> Path:
             return candidate
     return candidates[0]
 
+HISTORICAL_OUTPUT = Path(
+    "app/Modules/Internal/ArchivosSql/Archivos_BD_SBL/SBL_inserts/"
+    "insert_calibraciones_certificados.sql"
+)
+
+
 def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description=(
@@ -140,10 +162,7 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser.add_argument(
         "--output",
         type=Path,
-        default=Path(
-            "app/Modules/Internal/ArchivosSql/Archivos_BD_SBL/SBL_inserts/"
-            "insert_calibraciones_certificados.sql"
-        ),
+        default=HISTORICAL_OUTPUT,
         help="Archivo SQL de salida listo para importar en phpMyAdmin.",
     )
     return parser.parse_args(argv)
@@ -282,37 +301,93 @@ def iter_events(
 
 
 def build_sql(events: Sequence[CalibrationEvent], empresa_id: int) -> str:
-    if not events:
-        return "-- No se detectaron eventos en el CSV proporcionado.\n"
+    return "\n".join(iter_sql_lines(events, empresa_id))
 
-    lines: List[str] = []
-    lines.append("-- Calibraciones programadas generadas desde CERT_instrumentos_original_v2.csv")
-    lines.append(f"-- Empresa destino: {empresa_id}")
-    lines.append("START TRANSACTION;")
 
+def write_sql(events: Sequence[CalibrationEvent], empresa_id: int, output: Path) -> None:
+    """Escribe el SQL histórico por bloques sin construir el script completo en memoria."""
+    if not UTILS_AVAILABLE:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(build_sql(events, empresa_id), encoding="utf-8")
+        return
+
+    with SQLStreamWriter(output) as sink:
+        for index, line in enumerate(iter_sql_lines(events, empresa_id)):
+            if index:
+                sink.write("\n")
+            sink.write(line)
+
+
+def _event_values(event: CalibrationEvent) -> tuple[str, Optional[dt.date], str]:
+    """Tipo, próxima fecha y observaciones (sin escapar) de un evento."""
+    fecha_proxima: Optional[dt.date] = None
+    if event.frecuencia_meses and event.frecuencia_meses > 0:
+        try:
+            fecha_proxima = add_months(event.fecha, event.frecuencia_meses)
+        except ValueError:
+            fecha_proxima = None
+
+    observaciones_parts = [
+        f"{event.periodo_label} {event.year}",
+        "Fuente: CERT_instrumentos_original_v2.csv",
+    ]
+    if event.requerimiento:
+        observaciones_parts.insert(0, f"Requerimiento: {event.requerimiento}")
+
+    tipo = event.requerimiento if event.requerimiento else "Calibración programada"
+    return tipo, fecha_proxima, ". ".join(observaciones_parts)
+
+
+def build_load_batches(
+    events: Sequence[CalibrationEvent], empresa_id: int, dialect: "SQLDialect"
+) -> List["LoadBatch"]:
+    """Equivalente parametrizado de `iter_sql_lines` para `--load`."""
+    sql = (
+        "INSERT INTO calibraciones (instrumento_id, empresa_id, tipo, fecha_calibracion, "
+        "periodo, fecha_proxima, resultado, observaciones) "
+        "SELECT i.id, i.empresa_id, ?, ?, ?, ?, NULL, ? FROM instrumentos i "
+        "WHERE i.codigo = ? AND i.empresa_id = ? AND NOT EXISTS ("
+        "SELECT 1 FROM calibraciones c WHERE c.instrumento_id = i.id "
+        "AND c.empresa_id = i.empresa_id AND c.fecha_calibracion = ? AND c.periodo = ?)"
+    )
+    rows = []
     for event in events:
-        fecha_proxima: Optional[dt.date] = None
-        if event.frecuencia_meses and event.frecuencia_meses > 0:
-            try:
-                fecha_proxima = add_months(event.fecha, event.frecuencia_meses)
-            except ValueError:
-                fecha_proxima = None
+        tipo, fecha_proxima, observaciones = _event_values(event)
+        fecha = event.fecha.isoformat()
+        rows.append((
+            tipo,
+            fecha,
+            event.periodo,
+            fecha_proxima.isoformat() if fecha_proxima else None,
+            observaciones,
+            event.codigo,
+            empresa_id,
+            fecha,
+            event.periodo,
+        ))
+    return [LoadBatch(table="calibraciones", sql=sql, rows=rows)]
+
+
+def iter_sql_lines(events: Sequence[CalibrationEvent], empresa_id: int) -> Iterator[str]:
+    if not events:
+        yield "-- No se detectaron eventos en el CSV proporcionado."
+        yield ""
+        return
 
-        observaciones_parts = [
-            f"{event.periodo_label} {event.year}",
-            "Fuente: CERT_instrumentos_original_v2.csv",
-        ]
-        if event.requerimiento:
-            observaciones_parts.insert(0, f"Requerimiento: {event.requerimiento}")
-        observaciones = sql_escape(". ".join(observaciones_parts))
+    yield "-- Calibraciones programadas generadas desde CERT_instrumentos_original_v2.csv"
+    yield f"-- Empresa destino: {empresa_id}"
+    yield "START TRANSACTION;"
 
-        tipo = sql_escape(event.requerimiento) if event.requerimiento else "Calibración programada"
+    for event in events:
+        tipo_raw, fecha_proxima, observaciones_raw = _event_values(event)
+        observaciones = sql_escape(observaciones_raw)
+        tipo = sql_escape(tipo_raw)
 
-        lines.append(
+        yield (
             f"SET @instrumento_id = ("
             f"SELECT id FROM instrumentos WHERE codigo = '{sql_escape(event.codigo)}' "
             f"AND empresa_id = {empresa_id} LIMIT 1);")
-        lines.append(
+        yield (
             "INSERT INTO calibraciones (" +
             "instrumento_id, empresa_id, tipo, fecha_calibracion, periodo, fecha_proxima, resultado, observaciones" +
             ")"
@@ -326,7 +401,7 @@ def build_sql(events: Sequence[CalibrationEvent], empresa_id: int) -> str:
         )
         fecha_sql = event.fecha.isoformat()
         fecha_proxima_sql = f"'{fecha_proxima.isoformat()}'" if fecha_proxima else "NULL"
-        lines.append(
+        yield (
             values_line.format(
                 empresa_id=empresa_id,
                 tipo=tipo,
@@ -336,11 +411,10 @@ def build_sql(events: Sequence[CalibrationEvent], empresa_id: int) -> str:
                 observaciones=observaciones,
             )
         )
-        lines.append("")
+        yield ""
 
-    lines.append("COMMIT;")
-    lines.append("")
-    return "\n".join(lines)
+    yield "COMMIT;"
+    yield ""
 
 
 def _next_relevant_row(reader: Iterable[List[str]]) -> List[str]:
@@ -383,11 +457,22 @@ class CalibrationSchedule:
 class CertCalibrationGenerator:
     """Generador moderno de certificaciones y calibraciones para el sistema SBL."""
     
-    def __init__(self, empresa_id: int = 1, backup: bool = False):
+    def __init__(
+        self,
+        empresa_id: int = 1,
+        backup: bool = False,
+        compression: Optional[str] = None,
+        sequence_store: Optional[str] = None,
+        sequence_block_size: int = DEFAULT_BLOCK_SIZE,
+        frequency_catalog: Optional[Path] = None,
+    ):
         self.empresa_id = empresa_id
         self.backup = backup
+        self.compression = compression if UTILS_AVAILABLE else None
         self.repo_root = get_repo_root(__file__)
-        self.logger = setup_logging("cert_calibration_generator")
+        # Los errores por instrumento se registran dentro del bucle de generación
+        self.logger = setup_logging("cert_calibration_generator", queued=True, repeat_limit=LOG_REPEAT_LIMIT)
+        self.metrics = setup_metrics("cert_calibration_generator")
         
         # Utilidades (solo si están disponibles)
         if UTILS_AVAILABLE:
@@ -400,6 +485,26 @@ class CertCalibrationGenerator:
         # Directorios
         self.setup_directories()
         
+        # Folios de certificado: JSON local por defecto o DSN de base de datos
+        sequence_store = sequence_store or str(
+            self.directories['certificates'] / "secuencias_certificados.json"
+        )
+        self.cert_allocator = CertificateNumberAllocator(
+            open_sequence_store(sequence_store), sequence_block_size
+        )
+        
+        # Frecuencias de calibración por tipo de instrumento (en meses)
+        frequency_catalog = frequency_catalog or DEFAULT_CATALOG_PATH
+        self.frequency_catalog = FrequencyCatalog.load(frequency_catalog)
+        
+        # Configuración con la que cada proceso de --workers recrea el generador
+        self.worker_config = {
+            'empresa_id': empresa_id,
+            'sequence_store': sequence_store,
+            'sequence_block_size': sequence_block_size,
+            'frequency_catalog': frequency_catalog,
+        }
+        
         # Contadores
         self.stats = {
             'certificates_generated': 0,
@@ -471,55 +576,19 @@ class CertCalibrationGenerator:
         """Genera un número único de certificado."""
         # Formato: CERT-YYYY-EMPRESA-CLIENTE-SECUENCIAL
         year = dt.date.today().year
-        empresa_id = instrument.get('empresa_id', self.empresa_id)
-        cliente_id = instrument['cliente_id']
-        
-        # Generar secuencial basado en fecha/hora
-        timestamp = dt.datetime.now().strftime("%m%d%H%M")
+        empresa_id = int(instrument.get('empresa_id', self.empresa_id))
+        cliente_id = int(instrument['cliente_id'])
         
-        cert_number = f"CERT-{year}-E{empresa_id:02d}-C{cliente_id:03d}-{timestamp}"
-        
-        return cert_number
+        # Consecutivo por año/empresa/cliente tomado de bloques reservados
+        return self.cert_allocator.next_number(year, empresa_id, cliente_id)
     
     def calculate_next_calibration_date(self, 
                                       last_calibration: dt.date, 
                                       instrument_type: str) -> dt.date:
         """Calcula la próxima fecha de calibración según el tipo de instrumento."""
         
-        # Frecuencias de calibración por tipo de instrumento (en meses)
-        calibration_frequencies = {
-            'balanza': 12,
-            'balanza_analitica': 6,
-            'pipeta': 12,
-            'micropipeta': 6,
-            'termometro': 12,
-            'termometro_digital': 6,
-            'ph_metro': 6,
-            'medidor_ph': 6,
-            'conductimetro': 12,
-            'espectrofotometro': 6,
-            'autoclave': 6,
-            'incubadora': 12,
-            'refrigerador': 6,
-            'congelador': 6,
-            'centrifuga': 12,
-            'agitador': 12,
-            'cronometro': 24,
-            'default': 12
-        }
-        
-        # Normalizar tipo de instrumento para búsqueda
-        if UTILS_AVAILABLE:
-            normalized_type = self.text_normalizer.normalize_text(instrument_type).lower()
-        else:
-            normalized_type = instrument_type.lower().strip()
-        
-        # Buscar frecuencia específica
-        frequency_months = calibration_frequencies.get('default')
-        for instrument_pattern, months in calibration_frequencies.items():
-            if instrument_pattern in normalized_type:
-                frequency_months = months
-                break
+        # Frecuencia por coincidencia más larga en el catálogo (memorizada por tipo)
+        frequency_months = self.frequency_catalog.lookup(instrument_type)
         
         # Calcular próxima fecha
         try:
@@ -533,14 +602,214 @@ class CertCalibrationGenerator:
         
         return next_date
     
-    def run_modern_generation_process(self, cliente_id: Optional[int] = None) -> bool:
-        """Ejecuta el proceso moderno de generación de certificaciones."""
+    def update_agenda(
+        self,
+        schedules: Iterable[CalibrationSchedule],
+        cliente_id: Optional[int] = None,
+    ) -> Optional[CalibrationAgenda]:
+        """Actualiza de forma incremental la agenda persistente de vencimientos.
+        
+        Los instrumentos que ya no aparecen en el programa generado se retiran
+        de la agenda; con ``cliente_id`` solo se retiran los de ese cliente.
+        """
+        agenda_path = self.directories['calibration_schedules'] / "agenda_calibraciones.json"
+        try:
+            agenda = CalibrationAgenda.load(agenda_path)
+        except AgendaError as e:
+            self.logger.warning(f"Agenda ilegible, se reconstruye: {e}")
+            agenda = CalibrationAgenda()
+        
+        updated = 0
+        vigentes = set()
+        for schedule in schedules:
+            vigentes.add(schedule.instrumento_id)
+            datos = asdict(schedule)
+            del datos['instrumento_id'], datos['cliente_id'], datos['proxima_calibracion']
+            if agenda.upsert(schedule.instrumento_id, schedule.cliente_id, schedule.proxima_calibracion, **datos):
+                updated += 1
+        removed = agenda.prune(vigentes, cliente_id)
+        
+        agenda.save(agenda_path)
+        due_soon = agenda.due_within(DEFAULT_HORIZON_DAYS)
+        self.logger.info(
+            f"Agenda actualizada: {updated} cambios, {len(removed)} retirados, {len(agenda)} instrumentos, "
+            f"{len(due_soon)} vencen en los próximos {DEFAULT_HORIZON_DAYS} días"
+        )
+        return agenda
+    
+    def _open_output(self, path: Path):
+        """Abre un CSV de salida (comprimido si la ruta termina en .gz / .zst)."""
+        if UTILS_AVAILABLE:
+            return open_text(path, 'w')
+        return open(path, 'w', newline='', encoding='utf-8')
+    
+    def parse_calibration_date(self, value: Optional[str]) -> dt.date:
+        """Fecha de la última calibración (ISO o formato español); hoy si no se reconoce."""
+        if value:
+            try:
+                return dt.date.fromisoformat(str(value).strip()[:10])
+            except ValueError:
+                pass
+            if UTILS_AVAILABLE:
+                parsed = self.date_parser.parse_spanish_date(value)
+                if parsed:
+                    return parsed
+        return dt.date.today()
+    
+    def build_records(self, index: int, instrument: Dict[str, Any]) -> Tuple[CertificationRecord, CalibrationSchedule]:
+        """Construye el certificado y el programa de calibración de un instrumento."""
+        # Generar certificado
+        cert_number = self.generate_certificate_number(instrument)
+        
+        # Determinar fechas
+        calibration_date = self.parse_calibration_date(instrument.get('fecha_ultima_calibracion'))
+        
+        # Calcular vencimiento
+        expiration_date = self.calculate_next_calibration_date(
+            calibration_date, 
+            instrument.get('tipo_instrumento', 'default')
+        )
+        
+        # Crear registro de certificación
+        cert_record = CertificationRecord(
+            instrumento_id=instrument.get('instrumento_id', f'INST_{index:04d}'),
+            cliente_id=int(instrument.get('cliente_id', 1)),
+            tipo_instrumento=instrument.get('tipo_instrumento', 'Instrumento'),
+            numero_serie=instrument.get('numero_serie', 'N/A'),
+            fecha_calibracion=calibration_date,
+            fecha_vencimiento=expiration_date,
+            certificado_numero=cert_number,
+            estado="vigente" if expiration_date > dt.date.today() else "vencido",
+            observaciones=instrument.get('observaciones', ''),
+            tecnico_responsable=instrument.get('tecnico_responsable', 'SBL'),
+            empresa_id=int(instrument.get('empresa_id', self.empresa_id))
+        )
+        
+        # Crear programa de calibración
+        schedule = CalibrationSchedule(
+            instrumento_id=cert_record.instrumento_id,
+            cliente_id=cert_record.cliente_id,
+            proxima_calibracion=expiration_date,
+            frecuencia_meses=12,  # Default
+            prioridad="alta" if cert_record.estado == "vencido" else "normal",
+            notificacion_dias=30,
+            estado_programacion="programada"
+        )
+        return cert_record, schedule
+    
+    def write_shard(
+        self,
+        items: Iterable[Tuple[int, Dict[str, Any]]],
+        cert_path: Path,
+        schedule_path: Path,
+        sql_path: Optional[Path] = None,
+        header: bool = True,
+    ) -> Dict[str, int]:
+        """Procesa instrumentos y escribe sus filas en streaming; devuelve las estadísticas."""
+        sql_writer = SQLStreamWriter(sql_path) if sql_path is not None else None
+        try:
+            with self._open_output(cert_path) as cert_file, self._open_output(schedule_path) as schedule_file:
+                cert_writer = csv.writer(cert_file, lineterminator='\r\n')
+                schedule_writer = csv.writer(schedule_file, lineterminator='\r\n')
+                if header:
+                    cert_writer.writerow(CERT_FIELDS)
+                    schedule_writer.writerow(SCHEDULE_FIELDS)
+                
+                for index, instrument in items:
+                    try:
+                        cert_record, schedule = self.build_records(index, instrument)
+                    except Exception as e:
+                        self.logger.error(f"Error procesando instrumento {instrument.get('instrumento_id', 'unknown')}: {e}")
+                        self.stats['validation_errors'] += 1
+                        continue
+                    
+                    cert_writer.writerow(_record_row(cert_record, CERT_FIELDS))
+                    self.stats['certificates_generated'] += 1
+                    schedule_writer.writerow(_record_row(schedule, SCHEDULE_FIELDS))
+                    self.stats['calibrations_scheduled'] += 1
+                    if cert_record.estado == "vencido":
+                        self.stats['expired_notifications'] += 1
+                    
+                    if sql_writer is not None:
+                        sql_writer.write_line(self.sql_generator.generate_insert_on_duplicate(
+                            "certificaciones_instrumentos",
+                            dict(zip(CERT_FIELDS, _record_row(cert_record, CERT_FIELDS))),
+                            unique_keys=['certificado_numero'],
+                        ))
+        finally:
+            if sql_writer is not None:
+                sql_writer.close()
+        return dict(self.stats)
+    
+    def _run_shards(
+        self,
+        shards: List[List[Tuple[int, Dict[str, Any]]]],
+        cert_csv_path: Path,
+        schedule_csv_path: Path,
+        sql_path: Optional[Path],
+        workers: int,
+    ) -> None:
+        """Genera un fragmento por proceso y los une en los archivos finales."""
+        shard_dir = cert_csv_path.parent / f".shards_{cert_csv_path.stem}"
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        jobs = [
+            (
+                self.worker_config,
+                shard,
+                shard_dir / f"certificaciones.{number:03d}.csv",
+                shard_dir / f"programas.{number:03d}.csv",
+                shard_dir / f"certificaciones.{number:03d}.sql" if sql_path is not None else None,
+            )
+            for number, shard in enumerate(shards)
+        ]
+        # Importación diferida: el pool solo se usa con --workers N.
+        from concurrent.futures import ProcessPoolExecutor
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for number, worker_stats in enumerate(executor.map(_generate_shard, jobs)):
+                    for key, value in worker_stats.items():
+                        self.stats[key] = self.stats.get(key, 0) + value
+                    self.logger.info(
+                        f"  Proceso {number}: {worker_stats['certificates_generated']} certificados, "
+                        f"{worker_stats['validation_errors']} errores"
+                    )
+            
+            _merge_files(cert_csv_path, [job[2] for job in jobs], self._open_output, CERT_FIELDS)
+            _merge_files(schedule_csv_path, [job[3] for job in jobs], self._open_output, SCHEDULE_FIELDS)
+            if sql_path is not None:
+                _merge_files(sql_path, [job[4] for job in jobs], lambda path: open(path, 'w', encoding='utf-8'))
+        finally:
+            shutil.rmtree(shard_dir, ignore_errors=True)
+    
+    def _read_schedules(self, schedule_csv_path: Path) -> Iterator[CalibrationSchedule]:
+        opener = open_text if UTILS_AVAILABLE else lambda path: open(path, newline='', encoding='utf-8')
+        with opener(schedule_csv_path) as f:
+            for row in csv.DictReader(f):
+                yield CalibrationSchedule(
+                    instrumento_id=row['instrumento_id'],
+                    cliente_id=int(row['cliente_id']),
+                    proxima_calibracion=dt.date.fromisoformat(row['proxima_calibracion']),
+                    frecuencia_meses=int(row['frecuencia_meses']),
+                    prioridad=row['prioridad'],
+                    notificacion_dias=int(row['notificacion_dias']),
+                    estado_programacion=row['estado_programacion'],
+                )
+    
+    def run_modern_generation_process(self, cliente_id: Optional[int] = None, workers: int = 1) -> bool:
+        """Ejecuta el proceso moderno de generación de certificaciones.
+        
+        Con ``workers > 1`` los instrumentos se reparten por ``cliente_id`` entre
+        procesos; cada uno escribe su fragmento de CSV/SQL y al final se unen.
+        """
         self.logger.info("🚀 Iniciando generación moderna de certificaciones y calibraciones")
         
         try:
             # 1. Cargar datos de instrumentos
             self.logger.info("📥 Cargando datos de instrumentos...")
-            instruments = self.load_instrument_data()
+            with self.metrics.stage("carga_instrumentos") as etapa:
+                instruments = self.load_instrument_data()
+                etapa.rows = len(instruments)
             
             if not instruments:
                 self.logger.error("No se encontraron datos de instrumentos")
@@ -551,130 +820,42 @@ class CertCalibrationGenerator:
                 instruments = [i for i in instruments if i.get('cliente_id') == str(cliente_id)]
                 self.logger.info(f"Filtrado para cliente {cliente_id}: {len(instruments)} instrumentos")
             
-            # 2. Procesar instrumentos
-            certificates_data = []
-            schedules_data = []
-            
-            for instrument in instruments:
-                try:
-                    # Generar certificado
-                    cert_number = self.generate_certificate_number(instrument)
-                    
-                    # Determinar fechas
-                    if 'fecha_ultima_calibracion' in instrument:
-                        if UTILS_AVAILABLE:
-                            calibration_date = self.date_parser.parse_date(instrument['fecha_ultima_calibracion'])
-                        else:
-                            # Fallback básico de parseo de fecha
-                            try:
-                                calibration_date = dt.datetime.strptime(instrument['fecha_ultima_calibracion'], '%Y-%m-%d').date()
-                            except:
-                                calibration_date = dt.date.today()
-                    else:
-                        calibration_date = dt.date.today()
-                    
-                    # Calcular vencimiento
-                    expiration_date = self.calculate_next_calibration_date(
-                        calibration_date, 
-                        instrument.get('tipo_instrumento', 'default')
-                    )
-                    
-                    # Crear registro de certificación
-                    cert_record = CertificationRecord(
-                        instrumento_id=instrument.get('instrumento_id', f'INST_{len(certificates_data):04d}'),
-                        cliente_id=int(instrument.get('cliente_id', 1)),
-                        tipo_instrumento=instrument.get('tipo_instrumento', 'Instrumento'),
-                        numero_serie=instrument.get('numero_serie', 'N/A'),
-                        fecha_calibracion=calibration_date,
-                        fecha_vencimiento=expiration_date,
-                        certificado_numero=cert_number,
-                        estado="vigente" if expiration_date > dt.date.today() else "vencido",
-                        observaciones=instrument.get('observaciones', ''),
-                        tecnico_responsable=instrument.get('tecnico_responsable', 'SBL'),
-                        empresa_id=int(instrument.get('empresa_id', self.empresa_id))
-                    )
-                    
-                    certificates_data.append(cert_record)
-                    self.stats['certificates_generated'] += 1
-                    
-                    # Crear programa de calibración
-                    schedule = CalibrationSchedule(
-                        instrumento_id=cert_record.instrumento_id,
-                        cliente_id=cert_record.cliente_id,
-                        proxima_calibracion=expiration_date,
-                        frecuencia_meses=12,  # Default
-                        prioridad="alta" if cert_record.estado == "vencido" else "normal",
-                        notificacion_dias=30,
-                        estado_programacion="programada"
-                    )
-                    
-                    schedules_data.append(schedule)
-                    self.stats['calibrations_scheduled'] += 1
-                    
-                except Exception as e:
-                    self.logger.error(f"Error procesando instrumento {instrument.get('instrumento_id', 'unknown')}: {e}")
-                    self.stats['validation_errors'] += 1
-            
-            # 3. Guardar resultados
-            self.logger.info("💾 Guardando resultados...")
-            
-            # Guardar certificaciones CSV
+            # 2. Rutas de salida
             timestamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
             cert_csv_path = self.directories['certificates'] / f"certificaciones_generadas_{timestamp}.csv"
-            
-            with open(cert_csv_path, 'w', newline='', encoding='utf-8') as f:
-                if certificates_data:
-                    writer = csv.DictWriter(f, fieldnames=asdict(certificates_data[0]).keys())
-                    writer.writeheader()
-                    for cert in certificates_data:
-                        cert_dict = asdict(cert)
-                        cert_dict['fecha_calibracion'] = cert.fecha_calibracion.isoformat()
-                        cert_dict['fecha_vencimiento'] = cert.fecha_vencimiento.isoformat()
-                        writer.writerow(cert_dict)
-            
-            self.logger.info(f"Certificaciones guardadas en: {cert_csv_path}")
-            
-            # Guardar programas CSV
             schedule_csv_path = self.directories['calibration_schedules'] / f"programas_calibracion_{timestamp}.csv"
+            if self.compression:
+                cert_csv_path = with_compression_suffix(cert_csv_path, self.compression)
+                schedule_csv_path = with_compression_suffix(schedule_csv_path, self.compression)
+            sql_path = (
+                self.directories['output_sql'] / f"insert_certificaciones_modernas_{timestamp}.sql"
+                if UTILS_AVAILABLE and instruments
+                else None
+            )
             
-            with open(schedule_csv_path, 'w', newline='', encoding='utf-8') as f:
-                if schedules_data:
-                    writer = csv.DictWriter(f, fieldnames=asdict(schedules_data[0]).keys())
-                    writer.writeheader()
-                    for schedule in schedules_data:
-                        schedule_dict = asdict(schedule)
-                        schedule_dict['proxima_calibracion'] = schedule.proxima_calibracion.isoformat()
-                        writer.writerow(schedule_dict)
+            # 3. Procesar instrumentos y guardar resultados en streaming
+            items = list(enumerate(instruments))
+            shards = partition_by_client(items, workers)
+            with self.metrics.stage("generacion_certificados") as etapa:
+                if len(shards) > 1:
+                    self.logger.info(f"⚙️ Procesando {len(items)} instrumentos en {len(shards)} procesos...")
+                    self._run_shards(shards, cert_csv_path, schedule_csv_path, sql_path, workers)
+                else:
+                    self.write_shard(items, cert_csv_path, schedule_csv_path, sql_path)
+                etapa.rows = len(items)
+                etapa.gauge("procesos", len(shards))
+                for key, value in self.stats.items():
+                    etapa.count(key, value)
             
+            self.logger.info(f"Certificaciones guardadas en: {cert_csv_path}")
             self.logger.info(f"Programas guardados en: {schedule_csv_path}")
-            
-            # 4. Generar SQL si está disponible el generador
-            if UTILS_AVAILABLE and certificates_data:
-                self.logger.info("🗃️ Generando archivos SQL...")
-                
-                # Preparar datos para SQL
-                cert_sql_data = []
-                for cert in certificates_data:
-                    cert_dict = asdict(cert)
-                    cert_dict['fecha_calibracion'] = cert.fecha_calibracion.isoformat()
-                    cert_dict['fecha_vencimiento'] = cert.fecha_vencimiento.isoformat()
-                    cert_sql_data.append(cert_dict)
-                
-                # Generar SQL
-                sql_content = self.sql_generator.generate_batch_insert(
-                    "certificaciones_instrumentos", 
-                    cert_sql_data,
-                    on_duplicate="UPDATE"
-                )
-                
-                # Guardar SQL
-                sql_path = self.directories['output_sql'] / f"insert_certificaciones_modernas_{timestamp}.sql"
-                with open(sql_path, 'w', encoding='utf-8') as f:
-                    f.write(sql_content)
-                
+            if sql_path is not None:
                 self.logger.info(f"SQL generado: {sql_path}")
             
-            # 5. Reporte final
+            # Agenda de vencimientos para recordatorios y notificaciones
+            self.update_agenda(self._read_schedules(schedule_csv_path), cliente_id)
+            
+            # 4. Reporte final
             self.logger.info("✅ Proceso moderno completado exitosamente")
             self.logger.info(f"📊 Estadísticas:")
             self.logger.info(f"  - Certificaciones generadas: {self.stats['certificates_generated']}")
@@ -682,7 +863,7 @@ class CertCalibrationGenerator:
             self.logger.info(f"  - Errores de validación: {self.stats['validation_errors']}")
             
             # Alertas de vencimiento
-            expired_count = len([c for c in certificates_data if c.estado == "vencido"])
+            expired_count = self.stats['expired_notifications']
             if expired_count > 0:
                 self.logger.warning(f"⚠️ {expired_count} instrumentos con calibración VENCIDA")
             
@@ -693,6 +874,66 @@ class CertCalibrationGenerator:
             return False
 
 
+CERT_FIELDS = [item.name for item in fields(CertificationRecord)]
+SCHEDULE_FIELDS = [item.name for item in fields(CalibrationSchedule)]
+
+
+def _record_row(record: Any, field_names: Sequence[str]) -> List[Any]:
+    row = []
+    for name in field_names:
+        value = getattr(record, name)
+        row.append(value.isoformat() if isinstance(value, dt.date) else value)
+    return row
+
+
+def partition_by_client(
+    items: Sequence[Tuple[int, Dict[str, Any]]],
+    workers: int,
+) -> List[List[Tuple[int, Dict[str, Any]]]]:
+    """Reparte los instrumentos en ``workers`` fragmentos sin separar a un cliente.
+    
+    Los clientes se asignan de mayor a menor al fragmento con menos instrumentos;
+    dentro de cada fragmento se conserva el orden original.
+    """
+    if workers <= 1 or not items:
+        return [list(items)]
+    by_client: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+    for item in items:
+        by_client.setdefault(str(item[1].get('cliente_id', '')), []).append(item)
+    
+    loads = [(0, number) for number in range(min(workers, len(by_client)))]
+    shards: List[List[Tuple[int, Dict[str, Any]]]] = [[] for _ in loads]
+    for group in sorted(by_client.values(), key=len, reverse=True):
+        load, number = heapq.heappop(loads)
+        shards[number].extend(group)
+        heapq.heappush(loads, (load + len(group), number))
+    for shard in shards:
+        shard.sort(key=lambda item: item[0])
+    return [shard for shard in shards if shard]
+
+
+def _generate_shard(
+    job: Tuple[Dict[str, Any], List[Tuple[int, Dict[str, Any]]], Path, Path, Optional[Path]]
+) -> Dict[str, int]:
+    config, items, cert_path, schedule_path, sql_path = job
+    generator = CertCalibrationGenerator(**config)
+    try:
+        return generator.write_shard(items, cert_path, schedule_path, sql_path, header=False)
+    finally:
+        if UTILS_AVAILABLE:
+            flush_logging("cert_calibration_generator")
+
+
+def _merge_files(target: Path, parts: Sequence[Path], opener, header: Optional[Sequence[str]] = None) -> None:
+    """Concatena los fragmentos (sin encabezado) en ``target``."""
+    with opener(target) as output:
+        if header is not None:
+            csv.writer(output, lineterminator='\r\n').writerow(header)
+        for part in parts:
+            with open(part, newline='', encoding='utf-8') as source:
+                shutil.copyfileobj(source, output, 1024 * 1024)
+
+
 def main(argv: Optional[Sequence[str]] = None) -> None:
     # Parsear argumentos con el sistema actualizado
     parser = argparse.ArgumentParser(
@@ -727,6 +968,13 @@ Modo histórico (compatibilidad):
         help="ID del cliente específico (opcional)"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Procesos para generar certificados en paralelo, repartidos por cliente (default: 1)"
+    )
+    
     parser.add_argument(
         "--backup",
         action="store_true",
@@ -743,32 +991,83 @@ Modo histórico (compatibilidad):
     parser.add_argument(
         "--input",
         type=Path,
-        default=_resolve_cert_path(),
-        help="Ruta al CSV original exportado de la hoja CERT (modo histórico)."
+        default=None,
+        help=(
+            "Ruta al CSV original exportado de la hoja CERT; activa el modo histórico "
+            "(default: CERT_instrumentos_original_v2.csv)."
+        )
     )
     
     parser.add_argument(
         "--output",
         type=Path,
-        default=Path(
-            "app/Modules/Internal/ArchivosSql/Archivos_BD_SBL/SBL_inserts/"
-            "insert_calibraciones_certificados.sql"
-        ),
-        help="Archivo SQL de salida listo para importar en phpMyAdmin (modo histórico)."
+        default=None,
+        help=(
+            "Archivo SQL de salida listo para importar en phpMyAdmin; activa el modo "
+            f"histórico (default: {HISTORICAL_OUTPUT})."
+        )
+    )
+    
+    parser.add_argument(
+        "--secuencia-certificados",
+        default=None,
+        metavar="RUTA_O_DSN",
+        help=(
+            "Contador de folios de certificado: archivo JSON o DSN sqlite:///, mysql:// "
+            "(por defecto storage/certificates/secuencias_certificados.json)"
+        )
+    )
+    
+    parser.add_argument(
+        "--bloque-certificados",
+        type=int,
+        default=DEFAULT_BLOCK_SIZE,
+        help=f"Folios reservados por acceso al contador (default: {DEFAULT_BLOCK_SIZE})"
     )
     
+    parser.add_argument(
+        "--catalogo-frecuencias",
+        type=Path,
+        default=DEFAULT_CATALOG_PATH,
+        help="Catálogo JSON de frecuencias de calibración por tipo de instrumento"
+    )
+    
+    if UTILS_AVAILABLE:
+        add_compression_argument(parser)
+        add_load_arguments(parser)
+    
     args = parser.parse_args(argv)
+    if args.bloque_certificados <= 0:
+        parser.error("--bloque-certificados debe ser mayor que cero")
+    if args.workers < 1:
+        parser.error("--workers debe ser al menos 1")
     
-    # Determinar modo de operación
-    if args.historical or (hasattr(args, 'input') and args.input != _resolve_cert_path()) or (hasattr(args, 'output') and 'insert_calibraciones_certificados.sql' in str(args.output)):
+    # Determinar modo de operación: el histórico solo se usa si se pide
+    # explícitamente (--historical, --input o --output)
+    if args.historical or args.input is not None or args.output is not None:
         # Modo histórico
         print("🕒 Ejecutando en modo histórico (compatibilidad)...")
-        events = list(iter_events(args.input, args.empresa_id))
-        sql_output = build_sql(events, args.empresa_id)
-        args.output.parent.mkdir(parents=True, exist_ok=True)
-        args.output.write_text(sql_output, encoding="utf-8")
+        args.input = args.input or _resolve_cert_path()
+        args.output = args.output or HISTORICAL_OUTPUT
+        metrics = setup_metrics("cert_calibration_generator")
+        with metrics.stage("lectura_historico") as etapa:
+            events = list(iter_events(args.input, args.empresa_id))
+            etapa.rows = len(events)
+        if getattr(args, "load", None):
+            run_load(
+                args.load,
+                lambda dialect: build_load_batches(events, args.empresa_id, dialect),
+                batch_size=args.load_batch_size,
+            )
+            return
+        output = args.output
+        if getattr(args, "compress", None):
+            output = with_compression_suffix(output, args.compress)
+        with metrics.stage("escritura_sql_historico") as etapa:
+            write_sql(events, args.empresa_id, output)
+            etapa.rows = len(events)
         print(
-            f"Se generaron {len(events)} eventos en {args.output}. "
+            f"Se generaron {len(events)} eventos en {output}. "
             "Ejecuta este archivo en phpMyAdmin después de validar los datos."
         )
     else:
@@ -776,13 +1075,22 @@ Modo histórico (compatibilidad):
         print("🚀 Ejecutando en modo moderno...")
         generator = CertCalibrationGenerator(
             empresa_id=args.empresa_id,
-            backup=args.backup
+            backup=args.backup,
+            compression=getattr(args, "compress", None),
+            sequence_store=args.secuencia_certificados,
+            sequence_block_size=args.bloque_certificados,
+            frequency_catalog=args.catalogo_frecuencias,
         )
         
-        success = generator.run_modern_generation_process(cliente_id=args.cliente_id)
+        success = generator.run_modern_generation_process(
+            cliente_id=args.cliente_id,
+            workers=args.workers,
+        )
         sys.exit(0 if success else 1)
 
 
 if __name__ == "__main__":
-    main()
+    from stage_profiler import run_main
+
+    run_main(main)
 
@@ -7,6 +7,17 @@ transacciones de tamaño configurable (por defecto, 100 filas). El resultado es
 compatible con phpMyAdmin y otros entornos donde la ejecución de scripts
 largos puede provocar "timeouts".
 
+El SQL se escribe por bloques directamente en el archivo de salida (ver
+`sbl_utils.SQLStreamWriter`); si la ruta termina en `.gz` o `.zst` (o se usa
+`--compress gzip|zstd`) se escribe comprimido.
+Con `--load DSN` las filas se cargan directamente en la base de datos mediante
+`db_loader` en lugar de escribir el archivo SQL.
+
+Con `--snapshot` la salida es incremental: se compara cada instrumento contra la
+instantánea de la corrida anterior (`inventory_snapshot.py`) y solo se emiten los
+nuevos y modificados; los códigos que desaparecieron del CSV se listan como
+comentario en el SQL, sin borrarse.
+
 Ejemplo rápido desde la raíz del repositorio:
 
 ```bash
@@ -23,11 +34,34 @@ import csv
 import datetime as dt
 import re
 import sys
-from dataclasses import dataclass
+from dataclasses import astuple, dataclass, fields
 from io import StringIO
 from pathlib import Path
 from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
 
+try:
+    from db_loader import LoadBatch, SQLDialect, add_load_arguments, run_load
+    from inventory_snapshot import (
+        DEFAULT_SNAPSHOT_NAME,
+        InventorySnapshot,
+        InventorySnapshotError,
+        SnapshotDiff,
+        row_hash,
+    )
+    from pipeline_metrics import setup_metrics
+    from sbl_utils import SQLStreamWriter, add_compression_argument, with_compression_suffix
+except ImportError:  # Importado como paquete (``scripts.generate_insert_instrumentos``)
+    from .db_loader import LoadBatch, SQLDialect, add_load_arguments, run_load
+    from .inventory_snapshot import (
+        DEFAULT_SNAPSHOT_NAME,
+        InventorySnapshot,
+        InventorySnapshotError,
+        SnapshotDiff,
+        row_hash,
+    )
+    from .pipeline_metrics import setup_metrics
+    from .sbl_utils import SQLStreamWriter, add_compression_argument, with_compression_suffix
+
 REPO_ROOT = Path(__file__).resolve().parents[2]
 ARCHIVOS_SQL_DIR = REPO_ROOT / "app/Modules/Internal/ArchivosSql"
 README_NORMALIZADO = ARCHIVOS_SQL_DIR / "ReadMe_BD" / "README_NORMALIZADO.md"
@@ -348,24 +382,71 @@ def preparar_entidades(
     }
 
 
+def instantanea_inventario(
+    instrumentos: Sequence[InstrumentoRegistro],
+) -> InventorySnapshot:
+    """Huellas por código de los instrumentos tal como se emiten en el SQL."""
+
+    contexto = row_hash(
+        (EMPRESA_ID, tuple(campo.name for campo in fields(InstrumentoRegistro)))
+    )
+    return InventorySnapshot.from_rows(
+        ((registro.codigo, astuple(registro)) for registro in instrumentos),
+        contexto=contexto,
+    )
+
+
+def entidades_delta(
+    registros: Sequence[InstrumentoRegistro],
+    diff: SnapshotDiff,
+) -> Dict[str, Sequence]:
+    """Entidades reducidas a los instrumentos nuevos o modificados.
+
+    Los catálogos se limitan a lo que esos instrumentos referencian (más los
+    registros sin código, que no tienen huella propia).
+    """
+
+    pendientes = set(diff.pendientes)
+    return preparar_entidades(
+        [r for r in registros if not r.codigo or r.codigo in pendientes]
+    )
+
+
 def generar_script_sql(
     entidades: Dict[str, Sequence],
     batch_size: int,
+    comentarios: Sequence[str] = (),
 ) -> str:
-    """Crea el script SQL con bloques transaccionales."""
+    """Crea el script SQL con bloques transaccionales y lo devuelve como texto."""
 
     buffer = StringIO()
-    print("-- Archivo generado automáticamente por generate_insert_instrumentos.py", file=buffer)
-    print("USE iso17025;", file=buffer)
-    print(file=buffer)
+    with SQLStreamWriter(buffer) as sink:
+        escribir_script_sql(entidades, batch_size, sink, comentarios)
+    return buffer.getvalue()
 
-    _render_inserciones_catalogo(entidades["catalogo"], batch_size, buffer)
-    _render_inserciones_marcas(entidades["marcas"], batch_size, buffer)
-    _render_inserciones_modelos(entidades["modelos"], batch_size, buffer)
-    _render_inserciones_departamentos(entidades["departamentos"], batch_size, buffer)
-    _render_inserciones_instrumentos(entidades["instrumentos"], batch_size, buffer)
 
-    return buffer.getvalue()
+def escribir_script_sql(
+    entidades: Dict[str, Sequence],
+    batch_size: int,
+    sink: SQLStreamWriter,
+    comentarios: Sequence[str] = (),
+) -> None:
+    """Escribe el script SQL por bloques en `sink` conforme se genera.
+
+    `comentarios` se agregan como líneas ``--`` después del encabezado.
+    """
+
+    sink.write_line("-- Archivo generado automáticamente por generate_insert_instrumentos.py")
+    for comentario in comentarios:
+        sink.write_line(f"-- {comentario}")
+    sink.write_line("USE iso17025;")
+    sink.write_line()
+
+    _render_inserciones_catalogo(entidades["catalogo"], batch_size, sink)
+    _render_inserciones_marcas(entidades["marcas"], batch_size, sink)
+    _render_inserciones_modelos(entidades["modelos"], batch_size, sink)
+    _render_inserciones_departamentos(entidades["departamentos"], batch_size, sink)
+    _render_inserciones_instrumentos(entidades["instrumentos"], batch_size, sink)
 
 
 def _normalizar_texto(valor: Optional[str], *, allow_empty: bool = False) -> Optional[str]:
@@ -471,154 +552,149 @@ def _normalizar_anio(anio_dos_digitos: int) -> int:
 
 
 def _render_inserciones_catalogo(
-    catalogo: Sequence[str], batch_size: int, buffer: StringIO
+    catalogo: Sequence[str], batch_size: int, sink: SQLStreamWriter
 ) -> None:
     if not catalogo:
         return
 
     for chunk in _chunk(catalogo, batch_size):
-        print("START TRANSACTION;", file=buffer)
-        print("INSERT INTO catalogo_instrumentos (nombre, empresa_id)", file=buffer)
-        _render_values([
-            f"({sql_quote(nombre)}, {EMPRESA_ID})" for nombre in chunk
-        ], buffer)
-        print("ON DUPLICATE KEY UPDATE nombre = VALUES(nombre);", file=buffer)
-        print("COMMIT;", file=buffer)
-        print(file=buffer)
+        sink.write_line("START TRANSACTION;")
+        sink.write_line("INSERT INTO catalogo_instrumentos (nombre, empresa_id)")
+        _render_values(
+            (f"({sql_quote(nombre)}, {EMPRESA_ID})" for nombre in chunk), sink
+        )
+        sink.write_line("ON DUPLICATE KEY UPDATE nombre = VALUES(nombre);")
+        sink.write_line("COMMIT;")
+        sink.write_line()
 
 
 def _render_inserciones_marcas(
-    marcas: Sequence[str], batch_size: int, buffer: StringIO
+    marcas: Sequence[str], batch_size: int, sink: SQLStreamWriter
 ) -> None:
     if not marcas:
         return
 
     for chunk in _chunk(marcas, batch_size):
-        print("START TRANSACTION;", file=buffer)
-        print("INSERT INTO marcas (nombre, empresa_id)", file=buffer)
-        _render_values([
-            f"({sql_quote(nombre)}, {EMPRESA_ID})" for nombre in chunk
-        ], buffer)
-        print("ON DUPLICATE KEY UPDATE nombre = VALUES(nombre);", file=buffer)
-        print("COMMIT;", file=buffer)
-        print(file=buffer)
+        sink.write_line("START TRANSACTION;")
+        sink.write_line("INSERT INTO marcas (nombre, empresa_id)")
+        _render_values(
+            (f"({sql_quote(nombre)}, {EMPRESA_ID})" for nombre in chunk), sink
+        )
+        sink.write_line("ON DUPLICATE KEY UPDATE nombre = VALUES(nombre);")
+        sink.write_line("COMMIT;")
+        sink.write_line()
 
 
 def _render_inserciones_modelos(
-    modelos: Sequence[Tuple[str, str]], batch_size: int, buffer: StringIO
+    modelos: Sequence[Tuple[str, str]], batch_size: int, sink: SQLStreamWriter
 ) -> None:
     if not modelos:
         return
 
     for chunk in _chunk(modelos, batch_size):
-        print("START TRANSACTION;", file=buffer)
-        print("INSERT INTO modelos (nombre, marca_id, empresa_id)", file=buffer)
-        values = []
-        for marca, modelo in chunk:
-            marca_id = _subselect_marca_id(marca)
-            values.append(
+        sink.write_line("START TRANSACTION;")
+        sink.write_line("INSERT INTO modelos (nombre, marca_id, empresa_id)")
+        _render_values(
+            (
                 "(" + ", ".join(
                     [
                         sql_quote(modelo),
-                        marca_id,
+                        _subselect_marca_id(marca),
                         sql_number(EMPRESA_ID),
                     ]
                 ) + ")"
-            )
-        _render_values(values, buffer)
-        print(
-            "ON DUPLICATE KEY UPDATE nombre = VALUES(nombre), marca_id = VALUES(marca_id);",
-            file=buffer,
+                for marca, modelo in chunk
+            ),
+            sink,
         )
-        print("COMMIT;", file=buffer)
-        print(file=buffer)
+        sink.write_line(
+            "ON DUPLICATE KEY UPDATE nombre = VALUES(nombre), marca_id = VALUES(marca_id);"
+        )
+        sink.write_line("COMMIT;")
+        sink.write_line()
 
 
 def _render_inserciones_departamentos(
-    departamentos: Sequence[str], batch_size: int, buffer: StringIO
+    departamentos: Sequence[str], batch_size: int, sink: SQLStreamWriter
 ) -> None:
     if not departamentos:
         return
 
     for chunk in _chunk(departamentos, batch_size):
-        print("START TRANSACTION;", file=buffer)
-        print("INSERT INTO departamentos (nombre, empresa_id)", file=buffer)
-        _render_values([
-            f"({sql_quote(nombre)}, {EMPRESA_ID})" for nombre in chunk
-        ], buffer)
-        print("ON DUPLICATE KEY UPDATE nombre = VALUES(nombre);", file=buffer)
-        print("COMMIT;", file=buffer)
-        print(file=buffer)
+        sink.write_line("START TRANSACTION;")
+        sink.write_line("INSERT INTO departamentos (nombre, empresa_id)")
+        _render_values(
+            (f"({sql_quote(nombre)}, {EMPRESA_ID})" for nombre in chunk), sink
+        )
+        sink.write_line("ON DUPLICATE KEY UPDATE nombre = VALUES(nombre);")
+        sink.write_line("COMMIT;")
+        sink.write_line()
 
 
 def _render_inserciones_instrumentos(
-    instrumentos: Sequence[InstrumentoRegistro], batch_size: int, buffer: StringIO
+    instrumentos: Sequence[InstrumentoRegistro], batch_size: int, sink: SQLStreamWriter
 ) -> None:
     if not instrumentos:
         return
 
     for chunk in _chunk(instrumentos, batch_size):
-        print("START TRANSACTION;", file=buffer)
-        print(
+        sink.write_line("START TRANSACTION;")
+        sink.write_line(
             "INSERT INTO instrumentos (catalogo_id, marca_id, modelo_id, serie, codigo, "
             "departamento_id, ubicacion, fecha_alta, fecha_baja, proxima_calibracion, "
-            "estado, programado, empresa_id)",
-            file=buffer,
+            "estado, programado, empresa_id)"
         )
-
-        values: List[str] = []
-        for registro in chunk:
-            if registro.catalogo_id_val is not None:
-                catalogo_id = sql_number(registro.catalogo_id_val)
-            else:
-                catalogo_id = _subselect_catalogo_id(registro.instrumento)
-
-            if registro.marca_id_val is not None:
-                marca_id = sql_number(registro.marca_id_val)
-            else:
-                marca_id = _subselect_marca_id(registro.marca)
-
-            if registro.modelo_id_val is not None:
-                modelo_id = sql_number(registro.modelo_id_val)
-            else:
-                modelo_id = _subselect_modelo_id(registro.marca, registro.modelo)
-
-            if registro.departamento_id_val is not None:
-                departamento_id = sql_number(registro.departamento_id_val)
-            else:
-                departamento_id = _subselect_departamento_id(registro.departamento)
-
-            fila = "(" + ", ".join(
-                [
-                    catalogo_id,
-                    marca_id,
-                    modelo_id,
-                    sql_quote(registro.serie),
-                    sql_quote(registro.codigo),
-                    departamento_id,
-                    sql_quote(registro.ubicacion),
-                    sql_quote(registro.fecha_alta),
-                    sql_quote(registro.fecha_baja),
-                    sql_quote(registro.proxima_calibracion),
-                    sql_quote(registro.estado),
-                    sql_number(registro.programado),
-                    sql_number(EMPRESA_ID),
-                ]
-            ) + ")"
-            values.append(fila)
-
-        _render_values(values, buffer)
-        print(
+        _render_values((_fila_instrumento(registro) for registro in chunk), sink)
+        sink.write_line(
             "ON DUPLICATE KEY UPDATE catalogo_id = VALUES(catalogo_id), "
             "marca_id = VALUES(marca_id), modelo_id = VALUES(modelo_id), serie = VALUES(serie), "
             "departamento_id = VALUES(departamento_id), ubicacion = VALUES(ubicacion), "
             "fecha_alta = VALUES(fecha_alta), fecha_baja = VALUES(fecha_baja), "
             "proxima_calibracion = VALUES(proxima_calibracion), estado = VALUES(estado), "
-            "programado = VALUES(programado);",
-            file=buffer,
+            "programado = VALUES(programado);"
         )
-        print("COMMIT;", file=buffer)
-        print(file=buffer)
+        sink.write_line("COMMIT;")
+        sink.write_line()
+
+
+def _fila_instrumento(registro: InstrumentoRegistro) -> str:
+    if registro.catalogo_id_val is not None:
+        catalogo_id = sql_number(registro.catalogo_id_val)
+    else:
+        catalogo_id = _subselect_catalogo_id(registro.instrumento)
+
+    if registro.marca_id_val is not None:
+        marca_id = sql_number(registro.marca_id_val)
+    else:
+        marca_id = _subselect_marca_id(registro.marca)
+
+    if registro.modelo_id_val is not None:
+        modelo_id = sql_number(registro.modelo_id_val)
+    else:
+        modelo_id = _subselect_modelo_id(registro.marca, registro.modelo)
+
+    if registro.departamento_id_val is not None:
+        departamento_id = sql_number(registro.departamento_id_val)
+    else:
+        departamento_id = _subselect_departamento_id(registro.departamento)
+
+    return "(" + ", ".join(
+        [
+            catalogo_id,
+            marca_id,
+            modelo_id,
+            sql_quote(registro.serie),
+            sql_quote(registro.codigo),
+            departamento_id,
+            sql_quote(registro.ubicacion),
+            sql_quote(registro.fecha_alta),
+            sql_quote(registro.fecha_baja),
+            sql_quote(registro.proxima_calibracion),
+            sql_quote(registro.estado),
+            sql_number(registro.programado),
+            sql_number(EMPRESA_ID),
+        ]
+    ) + ")"
 
 
 def _subselect_catalogo_id(instrumento: Optional[str]) -> str:
@@ -671,17 +747,118 @@ def _subselect_departamento_id(departamento: Optional[str]) -> str:
     )
 
 
+_CARGA_CATALOGO_ID = (
+    "COALESCE(?, (SELECT id FROM catalogo_instrumentos WHERE nombre = ? "
+    "AND empresa_id = ? LIMIT 1))"
+)
+_CARGA_MARCA_ID = (
+    "COALESCE(?, (SELECT id FROM marcas WHERE nombre = ? AND empresa_id = ? LIMIT 1))"
+)
+_CARGA_MODELO_ID = (
+    "COALESCE(?, (SELECT mo.id FROM modelos mo WHERE mo.nombre = ? "
+    "AND mo.empresa_id = ? AND mo.marca_id = (SELECT id FROM marcas "
+    "WHERE nombre = ? AND empresa_id = ? LIMIT 1) LIMIT 1))"
+)
+_CARGA_DEPARTAMENTO_ID = (
+    "COALESCE(?, (SELECT id FROM departamentos WHERE nombre = ? "
+    "AND empresa_id = ? LIMIT 1))"
+)
+
+
+def construir_lotes_carga(
+    entidades: Dict[str, Sequence],
+    dialect: SQLDialect,
+) -> List[LoadBatch]:
+    """Equivalente parametrizado de `escribir_script_sql` para `--load`.
+
+    Los identificadores conocidos se envían tal cual; si faltan se resuelven
+    por nombre con el mismo subselect que usa el SQL generado.
+    """
+
+    lotes: List[LoadBatch] = []
+    for tabla, clave in (
+        ("catalogo_instrumentos", "catalogo"),
+        ("marcas", "marcas"),
+        ("departamentos", "departamentos"),
+    ):
+        lotes.append(
+            LoadBatch(
+                table=tabla,
+                sql=dialect.insert_values(
+                    tabla, ("nombre", "empresa_id"), update_columns=("nombre",)
+                ),
+                rows=[(nombre, EMPRESA_ID) for nombre in entidades[clave]],
+            )
+        )
+
+    lotes.append(
+        LoadBatch(
+            table="modelos",
+            sql=dialect.insert_values(
+                "modelos",
+                ("nombre", "marca_id", "empresa_id"),
+                ("?", "(SELECT id FROM marcas WHERE nombre = ? AND empresa_id = ? LIMIT 1)", "?"),
+                update_columns=("nombre", "marca_id"),
+            ),
+            rows=[
+                (modelo, marca, EMPRESA_ID, EMPRESA_ID)
+                for marca, modelo in entidades["modelos"]
+            ],
+        )
+    )
+
+    columnas = (
+        "catalogo_id", "marca_id", "modelo_id", "serie", "codigo", "departamento_id",
+        "ubicacion", "fecha_alta", "fecha_baja", "proxima_calibracion", "estado",
+        "programado", "empresa_id",
+    )
+    expresiones = (
+        _CARGA_CATALOGO_ID, _CARGA_MARCA_ID, _CARGA_MODELO_ID, "?", "?",
+        _CARGA_DEPARTAMENTO_ID, "?", "?", "?", "?", "?", "?", "?",
+    )
+    lotes.append(
+        LoadBatch(
+            table="instrumentos",
+            sql=dialect.insert_values(
+                "instrumentos",
+                columnas,
+                expresiones,
+                update_columns=tuple(c for c in columnas if c not in ("codigo", "empresa_id")),
+            ),
+            rows=(_parametros_instrumento(registro) for registro in entidades["instrumentos"]),
+        )
+    )
+    return lotes
+
+
+def _parametros_instrumento(registro: InstrumentoRegistro) -> Tuple:
+    modelo_completo = registro.marca and registro.modelo
+    return (
+        registro.catalogo_id_val, registro.instrumento, EMPRESA_ID,
+        registro.marca_id_val, registro.marca, EMPRESA_ID,
+        registro.modelo_id_val,
+        registro.modelo if modelo_completo else None, EMPRESA_ID,
+        registro.marca if modelo_completo else None, EMPRESA_ID,
+        registro.serie,
+        registro.codigo,
+        registro.departamento_id_val, registro.departamento, EMPRESA_ID,
+        registro.ubicacion,
+        registro.fecha_alta,
+        registro.fecha_baja,
+        registro.proxima_calibracion,
+        registro.estado,
+        registro.programado,
+        EMPRESA_ID,
+    )
+
+
 def _chunk(sequence: Sequence, size: int) -> Iterator[Sequence]:
     for idx in range(0, len(sequence), size):
         yield sequence[idx : idx + size]
 
 
-def _render_values(values: Iterable[str], buffer: StringIO) -> None:
-    values = list(values)
-    print("VALUES", file=buffer)
-    for index, value in enumerate(values):
-        suffix = "," if index < len(values) - 1 else ""
-        print(f"    {value}{suffix}", file=buffer)
+def _render_values(values: Iterable[str], sink: SQLStreamWriter) -> None:
+    sink.write_values(values)
 
 
 def sql_quote(valor: Optional[str]) -> str:
@@ -761,9 +938,39 @@ def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
         default=100,
         help="Número máximo de filas por transacción.",
     )
+    parser.add_argument(
+        "--flush-size",
+        type=int,
+        default=SQLStreamWriter.DEFAULT_FLUSH_SIZE,
+        help=(
+            "Caracteres acumulados antes de volcar al archivo de salida."
+        ),
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        nargs="?",
+        const=REPO_ROOT / "storage" / "inventory_snapshots" / DEFAULT_SNAPSHOT_NAME,
+        default=None,
+        help=(
+            "Emite solo los instrumentos nuevos o modificados respecto a la instantánea "
+            f"indicada (por defecto storage/inventory_snapshots/{DEFAULT_SNAPSHOT_NAME}) "
+            "y la actualiza al terminar."
+        ),
+    )
+    add_compression_argument(parser)
+    add_load_arguments(parser)
     return parser.parse_args(argv)
 
 
+def _comentarios_delta(diff: SnapshotDiff) -> List[str]:
+    comentarios = [f"Delta respecto a la instantánea previa: {diff.resumen()}"]
+    if diff.eliminados:
+        comentarios.append("Códigos ausentes en el CSV (no se eliminan de la base):")
+        comentarios.extend(f"  {codigo}" for codigo in diff.eliminados)
+    return comentarios
+
+
 def main(argv: Optional[Sequence[str]] = None) -> int:
     args = parse_args(argv)
 
@@ -780,17 +987,56 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
             "Se generará el SQL usando únicamente el CSV principal."
         )
 
-    estado_programado = _cargar_estado_programado(args.estado_programado)
-    registros = leer_csv_normalizado(args.input, estado_programado)
-    entidades = preparar_entidades(registros)
-    script = generar_script_sql(entidades, batch_size=args.batch_size)
-
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    args.output.write_text(script, encoding="utf-8")
-
+    metrics = setup_metrics("generate_insert_instrumentos")
+    with metrics.stage("lectura_csv") as etapa:
+        estado_programado = _cargar_estado_programado(args.estado_programado)
+        registros = leer_csv_normalizado(args.input, estado_programado)
+        entidades = preparar_entidades(registros)
+        etapa.rows = len(registros)
+        etapa.gauge("instrumentos", len(entidades["instrumentos"]))
+
+    actual: Optional[InventorySnapshot] = None
+    comentarios: List[str] = []
+    if args.snapshot is not None:
+        with metrics.stage("delta_instantanea") as etapa:
+            actual = instantanea_inventario(entidades["instrumentos"])
+            try:
+                previa = InventorySnapshot.load(args.snapshot)
+            except InventorySnapshotError as exc:
+                print(f"[INFO] Sin instantánea utilizable, se emite el inventario completo: {exc}")
+                previa = InventorySnapshot()
+            diff = previa.diff(actual)
+            print(f"[INFO] Instantánea {args.snapshot.name}: {diff.resumen()}")
+            entidades = entidades_delta(registros, diff)
+            comentarios = _comentarios_delta(diff)
+            etapa.rows = len(actual.hashes)
+            etapa.count("nuevos", len(diff.nuevos))
+            etapa.count("modificados", len(diff.modificados))
+            etapa.count("sin_cambios", len(diff.sin_cambios))
+            etapa.count("eliminados", len(diff.eliminados))
+
+    if args.load:
+        with metrics.stage("carga_base") as etapa:
+            results = run_load(
+                args.load,
+                lambda dialect: construir_lotes_carga(entidades, dialect),
+                batch_size=args.load_batch_size,
+            )
+            etapa.rows = sum(result.rows for result in results)
+    else:
+        output = with_compression_suffix(args.output, args.compress)
+        with metrics.stage("escritura_sql") as etapa:
+            with SQLStreamWriter(output, flush_size=args.flush_size) as sink:
+                escribir_script_sql(entidades, args.batch_size, sink, comentarios)
+            etapa.rows = len(entidades["instrumentos"])
+
+    if actual is not None:
+        actual.save(args.snapshot)
     return 0
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    from stage_profiler import run_main
+
+    sys.exit(run_main(main))
 
@@ -11,6 +11,18 @@ Ejemplo desde la raíz del repositorio:
 python tools/scripts/generate_plan_riesgos.py
 ```
 
+Con `--load DSN` el plan se carga directamente en la base de datos (ver
+`db_loader.py`) en lugar de escribir `insert_plan_riesgos.sql`.
+
+Con `--staged` el SQL se emite por bloques de `--chunk-size` filas: cada bloque
+se inserta en la tabla temporal `tmp_plan_riesgos` (clave `codigo`) y después
+se vuelca con un único `INSERT … SELECT … LEFT JOIN instrumentos`, de modo que
+el `instrumento_id` se resuelve con un join por bloque en lugar de una
+subconsulta por fila y ninguna sentencia supera el `max_allowed_packet` del
+servidor. Antes de cada volcado se listan los códigos del bloque que no existen
+en `instrumentos`; igual que en el modo normal, esas filas llegan con
+`instrumento_id` NULL y la transacción falla en lugar de omitirlas en silencio.
+
 Resultados:
 
 - `app/Modules/Internal/ArchivosSql/Archivos_Normalize/normalize_plan_riesgos.csv`
@@ -18,14 +30,26 @@ Resultados:
 """
 from __future__ import annotations
 
+import argparse
 import csv
 import re
 import unicodedata
 from dataclasses import dataclass
 from datetime import date, datetime
-from io import StringIO
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Sequence
+
+from columnar_cache import read_column, write_sidecar
+from db_loader import (
+    DEFAULT_LOAD_BATCH_SIZE,
+    LoadBatch,
+    SQLDialect,
+    add_load_arguments,
+    run_load,
+)
+from pipeline_metrics import setup_metrics
+from sbl_utils import SQLStreamWriter
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 ARCHIVOS_SQL_DIR = REPO_ROOT / "app/Modules/Internal/ArchivosSql"
@@ -49,6 +73,8 @@ INVENTORY_SOURCE_CANDIDATES = [
 ]
 
 EMPRESA_ID = 1
+DEFAULT_CHUNK_SIZE = 500
+STAGING_TABLE = "tmp_plan_riesgos"
 
 PLAN_MIN_YEAR = 2015
 PLAN_MAX_YEAR = date.today().year + 10
@@ -78,6 +104,37 @@ DATE_PATTERNS = (
 
 MISSING_CERTIFICATE_MESSAGE = "No se ha añadido su primer certificado"
 
+PLAN_COLUMNS = (
+    "instrumento_id",
+    "empresa_id",
+    "requerimiento",
+    "impacto_falla",
+    "consideraciones_falla",
+    "clase_riesgo",
+    "capacidad_deteccion",
+    "frecuencia",
+    "fecha_actualizacion",
+    "observaciones",
+    "tipo_calibracion",
+    "especificaciones",
+)
+# Columnas de la tabla temporal del modo `--staged`; `codigo` sustituye a
+# `instrumento_id` y se resuelve con un join contra `instrumentos`.
+STAGING_COLUMN_DEFINITIONS = (
+    "codigo VARCHAR(100) NOT NULL PRIMARY KEY",
+    "empresa_id INT NOT NULL",
+    "requerimiento VARCHAR(100)",
+    "impacto_falla VARCHAR(100)",
+    "consideraciones_falla VARCHAR(100)",
+    "clase_riesgo VARCHAR(100)",
+    "capacidad_deteccion VARCHAR(100)",
+    "frecuencia VARCHAR(100)",
+    "fecha_actualizacion DATETIME NULL",
+    "observaciones TEXT",
+    "tipo_calibracion VARCHAR(50)",
+    "especificaciones TEXT",
+)
+
 CSV_HEADERS = [
     "instrumento_codigo",
     "empresa_id",
@@ -253,12 +310,10 @@ def _normalize_year_component(year_str: str) -> Optional[int]:
 
 def _load_inventory_codes() -> set[str]:
     codes: set[str] = set()
-    with INVENTORY_NORMALIZED.open("r", encoding="utf-8", newline="") as fh:
-        reader = csv.DictReader(fh)
-        for row in reader:
-            code = _normalize_placeholder(row.get("codigo"))
-            if code:
-                codes.add(code.upper())
+    for raw_code in read_column(INVENTORY_NORMALIZED, "codigo"):
+        code = _normalize_placeholder(raw_code)
+        if code:
+            codes.add(code.upper())
     if not codes:
         raise RuntimeError("No se pudieron cargar códigos desde instrumentos_normalizado.csv")
     return codes
@@ -318,12 +373,14 @@ def _read_plan_rows(valid_codes: set[str]) -> List[RiskPlanRow]:
 
 
 def _write_csv(rows: Iterable[RiskPlanRow]) -> None:
+    rows = list(rows)
     PLAN_NORMALIZED.parent.mkdir(parents=True, exist_ok=True)
     with PLAN_NORMALIZED.open("w", encoding="utf-8", newline="") as fh:
         writer = csv.writer(fh)
         writer.writerow(CSV_HEADERS)
         for row in rows:
             writer.writerow(row.as_csv_row())
+    write_sidecar(PLAN_NORMALIZED, CSV_HEADERS, (row.as_csv_row() for row in rows))
 
 
 def _sql_escape(value: str) -> str:
@@ -336,94 +393,222 @@ def _sql_value(text: str, *, allow_null: bool = False) -> str:
     return f"'{_sql_escape(text)}'"
 
 
-def _render_sql(rows: List[RiskPlanRow]) -> str:
-    buffer = StringIO()
-    print("-- Archivo generado automáticamente por generate_plan_riesgos.py", file=buffer)
-    print(file=buffer)
-    print("START TRANSACTION;", file=buffer)
-    print(file=buffer)
-    print("INSERT INTO plan_riesgos (", file=buffer)
-    print("    instrumento_id,", file=buffer)
-    print("    empresa_id,", file=buffer)
-    print("    requerimiento,", file=buffer)
-    print("    impacto_falla,", file=buffer)
-    print("    consideraciones_falla,", file=buffer)
-    print("    clase_riesgo,", file=buffer)
-    print("    capacidad_deteccion,", file=buffer)
-    print("    frecuencia,", file=buffer)
-    print("    fecha_actualizacion,", file=buffer)
-    print("    observaciones,", file=buffer)
-    print("    tipo_calibracion,", file=buffer)
-    print("    especificaciones", file=buffer)
-    print(")", file=buffer)
-    print("VALUES", file=buffer)
-
-    total = len(rows)
-    for idx, row in enumerate(rows):
-        select_instrumento = (
-            "(SELECT id FROM instrumentos WHERE codigo = "
-            f"'{_sql_escape(row.codigo)}' AND empresa_id = {row.empresa_id} LIMIT 1)"
-        )
-        select_empresa = (
-            f"(SELECT id FROM empresas WHERE id = {row.empresa_id} LIMIT 1)"
-        )
-        fecha_value = (
-            _sql_value(row.fecha_actualizacion)
-            if row.fecha_actualizacion
-            else "NULL"
-        )
-        observaciones_value = _sql_value(row.observaciones, allow_null=True)
-        especificaciones_value = _sql_value(row.especificaciones, allow_null=True)
-
-        values = ", ".join(
-            [
-                select_instrumento,
-                select_empresa,
-                _sql_value(row.requerimiento),
-                _sql_value(row.impacto_falla),
-                _sql_value(row.consideraciones_falla),
-                _sql_value(row.clase_riesgo),
-                _sql_value(row.capacidad_deteccion),
-                _sql_value(row.frecuencia),
-                fecha_value,
-                observaciones_value,
-                _sql_value(row.tipo_calibracion),
-                especificaciones_value,
+def _plan_values(row: RiskPlanRow) -> List[str]:
+    """Literales SQL de las columnas posteriores a `instrumento_id`."""
+    fecha_value = (
+        _sql_value(row.fecha_actualizacion)
+        if row.fecha_actualizacion
+        else "NULL"
+    )
+    observaciones_value = _sql_value(row.observaciones, allow_null=True)
+    especificaciones_value = _sql_value(row.especificaciones, allow_null=True)
+
+    return [
+        str(row.empresa_id),
+        _sql_value(row.requerimiento),
+        _sql_value(row.impacto_falla),
+        _sql_value(row.consideraciones_falla),
+        _sql_value(row.clase_riesgo),
+        _sql_value(row.capacidad_deteccion),
+        _sql_value(row.frecuencia),
+        fecha_value,
+        observaciones_value,
+        _sql_value(row.tipo_calibracion),
+        especificaciones_value,
+    ]
+
+
+def _render_row(row: RiskPlanRow) -> str:
+    select_instrumento = (
+        "(SELECT id FROM instrumentos WHERE codigo = "
+        f"'{_sql_escape(row.codigo)}' AND empresa_id = {row.empresa_id} LIMIT 1)"
+    )
+    values = ", ".join([select_instrumento] + _plan_values(row))
+    return f"({values})"
+
+
+def _render_staged_row(row: RiskPlanRow) -> str:
+    values = ", ".join([_sql_value(row.codigo)] + _plan_values(row))
+    return f"({values})"
+
+
+def _column_list(columns: Sequence[str]) -> List[str]:
+    return [f"    {column}," for column in columns[:-1]] + [f"    {columns[-1]}"]
+
+
+def _update_clause() -> List[str]:
+    updates = [f"    {column} = VALUES({column})" for column in PLAN_COLUMNS[1:]]
+    return ["ON DUPLICATE KEY UPDATE"] + [f"{line}," for line in updates[:-1]] + [f"{updates[-1]};"]
+
+
+def _render_sql(rows: Iterable[RiskPlanRow], sink: SQLStreamWriter) -> None:
+    sink.write_line("-- Archivo generado automáticamente por generate_plan_riesgos.py")
+    sink.write_line()
+    sink.write_line("START TRANSACTION;")
+    sink.write_line()
+    sink.write_lines(["INSERT INTO plan_riesgos ("] + _column_list(PLAN_COLUMNS) + [")"])
+    sink.write_values(_render_row(row) for row in rows)
+    sink.write_lines(_update_clause() + ["", "COMMIT;", ""])
+
+
+def _render_staged_sql(
+    rows: Iterable[RiskPlanRow],
+    sink: SQLStreamWriter,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    if chunk_size <= 0:
+        raise ValueError("chunk_size debe ser mayor que cero")
+    staging_columns = ("codigo",) + PLAN_COLUMNS[1:]
+    join_columns = ["    i.id,"] + [f"    t.{column}," for column in PLAN_COLUMNS[1:-1]]
+    join_columns.append(f"    t.{PLAN_COLUMNS[-1]}")
+
+    sink.write_line("-- Archivo generado automáticamente por generate_plan_riesgos.py (modo por bloques)")
+    sink.write_line()
+    sink.write_line("START TRANSACTION;")
+    sink.write_line()
+    sink.write_line(f"DROP TEMPORARY TABLE IF EXISTS {STAGING_TABLE};")
+    sink.write_lines(
+        [f"CREATE TEMPORARY TABLE {STAGING_TABLE} ("]
+        + [f"    {definition}," for definition in STAGING_COLUMN_DEFINITIONS[:-1]]
+        + [f"    {STAGING_COLUMN_DEFINITIONS[-1]}", ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;"]
+    )
+
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        sink.write_line()
+        sink.write_lines([f"INSERT INTO {STAGING_TABLE} ("] + _column_list(staging_columns) + [")"])
+        sink.write_values((_render_staged_row(row) for row in chunk), terminator=";")
+        # Códigos sin instrumento: el INSERT siguiente fallará por instrumento_id NULL.
+        sink.write_lines([
+            "SELECT t.codigo AS codigo_sin_instrumento",
+            f"FROM {STAGING_TABLE} t",
+            "LEFT JOIN instrumentos i ON i.codigo = t.codigo AND i.empresa_id = t.empresa_id",
+            "WHERE i.id IS NULL;",
+        ])
+        sink.write_lines(["INSERT INTO plan_riesgos ("] + _column_list(PLAN_COLUMNS) + [")"])
+        sink.write_lines(
+            ["SELECT"]
+            + join_columns
+            + [
+                f"FROM {STAGING_TABLE} t",
+                "LEFT JOIN instrumentos i ON i.codigo = t.codigo AND i.empresa_id = t.empresa_id",
             ]
         )
-        suffix = "," if idx < total - 1 else ""
-        print(f"    ({values}){suffix}", file=buffer)
-
-    print("ON DUPLICATE KEY UPDATE", file=buffer)
-    print("    empresa_id = VALUES(empresa_id),", file=buffer)
-    print("    requerimiento = VALUES(requerimiento),", file=buffer)
-    print("    impacto_falla = VALUES(impacto_falla),", file=buffer)
-    print("    consideraciones_falla = VALUES(consideraciones_falla),", file=buffer)
-    print("    clase_riesgo = VALUES(clase_riesgo),", file=buffer)
-    print("    capacidad_deteccion = VALUES(capacidad_deteccion),", file=buffer)
-    print("    frecuencia = VALUES(frecuencia),", file=buffer)
-    print("    fecha_actualizacion = VALUES(fecha_actualizacion),", file=buffer)
-    print("    observaciones = VALUES(observaciones),", file=buffer)
-    print("    tipo_calibracion = VALUES(tipo_calibracion),", file=buffer)
-    print("    especificaciones = VALUES(especificaciones);", file=buffer)
-    print(file=buffer)
-    print("COMMIT;", file=buffer)
-    print(file=buffer)
-    return buffer.getvalue()
-
-
-def _write_sql(content: str) -> None:
-    PLAN_SQL.parent.mkdir(parents=True, exist_ok=True)
-    PLAN_SQL.write_text(content, encoding="utf-8")
-
-
-def generate() -> None:
-    valid_codes = _load_inventory_codes()
-    rows = _read_plan_rows(valid_codes)
-    _write_csv(rows)
-    sql = _render_sql(rows)
-    _write_sql(sql)
+        sink.write_lines(_update_clause())
+        sink.write_line(f"DELETE FROM {STAGING_TABLE};")
+
+    sink.write_line()
+    sink.write_line(f"DROP TEMPORARY TABLE IF EXISTS {STAGING_TABLE};")
+    sink.write_line()
+    sink.write_line("COMMIT;")
+
+
+def _write_sql(
+    rows: Iterable[RiskPlanRow],
+    *,
+    staged: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    with SQLStreamWriter(PLAN_SQL) as sink:
+        if staged:
+            _render_staged_sql(rows, sink, chunk_size)
+        else:
+            _render_sql(rows, sink)
+
+
+def _load_batches(rows: List[RiskPlanRow], dialect: SQLDialect) -> List[LoadBatch]:
+    expressions = [
+        "(SELECT id FROM instrumentos WHERE codigo = ? AND empresa_id = ? LIMIT 1)",
+    ] + ["?"] * (len(PLAN_COLUMNS) - 1)
+    sql = dialect.insert_values(
+        "plan_riesgos", PLAN_COLUMNS, expressions, update_columns=PLAN_COLUMNS[1:]
+    )
+    params = [
+        (
+            row.codigo,
+            row.empresa_id,
+            row.empresa_id,
+            row.requerimiento,
+            row.impacto_falla,
+            row.consideraciones_falla,
+            row.clase_riesgo,
+            row.capacidad_deteccion,
+            row.frecuencia,
+            row.fecha_actualizacion or None,
+            row.observaciones or None,
+            row.tipo_calibracion,
+            row.especificaciones or None,
+        )
+        for row in rows
+    ]
+    return [LoadBatch(table="plan_riesgos", sql=sql, rows=params)]
+
+
+def generate(
+    load_dsn: Optional[str] = None,
+    load_batch_size: int = DEFAULT_LOAD_BATCH_SIZE,
+    *,
+    staged: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    metrics = setup_metrics("generate_plan_riesgos")
+    with metrics.stage("lectura_csv") as etapa:
+        valid_codes = _load_inventory_codes()
+        rows = _read_plan_rows(valid_codes)
+        etapa.rows = len(rows)
+        etapa.gauge("codigos_inventario", len(valid_codes))
+    with metrics.stage("escritura_csv_normalizado") as etapa:
+        _write_csv(rows)
+        etapa.rows = len(rows)
+    if load_dsn:
+        with metrics.stage("carga_base") as etapa:
+            results = run_load(
+                load_dsn,
+                lambda dialect: _load_batches(rows, dialect),
+                batch_size=load_batch_size,
+            )
+            etapa.rows = sum(result.rows for result in results)
+        return
+    with metrics.stage("escritura_sql") as etapa:
+        _write_sql(rows, staged=staged, chunk_size=chunk_size)
+        etapa.rows = len(rows)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Genera el CSV normalizado y el SQL del plan de riesgos."
+    )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help=(
+            "Emite el SQL por bloques: tabla temporal por código y un "
+            "INSERT … SELECT … LEFT JOIN instrumentos por bloque. Los códigos sin "
+            "instrumento se listan y hacen fallar la transacción, como en el modo normal."
+        ),
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Filas por bloque en modo --staged (por defecto {DEFAULT_CHUNK_SIZE}).",
+    )
+    add_load_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size debe ser mayor que cero")
+    generate(
+        load_dsn=args.load,
+        load_batch_size=args.load_batch_size,
+        staged=args.staged,
+        chunk_size=args.chunk_size,
+    )
 
 
 if __name__ == "__main__":
-    generate()
+    from stage_profiler import run_main
+
+    run_main(main)
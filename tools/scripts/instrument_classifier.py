@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Clasificación de instrumentos por palabras clave (criticidad y tipo de servicio).
+
+Las reglas se declaran en tablas (`CRITICIDAD_RULES`, `SERVICIO_RULES`): cada
+una indica la columna que revisa, el valor que asigna y sus términos. El orden
+de la tabla es la prioridad, igual que la cadena de ``if/elif`` original.
+
+Cada tabla se compila una sola vez en una expresión regular por columna: una
+alternancia dentro de un *lookahead* con un grupo por regla, de modo que en cada
+posición del texto gana la regla de mayor prioridad y no se pierden términos que
+se traslapan. El rango por texto distinto y la clasificación por combinación de
+columnas se memorizan, así que agregar reglas no encarece el ciclo por
+instrumento cuando las descripciones se repiten.
+
+Benchmark contra la versión con ``any(term in ...)``:
+```bash
+python tools/scripts/instrument_classifier.py --benchmark 1000000
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+CACHE_SIZE = 65536
+
+
+@dataclass(frozen=True)
+class KeywordRule:
+    """Asigna ``valor`` cuando ``campo`` contiene alguno de ``terminos`` (en minúsculas)."""
+
+    campo: str
+    valor: str
+    terminos: Tuple[str, ...]
+
+
+CRITICIDAD_RULES = (
+    KeywordRule("descripcion", "CRITICA", ("critico", "vital", "principal")),
+    KeywordRule("ubicacion", "ALTA", ("produccion", "proceso", "linea")),
+)
+SERVICIO_RULES = (
+    KeywordRule("descripcion", "MANTENIMIENTO", ("mantenimiento", "reparacion")),
+    KeywordRule("descripcion", "VALIDACION", ("validacion", "verificacion")),
+)
+
+
+def _compile_column(rules: Sequence[Tuple[int, KeywordRule]]) -> re.Pattern:
+    alternatives = "|".join(
+        f"(?P<r{rank}>{'|'.join(re.escape(term) for term in rule.terminos)})"
+        for rank, rule in rules
+    )
+    return re.compile(f"(?=(?:{alternatives}))")
+
+
+class KeywordClassifier:
+    """Tabla de reglas compilada a una expresión regular por columna."""
+
+    def __init__(self, rules: Sequence[KeywordRule], default: str, cache_size: int = CACHE_SIZE):
+        self.rules = tuple(rules)
+        self.default = default
+        by_column: Dict[str, List[Tuple[int, KeywordRule]]] = {}
+        for rank, rule in enumerate(self.rules):
+            by_column.setdefault(rule.campo, []).append((rank, rule))
+        self._columns = [
+            (campo, lru_cache(maxsize=cache_size)(self._ranker(_compile_column(column_rules))))
+            for campo, column_rules in by_column.items()
+        ]
+
+    def _ranker(self, pattern: re.Pattern) -> Callable[[str], int]:
+        missing = len(self.rules)
+
+        def rank(text: str) -> int:
+            best = missing
+            for match in pattern.finditer(text.lower()):
+                # El único grupo con valor es la regla de mayor prioridad en esa posición.
+                best = min(best, int(match.lastgroup[1:]))
+                if best == 0:
+                    break
+            return best
+
+        return rank
+
+    def classify(self, row: Mapping[str, Optional[str]]) -> str:
+        best = len(self.rules)
+        for campo, rank in self._columns:
+            text = row.get(campo)
+            if text:
+                best = min(best, rank(text))
+        return self.rules[best].valor if best < len(self.rules) else self.default
+
+    def cache_info(self) -> Dict[str, object]:
+        return {campo: rank.cache_info() for campo, rank in self._columns}
+
+
+CRITICIDAD_CLASSIFIER = KeywordClassifier(CRITICIDAD_RULES, "NORMAL")
+SERVICIO_CLASSIFIER = KeywordClassifier(SERVICIO_RULES, "CALIBRACION")
+
+
+RULE_COLUMNS = tuple(dict.fromkeys(rule.campo for rule in CRITICIDAD_RULES + SERVICIO_RULES))
+# Cambia cuando se editan las tablas; invalida las instantáneas de cumplimiento.
+RULES_SIGNATURE = repr((CRITICIDAD_RULES, SERVICIO_RULES))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _classify_texts(texts: Tuple[str, ...]) -> Tuple[str, str]:
+    row = dict(zip(RULE_COLUMNS, texts))
+    return CRITICIDAD_CLASSIFIER.classify(row), SERVICIO_CLASSIFIER.classify(row)
+
+
+def classify_instrument(row: Mapping[str, Optional[str]]) -> Tuple[str, str]:
+    """Devuelve ``(criticidad, servicio_tipo)`` de una fila de instrumento."""
+    return _classify_texts(tuple([row.get(campo) or "" for campo in RULE_COLUMNS]))
+
+
+def _legacy_classify(row: Mapping[str, str]) -> Tuple[str, str]:
+    """Implementación previa con ``any(term in ...)``; solo para el benchmark."""
+    descripcion = row.get('descripcion', '').lower()
+    ubicacion = row.get('ubicacion', '').lower()
+
+    criticidad = "NORMAL"
+    if any(term in descripcion for term in ['critico', 'vital', 'principal']):
+        criticidad = "CRITICA"
+    elif any(term in ubicacion for term in ['produccion', 'proceso', 'linea']):
+        criticidad = "ALTA"
+
+    servicio_tipo = "CALIBRACION"
+    if any(term in descripcion for term in ['mantenimiento', 'reparacion']):
+        servicio_tipo = "MANTENIMIENTO"
+    elif any(term in descripcion for term in ['validacion', 'verificacion']):
+        servicio_tipo = "VALIDACION"
+    return criticidad, servicio_tipo
+
+
+def synthetic_instruments(count: int, seed: int = 7) -> List[Dict[str, str]]:
+    """Instrumentos con descripciones y ubicaciones repetidas, como en el catálogo real."""
+    rng = random.Random(seed)
+    equipos = ["Balanza", "Termómetro", "Manómetro", "Pipeta", "Cronómetro", "Higrómetro", "Bomba"]
+    calificativos = ["", "principal", "de respaldo", "vital", "para validacion", "en reparacion", "critico"]
+    areas = ["Almacén", "Linea 3", "Laboratorio", "Produccion", "Control de proceso", "Oficinas"]
+    descripciones = [f"{equipo} {calificativo} modelo {modelo}".strip()
+                     for equipo in equipos for calificativo in calificativos for modelo in range(40)]
+    ubicaciones = [f"{area} {piso}" for area in areas for piso in range(1, 6)]
+    return [
+        {"descripcion": rng.choice(descripciones), "ubicacion": rng.choice(ubicaciones)}
+        for _ in range(count)
+    ]
+
+
+def run_benchmark(count: int) -> Dict[str, float]:
+    rows = synthetic_instruments(count)
+
+    started = time.perf_counter()
+    legacy = [_legacy_classify(row) for row in rows]
+    legacy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    compiled = [classify_instrument(row) for row in rows]
+    compiled_s = time.perf_counter() - started
+
+    if legacy != compiled:
+        raise AssertionError("El clasificador compilado difiere de la implementación previa")
+    return {
+        "instrumentos": count,
+        "any_s": round(legacy_s, 3),
+        "compilado_s": round(compiled_s, 3),
+        "aceleracion": round(legacy_s / compiled_s, 2) if compiled_s else 0.0,
+    }
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compara el clasificador compilado de criticidad/servicio contra la versión con any()."
+    )
+    parser.add_argument(
+        "--benchmark",
+        type=int,
+        default=1_000_000,
+        metavar="INSTRUMENTOS",
+        help="Número de instrumentos sintéticos a clasificar (por defecto 1,000,000).",
+    )
+    args = parser.parse_args(argv)
+    if args.benchmark <= 0:
+        parser.error("--benchmark debe ser mayor que cero")
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    result = run_benchmark(args.benchmark)
+    print(
+        f"{result['instrumentos']:,} instrumentos: any() {result['any_s']:.3f} s, "
+        f"compilado {result['compilado_s']:.3f} s ({result['aceleracion']:.2f}x)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    from stage_profiler import run_main
+
+    raise SystemExit(run_main(main))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Instantáneas del inventario normalizado para generar SQL incremental.
+
+`generate_insert_instrumentos.py` guarda, al terminar cada corrida con
+`--snapshot`, una huella por código de instrumento calculada sobre los valores
+ya normalizados que se emiten en el SQL. En la corrida siguiente cada código se
+clasifica como:
+
+- nuevo: no existía en la instantánea;
+- modificado: su huella cambió;
+- sin cambios: misma huella, no se vuelve a emitir;
+- eliminado: estaba en la instantánea y ya no aparece en el CSV.
+
+El SQL solo contiene los nuevos y modificados (más los catálogos que ellos
+referencian), de modo que una sincronización nocturna con pocos cambios no
+vuelve a enviar el inventario completo. La instantánea refleja lo último que se
+emitió: si un SQL generado no llega a aplicarse, hay que descartar la
+instantánea para forzar la siguiente corrida completa.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+
+try:
+    from sbl_utils import write_json_atomic
+except ImportError:  # Importado como paquete (``scripts.inventory_snapshot``)
+    from .sbl_utils import write_json_atomic
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_NAME = "instrumentos_snapshot.json"
+
+
+class InventorySnapshotError(RuntimeError):
+    """La instantánea no existe, está dañada o pertenece a otra versión."""
+
+
+def row_hash(values: Sequence[object]) -> str:
+    """Huella estable de los valores normalizados de una fila."""
+    return hashlib.blake2b(repr(tuple(values)).encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class SnapshotDiff:
+    """Clasificación de los códigos actuales frente a la instantánea previa."""
+
+    nuevos: List[str] = field(default_factory=list)
+    modificados: List[str] = field(default_factory=list)
+    sin_cambios: List[str] = field(default_factory=list)
+    eliminados: List[str] = field(default_factory=list)
+
+    @property
+    def pendientes(self) -> List[str]:
+        """Códigos que deben emitirse (nuevos y modificados)."""
+        return self.nuevos + self.modificados
+
+    def resumen(self) -> str:
+        return (
+            f"{len(self.nuevos)} nuevos, {len(self.modificados)} modificados, "
+            f"{len(self.sin_cambios)} sin cambios, {len(self.eliminados)} eliminados"
+        )
+
+
+def diff_hashes(previous: Mapping[str, str], current: Mapping[str, str]) -> SnapshotDiff:
+    """Compara dos mapas ``codigo -> huella``; cada lista sale ordenada por código."""
+    diff = SnapshotDiff()
+    for codigo in sorted(current):
+        anterior = previous.get(codigo)
+        if anterior is None:
+            diff.nuevos.append(codigo)
+        elif anterior != current[codigo]:
+            diff.modificados.append(codigo)
+        else:
+            diff.sin_cambios.append(codigo)
+    diff.eliminados = sorted(codigo for codigo in previous if codigo not in current)
+    return diff
+
+
+@dataclass
+class InventorySnapshot:
+    """Huellas por código de la última corrida emitida."""
+
+    contexto: str = ""
+    hashes: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, Sequence[object]]], contexto: str = "") -> "InventorySnapshot":
+        return cls(contexto=contexto, hashes={codigo: row_hash(values) for codigo, values in rows})
+
+    @classmethod
+    def load(cls, path: Path) -> "InventorySnapshot":
+        try:
+            with path.open(encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except FileNotFoundError as exc:
+            raise InventorySnapshotError(f"No existe la instantánea {path}") from exc
+        except (OSError, ValueError) as exc:
+            raise InventorySnapshotError(f"No se pudo leer la instantánea {path}: {exc}") from exc
+        if not isinstance(payload, dict) or payload.get("version") != SNAPSHOT_VERSION:
+            raise InventorySnapshotError(f"Versión de instantánea no soportada en {path}")
+        hashes = payload.get("hashes")
+        contexto = payload.get("contexto")
+        if not isinstance(hashes, dict) or not isinstance(contexto, str):
+            raise InventorySnapshotError(f"Instantánea dañada en {path}")
+        return cls(contexto=contexto, hashes={str(k): str(v) for k, v in hashes.items()})
+
+    def save(self, path: Path) -> Path:
+        """Escribe la instantánea de forma atómica (archivo temporal + ``os.replace``)."""
+        payload = {
+            "version": SNAPSHOT_VERSION,
+            "contexto": self.contexto,
+            "hashes": dict(sorted(self.hashes.items())),
+        }
+        return write_json_atomic(path, payload, separators=(",", ":"))
+
+    def diff(self, current: "InventorySnapshot") -> SnapshotDiff:
+        """Clasifica ``current`` contra esta instantánea.
+
+        Si el contexto cambió (otra empresa u otro formato de fila) todas las
+        filas se consideran nuevas y no se reporta ninguna como eliminada.
+        """
+        if self.contexto != current.contexto:
+            return diff_hashes({}, current.hashes)
+        return diff_hashes(self.hashes, current.hashes)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Métricas estructuradas de rendimiento por etapa (JSON lines).
+
+Complementa a ``sbl_utils.setup_logging``. Los mensajes del logger son para
+las personas. Estas métricas son para el tablero: cada etapa que termina
+escribe una línea JSON con su duración, las filas procesadas, las filas por
+segundo, el pico de memoria residente (``ru_maxrss``) y sus contadores::
+
+    metrics = setup_metrics("cert_calibration_generator")
+    with metrics.stage("carga_instrumentos") as etapa:
+        instrumentos = leer()
+        etapa.rows = len(instrumentos)
+        etapa.count("errores_validacion", errores)
+
+Las líneas se agregan al archivo indicado en ``SBL_METRICS_FILE``. El
+orquestador lo define para cada corrida y después resume el archivo con
+:func:`summarize_metrics`. Sin esa variable las métricas solo se conservan en
+``MetricsRecorder.records``.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+try:
+    import resource
+except ImportError:  # Windows: sin ru_maxrss
+    resource = None  # type: ignore[assignment]
+
+METRICS_ENV_VAR = "SBL_METRICS_FILE"
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Pico de memoria residente del proceso en MB (``None`` si no se puede medir)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KiB; macOS, bytes.
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+@dataclass
+class StageMetric:
+    """Acumulador de una etapa en curso."""
+
+    stage: str
+    rows: int = 0
+    counters: Dict[str, float] = field(default_factory=dict)
+    gauges: Dict[str, Any] = field(default_factory=dict)
+
+    def count(self, name: str, value: float = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: Any) -> None:
+        self.gauges[name] = value
+
+
+class MetricsRecorder:
+    """Registra una línea JSON por etapa terminada de un script."""
+
+    def __init__(self, script_name: str, path: Optional[Union[str, Path]] = None):
+        self.script_name = script_name
+        if path is None and os.environ.get(METRICS_ENV_VAR):
+            path = os.environ[METRICS_ENV_VAR]
+        self.path = Path(path) if path is not None else None
+        self.records: List[Dict[str, Any]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetric]:
+        """Mide la etapa ``name``; si lanza una excepción se registra con ``estado: error``."""
+        metric = StageMetric(name)
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield metric
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self.record(metric, time.perf_counter() - started, status)
+
+    def record(self, metric: StageMetric, seconds: float, status: str = "ok") -> Dict[str, Any]:
+        record = {
+            "ts": dt.datetime.now().isoformat(timespec="seconds"),
+            "script": self.script_name,
+            "pid": os.getpid(),
+            "etapa": metric.stage,
+            "estado": status,
+            "duracion_s": round(seconds, 6),
+            "filas": metric.rows,
+            "filas_por_s": round(metric.rows / seconds, 1) if metric.rows and seconds > 0 else None,
+            "pico_rss_mb": peak_rss_mb(),
+            "contadores": metric.counters,
+            "medidas": metric.gauges,
+        }
+        self.records.append(record)
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Una sola escritura en modo append por línea: varios procesos
+            # pueden compartir el archivo de la corrida.
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return record
+
+
+_RECORDERS: Dict[str, MetricsRecorder] = {}
+
+
+def setup_metrics(script_name: str, path: Optional[Union[str, Path]] = None) -> MetricsRecorder:
+    """Devuelve (y comparte) el registro de métricas de ``script_name``."""
+    recorder = _RECORDERS.get(script_name)
+    if recorder is None or (path is not None and recorder.path != Path(path)):
+        recorder = _RECORDERS[script_name] = MetricsRecorder(script_name, path)
+    return recorder
+
+
+def read_metrics(path: Path) -> List[Dict[str, Any]]:
+    """Lee un archivo JSON lines de métricas; las líneas dañadas se omiten."""
+    records = []
+    try:
+        with path.open(encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and "etapa" in record:
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def summarize_metrics(records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Agrega las líneas por ``script/etapa``: totales, filas por segundo y pico de memoria."""
+    summary: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        key = f"{record.get('script', '?')}/{record['etapa']}"
+        entry = summary.setdefault(key, {
+            "ejecuciones": 0,
+            "errores": 0,
+            "duracion_s": 0.0,
+            "filas": 0,
+            "filas_por_s": None,
+            "pico_rss_mb": None,
+            "contadores": {},
+        })
+        entry["ejecuciones"] += 1
+        entry["errores"] += record.get("estado") == "error"
+        entry["duracion_s"] = round(entry["duracion_s"] + float(record.get("duracion_s") or 0), 6)
+        entry["filas"] += int(record.get("filas") or 0)
+        peak = record.get("pico_rss_mb")
+        if peak is not None:
+            entry["pico_rss_mb"] = max(entry["pico_rss_mb"] or 0, peak)
+        for name, value in (record.get("contadores") or {}).items():
+            entry["contadores"][name] = entry["contadores"].get(name, 0) + value
+    for entry in summary.values():
+        if entry["filas"] and entry["duracion_s"] > 0:
+            entry["filas_por_s"] = round(entry["filas"] / entry["duracion_s"], 1)
+    return summary
@@ -5,6 +5,7 @@ Este script orquesta la ejecución de todos los componentes específicos del por
 - Validación de datos de clientes
 - Normalización de archivos CSV de servicios
 - Generación de SQL de inserción para clientes
+- Audit trail e historiales de instrumentos en una sola pasada
 - Generación de reportes de auditoría por cliente
 - Limpieza y mantenimiento del portal
 
@@ -14,11 +15,23 @@ Características:
 - Opciones para ejecutar solo partes específicas
 - Generación de reportes de resumen
 - Verificación de prerrequisitos del portal
+- Perfilado opcional de cada script (``--profile``/``--trace-malloc``)
+- Métricas de rendimiento por etapa (JSON lines) agregadas en el resumen
 
 Uso:
 ```bash
 python tools/scripts/run_all_processes.py --full --backup
+python tools/scripts/run_all_processes.py --full --profile --trace-malloc
 ```
+
+Con perfilado, cada script deja su ``.prof``, sus pilas colapsadas
+(``.collapsed``) y un resumen en
+``storage/client_process_runs/profiles_<fecha>/<script>/``; el resumen se
+incluye en ``process_results`` del log JSON.
+
+Cada script escribe sus métricas por etapa (duración, filas por segundo, pico
+de RSS, contadores) en ``client_portal_metrics_<fecha>.jsonl`` a través de
+``SBL_METRICS_FILE``; el log JSON y el resumen Markdown las agregan.
 """
 
 from __future__ import annotations
@@ -30,26 +43,35 @@ import sys
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 import json
+import os
 
+from pipeline_metrics import METRICS_ENV_VAR, read_metrics, summarize_metrics
 from sbl_utils import setup_logging, get_repo_root
+from stage_profiler import load_profile_summary
 
 class SBLClientPortalOrchestrator:
     """Orquestador principal del portal de servicios a clientes SBL."""
     
-    def __init__(self, empresa_id: int = 1, backup: bool = False):
+    def __init__(self, empresa_id: int = 1, backup: bool = False, profile: bool = False, trace_malloc: bool = False):
         self.empresa_id = empresa_id
         self.backup = backup
+        self.profile = profile
+        self.trace_malloc = trace_malloc
         self.repo_root = get_repo_root(__file__)
         self.logger = setup_logging("sbl_client_portal_orchestrator")
         
         # Directorios
         self.tools_dir = self.repo_root / "tools" / "scripts"
+        self.normalize_dir = self.repo_root / "app" / "Modules" / "Internal" / "ArchivosSql" / "Normalize_Python"
         self.output_dir = self.repo_root / "storage" / "client_process_runs"
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Estado del proceso
         self.process_results: Dict[str, Any] = {}
         self.start_time = dt.datetime.now()
+        self.profile_dir = self.output_dir / f"profiles_{self.start_time.strftime('%Y%m%d_%H%M%S')}"
+        self.metrics_file = self.output_dir / f"client_portal_metrics_{self.start_time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+        self._metrics_read = 0
         
         # Scripts disponibles específicos para el portal de clientes
         self.available_scripts = {
@@ -59,6 +81,8 @@ class SBLClientPortalOrchestrator:
             'generate_cert_calibrations': 'generate_cert_calibrations.py',
             'generate_insert_instrumentos': 'generate_insert_instrumentos.py',
             'generate_plan_riesgos': 'generate_plan_riesgos.py',
+            # Ruta absoluta: ``self.tools_dir / script_file`` la respeta tal cual.
+            'audit_trail_historiales': str(self.normalize_dir / 'convert_audit_trail_csv.py'),
         }
     
     def check_prerequisites(self) -> bool:
@@ -138,6 +162,15 @@ class SBLClientPortalOrchestrator:
             if '--empresa-id' not in (args or []):
                 cmd.extend(['--empresa-id', str(self.empresa_id)])
         
+        # Perfilado por script
+        profile_dir = self.profile_dir / script_key
+        if self.profile or self.trace_malloc:
+            if self.profile:
+                cmd.append('--profile')
+            if self.trace_malloc:
+                cmd.append('--trace-malloc')
+            cmd.extend(['--profile-dir', str(profile_dir)])
+        
         try:
             # Ejecutar script
             start_time = dt.datetime.now()
@@ -146,7 +179,8 @@ class SBLClientPortalOrchestrator:
                 capture_output=True, 
                 text=True, 
                 check=True,
-                cwd=self.repo_root
+                cwd=self.repo_root,
+                env={**os.environ, METRICS_ENV_VAR: str(self.metrics_file)}
             )
             
             end_time = dt.datetime.now()
@@ -160,6 +194,8 @@ class SBLClientPortalOrchestrator:
                 'stderr': result.stderr,
                 'timestamp': end_time.isoformat()
             }
+            self._attach_profile(script_key, profile_dir)
+            self._attach_metrics(script_key)
             
             self.logger.info(f"✅ {script_file} completado en {duration:.1f}s")
             
@@ -183,6 +219,8 @@ class SBLClientPortalOrchestrator:
                 'return_code': e.returncode,
                 'timestamp': end_time.isoformat()
             }
+            self._attach_profile(script_key, profile_dir)
+            self._attach_metrics(script_key)
             
             message = f"❌ Error en {script_file} (código: {e.returncode})"
             if required:
@@ -210,6 +248,32 @@ class SBLClientPortalOrchestrator:
                 self.logger.warning(message)
                 return True
     
+    def _attach_profile(self, script_key: str, profile_dir: Path) -> None:
+        """Agrega al resultado del script el resumen de perfilado que dejó."""
+        if not (self.profile or self.trace_malloc):
+            return
+        summary = load_profile_summary(profile_dir, Path(self.available_scripts[script_key]).stem)
+        if summary is None:
+            self.logger.warning(f"{script_key} no dejó resumen de perfilado en {profile_dir}")
+            return
+        summary['directorio'] = str(profile_dir.relative_to(self.repo_root))
+        self.process_results[script_key]['profile'] = summary
+        memoria = summary.get('tracemalloc', {}).get('pico_mb')
+        if memoria is not None:
+            self.logger.info(f"  Pico de memoria (tracemalloc): {memoria:.1f} MB")
+    
+    def _attach_metrics(self, script_key: str) -> None:
+        """Agrega al resultado del script las métricas por etapa que escribió."""
+        records = read_metrics(self.metrics_file)
+        new_records, self._metrics_read = records[self._metrics_read:], len(records)
+        if not new_records:
+            return
+        metrics = summarize_metrics(new_records)
+        self.process_results[script_key]['metrics'] = metrics
+        for stage, entry in metrics.items():
+            if entry['filas_por_s']:
+                self.logger.info(f"  {stage}: {entry['filas']} filas, {entry['filas_por_s']:.0f} filas/s")
+    
     def run_setup_process(self) -> bool:
         """Ejecuta el proceso de configuración inicial del portal."""
         self.logger.info("🚀 Iniciando configuración del portal de servicios...")
@@ -238,8 +302,9 @@ class SBLClientPortalOrchestrator:
         
         success = True
         
-        # Generar calibraciones de certificados (importante para clientes)
-        if not self.run_script('generate_cert_calibrations', [], required=True):
+        # Generar calibraciones de certificados (importante para clientes); el
+        # modo histórico convierte la hoja CERT, como hasta ahora
+        if not self.run_script('generate_cert_calibrations', ['--historical'], required=True):
             self.logger.error("Generación de calibraciones crítica para servicios a clientes")
             success = False
         
@@ -252,6 +317,10 @@ class SBLClientPortalOrchestrator:
         if not self.run_script('generate_plan_riesgos', [], required=False):
             self.logger.warning("Generación de plan de riesgos falló")
         
+        # Audit trail e historiales en una sola lectura del CSV crudo
+        if not self.run_script('audit_trail_historiales', ['--historiales'], required=False):
+            self.logger.warning("Normalización del audit trail e historiales falló")
+        
         return success
     
     def run_client_reporting_process(self) -> bool:
@@ -378,6 +447,18 @@ class SBLClientPortalOrchestrator:
                     f.write(f"- **Estado:** {result['status'].upper()}\n")
                     f.write(f"- **Duración:** {result.get('duration', 0):.1f} segundos\n\n")
             
+            # Métricas de rendimiento por etapa
+            metrics = summarize_metrics(read_metrics(self.metrics_file))
+            if metrics:
+                f.write("## MÉTRICAS DE RENDIMIENTO\n\n")
+                f.write("| Etapa | Duración (s) | Filas | Filas/s | Pico RSS (MB) |\n")
+                f.write("|---|---:|---:|---:|---:|\n")
+                for stage, entry in metrics.items():
+                    rate = f"{entry['filas_por_s']:.0f}" if entry['filas_por_s'] else "-"
+                    peak = f"{entry['pico_rss_mb']:.1f}" if entry['pico_rss_mb'] is not None else "-"
+                    f.write(f"| {stage} | {entry['duracion_s']:.2f} | {entry['filas']} | {rate} | {peak} |\n")
+                f.write(f"\nDetalle por etapa: `{self.metrics_file.name}`\n\n")
+            
             # Recomendaciones específicas
             f.write("## RECOMENDACIONES PARA EL PORTAL\n\n")
             
@@ -492,7 +573,11 @@ class SBLClientPortalOrchestrator:
                 'working_directory': str(self.repo_root),
                 'scripts_executed': len(self.process_results)
             },
-            'process_results': self.process_results
+            'process_results': self.process_results,
+            'metrics': {
+                'file': self.metrics_file.name,
+                'stages': summarize_metrics(read_metrics(self.metrics_file))
+            }
         }
         
         with open(log_file, 'w', encoding='utf-8') as f:
@@ -539,6 +624,18 @@ Ejemplos de uso para Portal de Clientes:
         help="Crear copias de seguridad antes de procesar"
     )
     
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Perfilar cada script con cProfile (pstats y pilas colapsadas)"
+    )
+    
+    parser.add_argument(
+        "--trace-malloc",
+        action="store_true",
+        help="Registrar con tracemalloc el pico de memoria y los sitios de asignación de cada script"
+    )
+    
     args = parser.parse_args()
     
     # Validar argumentos
@@ -548,7 +645,9 @@ Ejemplos de uso para Portal de Clientes:
     # Crear orquestador del portal
     orchestrator = SBLClientPortalOrchestrator(
         empresa_id=args.empresa_id,
-        backup=args.backup
+        backup=args.backup,
+        profile=args.profile,
+        trace_malloc=args.trace_malloc
     )
     
     # Ejecutar proceso del portal
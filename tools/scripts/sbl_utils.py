@@ -7,23 +7,262 @@ Funcionalidades:
 - Normalización de texto y datos
 - Manejo de fechas en español
 - Validación de datos
-- Logging configurado
+- Logging configurado (opcionalmente en cola, con límite de mensajes repetidos)
 - Manejo de archivos CSV con diferentes encodings
+- Escritura de SQL por bloques (streaming) con compresión opcional
+- Lectura y escritura transparente de archivos comprimidos (.gz / .zst)
+- Escaneo de CSV grandes con mmap proyectando solo las columnas necesarias
+- Lectura de CSV grandes en paralelo por rangos de bytes
+- Importación diferida de dependencias pesadas (pandas, openpyxl, chardet...)
+- Escritura atómica de archivos JSON de estado (instantáneas, agendas, contadores)
 """
 
 from __future__ import annotations
 
 import csv
 import datetime as dt
+import argparse
+import functools
+import gzip
+import importlib
+import importlib.util
+import io
+import json
 import logging
+import mmap
+import operator
+import os
 import re
 import unicodedata
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from types import ModuleType
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+
+
+# Dependencias opcionales: se importan hasta el primer uso real
+@functools.lru_cache(maxsize=None)
+def module_available(name: str) -> bool:
+    """Indica si ``name`` puede importarse, sin importarlo (``find_spec``)."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule(ModuleType):
+    """Proxy de un módulo que se importa al acceder al primer atributo."""
+
+    def __init__(self, name: str, install_hint: Optional[str] = None):
+        super().__init__(name)
+        self._lazy_install_hint = install_hint
+        self._lazy_module: Optional[ModuleType] = None
+
+    @property
+    def available(self) -> bool:
+        return self._lazy_module is not None or module_available(self.__name__)
+
+    def load(self) -> ModuleType:
+        if self._lazy_module is None:
+            try:
+                self._lazy_module = importlib.import_module(self.__name__)
+            except ImportError as exc:
+                if self._lazy_install_hint:
+                    raise ImportError(
+                        f"Se requiere '{self.__name__}': {self._lazy_install_hint}"
+                    ) from exc
+                raise
+        return self._lazy_module
+
+    def __getattr__(self, attribute: str) -> Any:
+        if attribute.startswith('_lazy_'):
+            raise AttributeError(attribute)
+        return getattr(self.load(), attribute)
+
+    def __repr__(self) -> str:
+        state = 'cargado' if self._lazy_module is not None else 'diferido'
+        return f"<LazyModule {self.__name__!r} ({state})>"
+
+
+_LAZY_MODULES: Dict[str, LazyModule] = {}
+
+
+def lazy_import(name: str, install_hint: Optional[str] = None) -> LazyModule:
+    """Devuelve (y comparte) el proxy diferido del módulo ``name``."""
+    if name not in _LAZY_MODULES:
+        _LAZY_MODULES[name] = LazyModule(name, install_hint)
+    return _LAZY_MODULES[name]
+
+
+zstandard = lazy_import('zstandard', 'pip install zstandard')
+chardet = lazy_import('chardet', 'pip install chardet')
 
 # Configuración de logging
-def setup_logging(script_name: str, log_level: int = logging.INFO) -> logging.Logger:
-    """Configura el sistema de logging para un script."""
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Mensajes por sitio de llamada (archivo:línea) antes de suprimir repeticiones
+LOG_REPEAT_LIMIT = 20
+
+
+class RepeatedMessageFilter(logging.Filter):
+    """Limita los mensajes repetidos de un mismo sitio de llamada.
+
+    Los scripts registran errores por fila con f-strings, así que el texto cambia
+    en cada fila; la repetición se reconoce por nivel, archivo y línea. Tras
+    ``limit`` mensajes de un sitio, el resto solo se cuenta, y :meth:`summary`
+    devuelve cuántos se suprimieron junto con el último de ellos.
+    """
+
+    def __init__(self, limit: int = LOG_REPEAT_LIMIT):
+        super().__init__()
+        self.limit = limit
+        self.seen: Dict[Tuple[int, str, int], int] = {}
+        self.last_suppressed: Dict[Tuple[int, str, int], logging.LogRecord] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, 'sbl_resumen', False):
+            return True
+        key = (record.levelno, record.pathname, record.lineno)
+        count = self.seen.get(key, 0) + 1
+        self.seen[key] = count
+        if count <= self.limit:
+            return True
+        self.last_suppressed[key] = record
+        return False
+
+    def summary(self) -> List[Tuple[int, str, int, int, str]]:
+        """``(nivel, archivo, línea, suprimidos, último mensaje)`` por sitio."""
+        return [
+            (level, pathname, lineno, self.seen[(level, pathname, lineno)] - self.limit, record.getMessage())
+            for (level, pathname, lineno), record in self.last_suppressed.items()
+        ]
+
+    def reset(self) -> None:
+        self.seen.clear()
+        self.last_suppressed.clear()
+
+
+class _DeferredQueueHandler(logging.Handler):
+    """``QueueHandler`` que deja el formateo al hilo del listener.
+
+    ``logging.handlers.QueueHandler.prepare`` formatea el mensaje en el hilo que
+    registra; aquí solo se encola el registro (salvo con ``exc_info``, cuyo
+    traceback debe resolverse antes de salir del ``except``).
+    """
+
+    def __init__(self, queue):
+        super().__init__()
+        self.queue = queue
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if record.exc_info:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+                record.exc_info = None
+            self.queue.put_nowait(record)
+        except Exception:
+            self.handleError(record)
+
+
+class _QueueLogging:
+    """Cola, handler de consola y listener de un logger en modo ``queued``."""
+
+    def __init__(self, name: str, handler: _DeferredQueueHandler, output: logging.Handler):
+        self.name = name
+        self.handler = handler
+        self.output = output
+        self.listener: Any = None
+        self.repeat_filter: Optional[RepeatedMessageFilter] = None
+
+    def start(self) -> None:
+        import logging.handlers
+
+        self.listener = logging.handlers.QueueListener(self.handler.queue, self.output, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def shutdown(self) -> None:
+        """Resume los suprimidos y vacía la cola (al salir del proceso)."""
+        _log_suppressed(logging.getLogger(self.name), self.repeat_filter)
+        self.stop()
+
+
+_QUEUE_LOGGING: Dict[str, _QueueLogging] = {}
+
+
+def _log_suppressed(logger: logging.Logger, repeat_filter: Optional[RepeatedMessageFilter]) -> None:
+    if repeat_filter is None:
+        return
+    for level, pathname, lineno, suppressed, last_message in repeat_filter.summary():
+        logger.log(
+            level,
+            "%d mensajes repetidos suprimidos de %s:%d (último: %s)",
+            suppressed, Path(pathname).name, lineno, last_message,
+            extra={'sbl_resumen': True},
+        )
+    repeat_filter.reset()
+
+
+def flush_logging(script_name: str) -> None:
+    """Registra el resumen de suprimidos y vacía la cola del logger ``script_name``.
+
+    En modo ``queued`` el listener se reinicia, así que el logger puede seguir
+    usándose (por ejemplo, en un proceso que atiende varios fragmentos).
+    """
+    logger = logging.getLogger(script_name)
+    for handler in logger.handlers:
+        for log_filter in handler.filters:
+            if isinstance(log_filter, RepeatedMessageFilter):
+                _log_suppressed(logger, log_filter)
+    state = _QUEUE_LOGGING.get(script_name)
+    if state is not None and state.listener is not None:
+        state.stop()
+        state.start()
+
+
+def _shutdown_queue_logging() -> None:
+    for state in _QUEUE_LOGGING.values():
+        state.shutdown()
+
+
+def _restart_listeners_after_fork() -> None:
+    # El hijo de un fork no hereda el hilo del listener; usa una cola nueva. Los
+    # mensajes suprimidos hasta el fork ya los resume el proceso padre.
+    import queue
+
+    for state in _QUEUE_LOGGING.values():
+        if state.repeat_filter is not None:
+            state.repeat_filter.reset()
+        if state.listener is not None:
+            state.handler.queue = queue.SimpleQueue()
+            state.start()
+
+
+def _finalize_in_child(state: _QueueLogging) -> None:
+    # Los procesos de multiprocessing terminan con os._exit (sin atexit), pero
+    # ejecutan sus finalizadores antes de salir.
+    import multiprocessing.util
+
+    multiprocessing.util.Finalize(state, state.shutdown, exitpriority=10)
+
+
+def setup_logging(
+    script_name: str,
+    log_level: int = logging.INFO,
+    queued: bool = False,
+    repeat_limit: Optional[int] = None,
+) -> logging.Logger:
+    """Configura el sistema de logging para un script.
+
+    Con ``queued=True`` el logger solo encola los registros (``QueueHandler``)
+    y un hilo ``QueueListener`` los formatea y escribe en consola, de modo que
+    los bucles por fila no esperan a la E/S. Con ``repeat_limit`` cada sitio de
+    llamada emite como máximo ese número de mensajes; los suprimidos se
+    resumen en :func:`flush_logging` y al terminar el proceso.
+    """
     logger = logging.getLogger(script_name)
     logger.setLevel(log_level)
     
@@ -36,12 +275,37 @@ def setup_logging(script_name: str, log_level: int = logging.INFO) -> logging.Lo
     console_handler.setLevel(log_level)
     
     # Formato de los mensajes
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    formatter = logging.Formatter(LOG_FORMAT)
     console_handler.setFormatter(formatter)
     
-    logger.addHandler(console_handler)
+    handler: logging.Handler = console_handler
+    state: Optional[_QueueLogging] = None
+    if queued:
+        import atexit
+        import multiprocessing.util
+        import queue
+
+        if not _QUEUE_LOGGING:
+            atexit.register(_shutdown_queue_logging)
+            if hasattr(os, 'register_at_fork'):
+                os.register_at_fork(after_in_child=_restart_listeners_after_fork)
+        handler = _DeferredQueueHandler(queue.SimpleQueue())
+        handler.setLevel(log_level)
+        state = _QUEUE_LOGGING[script_name] = _QueueLogging(script_name, handler, console_handler)
+        state.start()
+        multiprocessing.util.register_after_fork(state, _finalize_in_child)
+    
+    if repeat_limit is not None:
+        repeat_filter = RepeatedMessageFilter(repeat_limit)
+        handler.addFilter(repeat_filter)
+        if state is not None:
+            state.repeat_filter = repeat_filter
+        else:
+            import atexit
+
+            atexit.register(_log_suppressed, logger, repeat_filter)
+    
+    logger.addHandler(handler)
     return logger
 
 # Constantes para normalización
@@ -183,24 +447,478 @@ class DateParser:
         return dt.date(year, month, day)
 
 
+# Compresión de artefactos: el formato se deduce del sufijo del archivo
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+
+def detect_compression(file_path: Union[str, Path]) -> Optional[str]:
+    """Devuelve 'gzip', 'zstd' o None según el sufijo del archivo."""
+    suffix = Path(file_path).suffix.lower()
+    for compression, compression_suffix in COMPRESSION_SUFFIXES.items():
+        if suffix == compression_suffix:
+            return compression
+    return None
+
+
+def with_compression_suffix(file_path: Path, compression: Optional[str]) -> Path:
+    """Agrega el sufijo de ``compression`` si la ruta aún no lo tiene.
+
+    Si la ruta ya termina en el sufijo de otra compresión (``.zst`` con
+    ``'gzip'``), ese sufijo se reemplaza en lugar de encadenar ``.zst.gz``.
+    """
+    current = detect_compression(file_path)
+    if not compression or current == compression:
+        return file_path
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Compresión no soportada: {compression}")
+    if current is not None:
+        file_path = file_path.with_suffix('')
+    return file_path.with_name(file_path.name + COMPRESSION_SUFFIXES[compression])
+
+
+def open_binary(
+    file_path: Union[str, Path],
+    mode: str = 'rb',
+    compression: Optional[str] = None,
+) -> IO[bytes]:
+    """Abre un archivo en modo binario descomprimiendo/comprimiendo al vuelo."""
+    if compression is None:
+        compression = detect_compression(file_path)
+    if compression == 'gzip':
+        return gzip.open(file_path, mode)
+    if compression == 'zstd':
+        return zstandard.open(file_path, mode)
+    if compression is not None:
+        raise ValueError(f"Compresión no soportada: {compression}")
+    return open(file_path, mode)
+
+
+def open_text(
+    file_path: Union[str, Path],
+    mode: str = 'r',
+    encoding: str = 'utf-8',
+    newline: Optional[str] = '',
+    compression: Optional[str] = None,
+) -> TextIO:
+    """Abre un archivo de texto, comprimido o no, con la misma interfaz que ``open``."""
+    binary_mode = mode.replace('t', '').replace('b', '') + 'b'
+    if binary_mode.startswith(('w', 'a', 'x')):
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+    if compression is None:
+        compression = detect_compression(file_path)
+    if compression is None:
+        return open(file_path, mode.replace('b', ''), encoding=encoding, newline=newline)
+    return io.TextIOWrapper(
+        open_binary(file_path, binary_mode, compression),
+        encoding=encoding,
+        newline=newline,
+    )
+
+
+def add_compression_argument(parser: argparse.ArgumentParser) -> None:
+    """Agrega ``--compress {gzip,zstd}`` a un parser de generador."""
+    parser.add_argument(
+        "--compress",
+        choices=sorted(COMPRESSION_SUFFIXES),
+        default=None,
+        help=(
+            "Comprime los archivos generados (agrega .gz o .zst a la ruta). "
+            "Las rutas que ya terminan en .gz/.zst se comprimen automáticamente."
+        ),
+    )
+
+
+# Estado persistente entre corridas: se escribe en ``<nombre>.tmp`` y se
+# reemplaza de una vez, así un lector nunca ve un JSON a medias
+def write_json_atomic(path: Path, payload: Any, *, fsync: bool = False, **dump_kwargs: Any) -> Path:
+    """Escribe ``payload`` como JSON en ``path`` (archivo temporal + ``os.replace``).
+
+    ``dump_kwargs`` se pasan a ``json.dump`` (``ensure_ascii`` es ``False`` por
+    defecto). Con ``fsync`` el contenido llega a disco antes del reemplazo.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    dump_kwargs.setdefault("ensure_ascii", False)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump(payload, handle, **dump_kwargs)
+        handle.write("\n")
+        if fsync:
+            handle.flush()
+            os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+# Escaneo de CSV grandes: límites de registro sobre mmap y columnas proyectadas
+def iter_csv_record_spans(
+    buffer: Union[bytes, mmap.mmap],
+    start: int = 0,
+    end: Optional[int] = None,
+) -> Iterator[Tuple[int, int]]:
+    """Genera ``(offset, longitud)`` de cada registro CSV entre ``start`` y ``end``.
+
+    Un salto de línea dentro de una celda entrecomillada no cierra el registro;
+    las comillas escapadas (``""``) se compensan solas. ``start`` debe caer al
+    inicio de un registro.
+    """
+    size = len(buffer) if end is None else end
+    record_start = position = start
+    while position < size:
+        newline = buffer.find(b"\n", position, size)
+        quote = buffer.find(b'"', position, size if newline == -1 else newline)
+        if quote != -1:
+            close = buffer.find(b'"', quote + 1, size)
+            position = size if close == -1 else close + 1
+            continue
+        if newline == -1:
+            break
+        position = newline + 1
+        yield record_start, position - record_start
+        record_start = position
+    if record_start < size:
+        yield record_start, size - record_start
+
+
+def _decode_csv_record(raw: bytes, encoding: str) -> List[str]:
+    return next(csv.reader(io.StringIO(raw.decode(encoding), newline="")), [])
+
+
+class CSVColumnProjection:
+    """Convierte registros crudos en tuplas con las columnas pedidas.
+
+    Las columnas que no existen en el encabezado (o que faltan en una fila
+    corta) valen ``None``, igual que con ``csv.DictReader``. Si el nombre se
+    repite en el encabezado gana la última columna, también como en
+    ``DictReader``.
+    """
+
+    def __init__(self, header: Sequence[str], columns: Sequence[str], encoding: str = "utf-8"):
+        names = list(header)
+        if names:
+            names[0] = names[0].lstrip("\ufeff")
+        index_by_name = {name: index for index, name in enumerate(names)}
+        self.header = names
+        self.columns = tuple(columns)
+        self.indexes = tuple(index_by_name.get(column) for column in self.columns)
+        present = [index for index in self.indexes if index is not None]
+        # Las filas se cortan hasta la última columna pedida; las ausentes
+        # apuntan al centinela ``None`` que se agrega al final de la lista.
+        self.width = max(present) + 1 if present else 0
+        positions = [-1 if index is None else index for index in self.indexes]
+        if not positions:
+            self._getter = lambda values: ()
+        elif len(positions) == 1:
+            position = positions[0]
+            self._getter = lambda values: (values[position],)
+        else:
+            self._getter = operator.itemgetter(*positions)
+        self.encoding = encoding
+
+    def from_values(self, values: List[Optional[str]]) -> Tuple[Optional[str], ...]:
+        missing = self.width - len(values)
+        if missing > 0:
+            values = values + [None] * missing
+        values.append(None)
+        return self._getter(values)
+
+    def from_bytes(self, raw: bytes) -> Optional[Tuple[Optional[str], ...]]:
+        """Tupla del registro o ``None`` si es una línea en blanco."""
+        text = str(raw, self.encoding)
+        if text.endswith("\n"):
+            text = text[:-2] if text.endswith("\r\n") else text[:-1]
+        if not text:
+            return None
+        if '"' in text:
+            values = next(csv.reader((text,)))
+        elif "\r" in text:
+            values = next(csv.reader(io.StringIO(text, newline="")))
+        else:
+            # Sin comillas basta con cortar en las comas hasta la última
+            # columna pedida; el resto de la fila no se divide.
+            values = text.split(",", self.width)
+        if len(values) < self.width:
+            return self.from_values(values)
+        values.append(None)
+        return self._getter(values)
+
+
+def scan_csv_columns(
+    file_path: Union[str, Path],
+    columns: Sequence[str],
+    encoding: str = "utf-8",
+) -> Iterator[Tuple[Optional[str], ...]]:
+    """Recorre un CSV y genera, por fila de datos, una tupla con ``columns``.
+
+    Los archivos sin comprimir se leen con ``mmap``: se ubican los límites de
+    cada registro (respetando celdas multilínea) y solo se decodifican las
+    columnas proyectadas, sin armar un ``dict`` por fila. Los comprimidos
+    (.gz / .zst) se leen con ``csv.reader`` y producen las mismas tuplas. Las
+    líneas en blanco se omiten, como en ``csv.DictReader``, de modo que
+    ``enumerate`` conserva la numeración de los lectores anteriores.
+    """
+    if detect_compression(file_path) is not None:
+        with open_text(file_path, encoding=encoding) as handle:
+            reader = csv.reader(handle)
+            header = next(reader, None)
+            if header is None:
+                return
+            projection = CSVColumnProjection(header, columns, encoding)
+            for values in reader:
+                if values:
+                    yield projection.from_values(values)
+        return
+
+    with open(file_path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            spans = iter_csv_record_spans(buffer)
+            header_span = next(spans, None)
+            if header_span is None:
+                return
+            offset, length = header_span
+            projection = CSVColumnProjection(
+                _decode_csv_record(buffer[offset:offset + length], encoding), columns, encoding
+            )
+            project = projection.from_bytes
+            for offset, length in spans:
+                values = project(buffer[offset:offset + length])
+                if values is not None:
+                    yield values
+
+
+# Lectura paralela: el archivo se corta en rangos de bytes que empiezan y
+# terminan en un límite de registro; cada rango se analiza en un proceso.
+DEFAULT_CSV_CHUNK_BYTES = 4 * 1024 * 1024
+_QUOTE_COUNT_BLOCK = 16 * 1024 * 1024
+
+
+def _count_quotes(buffer: Union[bytes, mmap.mmap], start: int, end: int) -> int:
+    total = 0
+    for block in range(start, end, _QUOTE_COUNT_BLOCK):
+        total += buffer[block:min(block + _QUOTE_COUNT_BLOCK, end)].count(b'"')
+    return total
+
+
+def _next_record_start(buffer: Union[bytes, mmap.mmap], position: int, in_quotes: bool) -> int:
+    """Primer inicio de registro en o después de ``position``.
+
+    ``in_quotes`` indica si ``position`` cae dentro de una celda entrecomillada
+    (número impar de comillas desde el último límite conocido).
+    """
+    size = len(buffer)
+    while position < size:
+        if in_quotes:
+            close = buffer.find(b'"', position)
+            if close == -1:
+                return size
+            position = close + 1
+            in_quotes = False
+            continue
+        newline = buffer.find(b"\n", position)
+        if newline == -1:
+            return size
+        quote = buffer.find(b'"', position, newline)
+        if quote != -1:
+            position = quote + 1
+            in_quotes = True
+            continue
+        return newline + 1
+    return size
+
+
+def csv_byte_ranges(
+    buffer: Union[bytes, mmap.mmap],
+    start: int,
+    chunk_bytes: int = DEFAULT_CSV_CHUNK_BYTES,
+) -> List[Tuple[int, int]]:
+    """Corta ``buffer[start:]`` en rangos de ~``chunk_bytes`` alineados a registros.
+
+    Cada corte se resincroniza con la paridad de comillas acumulada desde el
+    corte anterior: si es impar, el punto cae dentro de una celda
+    entrecomillada (que puede contener saltos de línea) y el registro termina
+    después de cerrarla. ``start`` debe ser el inicio de un registro.
+    """
+    size = len(buffer)
+    ranges: List[Tuple[int, int]] = []
+    boundary = start
+    while boundary < size:
+        target = boundary + max(chunk_bytes, 1)
+        if target >= size:
+            ranges.append((boundary, size))
+            break
+        in_quotes = _count_quotes(buffer, boundary, target) % 2 == 1
+        end = _next_record_start(buffer, target, in_quotes)
+        ranges.append((boundary, end))
+        boundary = end
+    return ranges
+
+
+@dataclass
+class CSVChunk:
+    """Filas de un rango del CSV, en orden, con su numeración original.
+
+    ``first_row`` es el número de la primera fila del rango contando el
+    encabezado como fila 1 y omitiendo las líneas en blanco, igual que
+    ``enumerate(csv.DictReader(...), start=2)``.
+    """
+
+    index: int
+    start: int
+    end: int
+    first_row: int
+    rows: List[Any]
+
+    def numbered(self) -> Iterator[Tuple[int, Any]]:
+        return enumerate(self.rows, start=self.first_row)
+
+
+def _dict_row(header: Sequence[str], values: List[str]) -> Dict[Optional[str], Any]:
+    """Fila como la arma ``csv.DictReader`` (restkey/restval en ``None``)."""
+    row: Dict[Optional[str], Any] = dict(zip(header, values))
+    width = len(header)
+    if width < len(values):
+        row[None] = values[width:]
+    elif width > len(values):
+        for name in header[len(values):]:
+            row[name] = None
+    return row
+
+
+def _parse_csv_range(
+    file_path: str,
+    start: int,
+    end: int,
+    header: List[str],
+    columns: Optional[Sequence[str]],
+    as_dicts: bool,
+    transform: Optional[Callable[[List[Any]], List[Any]]],
+    encoding: str,
+    delimiter: str,
+) -> List[Any]:
+    """Analiza ``[start, end)``; se ejecuta en los procesos del pool."""
+    with open(file_path, "rb") as handle:
+        handle.seek(start)
+        text = handle.read(end - start).decode(encoding)
+    reader = csv.reader(io.StringIO(text, newline=""), delimiter=delimiter)
+    if columns is not None:
+        project = CSVColumnProjection(header, columns, encoding).from_values
+        rows: List[Any] = [project(values) for values in reader if values]
+    elif as_dicts:
+        rows = [_dict_row(header, values) for values in reader if values]
+    else:
+        rows = [values for values in reader if values]
+    if transform is not None:
+        transformed = transform(rows)
+        if len(transformed) != len(rows):
+            raise ValueError("transform debe devolver un elemento por fila para conservar la numeración")
+        rows = transformed
+    return rows
+
+
+def _parse_csv_range_job(job: Tuple[Any, ...]) -> List[Any]:
+    return _parse_csv_range(*job)
+
+
+def splittable_encoding(encoding: str) -> bool:
+    """Indica si en ``encoding`` el salto de línea y las comillas ocupan un byte propio.
+
+    Es la condición para cortar el archivo por bytes (UTF-8, Latin-1, cp1252...;
+    no UTF-16).
+    """
+    try:
+        return b'\n"'.decode(encoding) == '\n"'
+    except (LookupError, UnicodeDecodeError):
+        return False
+
+
+def read_csv_parallel(
+    file_path: Union[str, Path],
+    *,
+    columns: Optional[Sequence[str]] = None,
+    as_dicts: bool = False,
+    transform: Optional[Callable[[List[Any]], List[Any]]] = None,
+    workers: int = 1,
+    chunk_bytes: int = DEFAULT_CSV_CHUNK_BYTES,
+    encoding: str = "utf-8",
+    delimiter: str = ",",
+) -> Iterator[CSVChunk]:
+    """Lee un CSV sin comprimir por rangos de bytes en un pool de procesos.
+
+    Los rangos se entregan en orden y cada :class:`CSVChunk` trae el número
+    original de su primera fila, de modo que los reportes de validación y
+    ``row_position`` no cambian. Las filas son listas, tuplas de ``columns``
+    (como :func:`scan_csv_columns`) o diccionarios con ``as_dicts``.
+
+    ``transform`` (una función de módulo, para poder enviarla a los procesos)
+    recibe las filas de cada rango y debe devolver un elemento por fila; así
+    la conversión de valores también se reparte entre los procesos. Con
+    ``workers=1`` o un solo rango todo se ejecuta en el proceso actual.
+    """
+    if detect_compression(file_path) is not None:
+        raise ValueError(f"La lectura paralela requiere un CSV sin comprimir: {file_path}")
+    if columns is not None and as_dicts:
+        raise ValueError("columns y as_dicts son excluyentes")
+    if not splittable_encoding(encoding):
+        raise ValueError(f"El encoding {encoding} no permite cortar el archivo por bytes")
+
+    with open(file_path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            header_span = next(iter_csv_record_spans(buffer), None)
+            if header_span is None:
+                return
+            offset, length = header_span
+            header = next(
+                csv.reader(io.StringIO(buffer[offset:offset + length].decode(encoding), newline=""), delimiter=delimiter),
+                [],
+            )
+            ranges = csv_byte_ranges(buffer, offset + length, chunk_bytes)
+
+    jobs = [
+        (str(file_path), start, end, header, columns, as_dicts, transform, encoding, delimiter)
+        for start, end in ranges
+    ]
+    if workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(jobs)))
+        results: Iterable[List[Any]] = executor.map(_parse_csv_range_job, jobs)
+    else:
+        executor = None
+        results = (_parse_csv_range_job(job) for job in jobs)
+
+    try:
+        first_row = 2
+        for index, ((start, end), rows) in enumerate(zip(ranges, results)):
+            yield CSVChunk(index=index, start=start, end=end, first_row=first_row, rows=rows)
+            first_row += len(rows)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
 class CSVHandler:
     """Manejador de archivos CSV con detección automática de encoding."""
     
     @staticmethod
     def detect_encoding(file_path: Path) -> str:
         """Detecta el encoding de un archivo."""
-        try:
-            import chardet
-            with open(file_path, 'rb') as f:
+        if chardet.available:
+            with open_binary(file_path) as f:
                 raw_data = f.read()
                 result = chardet.detect(raw_data)
                 return result['encoding'] or 'utf-8'
-        except ImportError:
+        else:
             # Fallback si chardet no está disponible
             encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
             for encoding in encodings:
                 try:
-                    with open(file_path, 'r', encoding=encoding) as f:
+                    with open_text(file_path, encoding=encoding, newline=None) as f:
                         f.read()
                     return encoding
                 except UnicodeDecodeError:
@@ -212,24 +930,45 @@ class CSVHandler:
         file_path: Path,
         encoding: Optional[str] = None,
         delimiter: str = ',',
+        workers: int = 1,
         **kwargs
     ) -> List[Dict[str, str]]:
-        """Lee un archivo CSV con detección automática de encoding."""
+        """Lee un archivo CSV (también .csv.gz / .csv.zst) con detección de encoding.
+
+        Con ``workers > 1`` los CSV sin comprimir se analizan en paralelo por
+        rangos de bytes (:func:`read_csv_parallel`); el resultado y su orden
+        son los mismos que con ``csv.DictReader``.
+        """
         if encoding is None:
             encoding = CSVHandler.detect_encoding(file_path)
         
         try:
-            with open(file_path, 'r', encoding=encoding, newline='') as f:
-                # Detectar delimitador si no se especifica
-                if delimiter == ',':
+            # Detectar delimitador si no se especifica. La muestra se toma en
+            # una apertura aparte porque los flujos comprimidos no siempre
+            # permiten regresar al inicio.
+            if delimiter == ',':
+                with open_text(file_path, encoding=encoding) as f:
                     sample = f.read(1024)
-                    f.seek(0)
-                    sniffer = csv.Sniffer()
-                    try:
-                        delimiter = sniffer.sniff(sample).delimiter
-                    except csv.Error:
-                        delimiter = ','
-                
+                sniffer = csv.Sniffer()
+                try:
+                    delimiter = sniffer.sniff(sample).delimiter
+                except csv.Error:
+                    delimiter = ','
+            
+            if (
+                workers > 1
+                and not kwargs
+                and detect_compression(file_path) is None
+                and splittable_encoding(encoding)
+            ):
+                rows: List[Dict[str, str]] = []
+                for chunk in read_csv_parallel(
+                    file_path, as_dicts=True, workers=workers, encoding=encoding, delimiter=delimiter
+                ):
+                    rows.extend(chunk.rows)
+                return rows
+
+            with open_text(file_path, encoding=encoding) as f:
                 reader = csv.DictReader(f, delimiter=delimiter, **kwargs)
                 return list(reader)
         
@@ -244,13 +983,11 @@ class CSVHandler:
         delimiter: str = ',',
         **kwargs
     ) -> None:
-        """Escribe datos a un archivo CSV."""
+        """Escribe datos a un archivo CSV (comprimido si termina en .gz / .zst)."""
         if not data:
             return
         
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(file_path, 'w', encoding=encoding, newline='') as f:
+        with open_text(file_path, 'w', encoding=encoding) as f:
             fieldnames = data[0].keys()
             writer = csv.DictWriter(f, fieldnames=fieldnames, delimiter=delimiter, **kwargs)
             writer.writeheader()
@@ -265,7 +1002,8 @@ class SQLGenerator:
         """Escapa una cadena para uso en SQL."""
         if value is None:
             return "NULL"
-        return f"'{str(value).replace('\'', '\'\'')}'"
+        escaped = str(value).replace("'", "''")
+        return f"'{escaped}'"
     
     @staticmethod
     def generate_insert_on_duplicate(
@@ -294,6 +1032,116 @@ class SQLGenerator:
         return sql + ";"
 
 
+class SQLStreamWriter:
+    """Sink de SQL que escribe por bloques directamente en el archivo destino.
+
+    Los generadores envían líneas a medida que las producen; el texto se
+    acumula hasta ``flush_size`` caracteres y después se vuelca al archivo,
+    de modo que el script completo nunca reside en memoria. Si la ruta de
+    salida termina en ``.gz`` o ``.zst`` se escribe comprimida; ``compress``
+    permite forzar ``'gzip'``/``'zstd'`` (``True`` equivale a gzip) o, con
+    ``False``, escribir texto plano sin importar el sufijo. También
+    acepta un manejador de texto ya abierto (por ejemplo ``StringIO``), en
+    cuyo caso no lo cierra.
+    """
+
+    DEFAULT_FLUSH_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        target: Union[Path, TextIO],
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+        compress: Union[bool, str, None] = None,
+        encoding: str = 'utf-8',
+    ) -> None:
+        if flush_size <= 0:
+            raise ValueError(f"flush_size debe ser positivo: {flush_size}")
+
+        self.flush_size = flush_size
+        self.chars_written = 0
+        self._pending: List[str] = []
+        self._pending_size = 0
+
+        if isinstance(target, (str, Path)):
+            if compress is False:
+                Path(target).parent.mkdir(parents=True, exist_ok=True)
+                self._handle: TextIO = open(target, 'w', encoding=encoding, newline='')
+            else:
+                compression = 'gzip' if compress is True else compress
+                self._handle = open_text(
+                    target, 'w', encoding=encoding, compression=compression
+                )
+            self._owns_handle = True
+        else:
+            self._handle = target
+            self._owns_handle = False
+
+    def write(self, text: str) -> None:
+        """Agrega texto al bloque pendiente y vuelca si se alcanzó el límite."""
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if self._pending_size >= self.flush_size:
+            self.flush()
+
+    def write_line(self, line: str = "") -> None:
+        """Escribe una línea terminada en salto de línea."""
+        self.write(line + "\n")
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        """Escribe varias líneas consecutivas."""
+        for line in lines:
+            self.write_line(line)
+
+    def write_values(
+        self,
+        rows: Iterable[str],
+        indent: str = "    ",
+        terminator: str = "",
+        header: Optional[str] = "VALUES",
+    ) -> int:
+        """Escribe una lista ``VALUES`` separada por comas sin materializarla.
+
+        Cada fila se emite en cuanto se conoce la siguiente (para decidir si
+        lleva coma). La última fila recibe ``terminator`` (por ejemplo ``;``).
+        Devuelve el número de filas escritas.
+        """
+        if header is not None:
+            self.write_line(header)
+
+        count = 0
+        previous: Optional[str] = None
+        for row in rows:
+            if previous is not None:
+                self.write_line(f"{indent}{previous},")
+            previous = row
+            count += 1
+        if previous is not None:
+            self.write_line(f"{indent}{previous}{terminator}")
+        return count
+
+    def flush(self) -> None:
+        """Vuelca el bloque pendiente al archivo."""
+        if not self._pending:
+            return
+        chunk = "".join(self._pending)
+        self._handle.write(chunk)
+        self.chars_written += len(chunk)
+        self._pending.clear()
+        self._pending_size = 0
+
+    def close(self) -> None:
+        """Vuelca lo pendiente y cierra el archivo si fue abierto por el sink."""
+        self.flush()
+        if self._owns_handle:
+            self._handle.close()
+
+    def __enter__(self) -> "SQLStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
 class ValidationError(Exception):
     """Excepción para errores de validación de datos."""
     pass
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Perfilado uniforme de los puntos de entrada del pipeline.
+
+Todos los scripts de ``tools/scripts`` y ``Normalize_Python`` arrancan su
+``main()`` con :func:`run_main`, que reconoce estas opciones antes de que el
+script analice sus propios argumentos (``run_all_processes.py`` no se perfila a
+sí mismo: reenvía ``--profile``/``--trace-malloc`` a cada script que lanza):
+
+``--profile``
+    Ejecuta ``main()`` bajo ``cProfile``.
+``--trace-malloc``
+    Activa ``tracemalloc`` y registra el pico de memoria y los sitios con más
+    memoria asignada al terminar.
+``--profile-dir DIR``
+    Carpeta de salida (por defecto
+    ``storage/client_process_runs/profiles/<script>_<fecha>``).
+``--profile-top N``
+    Número de funciones y sitios de asignación en el resumen (25).
+
+En la carpeta de salida se escriben ``<script>.prof`` (``pstats``, se abre con
+``snakeviz`` o ``python -m pstats``), ``<script>.collapsed`` (pilas colapsadas
+para ``flamegraph.pl`` o speedscope, en microsegundos) y ``<script>.json`` con
+el resumen que recoge el orquestador. Las pilas se reconstruyen a partir del
+grafo llamador/llamado de ``cProfile``: cuando una función se invoca desde
+varios caminos su tiempo se reparte en proporción al tiempo de cada llamador.
+
+Uso:
+```bash
+python tools/scripts/generate_cert_calibrations.py --historical --profile --trace-malloc
+python tools/scripts/run_all_processes.py --full --profile
+```
+"""
+
+from __future__ import annotations
+
+import cProfile
+import datetime as dt
+import json
+import pstats
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_PROFILE_ROOT = REPO_ROOT / "storage" / "client_process_runs" / "profiles"
+DEFAULT_TOP = 25
+TRACEMALLOC_FRAMES = 1
+# Caminos con menos de 1 µs atribuido no se expanden al reconstruir las pilas.
+MIN_STACK_SECONDS = 1e-6
+MAX_STACK_DEPTH = 256
+
+FunctionKey = Tuple[str, int, str]
+
+
+@dataclass
+class ProfilingOptions:
+    """Opciones de perfilado extraídas de la línea de comandos."""
+
+    profile: bool = False
+    trace_malloc: bool = False
+    output_dir: Optional[Path] = None
+    top: int = DEFAULT_TOP
+
+    @property
+    def enabled(self) -> bool:
+        return self.profile or self.trace_malloc
+
+
+def extract_profiling_args(argv: Sequence[str]) -> Tuple[ProfilingOptions, List[str]]:
+    """Separa las opciones de perfilado del resto de argumentos del script."""
+    options = ProfilingOptions()
+    remaining: List[str] = []
+    index = 0
+    while index < len(argv):
+        arg = argv[index]
+        name, has_value, value = arg.partition("=")
+        if arg == "--profile":
+            options.profile = True
+        elif arg == "--trace-malloc":
+            options.trace_malloc = True
+        elif name in ("--profile-dir", "--profile-top"):
+            if not has_value:
+                index += 1
+                if index >= len(argv):
+                    raise SystemExit(f"{name} requiere un valor")
+                value = argv[index]
+            if name == "--profile-dir":
+                options.output_dir = Path(value)
+            else:
+                try:
+                    options.top = int(value)
+                except ValueError:
+                    raise SystemExit(f"{name} debe ser un entero: {value!r}") from None
+                if options.top <= 0:
+                    raise SystemExit(f"{name} debe ser mayor que cero")
+        else:
+            remaining.append(arg)
+        index += 1
+    return options, remaining
+
+
+def _label(func: FunctionKey) -> str:
+    filename, line, name = func
+    if filename == "~":
+        label = name
+    else:
+        label = f"{name} ({Path(filename).name}:{line})"
+    # El formato colapsado usa ';' como separador de marcos.
+    return label.replace(";", ",")
+
+
+def collapsed_stacks(stats: pstats.Stats) -> Dict[str, int]:
+    """Pilas colapsadas (``a;b;c`` → microsegundos) a partir de ``pstats``."""
+    table = stats.stats  # type: ignore[attr-defined]
+    children: Dict[FunctionKey, List[FunctionKey]] = defaultdict(list)
+    for func, (_, _, _, _, callers) in table.items():
+        for caller in callers:
+            if caller in table:
+                children[caller].append(func)
+
+    stacks: Dict[str, float] = defaultdict(float)
+
+    def walk(func: FunctionKey, path: List[FunctionKey], labels: List[str], fraction: float) -> None:
+        _, _, own, cumulative, _ = table[func]
+        if own * fraction > 0:
+            stacks[";".join(labels)] += own * fraction
+        if len(path) >= MAX_STACK_DEPTH:
+            return
+        for callee in children.get(func, ()):
+            if callee in path:
+                continue
+            callee_cumulative = table[callee][3]
+            edge_cumulative = table[callee][4][func][3]
+            share = edge_cumulative * fraction
+            if callee_cumulative <= 0 or share < MIN_STACK_SECONDS:
+                continue
+            path.append(callee)
+            labels.append(_label(callee))
+            walk(callee, path, labels, share / callee_cumulative)
+            path.pop()
+            labels.pop()
+
+    roots = [func for func, row in table.items() if not any(caller in table for caller in row[4])]
+    for root in roots:
+        walk(root, [root], [_label(root)], 1.0)
+    return {stack: round(seconds * 1e6) for stack, seconds in stacks.items() if round(seconds * 1e6) > 0}
+
+
+def _top_functions(stats: pstats.Stats, top: int) -> List[Dict[str, Any]]:
+    table = stats.stats  # type: ignore[attr-defined]
+    ranked = sorted(table.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    return [
+        {
+            "funcion": _label(func),
+            "llamadas": calls,
+            "tiempo_propio_s": round(own, 6),
+            "tiempo_acumulado_s": round(cumulative, 6),
+        }
+        for func, (_, calls, own, cumulative, _) in ranked
+    ]
+
+
+def _top_allocations(snapshot: tracemalloc.Snapshot, top: int) -> List[Dict[str, Any]]:
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    return [
+        {
+            "sitio": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "kb": round(stat.size / 1024, 1),
+            "bloques": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:top]
+    ]
+
+
+class ProfileSession:
+    """Perfila un bloque de código y escribe el ``.prof``, el ``.collapsed`` y el resumen."""
+
+    def __init__(self, name: str, options: ProfilingOptions):
+        self.name = name
+        self.options = options
+        self.output_dir = options.output_dir or (
+            DEFAULT_PROFILE_ROOT / f"{name}_{dt.datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        )
+        self.summary: Dict[str, Any] = {}
+        # Valor devuelto por main() (o código de SystemExit / nombre de la excepción).
+        self.exit_code: Optional[object] = 0
+        self._profiler: Optional[cProfile.Profile] = None
+        self._started = 0.0
+        self._started_at = ""
+        self._owns_tracemalloc = False
+
+    def __enter__(self) -> "ProfileSession":
+        self._started_at = dt.datetime.now().isoformat()
+        if self.options.trace_malloc and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._owns_tracemalloc = True
+        if self.options.trace_malloc:
+            tracemalloc.reset_peak()
+        if self.options.profile:
+            self._profiler = cProfile.Profile()
+        self._started = time.perf_counter()
+        if self._profiler is not None:
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._profiler is not None:
+            self._profiler.disable()
+        duration = time.perf_counter() - self._started
+        if exc_type is SystemExit:
+            self.exit_code = exc.code if exc.code is not None else 0
+        elif exc_type is not None:
+            self.exit_code = exc_type.__name__
+        self.summary = {
+            "script": self.name,
+            "argv": sys.argv[1:],
+            "inicio": self._started_at,
+            "duracion_s": round(duration, 6),
+            "salida": self.exit_code,
+            "archivos": {},
+        }
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.options.trace_malloc:
+            self.summary["tracemalloc"] = self._memory_summary()
+        if self._profiler is not None:
+            self.summary["cprofile"] = self._cpu_summary()
+        summary_path = self.output_dir / f"{self.name}.json"
+        with summary_path.open("w", encoding="utf-8") as handle:
+            json.dump(self.summary, handle, indent=2, ensure_ascii=False)
+        print(f"Perfil de {self.name} guardado en {self.output_dir}", file=sys.stderr)
+
+    def _memory_summary(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+        return {
+            "pico_mb": round(peak / (1024 * 1024), 3),
+            "retenido_mb": round(current / (1024 * 1024), 3),
+            # Asignaciones vivas al terminar main(), agrupadas por línea.
+            "sitios": _top_allocations(snapshot, self.options.top),
+        }
+
+    def _cpu_summary(self) -> Dict[str, Any]:
+        assert self._profiler is not None
+        stats = pstats.Stats(self._profiler)
+        prof_path = self.output_dir / f"{self.name}.prof"
+        collapsed_path = self.output_dir / f"{self.name}.collapsed"
+        stats.dump_stats(str(prof_path))
+        stacks = collapsed_stacks(stats)
+        with collapsed_path.open("w", encoding="utf-8") as handle:
+            for stack, micros in sorted(stacks.items()):
+                handle.write(f"{stack} {micros}\n")
+        self.summary["archivos"].update({"pstats": prof_path.name, "collapsed": collapsed_path.name})
+        return {
+            "llamadas": stats.total_calls,  # type: ignore[attr-defined]
+            "tiempo_total_s": round(stats.total_tt, 6),  # type: ignore[attr-defined]
+            "funciones": _top_functions(stats, self.options.top),
+        }
+
+
+def run_main(main: Callable[[], Any], name: Optional[str] = None) -> Any:
+    """Ejecuta ``main()`` de un script aplicando ``--profile``/``--trace-malloc``.
+
+    Las opciones de perfilado se retiran de ``sys.argv`` para que el parser del
+    script no las vea. Devuelve lo mismo que ``main()``; ``SystemExit`` y las
+    excepciones se propagan después de guardar el perfil.
+    """
+    options, remaining = extract_profiling_args(sys.argv[1:])
+    sys.argv[1:] = remaining
+    if not options.enabled:
+        return main()
+    with ProfileSession(name or Path(sys.argv[0]).stem, options) as session:
+        result = main()
+        session.exit_code = 0 if result is None else result
+        return result
+
+
+def load_profile_summary(output_dir: Path, name: str) -> Optional[Dict[str, Any]]:
+    """Lee el resumen que dejó :class:`ProfileSession` (``None`` si no existe)."""
+    path = output_dir / f"{name}.json"
+    try:
+        with path.open(encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
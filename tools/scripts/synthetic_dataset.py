@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""Generador de conjuntos de datos sintéticos a escala para pruebas de carga.
+
+Aprende de los CSV reales de ``Archivos_CSV_originales`` (LM, PR, CERT y AT) y
+escribe archivos con los mismos nombres y encabezados, ``escala`` veces más
+grandes y siempre iguales para la misma semilla:
+
+- Cada instrumento sintético toma como prototipo un instrumento real al azar
+  (LM, PR y CERT alineados por código), así se conservan las distribuciones
+  conjuntas de tipo, marca, modelo, departamento, ubicación, plan de riesgos y
+  calendario de certificados.
+- Los códigos siguen el formato aprendido ``PREFIJO-AREA-NN`` del prototipo con
+  un consecutivo propio por prefijo y área, de modo que nunca se repiten. Las
+  series cambian sus dígitos y conservan su forma.
+- Las fechas en español (``16-Abr-19``, ``19-abr-24``) se desplazan unos días
+  por instrumento respetando su estilo (mayúsculas, ceros, dígitos del año) y
+  sin cambiar de año, para que sigan en la columna de su periodo.
+- El audit trail se reproduce ``escala`` veces: cada evento real se repite por
+  bloque de instrumentos con el mismo tipo y tamaño de rango, desplazado a las
+  filas del bloque. Las ediciones de una sola celda toman como valor nuevo el
+  contenido sintético de esa celda, por lo que todas las referencias resuelven
+  a instrumentos existentes.
+
+Ejemplos::
+
+    python tools/scripts/synthetic_dataset.py --escala 100 --salida /tmp/sbl_x100
+    python app/Modules/Internal/ArchivosSql/Normalize_Python/convert_audit_trail_csv.py \\
+        --csv /tmp/sbl_x100/AT_instrumentos_original_v2.csv --hojas-dir /tmp/sbl_x100
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime as dt
+import math
+import random
+import re
+import sys
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sbl_utils import NA_VALUES, TextNormalizer, get_csv_originales_dir, get_repo_root
+
+# Hoja -> (archivo, filas de encabezado), en el orden en que se escriben.
+SHEET_FILES = {
+    "instrumentos": ("LM_instrumentos_original_v2.csv", 1),
+    "plan_riesgos": ("PR_instrumentos_original_v2.csv", 1),
+    "certificados": ("CERT_instrumentos_original_v2.csv", 2),
+}
+AUDIT_FILE = "AT_instrumentos_original_v2.csv"
+# Nombre de hoja en el audit trail (sin acentos ni símbolos) -> hoja sintética.
+AUDIT_SHEETS = {
+    "sbllm08": "instrumentos",
+    "instrumentos": "instrumentos",
+    "calibracionverificacion": "plan_riesgos",
+    "certificados": "certificados",
+}
+CODE_COLUMN = 4  # Columna E en las tres hojas
+SERIE_COLUMN = 3
+MAX_DATE_SHIFT_DAYS = 45
+ROW_CACHE_SIZE = 8192
+
+CODE_FORMAT = re.compile(r"^([A-Z]+)-([A-Z]+)-(\d+)$")
+SPANISH_DATE = re.compile(r"\b(\d{1,2})-([A-Za-z]{3,4})-(\d{4}|\d{2})\b")
+CELL_RANGE = re.compile(r"^([A-Z]+)(\d+)(?::([A-Z]+)(\d+))?$")
+MONTHS = {
+    "ene": 1, "feb": 2, "mar": 3, "abr": 4, "may": 5, "jun": 6,
+    "jul": 7, "ago": 8, "sep": 9, "set": 9, "sept": 9, "oct": 10, "nov": 11, "dic": 12,
+}
+MONTH_NAMES = ("ene", "feb", "mar", "abr", "may", "jun", "jul", "ago", "sep", "oct", "nov", "dic")
+
+
+class DatasetError(RuntimeError):
+    """Los CSV de origen no existen o no tienen la forma esperada."""
+
+
+def _sheet_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", (TextNormalizer.normalize_text(name) or "").lower())
+
+
+def _column_index(letters: str) -> int:
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def shift_spanish_dates(text: str, days: int) -> str:
+    """Desplaza ``days`` días cada fecha ``d-mmm-aa`` del texto conservando su estilo.
+
+    Las fechas que cambiarían de año o que no son válidas se dejan como están.
+    """
+    if not days or "-" not in text:
+        return text
+
+    def replace(match: re.Match) -> str:
+        day_text, month_text, year_text = match.groups()
+        month = MONTHS.get(month_text.lower())
+        if month is None:
+            return match.group(0)
+        year = int(year_text) + (2000 if len(year_text) == 2 else 0)
+        try:
+            shifted = dt.date(year, month, int(day_text)) + dt.timedelta(days=days)
+        except ValueError:
+            return match.group(0)
+        if shifted.year != year:
+            return match.group(0)
+        name = month_text if shifted.month == month else MONTH_NAMES[shifted.month - 1]
+        if month_text.isupper():
+            name = name.upper()
+        elif month_text[0].isupper():
+            name = name.capitalize()
+        else:
+            name = name.lower()
+        day = f"{shifted.day:02d}" if len(day_text) == 2 else str(shifted.day)
+        return f"{day}-{name}-{year_text}"
+
+    return SPANISH_DATE.sub(replace, text)
+
+
+@dataclass
+class AuditEvent:
+    """Evento real del audit trail con su rango ya interpretado."""
+
+    fecha: str
+    hoja: str
+    valor_anterior: str
+    valor_nuevo: str
+    usuario: str
+    sheet: Optional[str] = None
+    start_column: str = ""
+    start_row: int = 0
+    end_column: str = ""
+    end_row: int = 0
+    rango: str = ""
+
+    @property
+    def single_cell(self) -> bool:
+        return self.start_column == self.end_column and self.start_row == self.end_row
+
+    def shifted_range(self, rows: int) -> str:
+        if self.sheet is None:
+            return self.rango
+        start = f"{self.start_column}{self.start_row + rows}"
+        if self.single_cell and ":" not in self.rango:
+            return start
+        return f"{start}:{self.end_column}{self.end_row + rows}"
+
+
+@dataclass
+class DatasetProfile:
+    """Lo aprendido de los CSV reales: encabezados, prototipos y eventos."""
+
+    headers: Dict[str, List[List[str]]]
+    footers: Dict[str, List[List[str]]]
+    prototypes: List[Dict[str, List[str]]]
+    audit_header: List[str]
+    audit_events: List[AuditEvent]
+
+    @classmethod
+    def learn(cls, source_dir: Path) -> "DatasetProfile":
+        headers: Dict[str, List[List[str]]] = {}
+        footers: Dict[str, List[List[str]]] = {}
+        rows_by_code: Dict[str, Dict[str, List[str]]] = {}
+        master: List[str] = []
+        for sheet, (filename, header_rows) in SHEET_FILES.items():
+            rows = _read_csv(source_dir / filename)
+            headers[sheet] = rows[:header_rows]
+            footers[sheet] = []
+            width = max(len(row) for row in rows[:header_rows])
+            for row in rows[header_rows:]:
+                code = row[CODE_COLUMN].strip() if len(row) > CODE_COLUMN else ""
+                if not code:
+                    # Renglones sin código (línea en blanco y leyenda al final) se copian tal cual.
+                    footers[sheet].append(row)
+                    continue
+                if sheet == "instrumentos":
+                    master.append(code)
+                rows_by_code.setdefault(code, {})[sheet] = row + [""] * (width - len(row))
+        if not master:
+            raise DatasetError(f"No hay instrumentos en {source_dir / SHEET_FILES['instrumentos'][0]}")
+
+        prototypes = []
+        for code in master:
+            rows = rows_by_code[code]
+            for sheet in SHEET_FILES:
+                if sheet not in rows:
+                    # Instrumento ausente en esa hoja: solo se copian los datos de identificación.
+                    width = len(headers[sheet][-1])
+                    rows[sheet] = rows["instrumentos"][: CODE_COLUMN + 3] + [""] * (width - CODE_COLUMN - 3)
+            prototypes.append(rows)
+
+        audit_rows = _read_csv(source_dir / AUDIT_FILE)
+        events = [_parse_event(row) for row in audit_rows[1:] if row]
+        return cls(headers, footers, prototypes, audit_rows[0], events)
+
+
+def _read_csv(path: Path) -> List[List[str]]:
+    try:
+        with path.open(newline="", encoding="utf-8") as handle:
+            return [list(row) for row in csv.reader(handle)]
+    except FileNotFoundError as exc:
+        raise DatasetError(f"No existe el archivo de origen {path}") from exc
+
+
+def _parse_event(row: List[str]) -> AuditEvent:
+    row = row + [""] * (6 - len(row))
+    fecha, hoja, rango, anterior, nuevo, usuario = row[:6]
+    event = AuditEvent(fecha, hoja, anterior, nuevo, usuario, rango=rango)
+    match = CELL_RANGE.match(rango.replace("$", "").strip().upper())
+    sheet = AUDIT_SHEETS.get(_sheet_key(hoja))
+    if match and sheet:
+        start_column, start_row, end_column, end_row = match.groups()
+        event.sheet = sheet
+        event.start_column, event.start_row = start_column, int(start_row)
+        event.end_column = end_column or start_column
+        event.end_row = int(end_row or start_row)
+    return event
+
+
+class SyntheticDataset:
+    """Instrumentos sintéticos deterministas para una escala y semilla."""
+
+    def __init__(self, profile: DatasetProfile, escala: float, semilla: int = 0):
+        if escala <= 0:
+            raise ValueError(f"La escala debe ser positiva: {escala}")
+        self.profile = profile
+        self.semilla = semilla
+        self.base = len(profile.prototypes)
+        self.total = max(1, round(escala * self.base))
+        rng = random.Random(semilla)
+        self.prototype_ids = [rng.randrange(self.base) for _ in range(self.total)]
+        self.offsets = [rng.randint(-MAX_DATE_SHIFT_DAYS, MAX_DATE_SHIFT_DAYS) for _ in range(self.total)]
+        self.codes = self._assign_codes()
+        self.rows = lru_cache(maxsize=ROW_CACHE_SIZE)(self._rows)
+
+    def _assign_codes(self) -> List[str]:
+        counters: Dict[Tuple[str, str], int] = {}
+        widths: Dict[Tuple[str, str], int] = {}
+        codes = []
+        for prototype_id in self.prototype_ids:
+            code = self.profile.prototypes[prototype_id]["instrumentos"][CODE_COLUMN].strip()
+            match = CODE_FORMAT.match(code)
+            if not match:
+                # Códigos fuera de formato reciben un sufijo para no repetirse.
+                key = (code, "")
+                counters[key] = counters.get(key, 0) + 1
+                codes.append(code if counters[key] == 1 else f"{code}-{counters[key]}")
+                continue
+            key = match.group(1), match.group(2)
+            counters[key] = counters.get(key, 0) + 1
+            widths[key] = max(widths.get(key, 0), len(match.group(3)))
+            codes.append(f"{key[0]}-{key[1]}-{counters[key]:0{widths[key]}d}")
+        return codes
+
+    def _rows(self, index: int) -> Dict[str, List[str]]:
+        prototype = self.profile.prototypes[self.prototype_ids[index]]
+        offset = self.offsets[index]
+        serie = prototype["instrumentos"][SERIE_COLUMN]
+        if serie.strip() not in NA_VALUES:
+            rng = random.Random(self.semilla * 1_000_003 + index)
+            serie = "".join(str(rng.randrange(10)) if char.isdigit() else char for char in serie)
+        rows = {}
+        for sheet, row in prototype.items():
+            row = [shift_spanish_dates(value, offset) for value in row]
+            row[CODE_COLUMN] = self.codes[index]
+            row[SERIE_COLUMN] = serie
+            rows[sheet] = row
+        return rows
+
+    def cell(self, sheet: str, column: str, row_number: int) -> Optional[str]:
+        """Valor sintético de una celda de hoja (``None`` fuera de los datos)."""
+        index = row_number - SHEET_FILES[sheet][1] - 1
+        if not 0 <= index < self.total:
+            return None
+        row = self.rows(index)[sheet]
+        position = _column_index(column)
+        return row[position] if position < len(row) else None
+
+    def audit_rows(self):
+        """Eventos del audit trail replicados por bloque, en el orden real."""
+        blocks = math.ceil(self.total / self.base)
+        for event in self.profile.audit_events:
+            data_index = event.start_row - SHEET_FILES[event.sheet][1] - 1 if event.sheet else -1
+            for block in range(blocks):
+                shift = block * self.base
+                if event.sheet is None:
+                    if block == 0:
+                        yield [event.fecha, event.hoja, event.rango, event.valor_anterior, event.valor_nuevo, event.usuario]
+                    continue
+                if 0 <= data_index < self.base and shift + data_index >= self.total:
+                    continue  # Instrumento fuera de una escala fraccionaria
+                nuevo = event.valor_nuevo
+                if event.single_cell and nuevo:
+                    nuevo = self.cell(event.sheet, event.start_column, event.start_row + shift) or nuevo
+                yield [event.fecha, event.hoja, event.shifted_range(shift), event.valor_anterior, nuevo, event.usuario]
+
+    def write(self, output_dir: Path) -> Dict[str, int]:
+        """Escribe los cuatro CSV en ``output_dir`` y devuelve las filas de cada uno."""
+        output_dir.mkdir(parents=True, exist_ok=True)
+        handles = {sheet: (output_dir / filename).open("w", newline="", encoding="utf-8")
+                   for sheet, (filename, _) in SHEET_FILES.items()}
+        try:
+            writers = {sheet: csv.writer(handle, lineterminator="\n") for sheet, handle in handles.items()}
+            for sheet, writer in writers.items():
+                writer.writerows(self.profile.headers[sheet])
+            for index in range(self.total):
+                for sheet, row in self.rows(index).items():
+                    writers[sheet].writerow(row)
+            for sheet, writer in writers.items():
+                writer.writerows(self.profile.footers[sheet])
+        finally:
+            for handle in handles.values():
+                handle.close()
+        counts = {filename: self.total for filename, _ in SHEET_FILES.values()}
+
+        with (output_dir / AUDIT_FILE).open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle, lineterminator="\n")
+            writer.writerow(self.profile.audit_header)
+            total = 0
+            for row in self.audit_rows():
+                writer.writerow(row)
+                total += 1
+        counts[AUDIT_FILE] = total
+        return counts
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    repo_root = get_repo_root(__file__)
+    parser = argparse.ArgumentParser(
+        description="Genera CSV sintéticos (LM, PR, CERT y AT) a escala a partir de los originales."
+    )
+    parser.add_argument("--escala", type=float, default=10.0, help="Factor de escala sobre los datos reales (default: 10).")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla del generador (default: 0).")
+    parser.add_argument(
+        "--origen",
+        type=Path,
+        default=get_csv_originales_dir(repo_root),
+        help="Directorio con los CSV originales de los que se aprende.",
+    )
+    parser.add_argument(
+        "--salida",
+        type=Path,
+        default=None,
+        help="Directorio destino (default: storage/synthetic_datasets/escala_<N>_semilla_<S>).",
+    )
+    args = parser.parse_args(argv)
+    if args.escala <= 0:
+        parser.error("--escala debe ser mayor que cero")
+    if args.salida is None:
+        args.salida = (
+            repo_root / "storage" / "synthetic_datasets" / f"escala_{args.escala:g}_semilla_{args.semilla}"
+        )
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    started = time.perf_counter()
+    try:
+        profile = DatasetProfile.learn(args.origen)
+    except DatasetError as exc:
+        print(f"❌ {exc}", file=sys.stderr)
+        return 1
+    dataset = SyntheticDataset(profile, args.escala, args.semilla)
+    counts = dataset.write(args.salida)
+    elapsed = time.perf_counter() - started
+    print(f"Conjunto sintético x{args.escala:g} (semilla {args.semilla}) en {args.salida} ({elapsed:.1f} s)")
+    for filename, rows in counts.items():
+        print(f"  - {filename}: {rows:,} filas")
+    return 0
+
+
+if __name__ == "__main__":
+    from stage_profiler import run_main
+
+    raise SystemExit(run_main(main))
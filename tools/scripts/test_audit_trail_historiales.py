@@ -0,0 +1,95 @@
+"""Pruebas de la lectura compartida del audit trail para audit_trail e historiales."""
+
+from __future__ import annotations
+
+import csv
+import filecmp
+import os
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+REPO_ROOT = SCRIPTS_DIR.parents[1]
+NORMALIZE_PYTHON = REPO_ROOT / "app" / "Modules" / "Internal" / "ArchivosSql" / "Normalize_Python"
+if str(NORMALIZE_PYTHON) not in sys.path:
+    sys.path.insert(0, str(NORMALIZE_PYTHON))
+
+import convert_audit_trail_csv as audit  # noqa: E402
+import convert_historiales_csv as historiales  # noqa: E402
+
+SAMPLE = (
+    "Fecha,Hoja,Rango,Valor anterior,Nuevo valor,Usuario\n"
+    "19-abr-24 12:55 p.m.,SBL-LM-08,E2,,AB-001,a@sbl.mx\n"
+    "20-abr-24 9:10 a.m.,Instrumentos,$F$2,Calidad,\"  Metrología\n\n  fina \",a@sbl.mx\n"
+    "21-abr-24,Instrumentos,G2:G3,,Lab,a@sbl.mx\n"
+    "22-abr-24,Certificados,H2,,2024-01-01,a@sbl.mx\n"
+    "23-abr-24,sbl lm 08,Hoja!H2,,01/02/2024,a@sbl.mx\n"
+)
+
+
+def _same_tree(left: Path, right: Path) -> bool:
+    names = sorted(os.listdir(left))
+    return names == sorted(os.listdir(right)) and all(
+        filecmp.cmp(left / name, right / name, shallow=False) for name in names
+    )
+
+
+def main() -> int:
+    with TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        csv_path = tmp / "audit_trail.csv"
+        csv_path.write_text(SAMPLE, encoding="utf-8")
+
+        rows = audit.load_raw_rows(csv_path)
+        assert [row.hoja_canonica for row in rows] == [
+            "instrumentos", "instrumentos", "instrumentos", "certificados", "instrumentos"
+        ]
+        assert [row.celda for row in rows] == ["E2", "F2", None, "H2", "H2"]
+
+        entries = historiales.entries_from_raw_rows(rows)
+        assert [(e.prefix, e.row_number) for e in entries] == [("E", 2), ("F", 2), ("H", 2)]
+        assert entries[1].valor_nuevo == "Metrología fina"
+        assert entries[0].timestamp == rows[0].fecha_evento
+        assert historiales.load_entries(csv_path) == entries
+
+        # Una sola lectura para ambas salidas equivale a correr cada conversor.
+        source = audit.CSV_PATH
+        separado = tmp / "separado"
+        historiales.write_historiales(historiales.load_entries(source), separado)
+        combinado = tmp / "combinado"
+        audit.main([
+            "--csv", str(source),
+            "--output", str(tmp / "audit.sql"),
+            "--normalized-output", str(tmp / "audit.csv"),
+            "--code-log", str(tmp / "log.md"),
+            "--historiales", str(combinado),
+        ])
+        assert _same_tree(separado, combinado)
+        assert (tmp / "audit.sql").stat().st_size > 0
+
+        # --empresa-id llega a ambas salidas.
+        otra = tmp / "empresa_7"
+        audit.main([
+            "--csv", str(source),
+            "--output", str(otra / "audit.sql"),
+            "--normalized-output", str(otra / "audit.csv"),
+            "--code-log", str(tmp / "log.md"),
+            "--historiales", str(otra),
+            "--empresa-id", "7",
+        ])
+        assert "-- Empresa destino: 7" in (otra / "audit.sql").read_text(encoding="utf-8")
+        with (otra / "audit.csv").open(encoding="utf-8", newline="") as handle:
+            assert {row["empresa_id"] for row in csv.DictReader(handle)} == {"7"}
+        departamentos = (otra / historiales.DEPARTAMENTOS_SQL.name).read_text(encoding="utf-8")
+        assert "SELECT 7 AS empresa_id" in departamentos
+        assert "SELECT 1 AS empresa_id" not in departamentos
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+"""Pruebas del índice de consulta del audit trail normalizado."""
+
+from __future__ import annotations
+
+import csv
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+NORMALIZE_DIR = REPO_ROOT / "app/Modules/Internal/ArchivosSql/Normalize_Python"
+if str(NORMALIZE_DIR) not in sys.path:
+    sys.path.insert(0, str(NORMALIZE_DIR))
+
+from audit_trail_index import (  # noqa: E402
+    AuditTrailIndex,
+    AuditTrailIndexError,
+    default_index_path,
+)
+
+HEADERS = ["row_position", "instrumento_codigo", "fecha_evento", "valor_nuevo"]
+ROWS = [
+    ["3", "SBL-002", "2024-05-02 09:00:00", "Almacén"],
+    ["1", "SBL-001", "2024-04-19 12:55:00", "Línea 1\nLínea 2"],
+    ["2", "SBL-001", "", "Sin fecha"],
+    ["4", "SBL-001", "2024-06-10 17:30:00", 'Valor "entre comillas"'],
+    ["5", "", "2024-06-11 08:00:00", "Sin código"],
+]
+
+
+def main() -> int:
+    with TemporaryDirectory() as tmp_dir:
+        csv_path = Path(tmp_dir) / "normalize_audit_trail.csv"
+        with csv_path.open("w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(HEADERS)
+            writer.writerows(ROWS)
+
+        index = AuditTrailIndex.open(csv_path)
+        assert default_index_path(csv_path).exists(), "No se persistió el índice"
+
+        historial = index.history("SBL-001")
+        assert [row["row_position"] for row in historial] == ["2", "1", "4"]
+        assert historial[1]["valor_nuevo"] == "Línea 1\nLínea 2", "Celda multilínea truncada"
+        assert historial[2]["valor_nuevo"] == 'Valor "entre comillas"'
+
+        abril_mayo = index.history("SBL-001", "2024-04-01", "2024-05-31")
+        assert [row["row_position"] for row in abril_mayo] == ["1"], "Rango por código incorrecto"
+        assert index.history("SBL-999") == []
+
+        junio = index.between("2024-06-10", "2024-06-11")
+        assert [row["row_position"] for row in junio] == ["4", "5"], "Rango por fecha incorrecto"
+        hasta_mayo = index.between(None, "2024-05-02 09:00")
+        assert [row["row_position"] for row in hasta_mayo] == ["1", "3"], "Eventos sin fecha en un rango"
+
+        with csv_path.open("a", newline="", encoding="utf-8") as handle:
+            csv.writer(handle).writerow(["6", "SBL-002", "2024-07-01 10:00:00", "Nuevo"])
+        actualizado = AuditTrailIndex.open(csv_path)
+        assert len(actualizado.history("SBL-002")) == 2, "El índice desactualizado no se reconstruyó"
+
+        try:
+            index.between("19/04/2024", None)
+        except AuditTrailIndexError:
+            pass
+        else:
+            raise AssertionError("Se esperaba un error por fecha inválida")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+"""Pruebas de los acumuladores por fila del reporte del audit trail (`RowMetrics`)."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+REPO_ROOT = SCRIPTS_DIR.parents[1]
+NORMALIZE_PYTHON = REPO_ROOT / "app" / "Modules" / "Internal" / "ArchivosSql" / "Normalize_Python"
+if str(NORMALIZE_PYTHON) not in sys.path:
+    sys.path.insert(0, str(NORMALIZE_PYTHON))
+
+import audit_trail_report as report  # noqa: E402
+
+
+def _apply(row_number: int, steps) -> report.RowMetrics:
+    """Aplica ``(columna, anterior, nuevo)`` en orden; el paso N lleva la marca ``tN``."""
+    metrics = report.RowMetrics(row_number)
+    for index, (column, previous, new) in enumerate(steps, start=1):
+        metrics.process_change(
+            report.CellChange(
+                sort_index=(index, index),
+                column=column,
+                row_number=row_number,
+                timestamp=index,
+                timestamp_str=f"t{index}" if row_number != 2 else "",
+                previous_value=previous,
+                new_value=new,
+            )
+        )
+    return metrics
+
+
+def main() -> int:
+    assert not hasattr(report.RowMetrics(1), "__dict__"), "RowMetrics debe usar __slots__"
+
+    pasos = [
+        ("D", None, "Balanza"),
+        ("E", None, "AB-001"),
+        ("F", None, "Calidad"),
+        ("G", None, "Almacén"),
+        ("H", None, "2023-01-01"),   # D–H completas, pero la columna A nunca tuvo dato
+        ("D", "Balanza", None),      # una requerida se vacía...
+        ("A", None, "1"),            # ...así que A no basta para confirmar
+        ("D", None, "Báscula"),      # al volver a llenarse se confirma la alta (t8)
+        ("E", "AB-001", None),       # quitar el código no cuenta
+        ("E", None, "AB-002"),       # reasignación: asignación y cambio de código
+        ("E", "AB-002", "ab-002"),   # solo mayúsculas: no es cambio
+        ("G", "Almacén", "lab 2"),
+        ("G", "lab 2", "LAB 2"),
+        ("I", None, "2024-01-01"),
+        ("F", "Calidad", "calidad"),
+    ]
+    fila = _apply(5, pasos)
+    assert fila.alta_confirmada and fila.fecha_alta_completa == "t8"
+    assert (
+        fila.asignaciones_codigo, fila.cambios_codigo, fila.movimientos_departamento,
+        fila.movimientos_ubicacion, fila.regresos_almacen, fila.cambios_fecha_alta,
+        fila.cambios_fecha_baja,
+    ) == (2, 1, 1, 2, 1, 1, 1)
+    assert [fila.get_value(column) for column in report.ALLOWED_COLUMNS] == [
+        "1", None, None, "Báscula", "ab-002", "calidad", "LAB 2", "2023-01-01", "2024-01-01",
+    ]
+
+    # La confirmación se evalúa paso a paso: antes de t8 no hay alta.
+    assert not _apply(5, pasos[:7]).alta_confirmada
+    # Una vez confirmada, vaciar una requerida no la revierte.
+    assert _apply(5, pasos[:8] + [("H", "2023-01-01", None)]).alta_confirmada
+
+    # A solo necesita haber tenido dato alguna vez; sin marca de tiempo no hay fecha.
+    sin_fecha = _apply(2, [("A", None, "1"), ("A", "1", None)] + [(c, None, c) for c in "DEFGH"])
+    assert sin_fecha.alta_confirmada and sin_fecha.fecha_alta_completa is None
+    assert sin_fecha.get_value("A") is None
+    assert not _apply(3, [(c, None, c) for c in "DEFGH"]).alta_confirmada
+
+    # --measure-memory con pocas filas sintéticas.
+    current, peak = report.measure_metrics_memory(25)
+    assert 0 < current <= peak
+    assert all(row.alta_confirmada for row in report.build_metrics(report.synthetic_changes(25)))
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        report.main(["--measure-memory", "25"])
+    assert salida.getvalue().startswith("RowMetrics x 25:")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,60 @@
+"""Pruebas del benchmark de etapas del pipeline."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from bench_pipeline import (  # noqa: E402
+    StageResult,
+    find_regressions,
+    parse_stage_tolerances,
+    run_benchmark,
+)
+
+
+def main() -> int:
+    baseline = {
+        "csv_load@x1": {"seconds": 1.0, "peak_mb": 100.0},
+        "audit_expansion@x1": {"seconds": 2.0, "peak_mb": 40.0},
+    }
+    results = [
+        StageResult("csv_load", 1.0, 1.2, [1.2], 150.0),
+        StageResult("audit_expansion", 1.0, 2.9, [2.9], 41.0),
+        StageResult("validation", 1.0, 9.0, [9.0], 500.0),  # Sin base: no se compara
+    ]
+    regressions = find_regressions(results, baseline, tolerance=0.25, stage_tolerances={})
+    assert [(r.key, r.metric) for r in regressions] == [
+        ("csv_load@x1", "peak_mb"),
+        ("audit_expansion@x1", "seconds"),
+    ], regressions
+    assert "+45%" in regressions[1].describe()
+
+    relaxed = find_regressions(results, baseline, 0.25, {"audit_expansion": 0.5})
+    assert [(r.key, r.metric) for r in relaxed] == [("csv_load@x1", "peak_mb")]
+    # Diferencias por debajo del mínimo absoluto no cuentan.
+    tiny = [StageResult("csv_load", 1.0, 0.03, [0.03], 100.0)]
+    assert not find_regressions(tiny, {"csv_load@x1": {"seconds": 0.01, "peak_mb": 100.0}}, 0.25, {})
+
+    assert parse_stage_tolerances(["validation=0.4"]) == {"validation": 0.4}
+    try:
+        parse_stage_tolerances(["desconocida=0.1"])
+    except Exception:
+        pass
+    else:
+        raise AssertionError("Se esperaba error con una etapa desconocida")
+
+    # La validación necesita el CSV normalizado: la normalización corre aunque no se mida.
+    measured = run_benchmark([0.05], ["validation"], repeat=1)
+    assert [result.key for result in measured] == ["validation@x0.05"]
+    assert measured[0].seconds > 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+"""Pruebas de la agenda de vencimientos (`calibration_agenda.CalibrationAgenda`)."""
+
+from __future__ import annotations
+
+import datetime as dt
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from calibration_agenda import CalibrationAgenda  # noqa: E402
+
+HOY = dt.date(2024, 6, 1)
+
+
+def _ids(entries):
+    return [entry.instrumento_id for entry in entries]
+
+
+def main() -> int:
+    agenda = CalibrationAgenda()
+    for index in range(200):
+        agenda.upsert(
+            f"INST_{index:04d}",
+            index % 4,
+            HOY + dt.timedelta(days=(index * 7) % 120 - 20),
+            prioridad="normal",
+        )
+
+    esperado = sorted(agenda.entries.values(), key=lambda e: (e.proxima_calibracion, e.instrumento_id))
+    assert _ids(agenda.next_due(5)) == _ids(esperado[:5])
+    cliente = [e for e in esperado if e.cliente_id == 2]
+    assert _ids(agenda.next_due(3, cliente_id=2)) == _ids(cliente[:3])
+    assert agenda.next_due(3, cliente_id=99) == []
+
+    dentro = agenda.due_within(30, HOY)
+    assert _ids(dentro) == _ids([e for e in esperado if e.proxima_calibracion <= HOY + dt.timedelta(days=30)])
+    sin_vencidos = agenda.due_within(30, HOY, incluir_vencidos=False)
+    assert all(HOY <= e.proxima_calibracion for e in sin_vencidos)
+
+    # Actualizaciones incrementales: mover, repetir sin cambios y eliminar.
+    assert agenda.upsert("INST_0000", 0, HOY - dt.timedelta(days=400), prioridad="alta")
+    assert not agenda.upsert("INST_0000", 0, HOY - dt.timedelta(days=400), prioridad="alta")
+    assert agenda.next_due(1)[0].instrumento_id == "INST_0000"
+    assert agenda.remove("INST_0000") is not None and "INST_0000" not in agenda
+    assert "INST_0000" not in _ids(agenda.due_within(1000, HOY))
+
+    # Retirar lo que ya no está en el programa, global o por cliente.
+    vigentes = {key for key in agenda.entries if int(key[5:]) < 150}
+    retirados = agenda.prune(vigentes, cliente_id=3)
+    assert retirados and all(e.cliente_id == 3 and e.instrumento_id not in vigentes for e in retirados)
+    assert len(agenda) == 199 - len(retirados)
+    assert agenda.prune(vigentes, cliente_id=99) == []
+    agenda.prune(vigentes)
+    assert set(agenda.entries) == vigentes and len(agenda) == 149
+    assert all(e.instrumento_id in vigentes for e in agenda.due_within(1000, HOY))
+
+    with TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "agenda.json"
+        agenda.save(path)
+        cargada = CalibrationAgenda.load(path)
+        assert len(cargada) == len(agenda) == 149
+        assert _ids(cargada.next_due(10, cliente_id=1)) == _ids(agenda.next_due(10, cliente_id=1))
+        assert cargada.entries["INST_0005"].datos == {"prioridad": "normal"}
+        assert len(CalibrationAgenda.load(Path(tmp_dir) / "no_existe.json")) == 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
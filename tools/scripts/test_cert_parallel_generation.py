@@ -0,0 +1,152 @@
+"""Pruebas de la generación de certificados repartida por cliente (--workers)."""
+
+from __future__ import annotations
+
+import contextlib
+import csv
+import io
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from calibration_agenda import CalibrationAgenda  # noqa: E402
+from generate_cert_calibrations import (  # noqa: E402
+    CERT_FIELDS,
+    CertCalibrationGenerator,
+    main as cert_main,
+    partition_by_client,
+)
+
+TIPOS = ["Balanza analítica", "Termómetro", "Micropipeta", "Cronómetro", "Manómetro"]
+
+
+def _write_instruments(path: Path, count: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["instrumento_id", "cliente_id", "tipo_instrumento", "numero_serie", "fecha_ultima_calibracion"])
+        for index in range(count):
+            writer.writerow([
+                f"INS-{index:05d}",
+                (index * 7) % 13 + 1,
+                TIPOS[index % len(TIPOS)],
+                f"SN{index:06d}",
+                f"20{20 + index % 6}-{index % 12 + 1:02d}-15",
+            ])
+
+
+DIRECTORIES = ("input", "output_sql", "certificates", "calibration_schedules")
+
+
+def _use_directories(generator: CertCalibrationGenerator, base: Path) -> None:
+    generator.directories = {key: base / key for key in DIRECTORIES}
+    for directory in generator.directories.values():
+        directory.mkdir(parents=True, exist_ok=True)
+
+
+def _run(base: Path, workers: int):
+    generator = CertCalibrationGenerator(sequence_store=str(base / "secuencias.json"))
+    _use_directories(generator, base)
+    _write_instruments(generator.directories["input"] / "instrumentos.csv", 600)
+    assert generator.run_modern_generation_process(workers=workers)
+
+    def rows(directory: str):
+        (path,) = generator.directories[directory].glob("*.csv")
+        with path.open(newline="", encoding="utf-8") as handle:
+            return list(csv.DictReader(handle))
+
+    return generator.stats, rows("certificates"), rows("calibration_schedules")
+
+
+def _run_cli(base: Path, *argv: str) -> tuple:
+    """Ejecuta ``main()`` con los directorios del generador dentro de ``base``."""
+    original = CertCalibrationGenerator.setup_directories
+    CertCalibrationGenerator.setup_directories = lambda self: _use_directories(self, base)
+    salida = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(salida):
+            cert_main(["--secuencia-certificados", str(base / "secuencias.json"), *argv])
+    except SystemExit as exc:
+        return exc.code, salida.getvalue()
+    finally:
+        CertCalibrationGenerator.setup_directories = original
+    return None, salida.getvalue()
+
+
+def main() -> int:
+    items = [(index, {"cliente_id": str(index % 5)}) for index in range(20)]
+    shards = partition_by_client(items, 3)
+    assert len(shards) == 3
+    assert sorted(index for shard in shards for index, _ in shard) == list(range(20))
+    for shard in shards:
+        assert [index for index, _ in shard] == sorted(index for index, _ in shard)
+    clientes = [{item["cliente_id"] for _, item in shard} for shard in shards]
+    assert all(not (a & b) for i, a in enumerate(clientes) for b in clientes[i + 1:]), "Cliente repartido"
+    assert partition_by_client(items, 1) == [items]
+    assert len(partition_by_client(items[:2], 8)) == 2
+
+    with TemporaryDirectory() as tmp_dir:
+        serial_stats, serial_certs, serial_schedules = _run(Path(tmp_dir) / "serial", 1)
+        parallel_stats, parallel_certs, parallel_schedules = _run(Path(tmp_dir) / "paralelo", 3)
+
+        assert serial_stats == parallel_stats, (serial_stats, parallel_stats)
+        assert serial_stats["certificates_generated"] == 600
+        assert serial_stats["validation_errors"] == 0
+
+        key = lambda row: row["instrumento_id"]  # noqa: E731
+        without_number = lambda rows: sorted(  # noqa: E731
+            ({**row, "certificado_numero": ""} for row in rows), key=key
+        )
+        assert without_number(serial_certs) == without_number(parallel_certs)
+        assert sorted(serial_schedules, key=key) == sorted(parallel_schedules, key=key)
+        assert list(parallel_certs[0]) == CERT_FIELDS
+
+        folios = [row["certificado_numero"] for row in parallel_certs]
+        assert len(set(folios)) == len(folios), "Folios repetidos entre procesos"
+
+        sql_files = list((Path(tmp_dir) / "paralelo" / "output_sql").glob("*.sql"))
+        assert len(sql_files) == 1
+        assert sql_files[0].read_text(encoding="utf-8").count("INSERT INTO certificaciones_instrumentos") == 600
+        assert not list((Path(tmp_dir) / "paralelo" / "certificates").glob(".shards_*"))
+
+        # Los instrumentos que salen del inventario se retiran de la agenda;
+        # una corrida filtrada solo toca al cliente indicado.
+        serial = Path(tmp_dir) / "serial"
+        agenda_path = serial / "calibration_schedules" / "agenda_calibraciones.json"
+        assert len(CalibrationAgenda.load(agenda_path)) == 600
+        generator = CertCalibrationGenerator(sequence_store=str(serial / "secuencias.json"))
+        _use_directories(generator, serial)
+        _write_instruments(generator.directories["input"] / "instrumentos.csv", 500)
+        retirados = {f"INS-{index:05d}" for index in range(500, 600)}
+        del_cliente_2 = {key for key in retirados if ((int(key[4:]) * 7) % 13 + 1) == 2}
+        assert generator.run_modern_generation_process(cliente_id=2)
+        agenda = CalibrationAgenda.load(agenda_path)
+        assert len(agenda) == 600 - len(del_cliente_2)
+        assert not del_cliente_2 & agenda.entries.keys()
+        assert generator.run_modern_generation_process()
+        assert set(CalibrationAgenda.load(agenda_path).entries) == {f"INS-{index:05d}" for index in range(500)}
+
+        # Desde la línea de comandos, --workers y el contador llegan al modo moderno.
+        cli = Path(tmp_dir) / "cli"
+        _write_instruments(cli / "input" / "instrumentos.csv", 120)
+        code, salida = _run_cli(cli, "--workers", "2", "--bloque-certificados", "7")
+        assert code == 0 and "modo moderno" in salida, salida
+        (cli_certs,) = (cli / "certificates").glob("certificaciones_generadas_*.csv")
+        with cli_certs.open(newline="", encoding="utf-8") as handle:
+            assert len(list(csv.DictReader(handle))) == 120
+        assert (cli / "secuencias.json").exists()
+
+        # El modo histórico solo se activa de forma explícita.
+        historico = Path(tmp_dir) / "historico.sql"
+        code, salida = _run_cli(cli, "--output", str(historico))
+        assert code is None and "modo histórico" in salida and historico.stat().st_size > 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
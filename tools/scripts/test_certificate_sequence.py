@@ -0,0 +1,85 @@
+"""Pruebas de los folios de certificado reservados por bloques."""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from certificate_sequence import (  # noqa: E402
+    CertificateNumberAllocator,
+    CertificateSequenceError,
+    FileSequenceStore,
+    open_sequence_store,
+)
+
+WORKERS = 4
+PER_WORKER = 2500
+
+
+def _allocate(job):
+    target, cantidad = job
+    allocator = CertificateNumberAllocator(open_sequence_store(target), block_size=100)
+    return [allocator.next_number(2024, 1, 5) for _ in range(cantidad)]
+
+
+def _check_parallel(target: str) -> None:
+    with ProcessPoolExecutor(max_workers=WORKERS) as executor:
+        folios = [folio for lote in executor.map(_allocate, [(target, PER_WORKER)] * WORKERS) for folio in lote]
+    assert len(folios) == len(set(folios)) == WORKERS * PER_WORKER, f"Folios repetidos con {target}"
+
+
+def main() -> int:
+    with TemporaryDirectory() as tmp_dir:
+        contador = Path(tmp_dir) / "secuencias.json"
+        allocator = CertificateNumberAllocator(FileSequenceStore(contador), block_size=3)
+        assert [allocator.next_number(2024, 1, 5) for _ in range(4)] == [
+            "CERT-2024-E01-C005-000001",
+            "CERT-2024-E01-C005-000002",
+            "CERT-2024-E01-C005-000003",
+            "CERT-2024-E01-C005-000004",
+        ]
+        assert allocator.next_number(2024, 1, 6) == "CERT-2024-E01-C006-000001"
+
+        # Un segundo proceso continúa después del bloque reservado por el primero.
+        otro = CertificateNumberAllocator(FileSequenceStore(contador), block_size=3)
+        assert otro.next_number(2024, 1, 5) == "CERT-2024-E01-C005-000007"
+
+        # Mientras otro proceso tiene el bloqueo nadie entra, por viejo que sea
+        # el archivo .lock; al soltarlo el siguiente continúa sin huecos.
+        ocupado = FileSequenceStore(contador)
+        fd = ocupado._acquire()
+        try:
+            os.utime(ocupado.lock_path, (0, 0))
+            try:
+                FileSequenceStore(contador, lock_timeout=0.05).reserve("x", 1)
+            except CertificateSequenceError:
+                pass
+            else:
+                raise AssertionError("Se obtuvo un bloqueo ocupado")
+        finally:
+            os.close(fd)
+        assert FileSequenceStore(contador, lock_timeout=0.05).reserve("x", 1) == 1
+        assert ocupado.lock_path.exists()
+
+        started = time.perf_counter()
+        rapido = CertificateNumberAllocator(FileSequenceStore(Path(tmp_dir) / "masivo.json"))
+        folios = {rapido.next_number(2024, 1, 9) for _ in range(100_000)}
+        assert len(folios) == 100_000
+        assert time.perf_counter() - started < 5, "La reserva por bloques es demasiado lenta"
+
+        _check_parallel(str(Path(tmp_dir) / "paralelo.json"))
+        _check_parallel(f"sqlite:///{Path(tmp_dir) / 'secuencias.db'}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
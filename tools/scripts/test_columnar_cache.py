@@ -0,0 +1,127 @@
+"""Pruebas de la caché columnar de los CSV normalizados."""
+
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import filecmp
+import importlib.util
+import os
+import shutil
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from columnar_cache import (  # noqa: E402
+    build_sidecar,
+    iter_rows,
+    load_sidecar,
+    read_column,
+    sidecar_path,
+    write_sidecar,
+)
+
+REPO_ROOT = SCRIPTS_DIR.parents[1]
+NORMALIZE_DIR = REPO_ROOT / "app" / "Modules" / "Internal" / "ArchivosSql" / "Archivos_Normalize"
+HISTORIAL_SCRIPT = NORMALIZE_DIR.parent / "Normalize_Python" / "generate_historial_inserts.py"
+NORMALIZED = ("normalize_instrumentos.csv", "normalize_plan_riesgos.csv", "normalize_certificates.csv")
+
+
+def _write_csv(path: Path, header, rows) -> None:
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _load_historial_module():
+    spec = importlib.util.spec_from_file_location("generate_historial_inserts", HISTORIAL_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def main() -> int:
+    with TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        header = ["codigo", "empresa_id", "departamento_id", "fecha_alta", "ubicacion"]
+        rows = [
+            ["AB-001", "1", "4", "2023-01-31", "Almacén, planta 2"],
+            ["AB-002", "1", "", "", "Línea\n\"A\""],
+        ]
+        path = tmp / "normalize_instrumentos.csv"
+        _write_csv(path, header, rows)
+        for formato in ("struct", "auto"):
+            assert write_sidecar(path, header, rows, formato=formato) == sidecar_path(path)
+            table = load_sidecar(path)
+            assert table is not None and len(table) == 2
+            typed = list(iter_rows(path))
+            assert typed[0]["empresa_id"] == 1 and typed[0]["fecha_alta"] == dt.date(2023, 1, 31)
+            assert typed[1]["departamento_id"] is None and typed[1]["fecha_alta"] is None
+            assert typed[1]["ubicacion"] == "Línea\n\"A\""
+            with path.open(encoding="utf-8", newline="") as handle:
+                assert list(table.iter_dicts(as_text=True)) == list(csv.DictReader(handle))
+            assert read_column(path, "codigo") == ["AB-001", "AB-002"]
+
+        # Si el CSV cambia, la caché se ignora y se lee el texto.
+        _write_csv(path, header, rows + [["AB-003", "2", "5", "2024-02-29", "Lab"]])
+        assert load_sidecar(path) is None
+        assert [row["empresa_id"] for row in iter_rows(path)] == ["1", "1", "2"]
+        assert build_sidecar(path) is not None and len(load_sidecar(path)) == 3
+
+        # Un entero que no vuelve a su texto original ("007") no genera caché.
+        _write_csv(path, header, [["AB-004", "007", "1", "", "Lab"]])
+        assert build_sidecar(path) is None and not sidecar_path(path).exists()
+        assert next(iter_rows(path))["empresa_id"] == "007"
+
+        # Filas cortas de DictReader traen None: se guardan como celda vacía,
+        # igual que en el CSV; otro tipo que no sea texto omite la caché.
+        incompletas = [["AB-005", "1", None, None, None]]
+        _write_csv(path, header, incompletas)
+        assert write_sidecar(path, header, incompletas, formato="struct") is not None
+        with path.open(encoding="utf-8", newline="") as handle:
+            assert list(load_sidecar(path).iter_dicts(as_text=True)) == list(csv.DictReader(handle))
+        assert next(iter_rows(path))["departamento_id"] is None
+        assert write_sidecar(path, header, [["AB-005", "1", "4", "", 3.5]]) is None
+        assert not sidecar_path(path).exists()
+
+        # Un archivo dañado equivale a no tener caché.
+        _write_csv(path, header, rows)
+        build_sidecar(path)
+        sidecar_path(path).write_bytes(b"SBLCOL1\0basura")
+        assert load_sidecar(path) is None
+
+        # Los historiales son idénticos leyendo la caché o el CSV.
+        data_dir = tmp / "normalize"
+        data_dir.mkdir()
+        for name in NORMALIZED:
+            shutil.copy2(NORMALIZE_DIR / name, data_dir / name)
+        historial = _load_historial_module()
+        inputs = dict(
+            input_path=data_dir / NORMALIZED[0],
+            plan_path=data_dir / NORMALIZED[1],
+            certificates_path=data_dir / NORMALIZED[2],
+            empresa_id=1,
+        )
+        from_csv = historial.generate_historial_files(output_dir=tmp / "csv", **inputs)
+        for name in NORMALIZED:
+            assert build_sidecar(data_dir / name, formato="struct") is not None, name
+        from_cache = historial.generate_historial_files(output_dir=tmp / "cache", **inputs)
+        assert from_csv == from_cache and sum(from_csv.values()) > 0
+        comparison = filecmp.dircmp(tmp / "csv", tmp / "cache")
+        assert not comparison.diff_files and not comparison.left_only and not comparison.right_only
+        assert all(
+            filecmp.cmp(tmp / "csv" / name, tmp / "cache" / name, shallow=False)
+            for name in os.listdir(tmp / "csv")
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
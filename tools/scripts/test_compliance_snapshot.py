@@ -0,0 +1,103 @@
+"""Pruebas del análisis incremental de cumplimiento (`compliance_snapshot`)."""
+
+from __future__ import annotations
+
+import datetime as dt
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from audit_report_generator import ClientAuditReportGenerator, _unique_file_slugs  # noqa: E402
+from compliance_snapshot import ClientAggregate, ComplianceSnapshot  # noqa: E402
+
+CLIENTES = [{"codigo": "LAB", "nombre": "Laboratorio Norte"}]
+
+
+def _dataset(dia: int):
+    instrumentos = []
+    calibraciones = []
+    for index in range(60):
+        prefijo = ("SBL", "LAB", "EXT")[index % 3]
+        codigo = f"{prefijo}-{index:03d}"
+        instrumentos.append({
+            "codigo": codigo,
+            "descripcion": "Balanza principal" if index % 7 == 0 else "Termómetro",
+            "ubicacion": "Linea 2" if index % 5 == 0 else "Almacén",
+            "frecuencia_calibracion": "6" if index % 4 == 0 else "",
+        })
+        if index % 10 != 9:
+            fecha = dt.date(2024, 1, 1) + dt.timedelta(days=index * 5)
+            calibraciones.append({"codigo": codigo, "fecha": fecha.strftime("%d/%m/%Y")})
+    # Código repetido en el catálogo: debe contarse dos veces, igual que en el recálculo completo.
+    instrumentos.append(dict(instrumentos[1]))
+    if dia >= 2:
+        calibraciones.append({"codigo": "SBL-003", "fecha": "01/06/2024"})
+        instrumentos = [row for row in instrumentos if row["codigo"] != "EXT-005"]
+        instrumentos.append({"codigo": "CLI-900", "descripcion": "Equipo vital", "ubicacion": ""})
+    return instrumentos, calibraciones
+
+
+def _run(fecha_corte: dt.date, dia: int, snapshot_path=None):
+    generator = ClientAuditReportGenerator(snapshot_path=snapshot_path, fecha_corte=fecha_corte)
+    generator.instrumentos, generator.calibraciones = _dataset(dia)
+    generator.clientes = list(CLIENTES)
+    generator.analyze_client_instrument_status()
+    return generator
+
+
+def main() -> int:
+    corte = dt.date(2024, 1, 1)
+    acumulador = ClientAggregate()
+    for dias in (-5, 0, 10, 10, 45, 120, 400, 20, 3, 60):
+        acumulador.add("AL_DIA", "NORMAL", corte + dt.timedelta(days=dias), dias)
+    assert acumulador.percentiles(corte, (10, 50, 90, 100)) == {10: -5, 50: 10, 90: 120, 100: 400}
+    assert acumulador.histogram(corte) == {
+        "<=0": 2, "1-30": 4, "31-90": 2, "91-180": 1, "181-365": 0, ">365": 1,
+    }
+    acumulador.add("AL_DIA", "NORMAL", corte + dt.timedelta(days=400), 400, sign=-1)
+    assert acumulador.histogram(corte)[">365"] == 0 and acumulador.total == 9
+
+    with TemporaryDirectory() as tmp_dir:
+        snapshot_path = Path(tmp_dir) / "compliance_snapshot.json"
+        corridas = [
+            (dt.date(2024, 6, 1), 1),
+            (dt.date(2024, 6, 1), 1),
+            (dt.date(2024, 7, 15), 1),
+            (dt.date(2024, 9, 30), 2),
+            (dt.date(2025, 3, 1), 2),
+        ]
+        for fecha_corte, dia in corridas:
+            completo = _run(fecha_corte, dia)
+            incremental = _run(fecha_corte, dia, snapshot_path)
+            assert incremental.client_instrument_status == completo.client_instrument_status, fecha_corte
+            metricas = incremental.calculate_client_metrics()
+            esperadas = completo.calculate_client_metrics()
+            assert list(metricas) == list(esperadas), "El orden de clientes difiere del recálculo completo"
+            assert metricas == esperadas, f"Métricas incrementales distintas al {fecha_corte}"
+
+        snapshot = ComplianceSnapshot.load(snapshot_path)
+        assert snapshot.fecha_corte == dt.date(2025, 3, 1)
+        assert "EXT-005" not in snapshot.instrumentos, "El instrumento eliminado sigue en la instantánea"
+        assert "LAB-001#2" in snapshot.instrumentos
+
+        # Un catálogo de clientes distinto invalida la instantánea completa.
+        generator = ClientAuditReportGenerator(snapshot_path=snapshot_path, fecha_corte=dt.date(2025, 3, 1))
+        generator.instrumentos, generator.calibraciones = _dataset(2)
+        generator.clientes = [{"codigo": "EXT", "nombre": "Servicio Externo SA"}]
+        generator.analyze_client_instrument_status()
+        assert "Servicio Externo SA" in generator.calculate_client_metrics()
+
+    # Nombres distintos con el mismo slug no comparten libro Excel.
+    slugs = _unique_file_slugs(["ACME S A", "ACME, S.A.", "ACME_S_A_2", ""])
+    assert slugs == {"": "cliente", "ACME S A": "ACME_S_A", "ACME, S.A.": "ACME_S_A_2", "ACME_S_A_2": "ACME_S_A_2_2"}
+    assert _unique_file_slugs(reversed(list(slugs))) == slugs
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
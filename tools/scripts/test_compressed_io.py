@@ -0,0 +1,58 @@
+"""Pruebas de lectura/escritura transparente de artefactos comprimidos."""
+
+from __future__ import annotations
+
+import gzip
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from sbl_utils import (  # noqa: E402
+    CSVHandler,
+    detect_compression,
+    open_text,
+    with_compression_suffix,
+)
+
+
+def main() -> int:
+    assert detect_compression(Path("a.sql.gz")) == "gzip"
+    assert detect_compression(Path("a.csv.zst")) == "zstd"
+    assert detect_compression(Path("a.csv")) is None
+    assert with_compression_suffix(Path("a.sql"), "gzip") == Path("a.sql.gz")
+    assert with_compression_suffix(Path("a.sql.gz"), "gzip") == Path("a.sql.gz")
+    assert with_compression_suffix(Path("a.sql"), None) == Path("a.sql")
+    assert with_compression_suffix(Path("a.sql.zst"), "gzip") == Path("a.sql.gz")
+    assert with_compression_suffix(Path("d/a.csv.GZ"), "zstd") == Path("d/a.csv.zst")
+    assert with_compression_suffix(Path("a.sql.zst"), None) == Path("a.sql.zst")
+
+    filas = [
+        {"codigo": f"SBL-{index:03d}", "ubicacion": "Almacén", "estado": "Activo"}
+        for index in range(20)
+    ]
+
+    with TemporaryDirectory() as tmp_dir:
+        plano = Path(tmp_dir) / "instrumentos.csv"
+        comprimido = Path(tmp_dir) / "sub" / "instrumentos.csv.gz"
+        CSVHandler.write_csv(plano, filas)
+        CSVHandler.write_csv(comprimido, filas)
+
+        with gzip.open(comprimido, "rb") as fh:
+            assert fh.read() == plano.read_bytes(), "El CSV comprimido difiere del plano"
+
+        leidas = CSVHandler.read_csv(comprimido, encoding="utf-8")
+        assert leidas == filas, "La lectura del .csv.gz no es transparente"
+        assert CSVHandler.detect_encoding(comprimido) in ("utf-8", "utf-8-sig")
+
+        with open_text(comprimido) as fh:
+            assert fh.readline().strip() == "codigo,ubicacion,estado"
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+"""Pruebas del escaneo de CSV con mmap y columnas proyectadas (scan_csv_columns)."""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from sbl_utils import iter_csv_record_spans, scan_csv_columns  # noqa: E402
+
+REPO_ROOT = SCRIPTS_DIR.parents[1]
+AUDIT_TRAIL_CSV = (
+    REPO_ROOT / "app" / "Modules" / "Internal" / "ArchivosSql"
+    / "Archivos_CSV_originales" / "AT_instrumentos_original_v2.csv"
+)
+AUDIT_COLUMNS = ("Fecha", "Sección", "Hoja", "ID", "Rango", "Valor anterior", "Nuevo valor", "Usuario")
+
+SAMPLE = (
+    b'Fecha,Hoja,Rango,Valor anterior,Nuevo valor\r\n'
+    b'19-abr-24 12:55 p.m.,SBL-LM-08,E2,,"Balanza\r\nanal\xc3\xadtica ""A"""\r\n'
+    b'\r\n'
+    b'20-abr-24 9:10 a.m.,Instrumentos,F3\r\n'
+    b'"21-abr-24",Certificados,"G4:G9",x,y,extra\n'
+    b'22-abr-24,Instrumentos,H5,,"sin salto final"'
+)
+
+
+def _dict_reader_rows(path: Path, columns) -> list:
+    with path.open(encoding="utf-8", newline="") as handle:
+        return [tuple(row.get(column) for column in columns) for row in csv.DictReader(handle)]
+
+
+def main() -> int:
+    # Las celdas multilínea entrecomilladas no cortan el registro.
+    spans = list(iter_csv_record_spans(SAMPLE))
+    assert len(spans) == 6, spans
+    assert SAMPLE[spans[1][0]:sum(spans[1])].endswith(b'"""\r\n')
+    assert sum(length for _, length in spans) == len(SAMPLE)
+    assert list(iter_csv_record_spans(SAMPLE, spans[3][0], spans[4][0])) == [spans[3]]
+
+    with TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "audit.csv"
+        path.write_bytes(SAMPLE)
+        for columns in (
+            ("Nuevo valor", "Fecha", "Rango"),
+            ("Hoja",),
+            ("Sección", "Valor anterior", "Usuario"),
+            (),
+        ):
+            rows = list(scan_csv_columns(path, columns))
+            assert rows == _dict_reader_rows(path, columns), columns
+        rows = list(scan_csv_columns(path, ("Rango", "Nuevo valor", "Usuario")))
+        assert rows[0] == ("E2", 'Balanza\r\nanalítica "A"', None)
+        assert rows[1] == ("F3", None, None), "las filas cortas completan con None"
+        assert len(rows) == 4, "la línea en blanco se omite como en DictReader"
+
+        # Los comprimidos producen las mismas tuplas sin mmap.
+        compressed = path.with_name("audit.csv.gz")
+        compressed.write_bytes(gzip.compress(SAMPLE))
+        assert list(scan_csv_columns(compressed, AUDIT_COLUMNS)) == list(scan_csv_columns(path, AUDIT_COLUMNS))
+
+        empty = Path(tmp_dir) / "vacio.csv"
+        empty.write_bytes(b"")
+        assert list(scan_csv_columns(empty, AUDIT_COLUMNS)) == []
+
+    if AUDIT_TRAIL_CSV.exists():
+        assert list(scan_csv_columns(AUDIT_TRAIL_CSV, AUDIT_COLUMNS)) == _dict_reader_rows(AUDIT_TRAIL_CSV, AUDIT_COLUMNS)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
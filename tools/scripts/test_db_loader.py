@@ -0,0 +1,254 @@
+"""Pruebas de la carga directa (`db_loader`) usando SQLite como sustituto."""
+
+from __future__ import annotations
+
+import contextlib
+import csv
+import datetime as dt
+import io
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+REPO_ROOT = SCRIPTS_DIR.parents[1]
+NORMALIZE_PYTHON = REPO_ROOT / "app" / "Modules" / "Internal" / "ArchivosSql" / "Normalize_Python"
+if str(NORMALIZE_PYTHON) not in sys.path:
+    sys.path.insert(0, str(NORMALIZE_PYTHON))
+
+import convert_audit_trail_csv as audit  # noqa: E402
+import generate_cert_calibrations as cert  # noqa: E402
+import generate_historial_inserts as historial  # noqa: E402
+import generate_insert_instrumentos  # noqa: E402
+import generate_plan_riesgos as plan  # noqa: E402
+from db_loader import (  # noqa: E402
+    MYSQL_DIALECT,
+    DatabaseLoadError,
+    DatabaseLoader,
+    close_pools,
+    get_pool,
+)
+
+INSTRUMENTOS_CSV = [
+    ["Instrumento", "Marca", "Modelo", "Serie", "Código", "Departamento responsable",
+     "Ubicación", "Fecha de alta", "Fecha de baja", "Próxima calibración", "estado", "programado"],
+    ["Balanza", "Mettler", "XS204", "S-1", "AB-001", "Calidad", "Lab 1", "2023-01-31", "", "2025-01-31", "activo", "1"],
+    ["Balanza", "Mettler", "XS205", "S-2", "AB-002", "Calidad", "Lab 2", "2023-02-28", "", "2025-02-28", "activo", "1"],
+    ["Termómetro", "Fluke", "51-II", "S-3", "AB-003", "Producción", "¿Lab?", "", "", "", "activo", "0"],
+]
+
+
+HISTORIAL_TABLAS = (
+    "historial_departamentos", "historial_ubicaciones", "historial_fecha_alta",
+    "historial_fecha_baja", "historial_tipos_instrumento", "historial_calibraciones",
+    "historial_especificaciones", "historial_estado_instrumento",
+)
+
+
+def _conteos(pool, tablas=(
+    "catalogo_instrumentos", "marcas", "modelos", "departamentos", "instrumentos",
+)) -> dict:
+    with pool.connection() as conn:
+        return {
+            tabla: conn.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+            for tabla in tablas
+        }
+
+
+def _check_generator_load(tmp: Path) -> None:
+    """``generate_insert_instrumentos --load`` contra SQLite, dos veces."""
+    csv_path = tmp / "normalize_instrumentos.csv"
+    with csv_path.open("w", encoding="utf-8", newline="") as handle:
+        csv.writer(handle).writerows(INSTRUMENTOS_CSV)
+    dsn = f"sqlite:///{tmp / 'instrumentos.db'}"
+    args = ["--input", str(csv_path), "--estado-programado", str(csv_path), "--load", dsn]
+    for _ in range(2):
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert generate_insert_instrumentos.main(args) == 0
+        pool = get_pool(dsn)
+        assert _conteos(pool) == {
+            "catalogo_instrumentos": 2, "marcas": 2, "modelos": 3, "departamentos": 2, "instrumentos": 3,
+        }, "La recarga duplicó registros"
+
+    with pool.connection() as conn:
+        filas = conn.execute(
+            "SELECT i.codigo, m.nombre, mo.nombre, i.ubicacion FROM instrumentos i "
+            "JOIN marcas m ON m.id = i.marca_id JOIN modelos mo ON mo.id = i.modelo_id ORDER BY i.codigo"
+        ).fetchall()
+    assert [fila[:3] for fila in filas] == [
+        ("AB-001", "Mettler", "XS204"), ("AB-002", "Mettler", "XS205"), ("AB-003", "Fluke", "51-II"),
+    ]
+    assert filas[2][3] == "¿Lab?"
+    _check_builder_loads(pool)
+
+
+def _plan_row(codigo: str, clase_riesgo: str) -> plan.RiskPlanRow:
+    return plan.RiskPlanRow(
+        codigo=codigo, empresa_id=1, requerimiento="Alto", impacto_falla="NA",
+        consideraciones_falla="NA", clase_riesgo=clase_riesgo, capacidad_deteccion="NA",
+        frecuencia="Anual", fecha_actualizacion="2024-01-31", observaciones="",
+        tipo_calibracion="Externa", especificaciones="±0.1 g",
+    )
+
+
+def _historial_sources() -> historial.HistorialSources:
+    records = [
+        historial.InstrumentRecord("AB-001", 1, "Lab 1", dt.date(2023, 1, 31), None, "Activo"),
+        historial.InstrumentRecord("AB-002", 1, "Lab 2", dt.date(2023, 2, 28), dt.date(2024, 5, 1), "Inactivo"),
+        historial.InstrumentRecord("AB-003", None, None, None, None, "NA"),
+        historial.InstrumentRecord("ZZ-999", 2, "Bodega", dt.date(2023, 3, 1), None, "Activo"),
+    ]
+    entrada = historial.PlanRiskEntry(
+        "AB-001", 1, dt.date(2024, 1, 31), "Alto", None, "Externa", "±0.1 g",
+    )
+    eventos = [
+        historial.CalibrationEvent("AB-001", 1, dt.date(2024, 2, 1), "Calibración", "P1 2024", "C-1"),
+        historial.CalibrationEvent("AB-001", 1, dt.date(2024, 2, 1), "Calibración", "P1 2024", "C-1"),
+        historial.CalibrationEvent("AB-002", 1, dt.date(2024, 8, 1), "Calibración", "P2 2024", None),
+    ]
+    return historial.HistorialSources(
+        records=records,
+        known_codes={record.codigo for record in records},
+        plan_records={"AB-001": [entrada]},
+        calibration_events=eventos,
+    )
+
+
+def _cert_events() -> list:
+    return [
+        cert.CalibrationEvent("AB-001", dt.date(2024, 2, 1), "P1", "Periodo 1", 2024, None, 12),
+        cert.CalibrationEvent("AB-001", dt.date(2024, 8, 1), "P2", "Periodo 2", 2024, "Alto", None),
+        cert.CalibrationEvent("AB-003", dt.date(2024, 3, 15), "EXTRA", "Extraordinario", 2024, None, 6),
+        cert.CalibrationEvent("ZZ-999", dt.date(2024, 2, 1), "P1", "Periodo 1", 2024, None, 12),
+    ]
+
+
+def _audit_changes() -> list:
+    return [
+        audit.NormalizedChange(
+            row_position=index, segmento_actor="Administradores", hoja="Instrumentos",
+            seccion="Ubicación", campo="Ubicación", columna_excel="G" if index else "",
+            fila_excel=index + 2 if index else 0, instrumento_codigo="AB-001" if index else None,
+            fecha_evento=dt.datetime(2024, 1, 2, 9, index) if index != 1 else None,
+            valor_anterior="Lab 1", valor_nuevo=f"Lab {index + 2}",
+            usuario_correo="calidad@sbl.mx", usuario_nombre="Calidad", usuario_firma_interna="CAL",
+        )
+        for index in range(3)
+    ]
+
+
+def _check_builder_loads(pool) -> None:
+    """Plan de riesgos, historiales, calibraciones y audit trail, cargados dos veces.
+
+    Los instrumentos AB-001..AB-003 ya existen; ZZ-999 no, así que sus filas
+    se omiten en lugar de insertarse sin instrumento.
+    """
+    loader = DatabaseLoader(pool, batch_size=2)
+    dialect = loader.dialect
+
+    for clase in ("B", "A"):
+        filas = [_plan_row("AB-001", clase), _plan_row("AB-002", clase)]
+        (resultado,) = loader.load_batches(plan._load_batches(filas, dialect))
+        assert resultado.rows == 2
+        with pool.connection() as conn:
+            assert conn.execute(
+                "SELECT i.codigo, p.clase_riesgo, p.observaciones FROM plan_riesgos p "
+                "JOIN instrumentos i ON i.id = p.instrumento_id ORDER BY i.codigo"
+            ).fetchall() == [("AB-001", clase, None), ("AB-002", clase, None)], (
+                "La recarga del plan debe actualizar, no duplicar"
+            )
+
+    esperados = {
+        "historial_departamentos": 2, "historial_ubicaciones": 2, "historial_fecha_alta": 2,
+        "historial_fecha_baja": 1, "historial_tipos_instrumento": 2, "historial_calibraciones": 2,
+        "historial_especificaciones": 1, "historial_estado_instrumento": 2,
+    }
+    for _ in range(2):
+        loader.load_batches(historial.build_load_batches(_historial_sources(), 1, dialect))
+        assert _conteos(pool, HISTORIAL_TABLAS) == esperados, "La recarga duplicó historiales"
+
+    for _ in range(2):
+        (resultado,) = loader.load_batches(cert.build_load_batches(_cert_events(), 1, dialect))
+        assert resultado.rows == 4
+        with pool.connection() as conn:
+            calibraciones = conn.execute(
+                "SELECT i.codigo, c.fecha_calibracion, c.periodo, c.fecha_proxima, c.tipo "
+                "FROM calibraciones c JOIN instrumentos i ON i.id = c.instrumento_id "
+                "ORDER BY i.codigo, c.fecha_calibracion"
+            ).fetchall()
+        assert calibraciones == [
+            ("AB-001", "2024-02-01", "P1", "2025-02-01", "Calibración programada"),
+            ("AB-001", "2024-08-01", "P2", None, "Alto"),
+            ("AB-003", "2024-03-15", "EXTRA", "2024-09-15", "Calibración programada"),
+        ], "La recarga duplicó calibraciones"
+
+    # El audit trail es una bitácora: igual que el SQL generado, cada carga
+    # agrega sus cambios en lugar de reemplazarlos.
+    for carga in (1, 2):
+        (resultado,) = loader.load_batches(audit.build_load_batches(_audit_changes(), dialect, 1))
+        assert resultado.rows == 3
+        assert _conteos(pool, ("audit_trail",)) == {"audit_trail": 3 * carga}
+    with pool.connection() as conn:
+        assert conn.execute(
+            "SELECT instrumento_codigo, columna_excel, fila_excel, fecha_evento, valor_nuevo "
+            "FROM audit_trail ORDER BY id LIMIT 3"
+        ).fetchall() == [
+            (None, None, None, "2024-01-02 09:00:00", "Lab 2"),
+            ("AB-001", "G", 3, None, "Lab 3"),
+            ("AB-001", "G", 4, "2024-01-02 09:02:00", "Lab 4"),
+        ]
+
+
+def main() -> int:
+    assert MYSQL_DIALECT.prepare("SELECT ? LIKE '5%'") == "SELECT %s LIKE '5%%'", (
+        "Los marcadores no se adaptaron al estilo pyformat"
+    )
+    assert MYSQL_DIALECT.prepare(
+        "SELECT '¿?', `c?`, ? FROM t WHERE a = 'it''s ?' AND b = 'x\\'?'"
+    ) == "SELECT '¿?', `c?`, %s FROM t WHERE a = 'it''s ?' AND b = 'x\\'?'", (
+        "Se reemplazó un ? dentro de un literal"
+    )
+
+    with TemporaryDirectory() as tmp_dir:
+        dsn = f"sqlite:///{Path(tmp_dir) / 'sbl.db'}"
+        pool = get_pool(dsn, size=2)
+        assert get_pool(dsn) is pool, "El pool debe compartirse por DSN"
+
+        loader = DatabaseLoader(pool, batch_size=3)
+        sql = loader.dialect.insert_values(
+            "marcas", ("nombre", "empresa_id"), update_columns=("nombre",)
+        )
+        marcas = [(f"Marca {index}", 1) for index in range(10)]
+
+        primera = loader.load("marcas", sql, marcas)
+        segunda = loader.load("marcas", sql, iter(marcas))
+        assert primera.rows == segunda.rows == 10, "Conteo de filas enviado incorrecto"
+        assert primera.rows_per_second > 0, "No se reportó el rendimiento"
+        assert "filas/s" in primera.describe()
+
+        with pool.connection() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM marcas").fetchone()[0]
+        assert total == 10, "El upsert duplicó registros"
+
+        try:
+            loader.load("marcas", sql, [("Marca nueva", 1), (None, 1)])
+        except DatabaseLoadError:
+            pass
+        else:
+            raise AssertionError("Se esperaba un error por nombre NULL")
+
+        with pool.connection() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM marcas").fetchone()[0]
+        assert total == 10, "La transacción fallida no se revirtió"
+
+        _check_generator_load(Path(tmp_dir))
+        close_pools()
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
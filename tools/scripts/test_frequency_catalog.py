@@ -0,0 +1,68 @@
+"""Pruebas del catálogo de frecuencias con búsqueda por coincidencia más larga."""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from frequency_catalog import FrequencyCatalog, FrequencyCatalogError, default_catalog, tokenize  # noqa: E402
+
+
+def main() -> int:
+    assert tokenize("Termómetro_Digital  (pH-metro)") == ("termometro", "digital", "ph", "metro")
+
+    catalogo = default_catalog()
+    casos = {
+        "Balanza": 12,
+        "Balanza analítica": 6,
+        "balanza_analitica": 6,
+        "Micropipeta 10-100 µL": 6,
+        "Pipeta volumétrica": 12,
+        "Termómetros digitales": 6,
+        "Congeladores": 6,
+        "pH-metro": 6,
+        "Cronómetro": 24,
+        "Manómetro": 12,
+        "": 12,
+        None: 12,
+    }
+    for tipo, meses in casos.items():
+        assert catalogo.lookup(tipo) == meses, (tipo, catalogo.lookup(tipo))
+    assert catalogo.lookup.cache_info().hits == 0
+    catalogo.lookup("Balanza")
+    assert catalogo.lookup.cache_info().hits == 1, "La búsqueda no se memorizó por tipo"
+
+    # El orden del catálogo no importa; gana la coincidencia más larga y en empate la primera.
+    invertido = FrequencyCatalog({"equipo de prueba": 3, "equipo": 9, "prueba": 1}, default=12)
+    assert invertido.lookup("Equipo de prueba rápido") == 3
+    assert invertido.lookup("Prueba de equipo") == 1
+
+    with TemporaryDirectory() as tmp_dir:
+        ruta = Path(tmp_dir) / "frecuencias.json"
+        ruta.write_text(json.dumps({"default": 18, "tipos": {"autoclave": 4}}), encoding="utf-8")
+        propio = FrequencyCatalog.load(ruta)
+        assert propio.lookup("Autoclave vertical") == 4 and propio.lookup("Balanza") == 18
+        ruta.write_text(json.dumps({"tipos": {"": 4}}), encoding="utf-8")
+        try:
+            FrequencyCatalog.load(ruta)
+        except FrequencyCatalogError:
+            pass
+        else:
+            raise AssertionError("Se esperaba un error por tipo vacío")
+
+    from generate_cert_calibrations import CertCalibrationGenerator
+
+    generador = CertCalibrationGenerator()
+    assert generador.calculate_next_calibration_date(dt.date(2024, 1, 31), "Balanza analítica") == dt.date(2024, 7, 31)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,84 @@
+"""Pruebas del SQL por bloques del plan de riesgos (--staged / --chunk-size)."""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import generate_plan_riesgos as plan  # noqa: E402
+from sbl_utils import SQLStreamWriter  # noqa: E402
+
+
+def _fila(index: int) -> plan.RiskPlanRow:
+    return plan.RiskPlanRow(
+        codigo=f"AB-{index:03d}",
+        empresa_id=plan.EMPRESA_ID,
+        requerimiento="Alto",
+        impacto_falla="NA",
+        consideraciones_falla="NA",
+        clase_riesgo="B",
+        capacidad_deteccion="NA",
+        frecuencia="Anual",
+        fecha_actualizacion="2024-01-31" if index % 2 else "",
+        observaciones="" if index % 2 else plan.MISSING_CERTIFICATE_MESSAGE,
+        tipo_calibracion="Externa",
+        especificaciones="O'Haus ±0.1",
+    )
+
+
+def _render(rows, **kwargs) -> str:
+    buffer = io.StringIO()
+    with SQLStreamWriter(buffer) as sink:
+        plan._render_staged_sql(rows, sink, **kwargs)
+    return buffer.getvalue()
+
+
+def main() -> int:
+    rows = [_fila(index) for index in range(7)]
+    sql = _render(rows, chunk_size=3)
+    staging = plan.STAGING_TABLE
+
+    # 7 filas en bloques de 3: tres cargas, tres volcados y tres limpiezas.
+    assert sql.count(f"INSERT INTO {staging} (") == 3
+    assert sql.count("INSERT INTO plan_riesgos (") == 3
+    assert sql.count(f"DELETE FROM {staging};") == 3
+    assert sql.count("ON DUPLICATE KEY UPDATE") == 3
+    assert sql.count("AS codigo_sin_instrumento") == 3
+    assert sql.count("LEFT JOIN instrumentos i") == 6 and "\nJOIN instrumentos" not in sql
+    assert sql.count(f"CREATE TEMPORARY TABLE {staging}") == 1
+    assert sql.rstrip().endswith("COMMIT;")
+    for row in rows:
+        assert sql.count(f"('{row.codigo}', ") == 1, row.codigo
+    assert "'O''Haus ±0.1'" in sql and "(SELECT id FROM instrumentos" not in sql
+
+    # Un solo bloque cuando el tamaño cubre todas las filas; sin filas, ninguno.
+    assert _render(rows, chunk_size=50).count("INSERT INTO plan_riesgos (") == 1
+    assert "INSERT" not in _render([], chunk_size=3)
+
+    for invalido in (0, -1):
+        try:
+            _render(rows, chunk_size=invalido)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"chunk_size={invalido} debe rechazarse")
+
+    with contextlib.redirect_stderr(io.StringIO()):
+        try:
+            plan.main(["--staged", "--chunk-size", "0"])
+        except SystemExit as exc:
+            assert exc.code == 2
+        else:
+            raise AssertionError("--chunk-size 0 debe rechazarse en la línea de comandos")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,45 @@
+"""Pruebas del clasificador compilado de criticidad y tipo de servicio."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from instrument_classifier import (  # noqa: E402
+    KeywordClassifier,
+    KeywordRule,
+    _legacy_classify,
+    classify_instrument,
+    synthetic_instruments,
+)
+
+
+def main() -> int:
+    assert classify_instrument({"descripcion": "Balanza PRINCIPAL", "ubicacion": "Linea 2"}) == (
+        "CRITICA", "CALIBRACION"
+    )
+    assert classify_instrument({"descripcion": "Termómetro", "ubicacion": "Proceso B"}) == ("ALTA", "CALIBRACION")
+    assert classify_instrument({"descripcion": None, "ubicacion": None}) == ("NORMAL", "CALIBRACION")
+    # La primera regla de la tabla gana aunque su término aparezca después en el texto.
+    assert classify_instrument({"descripcion": "verificacion tras reparacion"})[1] == "MANTENIMIENTO"
+
+    # Términos traslapados: "reparacion" empieza dentro de "prereparacion" y no debe perderse.
+    traslape = KeywordClassifier(
+        [KeywordRule("texto", "A", ("reparacion",)), KeywordRule("texto", "B", ("prerep",))],
+        "NINGUNO",
+    )
+    assert traslape.classify({"texto": "prereparacion"}) == "A"
+    assert traslape.classify({"texto": "prerepintado"}) == "B"
+    assert traslape.classify({}) == "NINGUNO"
+
+    for row in synthetic_instruments(5000, seed=3):
+        assert classify_instrument(row) == _legacy_classify(row), row
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+"""Pruebas del SQL incremental de instrumentos con instantáneas (--snapshot)."""
+
+from __future__ import annotations
+
+import csv
+import json
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import generate_insert_instrumentos as gen  # noqa: E402
+from inventory_snapshot import InventorySnapshot, diff_hashes  # noqa: E402
+from pipeline_metrics import setup_metrics  # noqa: E402
+
+HEADER = [
+    "Instrumento", "Marca", "Modelo", "Serie", "Código", "Departamento responsable",
+    "Ubicación", "Fecha de alta", "Fecha de baja", "Próxima calibración", "estado", "programado",
+]
+
+
+def _fila(codigo: str, ubicacion: str = "Lab 1", marca: str = "Mettler") -> list:
+    return ["Balanza", marca, "XS204", "S-" + codigo, codigo, "Calidad", ubicacion,
+            "2023-01-31", "", "2025-01-31", "activo", "1"]
+
+
+def _write_csv(path: Path, rows) -> None:
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+
+
+def _run(tmp: Path, csv_path: Path, snapshot: Path, nombre: str) -> str:
+    output = tmp / nombre
+    args = ["--input", str(csv_path), "--estado-programado", str(csv_path),
+            "--output", str(output), "--snapshot", str(snapshot)]
+    assert gen.main(args) == 0
+    return output.read_text(encoding="utf-8")
+
+
+def main() -> int:
+    diff = diff_hashes({"A": "1", "B": "2", "C": "3"}, {"B": "2", "C": "9", "D": "4"})
+    assert (diff.nuevos, diff.modificados, diff.sin_cambios, diff.eliminados) == (
+        ["D"], ["C"], ["B"], ["A"]
+    )
+    assert diff.pendientes == ["D", "C"]
+
+    with TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        csv_path = tmp / "normalize_instrumentos.csv"
+        snapshot = tmp / "snap" / "instrumentos_snapshot.json"
+        _write_csv(csv_path, [_fila("AB-001"), _fila("AB-002"), _fila("AB-003")])
+
+        # Sin instantánea previa se emite todo, igual que sin --snapshot.
+        completo = _run(tmp, csv_path, snapshot, "1.sql")
+        registros = gen.leer_csv_normalizado(csv_path)
+        esperado = gen.generar_script_sql(gen.preparar_entidades(registros), 100)
+        assert completo.replace(completo.splitlines()[1] + "\n", "") == esperado
+        assert json.loads(snapshot.read_text(encoding="utf-8"))["hashes"].keys() == {
+            "AB-001", "AB-002", "AB-003"
+        }
+
+        # Sin cambios: el SQL no contiene inserciones.
+        vacio = _run(tmp, csv_path, snapshot, "2.sql")
+        assert "INSERT" not in vacio and "3 sin cambios" in vacio
+
+        # Un modificado, uno nuevo (con marca nueva) y uno eliminado.
+        _write_csv(csv_path, [_fila("AB-001"), _fila("AB-002", "Lab 2"), _fila("AB-004", marca="Ohaus")])
+        delta = _run(tmp, csv_path, snapshot, "3.sql")
+        assert "1 nuevos, 1 modificados, 1 sin cambios, 1 eliminados" in delta
+        assert "'AB-002'" in delta and "'AB-004'" in delta and "'AB-001'" not in delta
+        assert "--   AB-003" in delta and "DELETE" not in delta
+        assert "INSERT INTO marcas" in delta and "'Ohaus'" in delta
+        assert InventorySnapshot.load(snapshot).hashes.keys() == {"AB-001", "AB-002", "AB-004"}
+        delta_metric = setup_metrics("generate_insert_instrumentos").records[-2]
+        assert delta_metric["etapa"] == "delta_instantanea" and delta_metric["filas"] == 3
+        assert delta_metric["contadores"] == {"nuevos": 1, "modificados": 1, "sin_cambios": 1, "eliminados": 1}
+
+        # Una instantánea dañada o de otro contexto obliga a emitir todo.
+        snapshot.write_text("{basura", encoding="utf-8")
+        assert _run(tmp, csv_path, snapshot, "4.sql").count("'AB-00") == 3
+        previa = InventorySnapshot.load(snapshot)
+        previa.contexto = "otro"
+        previa.save(snapshot)
+        assert "3 nuevos, 0 modificados, 0 sin cambios, 0 eliminados" in _run(tmp, csv_path, snapshot, "5.sql")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,59 @@
+"""Pruebas de la importación diferida (`sbl_utils.lazy_import`)."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from sbl_utils import LazyModule, lazy_import, module_available  # noqa: E402
+
+SONDA = "sbl_lazy_import_sonda"
+INEXISTENTE = "sbl_modulo_que_no_existe"
+
+
+def main() -> int:
+    with TemporaryDirectory() as tmp_dir:
+        (Path(tmp_dir) / f"{SONDA}.py").write_text("VALOR = 42\n", encoding="utf-8")
+        sys.path.insert(0, tmp_dir)
+        try:
+            proxy = lazy_import(SONDA)
+            assert isinstance(proxy, LazyModule) and lazy_import(SONDA) is proxy
+            assert proxy.available and module_available(SONDA)
+            assert SONDA not in sys.modules, "El módulo se importó antes del primer acceso"
+            assert "diferido" in repr(proxy)
+
+            assert proxy.VALOR == 42
+            assert SONDA in sys.modules and "cargado" in repr(proxy)
+            assert proxy.load() is sys.modules[SONDA]
+        finally:
+            sys.path.remove(tmp_dir)
+            sys.modules.pop(SONDA, None)
+
+    faltante = lazy_import(INEXISTENTE, "pip install sbl-inexistente")
+    assert not faltante.available and not module_available(INEXISTENTE)
+    try:
+        faltante.algo
+    except ImportError as exc:
+        assert "pip install sbl-inexistente" in str(exc) and INEXISTENTE in str(exc)
+        assert isinstance(exc.__cause__, ImportError)
+    else:
+        raise AssertionError("Se esperaba ImportError con la sugerencia de instalación")
+
+    sin_sugerencia = LazyModule(INEXISTENTE)
+    try:
+        sin_sugerencia.load()
+    except ModuleNotFoundError:
+        pass
+    else:
+        raise AssertionError("Sin sugerencia debe propagarse el ImportError original")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+"""Pruebas de la lectura paralela de CSV por rangos de bytes (read_csv_parallel)."""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from sbl_utils import (  # noqa: E402
+    CSVHandler,
+    csv_byte_ranges,
+    iter_csv_record_spans,
+    read_csv_parallel,
+    splittable_encoding,
+)
+
+REPO_ROOT = SCRIPTS_DIR.parents[1]
+NORMALIZE_PYTHON = REPO_ROOT / "app" / "Modules" / "Internal" / "ArchivosSql" / "Normalize_Python"
+if str(NORMALIZE_PYTHON) not in sys.path:
+    sys.path.insert(0, str(NORMALIZE_PYTHON))
+
+import convert_audit_trail_csv as audit  # noqa: E402
+
+SAMPLE = (
+    b'codigo,fecha,nota\r\n'
+    b'AB-001,2024-01-02,"l\xc3\xadnea 1\r\nl\xc3\xadnea 2"\r\n'
+    b'\r\n'
+    b'AB-002,2024-01-03,"comillas ""dobles"" y\nsalto"\r\n'
+    b'AB-003,2024-01-04\r\n'
+    b'AB-004,2024-01-05,x,extra\r\n'
+    b'"AB-005","2024-01-06","\n\n\n"\r\n'
+)
+
+
+def _longitudes(rows):
+    return [len(row) for row in rows]
+
+
+def main() -> int:
+    header_end = SAMPLE.index(b"\n") + 1
+    starts = {offset for offset, _ in iter_csv_record_spans(SAMPLE)}
+    # Con cualquier tamaño de corte, los rangos caen en límites de registro.
+    for chunk_bytes in range(1, len(SAMPLE) + 1):
+        ranges = csv_byte_ranges(SAMPLE, header_end, chunk_bytes)
+        assert ranges[0][0] == header_end and ranges[-1][1] == len(SAMPLE)
+        assert all(left[1] == right[0] for left, right in zip(ranges, ranges[1:]))
+        assert all(start in starts for start, _ in ranges), chunk_bytes
+
+    assert splittable_encoding("utf-8") and splittable_encoding("latin-1")
+    assert not splittable_encoding("utf-16")
+
+    with TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "sample.csv"
+        path.write_bytes(SAMPLE)
+        with path.open(encoding="utf-8", newline="") as handle:
+            expected = list(csv.DictReader(handle))
+        for chunk_bytes in (1, 16, 64, 1 << 20):
+            chunks = list(read_csv_parallel(path, as_dicts=True, workers=2, chunk_bytes=chunk_bytes))
+            assert [row for chunk in chunks for row in chunk.rows] == expected, chunk_bytes
+            numbers = [number for chunk in chunks for number, _ in chunk.numbered()]
+            assert numbers == list(range(2, 2 + len(expected)))
+        projected = [
+            row
+            for chunk in read_csv_parallel(path, columns=("nota", "codigo", "falta"), chunk_bytes=32)
+            for row in chunk.rows
+        ]
+        assert projected == [(row["nota"], row["codigo"], None) for row in expected]
+        lengths = [
+            row
+            for chunk in read_csv_parallel(path, transform=_longitudes, workers=2, chunk_bytes=32)
+            for row in chunk.rows
+        ]
+        assert lengths == [3, 3, 2, 4, 3]
+        assert CSVHandler.read_csv(path, workers=2) == expected
+
+        try:
+            list(read_csv_parallel(path, transform=lambda rows: rows[:1], chunk_bytes=1 << 20))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("transform debe conservar una salida por fila")
+
+        compressed = path.with_name("sample.csv.gz")
+        compressed.write_bytes(gzip.compress(SAMPLE))
+        try:
+            list(read_csv_parallel(compressed))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Los CSV comprimidos no se pueden cortar por bytes")
+        assert CSVHandler.read_csv(compressed, workers=2) == expected
+
+        # El audit trail en paralelo produce las mismas filas y row_position.
+        source = audit.CSV_PATH.read_bytes()
+        header, body = source.split(b"\n", 1)
+        big = Path(tmp_dir) / "audit_trail.csv"
+        big.write_bytes(header + b"\n" + body * 10)
+        sequential = audit.load_raw_rows(big)
+        parallel = audit.load_raw_rows(big, workers=2)
+        assert len(parallel) == len(sequential) > 0
+        assert parallel == sequential
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
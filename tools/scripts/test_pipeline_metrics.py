@@ -0,0 +1,114 @@
+"""Pruebas de las métricas estructuradas por etapa (JSON lines)."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from pipeline_metrics import (  # noqa: E402
+    METRICS_ENV_VAR,
+    MetricsRecorder,
+    read_metrics,
+    setup_metrics,
+    summarize_metrics,
+)
+
+
+def main() -> int:
+    with TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "metricas" / "corrida.jsonl"
+        metrics = MetricsRecorder("prueba", path)
+        with metrics.stage("carga") as etapa:
+            etapa.rows = 1000
+            etapa.count("omitidas", 2)
+            etapa.count("omitidas")
+            etapa.gauge("procesos", 4)
+        with metrics.stage("carga") as etapa:
+            etapa.rows = 500
+        try:
+            with metrics.stage("escritura"):
+                raise RuntimeError("falla")
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("La excepción de la etapa debe propagarse")
+
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write("línea dañada\n")
+        records = read_metrics(path)
+        assert records == metrics.records
+        assert [record["etapa"] for record in records] == ["carga", "carga", "escritura"]
+        first = records[0]
+        assert first["contadores"] == {"omitidas": 3} and first["medidas"] == {"procesos": 4}
+        assert first["filas_por_s"] and first["filas_por_s"] > 1000
+        assert records[2]["estado"] == "error" and records[2]["filas_por_s"] is None
+        if sys.platform != "win32":
+            assert records[0]["pico_rss_mb"] > 0
+
+        summary = summarize_metrics(records)
+        assert set(summary) == {"prueba/carga", "prueba/escritura"}
+        carga = summary["prueba/carga"]
+        assert carga["ejecuciones"] == 2 and carga["filas"] == 1500
+        assert carga["contadores"] == {"omitidas": 3}
+        assert carga["filas_por_s"] == round(1500 / carga["duracion_s"], 1)
+        assert summary["prueba/escritura"]["errores"] == 1
+        assert read_metrics(Path(tmp_dir) / "no_existe.jsonl") == []
+
+        # Sin destino las métricas solo quedan en memoria.
+        saved = os.environ.pop(METRICS_ENV_VAR, None)
+        try:
+            recorder = MetricsRecorder("memoria")
+            with recorder.stage("x"):
+                pass
+            assert recorder.path is None and len(recorder.records) == 1
+            assert setup_metrics("compartido") is setup_metrics("compartido")
+        finally:
+            if saved is not None:
+                os.environ[METRICS_ENV_VAR] = saved
+
+        # Un script real escribe sus etapas en el archivo de SBL_METRICS_FILE.
+        run_file = Path(tmp_dir) / "script.jsonl"
+        subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / "generate_cert_calibrations.py"), "--historical",
+             "--output", str(Path(tmp_dir) / "cert.sql")],
+            check=True, capture_output=True, text=True,
+            env={**os.environ, METRICS_ENV_VAR: str(run_file)},
+        )
+        stages = summarize_metrics(read_metrics(run_file))
+        assert set(stages) == {
+            "cert_calibration_generator/lectura_historico",
+            "cert_calibration_generator/escritura_sql_historico",
+        }, stages
+        assert stages["cert_calibration_generator/lectura_historico"]["filas"] > 0
+
+        audit_file = Path(tmp_dir) / "audit.jsonl"
+        normalize_python = SCRIPTS_DIR.parents[1] / "app/Modules/Internal/ArchivosSql/Normalize_Python"
+        subprocess.run(
+            [sys.executable, str(normalize_python / "convert_audit_trail_csv.py"),
+             "--output", str(Path(tmp_dir) / "audit.sql"),
+             "--normalized-output", str(Path(tmp_dir) / "audit.csv"),
+             "--code-log", str(Path(tmp_dir) / "audit_log.md")],
+            check=True, capture_output=True, text=True,
+            env={**os.environ, METRICS_ENV_VAR: str(audit_file)},
+        )
+        stages = summarize_metrics(read_metrics(audit_file))
+        assert set(stages) == {
+            f"convert_audit_trail_csv/{etapa}"
+            for etapa in ("lectura_csv", "expansion_cambios", "escritura_csv_normalizado", "escritura_sql")
+        }, stages
+        assert stages["convert_audit_trail_csv/expansion_cambios"]["filas"] > 0
+        json.dumps(stages)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
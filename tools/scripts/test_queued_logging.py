@@ -0,0 +1,102 @@
+"""Pruebas del logging en cola con límite de mensajes repetidos (setup_logging)."""
+
+from __future__ import annotations
+
+import io
+import logging
+import subprocess
+import sys
+import textwrap
+import threading
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from sbl_utils import _QUEUE_LOGGING, flush_logging, setup_logging  # noqa: E402
+
+CHILD = textwrap.dedent(
+    """
+    import sys
+    sys.path.insert(0, {scripts!r})
+    from sbl_utils import setup_logging
+
+    logger = setup_logging("prueba_hijo", queued=True, repeat_limit=3)
+    for fila in range(10):
+        logger.error(f"Error procesando fila {{fila}}")
+    logger.info("Proceso terminado")
+    if {fork}:
+        import multiprocessing
+
+        def trabajo():
+            logger.warning("Mensaje desde el proceso hijo")
+
+        proceso = multiprocessing.get_context("fork").Process(target=trabajo)
+        proceso.start()
+        proceso.join()
+    """
+)
+
+
+class _ThreadName:
+    def __init__(self):
+        self.formatted_in = None
+
+    def __str__(self) -> str:
+        self.formatted_in = threading.current_thread().name
+        return "valor"
+
+
+def main() -> int:
+    # El proceso termina sin llamar a flush_logging: atexit vacía la cola y resume.
+    fork = sys.platform == "linux"
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(scripts=str(SCRIPTS_DIR), fork=fork)],
+        check=True, capture_output=True, text=True,
+    )
+    lines = result.stderr.splitlines()
+    errores = [line for line in lines if "Error procesando fila" in line and "suprimidos" not in line]
+    assert [line.rsplit(" ", 1)[-1] for line in errores] == ["0", "1", "2"], lines
+    resumen = [line for line in lines if "suprimidos" in line]
+    assert len(resumen) == 1 and "7 mensajes repetidos suprimidos" in resumen[0], lines
+    assert resumen[0].endswith("(último: Error procesando fila 9)") and " - ERROR - " in resumen[0]
+    assert any(line.endswith("Proceso terminado") for line in lines)
+    assert lines.index(resumen[0]) > lines.index(errores[-1])
+    if fork:
+        assert any(line.endswith("Mensaje desde el proceso hijo") for line in lines), lines
+
+    # El formateo ocurre en el hilo del listener, no en el que registra.
+    logger = setup_logging("prueba_cola", queued=True, repeat_limit=2)
+    stream = io.StringIO()
+    _QUEUE_LOGGING["prueba_cola"].output.setStream(stream)
+    valor = _ThreadName()
+    logger.info("Valor diferido: %s", valor)
+    for fila in range(5):
+        logger.warning("Fila %d inválida", fila)
+    try:
+        raise ValueError("falla")
+    except ValueError:
+        logger.exception("Con traceback")
+    flush_logging("prueba_cola")
+    salida = stream.getvalue()
+    assert valor.formatted_in not in (None, threading.current_thread().name), valor.formatted_in
+    assert "Valor diferido: valor" in salida
+    assert salida.count("inválida") == 3, salida  # dos mensajes y el resumen
+    assert "3 mensajes repetidos suprimidos" in salida and "ValueError: falla" in salida
+
+    # Después de flush_logging el logger sigue funcionando y el límite se reinicia.
+    logger.warning("Fila %d inválida", 99)
+    flush_logging("prueba_cola")
+    assert "Fila 99 inválida" in stream.getvalue()
+    assert setup_logging("prueba_cola", queued=True) is logger and len(logger.handlers) == 1
+
+    # Sin cola ni límite el comportamiento es el de siempre.
+    plain = setup_logging("prueba_directo")
+    assert isinstance(plain.handlers[0], logging.StreamHandler) and not plain.handlers[0].filters
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
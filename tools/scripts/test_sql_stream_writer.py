@@ -0,0 +1,75 @@
+"""Pruebas del escritor de SQL por bloques (`sbl_utils.SQLStreamWriter`)."""
+
+from __future__ import annotations
+
+import gzip
+import sys
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from sbl_utils import SQLStreamWriter  # noqa: E402
+
+
+def _valores(total: int):
+    for index in range(total):
+        yield f"({index}, 'fila {index}')"
+
+
+def main() -> int:
+    buffer = StringIO()
+    with SQLStreamWriter(buffer, flush_size=16) as sink:
+        sink.write_line("START TRANSACTION;")
+        filas = sink.write_values(_valores(3), terminator=";")
+        sink.write_line("COMMIT;")
+
+    assert filas == 3, "Conteo de filas incorrecto"
+    assert buffer.getvalue() == (
+        "START TRANSACTION;\n"
+        "VALUES\n"
+        "    (0, 'fila 0'),\n"
+        "    (1, 'fila 1'),\n"
+        "    (2, 'fila 2');\n"
+        "COMMIT;\n"
+    ), "El bloque VALUES no respeta comas y terminador"
+    assert not buffer.closed, "Un manejador externo no debe cerrarse"
+
+    with TemporaryDirectory() as tmp_dir:
+        plano = Path(tmp_dir) / "salida.sql"
+        comprimido = Path(tmp_dir) / "anidado" / "salida.sql.gz"
+        for destino in (plano, comprimido):
+            with SQLStreamWriter(destino, flush_size=64) as sink:
+                sink.write_values(_valores(1000))
+
+        contenido = plano.read_text(encoding="utf-8")
+        assert contenido.count("\n") == 1001, "Faltan filas en el archivo plano"
+        with gzip.open(comprimido, "rt", encoding="utf-8") as fh:
+            assert fh.read() == contenido, "El archivo .gz difiere del plano"
+
+        # compress=False gana sobre el sufijo; compress=None lo respeta.
+        forzado_plano = Path(tmp_dir) / "forzado.sql.gz"
+        with SQLStreamWriter(forzado_plano, compress=False) as sink:
+            sink.write_line("COMMIT;")
+        assert forzado_plano.read_text(encoding="utf-8") == "COMMIT;\n"
+        forzado_gzip = Path(tmp_dir) / "forzado.sql"
+        with SQLStreamWriter(forzado_gzip, compress=True) as sink:
+            sink.write_line("COMMIT;")
+        with gzip.open(forzado_gzip, "rt", encoding="utf-8") as fh:
+            assert fh.read() == "COMMIT;\n"
+
+    try:
+        SQLStreamWriter(StringIO(), flush_size=0)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("flush_size=0 debe rechazarse")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
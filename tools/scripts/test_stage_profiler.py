@@ -0,0 +1,108 @@
+"""Pruebas del perfilado uniforme de los puntos de entrada (--profile/--trace-malloc)."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from stage_profiler import extract_profiling_args, load_profile_summary, run_main  # noqa: E402
+
+
+def _fib(n: int) -> int:
+    return n if n < 2 else _fib(n - 1) + _fib(n - 2)
+
+
+def _hoja(n: int) -> int:
+    return sum(range(n))
+
+
+def _rama_a() -> int:
+    return _hoja(200_000)
+
+
+def _rama_b() -> int:
+    return _hoja(200_000) + _hoja(200_000)
+
+
+def _workload() -> int:
+    bloques = [bytearray(256 * 1024) for _ in range(8)]
+    _fib(18)
+    _rama_a()
+    _rama_b()
+    del bloques
+    raise SystemExit(3)
+
+
+def main() -> int:
+    options, remaining = extract_profiling_args(
+        ["--empresa-id", "2", "--profile", "--profile-dir=/tmp/x", "--trace-malloc", "--profile-top", "5", "--full"]
+    )
+    assert remaining == ["--empresa-id", "2", "--full"]
+    assert options.profile and options.trace_malloc and options.top == 5
+    assert options.output_dir == Path("/tmp/x")
+    options, remaining = extract_profiling_args(["--full"])
+    assert not options.enabled and remaining == ["--full"]
+    for bad in (["--profile-dir"], ["--profile-top", "cero"], ["--profile-top", "0"]):
+        try:
+            extract_profiling_args(bad)
+        except SystemExit:
+            pass
+        else:
+            raise AssertionError(bad)
+
+    with TemporaryDirectory() as tmp_dir:
+        out = Path(tmp_dir) / "perfil"
+        saved_argv = sys.argv[:]
+        sys.argv = ["carga.py", "--profile", "--trace-malloc", "--profile-dir", str(out), "--otro"]
+        try:
+            run_main(_workload)
+        except SystemExit as exc:
+            assert exc.code == 3
+        else:
+            raise AssertionError("run_main debe propagar SystemExit")
+        finally:
+            seen_argv, sys.argv = sys.argv, saved_argv
+        assert seen_argv == ["carga.py", "--otro"], seen_argv
+
+        summary = load_profile_summary(out, "carga")
+        assert summary is not None and summary["salida"] == 3
+        assert summary["tracemalloc"]["pico_mb"] >= 2.0, summary["tracemalloc"]
+        assert summary["cprofile"]["funciones"]
+        assert (out / "carga.prof").stat().st_size > 0
+
+        stacks = {}
+        for line in (out / "carga.collapsed").read_text(encoding="utf-8").splitlines():
+            stack, micros = line.rsplit(" ", 1)
+            stacks[stack] = int(micros)
+        hoja = {stack: micros for stack, micros in stacks.items() if stack.split(";")[-1].startswith("_hoja ")}
+        rama_a = sum(micros for stack, micros in hoja.items() if "_rama_a " in stack)
+        rama_b = sum(micros for stack, micros in hoja.items() if "_rama_b " in stack)
+        assert rama_a and rama_b and 1.3 < rama_b / rama_a < 3.0, (rama_a, rama_b)
+        assert all(stack.split(";")[0].startswith("_workload ") for stack in stacks if "_fib " in stack)
+        total = summary["cprofile"]["tiempo_total_s"] * 1e6
+        assert abs(sum(stacks.values()) - total) < 0.05 * total + 1000
+
+        # Un script real con las opciones en su línea de comandos.
+        cli = Path(tmp_dir) / "cli"
+        subprocess.run(
+            [sys.executable, str(SCRIPTS_DIR / "frequency_catalog.py"), "--benchmark", "2000",
+             "--profile", "--profile-dir", str(cli)],
+            check=True, capture_output=True, text=True,
+        )
+        summary = json.loads((cli / "frequency_catalog.json").read_text(encoding="utf-8"))
+        assert summary["salida"] == 0 and summary["argv"] == ["--benchmark", "2000"]
+        assert "tracemalloc" not in summary
+        assert (cli / "frequency_catalog.collapsed").read_text(encoding="utf-8")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
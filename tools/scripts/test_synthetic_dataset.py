@@ -0,0 +1,92 @@
+"""Pruebas del generador de conjuntos sintéticos a escala."""
+
+from __future__ import annotations
+
+import csv
+import sys
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from sbl_utils import get_csv_originales_dir, get_repo_root  # noqa: E402
+from synthetic_dataset import (  # noqa: E402
+    AUDIT_FILE,
+    CELL_RANGE,
+    CODE_COLUMN,
+    SHEET_FILES,
+    DatasetProfile,
+    SyntheticDataset,
+    shift_spanish_dates,
+)
+
+
+def _rows(path: Path):
+    with path.open(newline="", encoding="utf-8") as handle:
+        return list(csv.reader(handle))
+
+
+def main() -> int:
+    assert shift_spanish_dates("16-Abr-19", 20) == "06-May-19"
+    assert shift_spanish_dates("Baja: 8-abr-2019 y 14-Abr-22", -8) == "Baja: 31-mar-2019 y 06-Abr-22"
+    assert shift_spanish_dates("28-Dic-23", 10) == "28-Dic-23", "No debe cambiar de año"
+    assert shift_spanish_dates("ND", 5) == "ND"
+
+    profile = DatasetProfile.learn(get_csv_originales_dir(get_repo_root(__file__)))
+    base = len(profile.prototypes)
+    assert base > 0 and profile.audit_events
+
+    with TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        counts = SyntheticDataset(profile, 2.5, semilla=4).write(tmp / "a")
+        SyntheticDataset(profile, 2.5, semilla=4).write(tmp / "b")
+        SyntheticDataset(profile, 2.5, semilla=5).write(tmp / "c")
+
+        total = round(2.5 * base)
+        for filename, _ in SHEET_FILES.values():
+            assert counts[filename] == total
+            assert (tmp / "a" / filename).read_bytes() == (tmp / "b" / filename).read_bytes(), filename
+        assert (tmp / "a" / AUDIT_FILE).read_bytes() == (tmp / "b" / AUDIT_FILE).read_bytes()
+        assert (tmp / "a" / "LM_instrumentos_original_v2.csv").read_bytes() != (
+            tmp / "c" / "LM_instrumentos_original_v2.csv"
+        ).read_bytes()
+
+        sheets = {
+            sheet: _rows(tmp / "a" / filename)[header_rows:header_rows + total]
+            for sheet, (filename, header_rows) in SHEET_FILES.items()
+        }
+        codes = [row[CODE_COLUMN] for row in sheets["instrumentos"]]
+        assert all(codes) and len(codes) == len(set(codes)), "Códigos vacíos o repetidos"
+        leyenda = _rows(tmp / "a" / "LM_instrumentos_original_v2.csv")[-1][0]
+        assert leyenda.startswith("ND=No disponible"), "Falta la leyenda al final de la hoja"
+        for sheet_rows in sheets.values():
+            assert [row[CODE_COLUMN] for row in sheet_rows] == codes, "Hojas desalineadas"
+
+        # Las ediciones de una celda apuntan a filas sintéticas y llevan su valor.
+        audit = _rows(tmp / "a" / AUDIT_FILE)
+        assert audit[0] == profile.audit_header
+        assert len(audit) - 1 == counts[AUDIT_FILE] > len(profile.audit_events) * 2
+        headers = {"SBL-LM-08": ("instrumentos", 1), "Certificados": ("certificados", 2)}
+        checked = 0
+        for fecha, hoja, rango, _, nuevo, _ in audit[1:]:
+            match = CELL_RANGE.match(rango)
+            if hoja not in headers or not match or match.group(3) or not nuevo:
+                continue
+            sheet, header_rows = headers[hoja]
+            index = int(match.group(2)) - header_rows - 1
+            column = ord(match.group(1)) - 65 if len(match.group(1)) == 1 else None
+            if column is None or not 0 <= index < total:
+                continue
+            row = sheets[sheet][index]
+            if column < len(row) and row[column]:
+                assert nuevo == row[column], (rango, nuevo, row[column])
+                checked += 1
+        assert checked > 100
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+"""Pruebas del escritor de libros Excel por filas (`xlsx_writer.XLSXStreamWriter`)."""
+
+from __future__ import annotations
+
+import datetime as dt
+import sys
+import zipfile
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from xml.etree import ElementTree
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from xlsx_writer import XLSXStreamWriter, XLSXWriterError, column_letter  # noqa: E402
+
+NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def _read_sheet(archive: zipfile.ZipFile, index: int):
+    root = ElementTree.fromstring(archive.read(f"xl/worksheets/sheet{index}.xml"))
+    rows = []
+    for row in root.iterfind(".//m:sheetData/m:row", NS):
+        cells = {}
+        for cell in row.iterfind("m:c", NS):
+            text = cell.find("m:is/m:t", NS)
+            value = cell.find("m:v", NS)
+            cells[cell.get("r")] = (text.text if text is not None else value.text, cell.get("s"))
+        rows.append(cells)
+    return rows
+
+
+def main() -> int:
+    assert [column_letter(i) for i in (0, 25, 26, 701, 702)] == ["A", "Z", "AA", "ZZ", "AAA"]
+
+    with TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "anidado" / "reporte.xlsx"
+        with XLSXStreamWriter(path) as libro:
+            with libro.sheet("Resumen: clientes/2024", ["Cliente", "Total", "Cumplimiento (%)"]) as hoja:
+                hoja.write_row(["Cliente <A&B>", 10, 87.5])
+            hoja = libro.sheet("Instrumentos", ["Código", "Próxima", "Días"])
+            filas = hoja.write_rows(
+                (f"SBL-{index:03d}", dt.date(2024, 1, 1) + dt.timedelta(days=index), None)
+                for index in range(1000)
+            )
+            assert filas == 1000
+            try:
+                libro.sheet("INSTRUMENTOS")
+            except XLSXWriterError:
+                pass
+            else:
+                raise AssertionError("Se esperaba un error por hoja duplicada")
+
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                if name.endswith((".xml", ".rels")):
+                    ElementTree.fromstring(archive.read(name))
+            workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+            nombres = [sheet.get("name") for sheet in workbook.iterfind(".//m:sheet", NS)]
+            assert nombres == ["Resumen_ clientes_2024", "Instrumentos"], nombres
+
+            resumen = _read_sheet(archive, 1)
+            assert resumen[0]["A1"] == ("Cliente", "3"), "El encabezado no usa el estilo en negritas"
+            assert resumen[1] == {
+                "A2": ("Cliente <A&B>", None),
+                "B2": ("10", None),
+                "C2": ("87.5", None),
+            }
+
+            instrumentos = _read_sheet(archive, 2)
+            assert len(instrumentos) == 1001, "Faltan filas en la hoja de instrumentos"
+            assert instrumentos[1]["B2"] == ("45292", "1"), "La fecha no se escribió como serial de Excel"
+            assert "C2" not in instrumentos[1], "Los valores None deben quedar como celdas vacías"
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
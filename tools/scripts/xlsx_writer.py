@@ -0,0 +1,357 @@
+"""Escritura de libros Excel (.xlsx) fila por fila, sin pandas ni openpyxl.
+
+`pd.ExcelWriter` construye cada hoja completa en memoria antes de guardarla.
+`XLSXStreamWriter` escribe cada hoja directamente dentro del ZIP del libro a
+medida que llegan las filas, de modo que la memoria usada no depende del número
+de filas:
+
+```python
+with XLSXStreamWriter(Path("reporte.xlsx")) as libro:
+    with libro.sheet("Instrumentos", ["Código", "Próxima calibración"]) as hoja:
+        for status in statuses:
+            hoja.write_row([status.codigo, status.proxima_calibracion])
+```
+
+Los textos se escriben como *inline strings* (no se mantiene una tabla de
+cadenas compartidas en memoria), las fechas como números de serie con formato
+`yyyy-mm-dd` y los valores `None` como celdas vacías. Solo puede haber una hoja
+abierta a la vez.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import functools
+import re
+import zipfile
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Sequence
+from xml.sax.saxutils import escape, quoteattr
+
+MAX_ROWS = 1_048_576
+MAX_SHEET_NAME_LENGTH = 31
+DEFAULT_COMPRESSLEVEL = 6
+DEFAULT_FLUSH_SIZE = 64 * 1024
+EXCEL_EPOCH = dt.datetime(1899, 12, 30)
+
+INVALID_SHEET_CHARS = re.compile(r"[\[\]\*\?/\\:]")
+ILLEGAL_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Índices de `cellXfs` en styles.xml
+STYLE_DEFAULT = 0
+STYLE_DATE = 1
+STYLE_DATETIME = 2
+STYLE_HEADER = 3
+
+_CONTENT_TYPES_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="2">'
+    '<numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>'
+    '<numFmt numFmtId="165" formatCode="yyyy-mm-dd hh:mm"/>'
+    '</numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    '</sheetView></sheetViews>'
+    '<sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+class XLSXWriterError(ValueError):
+    """Uso inválido del escritor de libros (hojas duplicadas, límites de Excel...)."""
+
+
+def column_letter(index: int) -> str:
+    """Convierte un índice de columna (base 0) en su letra de Excel."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+@functools.lru_cache(maxsize=4096)
+def _excel_serial(value: dt.date) -> str:
+    if isinstance(value, dt.datetime):
+        delta = value.replace(tzinfo=None) - EXCEL_EPOCH
+        return _format_number(delta.days + delta.seconds / 86400)
+    return str((value - EXCEL_EPOCH.date()).days)
+
+
+def _format_number(value: float) -> str:
+    text = repr(value)
+    return text[:-2] if text.endswith(".0") else text
+
+
+@functools.lru_cache(maxsize=65536)
+def _escape_text(text: str) -> str:
+    # Los reportes repiten mucho los mismos textos (cliente, estado, ubicación).
+    return escape(ILLEGAL_XML_CHARS.sub("", text))
+
+
+def _text_cell(reference: str, value: Any, style_attr: str) -> str:
+    text = _escape_text(str(value))
+    if not text:
+        return ""
+    return (
+        f'<c r="{reference}" t="inlineStr"{style_attr}>'
+        f'<is><t xml:space="preserve">{text}</t></is></c>'
+    )
+
+
+def _int_cell(reference: str, value: int, style_attr: str) -> str:
+    return f'<c r="{reference}"{style_attr}><v>{value}</v></c>'
+
+
+def _float_cell(reference: str, value: float, style_attr: str) -> str:
+    if value != value or value in (float("inf"), float("-inf")):
+        return ""
+    return f'<c r="{reference}"{style_attr}><v>{_format_number(value)}</v></c>'
+
+
+def _bool_cell(reference: str, value: bool, style_attr: str) -> str:
+    return f'<c r="{reference}" t="b"{style_attr}><v>{int(value)}</v></c>'
+
+
+def _date_cell(reference: str, value: dt.date, style_attr: str) -> str:
+    return f'<c r="{reference}" s="{STYLE_DATE}"><v>{_excel_serial(value)}</v></c>'
+
+
+def _datetime_cell(reference: str, value: dt.datetime, style_attr: str) -> str:
+    return f'<c r="{reference}" s="{STYLE_DATETIME}"><v>{_excel_serial(value)}</v></c>'
+
+
+_CELL_RENDERERS: Dict[type, Callable[[str, Any, str], str]] = {
+    str: _text_cell,
+    int: _int_cell,
+    float: _float_cell,
+    bool: _bool_cell,
+    dt.date: _date_cell,
+    dt.datetime: _datetime_cell,
+}
+
+
+def _renderer_for(value: Any) -> Callable[[str, Any, str], str]:
+    renderer = _CELL_RENDERERS.get(type(value))
+    if renderer is not None:
+        return renderer
+    # Subclases (p. ej. IntEnum o tipos de fecha derivados): el orden importa
+    # porque bool es subclase de int y datetime de date.
+    for kind in (bool, int, float, dt.datetime, dt.date):
+        if isinstance(value, kind):
+            return _CELL_RENDERERS[kind]
+    return _text_cell
+
+
+def sanitize_sheet_name(name: str) -> str:
+    """Aplica las restricciones de Excel a un nombre de hoja."""
+    cleaned = INVALID_SHEET_CHARS.sub("_", name).strip("'").strip()
+    return (cleaned or "Hoja")[:MAX_SHEET_NAME_LENGTH]
+
+
+class WorksheetStream:
+    """Hoja abierta dentro del libro; las filas se comprimen al ZIP por bloques."""
+
+    def __init__(
+        self,
+        handle: IO[bytes],
+        name: str,
+        columns: Sequence[str],
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+    ):
+        self.name = name
+        self.columns = list(columns)
+        self.rows_written = 0
+        self._handle = handle
+        self._references: List[str] = [column_letter(index) for index in range(len(self.columns))]
+        self._closed = False
+        # Las filas se acumulan y se comprimen por bloques: cada escritura al
+        # ZIP invoca zlib, y hacerlo por fila domina el tiempo total.
+        self._flush_size = flush_size
+        self._buffer: List[str] = [_SHEET_HEAD]
+        self._buffered = len(_SHEET_HEAD)
+        if self.columns:
+            self._write(self.columns, STYLE_HEADER)
+
+    def _write(self, values: Sequence[Any], style: int = STYLE_DEFAULT) -> None:
+        if self._closed:
+            raise XLSXWriterError(f"La hoja {self.name!r} ya fue cerrada")
+        row_number = self.rows_written + 1
+        if row_number > MAX_ROWS:
+            raise XLSXWriterError(f"La hoja {self.name!r} excede el límite de {MAX_ROWS} filas de Excel")
+        while len(self._references) < len(values):
+            self._references.append(column_letter(len(self._references)))
+        style_attr = f' s="{style}"' if style else ""
+        references = self._references
+        row_number_text = str(row_number)
+        cells = "".join(
+            _renderer_for(value)(references[index] + row_number_text, value, style_attr)
+            for index, value in enumerate(values)
+            if value is not None
+        )
+        row = f'<row r="{row_number_text}">{cells}</row>'
+        self._buffer.append(row)
+        self._buffered += len(row)
+        self.rows_written = row_number
+        if self._buffered >= self._flush_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self._handle.write("".join(self._buffer).encode("utf-8"))
+            self._buffer = []
+            self._buffered = 0
+
+    def write_row(self, values: Sequence[Any]) -> None:
+        self._write(values)
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> int:
+        count = 0
+        for values in rows:
+            self._write(values)
+            count += 1
+        return count
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._buffer.append(_SHEET_TAIL)
+        self._flush()
+        self._handle.close()
+        self._closed = True
+
+    def __enter__(self) -> "WorksheetStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class XLSXStreamWriter:
+    """Libro `.xlsx` escrito de forma incremental; ver el docstring del módulo."""
+
+    def __init__(self, path: Path, compresslevel: int = DEFAULT_COMPRESSLEVEL):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._zip = zipfile.ZipFile(
+            self.path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel
+        )
+        self._sheets: List[str] = []
+        self._current: Optional[WorksheetStream] = None
+        self._closed = False
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return list(self._sheets)
+
+    def sheet(self, name: str, columns: Sequence[str] = ()) -> WorksheetStream:
+        """Abre una hoja nueva; la anterior se cierra automáticamente."""
+        if self._closed:
+            raise XLSXWriterError("El libro ya fue cerrado")
+        if self._current is not None:
+            self._current.close()
+        sheet_name = sanitize_sheet_name(name)
+        if sheet_name.casefold() in (existing.casefold() for existing in self._sheets):
+            raise XLSXWriterError(f"La hoja {sheet_name!r} ya existe en {self.path.name}")
+        self._sheets.append(sheet_name)
+        handle = self._zip.open(f"xl/worksheets/sheet{len(self._sheets)}.xml", "w")
+        self._current = WorksheetStream(handle, sheet_name, columns)
+        return self._current
+
+    def _write_workbook_parts(self) -> None:
+        if not self._sheets:
+            # Excel no abre libros sin hojas.
+            self.sheet("Hoja1").close()
+        sheets_xml = "".join(
+            f'<sheet name={quoteattr(name)} sheetId="{index}" r:id="rId{index}"/>'
+            for index, name in enumerate(self._sheets, start=1)
+        )
+        workbook = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets_xml}</sheets></workbook>'
+        )
+        sheet_rels = "".join(
+            f'<Relationship Id="rId{index}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{index}.xml"/>'
+            for index in range(1, len(self._sheets) + 1)
+        )
+        styles_rel = (
+            f'<Relationship Id="rId{len(self._sheets) + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/>'
+        )
+        workbook_rels = (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{sheet_rels}{styles_rel}</Relationships>'
+        )
+        content_types = _CONTENT_TYPES_HEAD + "".join(
+            f'<Override PartName="/xl/worksheets/sheet{index}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for index in range(1, len(self._sheets) + 1)
+        ) + "</Types>"
+
+        self._zip.writestr("[Content_Types].xml", content_types)
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._zip.writestr("xl/workbook.xml", workbook)
+        self._zip.writestr("xl/_rels/workbook.xml.rels", workbook_rels)
+        self._zip.writestr("xl/styles.xml", _STYLES)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        try:
+            if self._current is not None:
+                self._current.close()
+                self._current = None
+            self._write_workbook_parts()
+        finally:
+            self._zip.close()
+            self._closed = True
+
+    def __enter__(self) -> "XLSXStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()